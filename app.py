@@ -1,9 +1,32 @@
 # app.py (replace your current app.py with this file)
-from flask import Flask, render_template, request, redirect, session, flash, url_for
+from flask import Flask, render_template, request, redirect, session, flash, url_for, jsonify, Response, g, has_request_context
 from functools import wraps
-import mysql.connector
+from datetime import date, timedelta
+import math
 import os
+import threading
+import time
+import uuid
 from dotenv import load_dotenv
+from backend.db_pool import pool_from_env
+from backend.db_router import router_from_env
+from backend.pagination import encode_cursor, decode_cursor, clamp_page_size, like_prefix
+from backend import risk_scoring, risk_forecast, export, bulk_import, risk_scanner, risk_rollups, mitigation_planner, vendor_scoring, schedule_graph
+from backend.health_scheduler import HealthScheduler
+from backend.risk_scanner import RiskScanner
+from backend.risk_rollups import RollupScheduler
+from backend.vendor_scoring import VendorScoreScheduler
+from backend.schedule_graph import ScheduleScheduler
+from backend.profiling import Profiler
+from backend.cache import TTLCache, backend_from_env, register_enterprise_cache, notify_enterprise_write
+from backend.auth import AuthBusy, lookup_user, save_rehash, verifier_from_env
+from backend.user_context import load_user_context, invalidate_user, user_cache
+from backend import serving
+from backend.live_feed import hub_from_env, sse_stream, FeedTailer, FeedHub, LocalPubSub
+from backend.chat import ChatService, ChatError, list_rooms
+from backend.template_cache import fragment_cache_from_env, install as install_template_caches
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
 
 # load environment (optional .env.local)
 load_dotenv('.env.local')
@@ -11,50 +34,229 @@ load_dotenv('.env.local')
 app = Flask(__name__)
 app.secret_key = os.getenv('FLASK_SECRET', 'risk-sentinel-2026-production-ready')
 
+# compiled templates persist under instance/jinja_bytecode across restarts; {% cache %} fragments
+# keyed by enterprise_id are dropped by notify_enterprise_write() along with dashboard_cache
+fragment_cache = fragment_cache_from_env()
+if fragment_cache is not None:
+    register_enterprise_cache(fragment_cache)
+install_template_caches(app.jinja_env, app.root_path, fragment_cache)
+
 # --------------------------
 # DATABASE helper
 # --------------------------
-def get_cursor():
-    """Return (cursor, conn) or (None, None) on failure."""
+db_pool = pool_from_env()
+
+# GET/HEAD requests read from DB_REPLICAS when set; other methods, background jobs and any
+# session or enterprise that wrote within DB_READ_YOUR_WRITES seconds use the primary
+db_router = router_from_env(db_pool)
+if db_router.enabled:
+    register_enterprise_cache(db_router.recent_writes)
+    db_router.start()
+
+# optional in-process ProjectHealth refresh; cron can drive backend/health_scheduler.py --once instead
+health_scheduler = None
+if int(os.getenv('HEALTH_SCHEDULER_INTERVAL', '0')) > 0:
+    health_scheduler = HealthScheduler(db_pool.acquire, int(os.getenv('HEALTH_SCHEDULER_INTERVAL'))).start()
+
+# optional in-process refresh of the daily risk rollups; cron can drive backend/risk_rollups.py --once instead
+rollup_scheduler = None
+if int(os.getenv('ROLLUP_INTERVAL', '0')) > 0:
+    rollup_scheduler = RollupScheduler(db_pool.acquire, int(os.getenv('ROLLUP_INTERVAL'))).start()
+
+# optional in-process vendor rescoring; cron can drive backend/vendor_scoring.py --once instead
+vendor_score_scheduler = None
+if int(os.getenv('VENDOR_SCORE_INTERVAL', '0')) > 0:
+    vendor_score_scheduler = VendorScoreScheduler(db_pool.acquire, int(os.getenv('VENDOR_SCORE_INTERVAL'))).start()
+
+# optional in-process schedule-slip propagation (keeps project graphs in memory between runs);
+# cron can drive backend/schedule_graph.py --once instead
+schedule_scheduler = None
+if int(os.getenv('SCHEDULE_INTERVAL', '0')) > 0:
+    schedule_scheduler = ScheduleScheduler(db_pool.acquire, int(os.getenv('SCHEDULE_INTERVAL'))).start()
+
+# optional in-process rule scan; cron can drive backend/risk_scanner.py --once instead
+risk_scanner_thread = None
+if int(os.getenv('RISK_SCAN_INTERVAL', '0')) > 0:
+    risk_scanner_thread = RiskScanner(db_pool.acquire, int(os.getenv('RISK_SCAN_INTERVAL')),
+                                      float(os.getenv('RISK_SCAN_BUDGET', '60'))).start()
+
+# per-route wall/DB/render timing, query + row counts and slow-query log; served at /metrics
+profiler = Profiler(
+    app,
+    sample_rate=float(os.getenv('PROFILE_SAMPLE_RATE', '1.0')),
+    slow_query_ms=float(os.getenv('SLOW_QUERY_MS', '200'))
+)
+profiler.extra_collectors.append(lambda: [
+    ('rs_db_pool_' + key, 'gauge' if key in ('open', 'idle', 'size') else 'counter',
+     f'Connection pool {key}.', [({}, value)])
+    for key, value in db_pool.snapshot().items()
+])
+profiler.extra_collectors.append(lambda: [
+    ('rs_db_router_' + key + '_total', 'counter', f'Read routing: {key}.', [({}, value)])
+    for key, value in db_router.stats.items()
+] + [
+    ('rs_db_replica_' + key, 'gauge' if key in ('healthy', 'lag_s', 'busy') else 'counter', f'Replica {key}.',
+     [({'replica': name}, replica[key]) for name, replica in db_router.snapshot()['replicas'].items()])
+    for key in ('healthy', 'lag_s', 'busy', 'reads', 'failures', 'checks') if db_router.enabled
+])
+
+# per-enterprise live activity / risk feed (SSE); the tailer picks up rows written by other processes
+feed_hub = hub_from_env()
+feed_tailer = None
+if float(os.getenv('FEED_TAIL_INTERVAL', '2')) > 0:
+    feed_tailer = FeedTailer(feed_hub, db_pool.acquire, float(os.getenv('FEED_TAIL_INTERVAL', '2')))
+    feed_tailer.start()
+profiler.extra_collectors.append(lambda: [
+    ('rs_feed_' + key, 'gauge' if key == 'subscribers' else 'counter', f'Live feed {key}.', [({}, value)])
+    for key, value in feed_hub.stats().items()
+])
+
+# every open EventSource (admin dashboard feed, chat page) holds a serving thread while the tab
+# is open; at most FEED_MAX_STREAMS per process, beyond that 503 and the browser retries.
+# gunicorn.conf.py gives each worker that many threads on top of WEB_THREADS for them.
+sse_slots = threading.BoundedSemaphore(int(os.getenv('FEED_MAX_STREAMS', '16')))
+profiler.extra_collectors.append(lambda: [
+    ('rs_sse_streams_free', 'gauge', 'SSE stream slots free in this process.', [({}, sse_slots._value)])
+])
+
+# vendor chat: batched message writes pushed to room subscribers over SSE; per-room rings serve history
+# only when FEED_BACKEND shares writes across workers (see ChatService)
+chat_hub = FeedHub(LocalPubSub(), max_queue=int(os.getenv('FEED_MAX_QUEUE', '256')), replay=20)
+chat_service = ChatService(
+    db_pool.acquire, chat_hub, feed_hub.backend,
+    shared_backend=not isinstance(feed_hub.backend, LocalPubSub),
+    ring_size=int(os.getenv('CHAT_RING_SIZE', '200')),
+    active_rooms=int(os.getenv('CHAT_ACTIVE_ROOMS', '1000')),
+    batch_size=int(os.getenv('CHAT_BATCH_SIZE', '500')),
+    flush_interval=float(os.getenv('CHAT_FLUSH_MS', '20')) / 1000
+).start()
+profiler.extra_collectors.append(lambda: [
+    ('rs_fragment_cache_' + key, 'counter', f'Template fragment cache {key}.', [({}, value)])
+    for key, value in (fragment_cache.stats() if fragment_cache else {}).items()
+])
+profiler.extra_collectors.append(lambda: [
+    ('rs_chat_' + key, 'gauge' if key in ('pending', 'active_rooms') else 'counter', f'Chat {key}.', [({}, value)])
+    for key, value in chat_service.stats().items()
+])
+
+# --------------------------
+# Pre-forked workers (gunicorn.conf.py)
+# --------------------------
+def start_worker():
+    """Run in each worker after fork(): threads do not survive it, so per-process ones start again."""
+    global feed_tailer
+    feed_hub.backend.after_fork()
+    chat_service.start()
+    db_router.start()
+    if feed_tailer is not None:
+        feed_tailer = FeedTailer(feed_hub, db_pool.acquire, feed_tailer.interval)
+        feed_tailer.start()
+
+def stop_worker():
+    """Stop the per-process threads, writing any queued chat messages first."""
+    if feed_tailer is not None:
+        feed_tailer.stop()
+    chat_service.stop()
+    db_router.stop()
+
+def schedulers():
+    """The optional background jobs enabled by their *_INTERVAL settings."""
+    return [s for s in (health_scheduler, rollup_scheduler, vendor_score_scheduler, schedule_scheduler,
+                        risk_scanner_thread) if s is not None]
+
+def start_schedulers():
+    for scheduler in schedulers():
+        scheduler.start()
+
+def stop_schedulers():
+    """Stop the schedulers, waiting for a pass in progress to finish; returns how many were running."""
+    running = schedulers()
+    for scheduler in running:
+        scheduler.stop()
+    return len(running)
+
+def read_only_request():
+    """True when this request may read from a replica."""
+    if not db_router.enabled or not has_request_context() or request.method not in ('GET', 'HEAD'):
+        return False
+    return not db_router.pinned(session.get('wrote_at'), session.get('enterprise_id'))
+
+@app.after_request
+def remember_write(response):
+    # read-your-writes: this session reads the primary for a while after any non-GET request
+    if db_router.enabled and request.method not in ('GET', 'HEAD', 'OPTIONS') and 'user_id' in session:
+        session['wrote_at'] = time.time()
+    return response
+
+def get_cursor(read_only=None):
+    """
+    Return (cursor, conn) or (None, None) on failure. conn.close() returns it to the pool.
+    read_only: None decides from the request (see read_only_request); True allows a replica.
+    """
+    conn = None
     try:
-        conn = mysql.connector.connect(
-            host=os.getenv('DB_HOST', 'localhost'),
-            user=os.getenv('DB_USER', 'root'),
-            password=os.getenv('DB_PASS', 'admin'),
-            database=os.getenv('DB_NAME', 'risk_sentinel'),
-            autocommit=True
-        )
+        conn = db_router.acquire(read_only_request() if read_only is None else read_only)
         cursor = conn.cursor(dictionary=True)
-        return cursor, conn
+        return profiler.wrap(cursor, conn)
     except Exception as e:
+        if conn is not None:
+            conn.close()
         app.logger.error("DB connection failed: %s", e)
         return None, None
 
+# --------------------------
+# Login throttling + password verification
+# --------------------------
+# bcrypt runs on a bounded pool; saturation answers 503 instead of queueing request threads
+password_verifier = verifier_from_env()
+
+limiter = Limiter(
+    get_remote_address,
+    app=app,
+    storage_uri=os.getenv('RATELIMIT_STORAGE_URI', 'memory://'),
+    strategy='moving-window',
+    enabled=os.getenv('RATELIMIT_ENABLED', '1') != '0'
+)
+
+def login_email_key():
+    return 'email:' + (request.form.get('email') or '').strip().lower()
+
+def is_login_get():
+    return request.method != 'POST'
+
+profiler.extra_collectors.append(lambda: [
+    ('rs_login_verify_rejected_total', 'counter', 'Logins refused because the hashing pool was saturated.',
+     [({}, password_verifier.rejected)])
+])
+
+@app.errorhandler(429)
+def too_many_requests(e):
+    flash('Too many login attempts. Please wait a minute and try again.', 'error')
+    return render_template('auth/enterprise_login.html'), 429
+
 # --------------------------
 # Template helper - current_user
 # --------------------------
 @app.context_processor
 def inject_user():
-    if 'user_id' in session:
-        user_obj = type('User', (), {
-            'is_authenticated': True,
-            'username': session.get('username', 'Admin'),
-            'role': session.get('role', 'Admin')
-        })()
-        return dict(current_user=user_obj)
-    guest = type('User', (), {'is_authenticated': False, 'username': 'Guest', 'role': 'Guest'})()
-    return dict(current_user=guest)
+    # built once per request (several templates may render); the record itself is LRU-cached per user_id
+    if 'current_user' not in g:
+        g.current_user = load_user_context(session, get_cursor)
+    return dict(current_user=g.current_user)
 
 # --------------------------
 # Dashboard data builder
 # --------------------------
-def get_complete_dashboard_data(enterprise_id):
-    """
-    Gather dashboard aggregates for an enterprise.
-    Uses joins so we filter by projects.enterprise_id (safer given your DB).
-    """
-    cursor, conn = get_cursor()
-    data = {
+# keyed by enterprise_id; dropped by notify_enterprise_write() on risk/project/task/vendor/budget/activity writes
+# and after background job runs that wrote the enterprise's rows (backend/jobs.py)
+dashboard_cache = register_enterprise_cache(TTLCache(
+    backend_from_env(int(os.getenv('DASHBOARD_CACHE_SIZE', '512'))),
+    ttl=int(os.getenv('DASHBOARD_CACHE_TTL', '60')),
+    namespace='dashboard'
+))
+
+def empty_dashboard_data():
+    return {
         'total_risks': 0,
         'active_projects': 0,
         'total_vendors': 0,
@@ -73,6 +275,132 @@ def get_complete_dashboard_data(enterprise_id):
         'complete_projects': 0
     }
 
+# all scalar counters in one round trip; every CTE reuses the enterprise's project set
+DASHBOARD_COUNTERS_SQL = """
+    WITH ep AS (
+        SELECT id, status FROM projects WHERE enterprise_id = %s
+    ),
+    pc AS (
+        SELECT COALESCE(SUM(status IN ('Active', 'Planning')), 0) AS active_projects,
+               COALESCE(SUM(status = 'OnHold'), 0) AS hold_projects,
+               COALESCE(SUM(status = 'Complete'), 0) AS complete_projects
+        FROM ep
+    ),
+    vc AS (
+        SELECT COUNT(*) AS total_vendors
+        FROM vendors v JOIN ep ON v.assigned_project_id = ep.id
+    ),
+    bc AS (
+        SELECT COALESCE(SUM(b.total), 0) AS budget_total, COALESCE(SUM(b.spent), 0) AS budget_spent
+        FROM budgets b JOIN ep ON b.project_id = ep.id
+    ),
+    tc AS (
+        SELECT COUNT(*) AS total_tasks
+        FROM tasks t JOIN ep ON t.project_id = ep.id
+    )
+    SELECT pc.*, vc.total_vendors, bc.budget_total, bc.budget_spent, tc.total_tasks
+    FROM pc, vc, bc, tc
+"""
+
+DASHBOARD_SEVERITY_SQL = """
+    SELECT r.severity, COUNT(*) AS count
+    FROM risks r
+    JOIN projects p ON r.project_id = p.id
+    WHERE p.enterprise_id = %s
+    GROUP BY r.severity
+"""
+
+def fill_dashboard_counters(cursor, enterprise_id, data):
+    """Scalar counters + severity breakdown in two queries (total risks is the severity sum)."""
+    cursor.execute(DASHBOARD_COUNTERS_SQL, (enterprise_id,))
+    row = cursor.fetchone() or {}
+    for key in ('active_projects', 'hold_projects', 'complete_projects', 'total_vendors', 'total_tasks'):
+        data[key] = int(row.get(key) or 0)
+    data['budget_total'] = float(row.get('budget_total') or 0)
+    data['budget_spent'] = float(row.get('budget_spent') or 0)
+    data['budget_percentage'] = int((data['budget_spent'] / data['budget_total'] * 100) if data['budget_total'] > 0 else 0)
+
+    cursor.execute(DASHBOARD_SEVERITY_SQL, (enterprise_id,))
+    severity_data = cursor.fetchall() or []
+    data['total_risks'] = sum(int(r['count']) for r in severity_data)
+    if severity_data:
+        data['severity_stats'] = {r['severity']: r['count'] for r in severity_data}
+        data['high_risks'] = data['severity_stats'].get('High', 0)
+
+def fill_dashboard_recent(cursor, enterprise_id, data):
+    cursor.execute("""
+        SELECT r.id, r.title, r.severity, r.status, COALESCE(p.name, 'No Project') as project_name, r.created_at
+        FROM risks r
+        LEFT JOIN projects p ON r.project_id = p.id
+        WHERE p.enterprise_id = %s
+        ORDER BY r.created_at DESC
+        LIMIT 5
+    """, (enterprise_id,))
+    data['recent_risks'] = cursor.fetchall() or []
+
+    cursor.execute("""
+        SELECT a.action, a.details, a.created_at, u.username
+        FROM activities a
+        LEFT JOIN users u ON a.user_id = u.id
+        WHERE a.project_id IN (SELECT id FROM projects WHERE enterprise_id = %s)
+        ORDER BY a.created_at DESC
+        LIMIT 5
+    """, (enterprise_id,))
+    data['recent_activities'] = cursor.fetchall() or []
+
+def build_dashboard_data(enterprise_id):
+    """
+    Gather dashboard aggregates for an enterprise.
+    4 queries: counters (CTE + conditional aggregation), severity groups, recent risks, recent activity.
+    Returns (data, ok) so callers can avoid caching a failed build.
+    """
+    cursor, conn = get_cursor()
+    data = empty_dashboard_data()
+    if not cursor:
+        return data, False
+
+    ok = False
+    try:
+        fill_dashboard_counters(cursor, enterprise_id, data)
+        fill_dashboard_recent(cursor, enterprise_id, data)
+        ok = True
+    except Exception as e:
+        app.logger.error("Error fetching dashboard data: %s", e)
+    finally:
+        try:
+            cursor.close()
+            conn.close()
+        except Exception:
+            pass
+
+    return data, ok
+
+profiler.extra_collectors.append(lambda: [
+    ('rs_cache_' + key + '_total', 'counter', f'Cache {key}.',
+     [({'cache': 'dashboard'}, value), ({'cache': 'user'}, user_cache.stats()[key])])
+    for key, value in dashboard_cache.stats().items()
+])
+
+def get_complete_dashboard_data(enterprise_id):
+    """Dashboard aggregates, served from dashboard_cache when fresh."""
+    data = dashboard_cache.get(enterprise_id)
+    if data is not None:
+        return data
+    data, ok = build_dashboard_data(enterprise_id)
+    # fresh on every build: fragments rendered from these figures key on it (templates/admin/dashboard.html)
+    data['data_version'] = uuid.uuid4().hex[:12]
+    if ok:
+        dashboard_cache.set(enterprise_id, data)
+    return data
+
+def get_complete_dashboard_data_per_query(enterprise_id):
+    """
+    Gather dashboard aggregates for an enterprise, one query per counter.
+    Kept as the reference implementation for benchmarks/bench_dashboard.py.
+    """
+    cursor, conn = get_cursor()
+    data = empty_dashboard_data()
+
     if not cursor:
         return data
 
@@ -208,6 +536,8 @@ def landing():
     return render_template('landing.html')
 
 @app.route('/enterprise-login', methods=['GET', 'POST'])
+@limiter.limit(os.getenv('LOGIN_RATE_PER_IP', '20/minute'), exempt_when=is_login_get)
+@limiter.limit(os.getenv('LOGIN_RATE_PER_EMAIL', '5/minute'), key_func=login_email_key, exempt_when=is_login_get)
 def enterprise_login():
     if request.method == 'POST':
         email = (request.form.get('email') or '').strip().lower()
@@ -215,13 +545,33 @@ def enterprise_login():
         cursor, conn = get_cursor()
         user = None
         if cursor:
-            cursor.execute("SELECT id, username, role, enterprise_id, is_active, email FROM users WHERE LOWER(email) = %s AND password = %s", (email, password))
-            user = cursor.fetchone()
             try:
-                cursor.close()
-                conn.close()
-            except Exception:
-                pass
+                user = lookup_user(cursor, email)
+            finally:
+                try:
+                    cursor.close()
+                    conn.close()
+                except Exception:
+                    pass
+
+        # verify after the connection is back in the pool so slow hashes never hold DB slots
+        try:
+            ok, new_hash = password_verifier.verify(password, user['password'] if user else None)
+        except AuthBusy:
+            flash('Login is busy right now, please try again shortly.', 'error')
+            return render_template('auth/enterprise_login.html'), 503
+        if not ok:
+            user = None
+        elif new_hash:
+            # plaintext or weaker-round hash: upgrade in place now that we know the password
+            cursor, conn = get_cursor()
+            if cursor:
+                try:
+                    save_rehash(cursor, user['id'], new_hash)
+                finally:
+                    cursor.close()
+                    conn.close()
+                invalidate_user(user['id'])
 
         if user and int(user.get('is_active', 0)) == 1:
             session['user_id'] = user['id']
@@ -253,31 +603,78 @@ def admin_dashboard():
     data = get_complete_dashboard_data(session.get('enterprise_id'))
     return render_template('admin/dashboard.html', **data)
 
+USER_STATS_SQL = """
+    SELECT COUNT(*) AS total_users,
+           COALESCE(SUM(is_active = 1), 0) AS active_users,
+           COALESCE(SUM(is_active = 0), 0) AS inactive_users,
+           COALESCE(SUM(role = 'PM'), 0) AS pm_count
+    FROM users WHERE enterprise_id = %s
+"""
+
+def fetch_user_page(cursor, enterprise_id, search='', after=None, before=None, per_page=25):
+    """
+    One keyset page of an enterprise's users, newest first, ordered by (created_at, id).
+    after/before are decoded (created_at, id) cursors. Returns (users, next_cursor, prev_cursor).
+    """
+    where = ["enterprise_id = %s"]
+    params = [enterprise_id]
+    if search:
+        where.append("(username LIKE %s OR email LIKE %s)")
+        params += [like_prefix(search), like_prefix(search.lower())]
+    if before:
+        where.append("(created_at > %s OR (created_at = %s AND id > %s))")
+        params += [before[0], before[0], before[1]]
+        order = "created_at ASC, id ASC"
+    else:
+        if after:
+            where.append("(created_at < %s OR (created_at = %s AND id < %s))")
+            params += [after[0], after[0], after[1]]
+        order = "created_at DESC, id DESC"
+    cursor.execute(f"""
+        SELECT id, username, email, role, is_active, created_at FROM users
+        WHERE {' AND '.join(where)}
+        ORDER BY {order}
+        LIMIT %s
+    """, (*params, per_page + 1))
+    rows = cursor.fetchall() or []
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if before:
+        rows.reverse()
+    if not rows:
+        return [], None, None
+    first, last = rows[0], rows[-1]
+    next_cursor = encode_cursor(last['created_at'], last['id']) if (has_more or before) else None
+    prev_cursor = encode_cursor(first['created_at'], first['id']) if (after or (before and has_more)) else None
+    return rows, next_cursor, prev_cursor
+
 @app.route('/admin/user_management')
 @login_required('Admin')
 def admin_user_management():
     cursor, conn = get_cursor()
     users = []
     stats = {'total_users': 0, 'active_users': 0, 'inactive_users': 0, 'pm_count': 0}
+    search = (request.args.get('q') or '').strip()
+    page = {'next_cursor': None, 'prev_cursor': None, 'search': search,
+            'per_page': clamp_page_size(request.args.get('per_page'))}
     if cursor:
         try:
-            cursor.execute("SELECT id, username, email, role, is_active, created_at FROM users ORDER BY created_at DESC")
-            users = cursor.fetchall() or []
-            cursor.execute("SELECT COUNT(*) as count FROM users")
-            stats['total_users'] = (cursor.fetchone() or {}).get('count', 0) or 0
-            cursor.execute("SELECT COUNT(*) as count FROM users WHERE is_active = 1")
-            stats['active_users'] = (cursor.fetchone() or {}).get('count', 0) or 0
-            cursor.execute("SELECT COUNT(*) as count FROM users WHERE is_active = 0")
-            stats['inactive_users'] = (cursor.fetchone() or {}).get('count', 0) or 0
-            cursor.execute("SELECT COUNT(*) as count FROM users WHERE role = 'PM'")
-            stats['pm_count'] = (cursor.fetchone() or {}).get('count', 0) or 0
+            users, page['next_cursor'], page['prev_cursor'] = fetch_user_page(
+                cursor, session.get('enterprise_id'), search,
+                after=decode_cursor(request.args.get('after'), 'di'),
+                before=decode_cursor(request.args.get('before'), 'di'),
+                per_page=page['per_page']
+            )
+            cursor.execute(USER_STATS_SQL, (session.get('enterprise_id'),))
+            row = cursor.fetchone() or {}
+            stats = {k: int(row.get(k) or 0) for k in stats}
         finally:
             try:
                 cursor.close()
                 conn.close()
             except Exception:
                 pass
-    return render_template('admin/user_management.html', users=users, **stats)
+    return render_template('admin/user_management.html', users=users, **stats, **page)
 
 @app.route('/admin/reports')
 @login_required('Admin')
@@ -285,6 +682,136 @@ def admin_reports():
     data = get_complete_dashboard_data(session.get('enterprise_id'))
     return render_template('admin/reports.html', **data)
 
+@app.route('/metrics')
+def metrics():
+    """Prometheus text exposition; set METRICS_TOKEN to require 'Authorization: Bearer <token>'."""
+    token = os.getenv('METRICS_TOKEN')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return Response('unauthorized\n', status=401, mimetype='text/plain')
+    return Response(profiler.prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/readyz')
+def readyz():
+    """Readiness probe: 200 once this worker is warmed up and can reach the DB, 503 while draining."""
+    payload, status = serving.readiness(db_pool)
+    return jsonify(payload), status
+
+@app.route('/admin/cache-stats')
+@login_required('Admin')
+def admin_cache_stats():
+    return jsonify(dashboard=dashboard_cache.stats(), user=user_cache.stats(), feed=feed_hub.stats())
+
+@app.route('/api/live/feed')
+@login_required()
+def live_feed():
+    """Server-Sent Events stream of new activities / risks for the user's enterprise."""
+    last_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    return sse_response(feed_hub, session.get('enterprise_id'), last_id,
+                        float(os.getenv('FEED_HEARTBEAT', '15')), float(os.getenv('FEED_LINGER', '0.05')))
+
+def sse_response(hub, key, last_id, heartbeat, linger):
+    """
+    SSE response for a subscription taken in the view (so replay starts at Last-Event-ID),
+    holding one of sse_slots. sse_stream unsubscribes once iterated; a HEAD request or a
+    client gone before the first chunk never iterates it, so the WSGI close() unsubscribes
+    and frees the slot.
+    """
+    if not sse_slots.acquire(blocking=False):
+        return jsonify(error='too many live streams, retrying'), 503, {'Retry-After': '5'}
+    sub = hub.subscribe(key, last_id)
+    released = []
+
+    def close():
+        hub.unsubscribe(sub)  # idempotent
+        if not released:
+            released.append(True)
+            sse_slots.release()
+
+    response = Response(sse_stream(hub, sub, heartbeat, linger), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    response.call_on_close(close)
+    return response
+
+@app.route('/admin/export/<table>')
+@login_required('Admin')
+def admin_export(table):
+    """Stream risks/tasks/activities for the enterprise as CSV or JSON (?format, ?columns, ?gzip=1)."""
+    fmt = request.args.get('format', 'csv').lower()
+    if fmt not in ('csv', 'json'):
+        return jsonify(error='format must be csv or json'), 400
+    try:
+        columns = export.select_columns(table, request.args.get('columns'))
+    except export.ExportError as e:
+        return jsonify(error=str(e)), 400
+    cursor, conn = get_cursor()
+    if not cursor:
+        return jsonify(error='database unavailable'), 503
+    cursor.close()
+
+    gzip = request.args.get('gzip') in ('1', 'true')
+    filename = f"{table}.{fmt}" + ('.gz' if gzip else '')
+    headers = {'Content-Disposition': f'attachment; filename="{filename}"'}
+    body = export.stream_export(conn, table, columns, session.get('enterprise_id'), fmt, gzip, on_close=conn.close)
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/json'
+    # the generator's finally only runs once iteration starts; a HEAD request or a client gone
+    # before the first chunk never starts it, so the WSGI close() hands the connection back
+    response = Response(body, mimetype='application/gzip' if gzip else mimetype, headers=headers)
+    response.call_on_close(conn.close)
+    return response
+
+@app.route('/admin/import/<table>', methods=['POST'])
+@login_required('Admin')
+def admin_import(table):
+    """
+    Bulk import risks/tasks from CSV or JSON, sent as a `file` upload or the raw body
+    (?format, ?batch_size, ?chunk_rows). Returns counts and per-row errors.
+    """
+    if table not in bulk_import.IMPORT_COLUMNS:
+        return jsonify(error=f'unknown import: {table}'), 404
+    upload = request.files.get('file')
+    source = upload.stream if upload else request.stream
+    default_fmt = 'json' if (upload and upload.filename.endswith('.json')) or request.mimetype == 'application/json' else 'csv'
+    fmt = request.args.get('format', default_fmt).lower()
+    batch_size = clamp_page_size(request.args.get('batch_size'), default=1000, maximum=10000)
+    chunk_rows = clamp_page_size(request.args.get('chunk_rows'), default=10000, maximum=100000)
+    enterprise_id = session.get('enterprise_id')
+    cursor, conn = get_cursor()
+    if not cursor:
+        return jsonify(error='database unavailable'), 503
+    cursor.close()
+    try:
+        summary = bulk_import.run_import(conn, table, source, enterprise_id, fmt, batch_size, chunk_rows)
+    except bulk_import.BulkImportError as e:
+        return jsonify(error=str(e)), 400
+    except Exception as e:
+        app.logger.error("Bulk import of %s failed: %s", table, e)
+        notify_enterprise_write(enterprise_id, table)  # earlier chunks may have committed
+        return jsonify(error='import failed'), 500
+    finally:
+        conn.close()
+    if summary['inserted']:
+        notify_enterprise_write(enterprise_id, table)
+        feed_hub.publish(enterprise_id, 'import', {k: summary[k] for k in ('table', 'inserted', 'failed')})
+    if summary['aborted'] and not summary['inserted']:
+        return jsonify(dict(summary, error=summary['aborted'])), 400
+    return jsonify(summary), 207 if summary['failed'] or summary['aborted'] else 200
+
+@app.route('/admin/api/vendors/riskiest')
+@login_required(['Admin', 'Analyst'])
+def admin_riskiest_vendors():
+    """This enterprise's vendors by risk_score, highest first; page with ?after=<next_cursor> and ?per_page=."""
+    cursor, conn = get_cursor()
+    if not cursor:
+        return jsonify(error='database unavailable'), 503
+    try:
+        vendors, next_cursor = vendor_scoring.riskiest(cursor, session.get('enterprise_id'),
+                                                       after=decode_cursor(request.args.get('after'), 'fi'),
+                                                       per_page=clamp_page_size(request.args.get('per_page')))
+    finally:
+        cursor.close()
+        conn.close()
+    return jsonify(vendors=vendors, next_cursor=next_cursor)
+
 @app.route('/admin/projects')
 @login_required('Admin')
 def admin_projects():
@@ -323,7 +850,7 @@ def admin_project_detail(project_id):
                 conn.close()
             except Exception:
                 pass
-    return render_template('admin/projectdetail.html', project=project, risks=risks)
+    return render_template('admin/project_detail.html', project=project, risks=risks)
 
 # VENDOR
 @app.route('/vendor-login', methods=['GET', 'POST'])
@@ -335,7 +862,71 @@ def vendor_login():
 
 @app.route('/vendor/dashboard')
 def vendor_dashboard():
-    return render_template('vendor/dashboard.html', vendor_name=session.get('vendor_name', 'Vendor'))
+    return render_template('vendor/dashboard/index.html', vendor_name=session.get('vendor_name', 'Vendor'))
+
+# VENDOR CHAT
+@app.route('/vendor/chat')
+@login_required()
+def vendor_chat():
+    return render_template('vendor/chat/index.html')
+
+def chat_room_denied(room_id):
+    """JSON error response when the room is missing or belongs to another enterprise, else None."""
+    try:
+        owner = chat_service.room_enterprise(room_id)
+    except Exception as e:
+        app.logger.error("Chat room lookup failed: %s", e)
+        return jsonify(error='database unavailable'), 503
+    if owner is None or owner != session.get('enterprise_id'):
+        return jsonify(error='room not found'), 404
+    return None
+
+@app.route('/api/chat/rooms')
+@login_required()
+def chat_rooms():
+    cursor, conn = get_cursor()
+    if not cursor:
+        return jsonify(error='database unavailable'), 503
+    try:
+        return jsonify(rooms=list_rooms(cursor, session.get('enterprise_id')))
+    finally:
+        cursor.close()
+        conn.close()
+
+@app.route('/api/chat/rooms/<int:room_id>/messages', methods=['GET', 'POST'])
+@login_required()
+def chat_messages(room_id):
+    """GET: newest-first keyset page (?before=<message_id>&limit=n). POST {"message": "..."}: send."""
+    denied = chat_room_denied(room_id)
+    if denied:
+        return denied
+    if request.method == 'POST':
+        body = request.get_json(silent=True) or request.form
+        try:
+            message = chat_service.post(room_id, session['user_id'], body.get('message'),
+                                        username=session.get('username'))
+        except ChatError as e:
+            return jsonify(error=str(e)), 400
+        return jsonify(message), 201
+    limit = clamp_page_size(request.args.get('limit'), default=50, maximum=200)
+    before = request.args.get('before', type=int)
+    try:
+        messages = chat_service.history(room_id, before=before, limit=limit)
+    except Exception as e:
+        app.logger.error("Chat history failed: %s", e)
+        return jsonify(error='database unavailable'), 503
+    next_before = messages[-1]['message_id'] if len(messages) == limit else None
+    return jsonify(messages=messages, next_before=next_before)
+
+@app.route('/api/chat/rooms/<int:room_id>/stream')
+@login_required()
+def chat_stream(room_id):
+    """SSE stream of new messages in the room."""
+    denied = chat_room_denied(room_id)
+    if denied:
+        return denied
+    return sse_response(chat_hub, room_id, request.headers.get('Last-Event-ID') or None,
+                        float(os.getenv('FEED_HEARTBEAT', '15')), linger=0.01)
 
 # SUPPORT
 @app.route('/forgot-password', methods=['GET', 'POST'])
@@ -359,13 +950,336 @@ def vendor_register():
 @app.route('/pm/dashboard')
 @login_required('PM')
 def pm_dashboard():
-    return render_template('pm/dashboard.html')
+    impacted = []
+    cursor, conn = get_cursor()
+    if cursor:
+        try:
+            impacted = schedule_graph.impacted_milestones(cursor, session.get('user_id'), session.get('enterprise_id'), 10)
+        finally:
+            cursor.close()
+            conn.close()
+    return render_template('pm/dashboard.html', impacted_milestones=impacted)
+
+@app.route('/pm/api/impacted-milestones')
+@login_required(['PM', 'Admin'])
+def pm_impacted_milestones():
+    """Open milestones of a PM's projects (this user, or ?pm_user_id=) projected past their target, largest slip first."""
+    cursor, conn = get_cursor()
+    if not cursor:
+        return jsonify(error='database unavailable'), 503
+    try:
+        pm_user_id = request.args.get('pm_user_id', session.get('user_id'), type=int)
+        milestones = schedule_graph.impacted_milestones(cursor, pm_user_id, session.get('enterprise_id'),
+                                                        clamp_page_size(request.args.get('limit')))
+    finally:
+        cursor.close()
+        conn.close()
+    return jsonify(milestones=milestones)
+
+@app.route('/pm/api/milestones/<int:milestone_id>/path')
+@login_required(['PM', 'Admin', 'Analyst'])
+def pm_milestone_path(milestone_id):
+    """The chain of tasks and milestones that drives this milestone's projected date, root cause first."""
+    cursor, conn = get_cursor()
+    if not cursor:
+        return jsonify(error='database unavailable'), 503
+    try:
+        milestone = schedule_graph.milestone_path(cursor, milestone_id, session.get('enterprise_id'))
+    finally:
+        cursor.close()
+        conn.close()
+    if milestone is None:
+        return jsonify(error='milestone not found'), 404
+    return jsonify(milestone)
+
+@app.route('/pm/api/dependencies', methods=['POST'])
+@login_required(['PM', 'Admin'])
+def pm_add_dependency():
+    """{"project_id", "predecessor": {"type", "id"}, "successor": {"type", "id"}, "lag_days"}; picked up by the next schedule run."""
+    body = request.get_json(silent=True) or {}
+    try:
+        project_id = int(body['project_id'])
+        ends = [(body[k]['type'], int(body[k]['id'])) for k in ('predecessor', 'successor')]
+        lag_days = int(body.get('lag_days') or 0)
+    except (KeyError, TypeError, ValueError):
+        return jsonify(error='project_id, predecessor and successor are required'), 400
+    if any(node_type not in schedule_graph.NODE_TYPES for node_type, _ in ends) or ends[0] == ends[1]:
+        return jsonify(error='predecessor and successor must be two different tasks or milestones'), 400
+    enterprise_id = session.get('enterprise_id')
+    cursor, conn = get_cursor()
+    if not cursor:
+        return jsonify(error='database unavailable'), 503
+    try:
+        cursor.execute("SELECT id FROM projects WHERE id = %s AND enterprise_id = %s", (project_id, enterprise_id))
+        if not cursor.fetchone():
+            return jsonify(error='project not found'), 404
+        dependency_id = schedule_graph.add_dependency(cursor, project_id, ends[0], ends[1], lag_days)
+    except Exception as e:
+        app.logger.error("Adding dependency failed: %s", e)
+        return jsonify(error='dependency already exists or could not be saved'), 409
+    finally:
+        cursor.close()
+        conn.close()
+    if dependency_id is None:
+        return jsonify(error='predecessor or successor is not in this project'), 404
+    return jsonify(id=dependency_id), 201
+
+@app.route('/pm/api/dependencies/<int:dependency_id>', methods=['DELETE'])
+@login_required(['PM', 'Admin'])
+def pm_remove_dependency(dependency_id):
+    cursor, conn = get_cursor()
+    if not cursor:
+        return jsonify(error='database unavailable'), 503
+    try:
+        cursor.execute("""
+            SELECT d.project_id FROM schedule_dependencies d JOIN projects p ON p.id = d.project_id
+            WHERE d.id = %s AND p.enterprise_id = %s
+        """, (dependency_id, session.get('enterprise_id')))
+        row = cursor.fetchone()
+        removed = bool(row) and schedule_graph.remove_dependency(cursor, dependency_id, row['project_id'])
+    finally:
+        cursor.close()
+        conn.close()
+    if not removed:
+        return jsonify(error='dependency not found'), 404
+    return jsonify(removed=dependency_id)
 
 @app.route('/analyst/dashboard')
 @login_required('Analyst')
 def analyst_dashboard():
     return render_template('analyst/dashboard.html')
 
+@app.route('/analyst/risk-calculator')
+@login_required(['Analyst', 'Admin'])
+def analyst_risk_calculator():
+    return render_template('analyst/risk-calculator.html')
+
+@app.route('/analyst/api/risk-score/preview', methods=['POST'])
+@login_required(['Analyst', 'Admin'])
+def analyst_risk_score_preview():
+    """Score posted {"risks": [...]} inputs without saving; optional "weights" override the config."""
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return jsonify(error='expected a JSON object'), 400
+    try:
+        config = risk_scoring.ScoringConfig.from_request(body.get('weights'))
+        results = risk_scoring.preview(body.get('risks') or [], config)
+    except risk_scoring.ScoringInputError as e:
+        return jsonify(error=str(e)), 400
+    return jsonify(results=results)
+
+@app.route('/analyst/api/risk-score/rescore', methods=['POST'])
+@login_required(['Analyst', 'Admin'])
+def analyst_risk_rescore():
+    """
+    Rescore one project ({"project_id": n}) or the whole enterprise and persist the results.
+    Saved scores use the configured weights; only Admin may persist a "weights" override.
+    """
+    body = request.get_json(silent=True)
+    if body is None:
+        body = {}
+    if not isinstance(body, dict):
+        return jsonify(error='expected a JSON object'), 400
+    enterprise_id = session.get('enterprise_id')
+    project_id = body.get('project_id')
+    if project_id is not None and (isinstance(project_id, bool) or not isinstance(project_id, int)):
+        return jsonify(error='project_id must be an integer'), 400
+    if body.get('weights') is not None and (session.get('role') or '').lower() != 'admin':
+        return jsonify(error='only Admin can save scores with custom weights; use preview'), 403
+    try:
+        config = risk_scoring.ScoringConfig.from_request(body.get('weights'))
+    except risk_scoring.ScoringInputError as e:
+        return jsonify(error=str(e)), 400
+    cursor, conn = get_cursor()
+    if not cursor:
+        return jsonify(error='database unavailable'), 503
+    try:
+        if project_id is not None:
+            cursor.execute("SELECT id FROM projects WHERE id = %s AND enterprise_id = %s", (project_id, enterprise_id))
+            if not cursor.fetchone():
+                return jsonify(error='project not found'), 404
+        summary = risk_scoring.rescore(conn, project_id=project_id, enterprise_id=enterprise_id, config=config)
+    except Exception as e:
+        app.logger.error("Risk rescore failed: %s", e)
+        return jsonify(error='rescore failed'), 500
+    finally:
+        try:
+            cursor.close()
+            conn.close()
+        except Exception:
+            pass
+    if summary['updated']:
+        notify_enterprise_write(enterprise_id, 'risks')
+        feed_hub.publish(enterprise_id, 'rescore', dict(summary, project_id=project_id))
+    return jsonify(summary)
+
+@app.route('/analyst/risk-forecast')
+@login_required(['Analyst', 'Admin', 'PM'])
+def analyst_risk_forecast():
+    return render_template('analyst/risk-forecast.html')
+
+@app.route('/analyst/api/risk-forecast')
+@login_required(['Analyst', 'Admin', 'PM'])
+def analyst_risk_forecast_data():
+    """P50/P80/P95 cost exposure and schedule slip; ?project_id= narrows to one project."""
+    enterprise_id = session.get('enterprise_id')
+    project_id = request.args.get('project_id', type=int)
+    trials = max(1000, min(request.args.get('trials', 100000, type=int), 200000))
+    seed = request.args.get('seed', 2026, type=int)
+    cursor, conn = get_cursor()
+    if not cursor:
+        return jsonify(error='database unavailable'), 503
+    try:
+        portfolio = risk_forecast.load_portfolio(conn, enterprise_id, project_id)
+    finally:
+        try:
+            cursor.close()
+            conn.close()
+        except Exception:
+            pass
+    if project_id is not None:
+        inputs = portfolio.get(project_id, {'risks': [], 'milestones': []})
+        return jsonify(project_id=project_id, trials=trials, seed=seed,
+                       **risk_forecast.forecast_project(inputs, project_id, trials, seed))
+    return jsonify(risk_forecast.forecast(portfolio, trials, seed))
+
+@app.route('/analyst/mitigation-planner')
+@login_required(['Analyst', 'Admin', 'PM'])
+def analyst_mitigation_planner():
+    return render_template('analyst/mitigation-planner.html')
+
+@app.route('/analyst/api/mitigation-plan')
+@login_required(['Analyst', 'Admin', 'PM'])
+def analyst_mitigation_plan():
+    """
+    Which open risks to mitigate within the remaining budget. ?project_id= plans one project
+    (?budget= overrides its remaining budget); otherwise every project, budgets times ?budget_scale=.
+    """
+    enterprise_id = session.get('enterprise_id')
+    project_id = request.args.get('project_id', type=int)
+    budget = request.args.get('budget', type=float)
+    budget_scale = max(0.0, min(request.args.get('budget_scale', 1.0, type=float), 10.0))
+    cursor, conn = get_cursor()
+    if not cursor:
+        return jsonify(error='database unavailable'), 503
+    try:
+        portfolio = mitigation_planner.load_candidates(conn, enterprise_id, project_id)
+    finally:
+        try:
+            cursor.close()
+            conn.close()
+        except Exception:
+            pass
+    if project_id is not None:
+        if project_id not in portfolio:
+            return jsonify(error='project not found'), 404
+        return jsonify(project_id=project_id,
+                       **mitigation_planner.plan_project(portfolio[project_id], project_id, budget))
+    return jsonify(mitigation_planner.plan_enterprise(portfolio, budget_scale))
+
+@app.route('/analyst/analytics')
+@login_required(['Analyst', 'Admin', 'PM'])
+def analyst_analytics():
+    return render_template('analyst/analytics.html', dimensions=risk_rollups.DIMENSIONS)
+
+@app.route('/analyst/api/analytics')
+@login_required(['Analyst', 'Admin', 'PM'])
+def analyst_analytics_data():
+    """Daily risk counts for one ?dimension= over the last ?days= (default 365); ?project_id= narrows to one project."""
+    enterprise_id = session.get('enterprise_id')
+    dimension = request.args.get('dimension', 'rag_status')
+    if dimension not in risk_rollups.DIMENSIONS:
+        return jsonify(error=f"dimension must be one of {', '.join(risk_rollups.DIMENSIONS)}"), 400
+    days = max(1, min(request.args.get('days', 365, type=int), 3 * 365))
+    project_id = request.args.get('project_id', type=int)
+    end = date.today()
+    start = end - timedelta(days=days - 1)
+    cursor, conn = get_cursor()
+    if not cursor:
+        return jsonify(error='database unavailable'), 503
+    try:
+        if project_id is not None:
+            cursor.execute("SELECT id FROM projects WHERE id = %s AND enterprise_id = %s", (project_id, enterprise_id))
+            if not cursor.fetchone():
+                return jsonify(error='project not found'), 404
+        scope = project_id if project_id is not None else risk_rollups.ENTERPRISE
+        series = risk_rollups.series(cursor, enterprise_id, dimension, start, end, scope)
+        totals = risk_rollups.totals(cursor, enterprise_id, dimension, scope)
+    finally:
+        cursor.close()
+        conn.close()
+    return jsonify(dimension=dimension, start=start.isoformat(), end=end.isoformat(), project_id=project_id,
+                   series=series, totals=totals)
+
+@app.route('/analyst/risk-scanner')
+@login_required(['Analyst', 'Admin'])
+def analyst_risk_scanner():
+    enterprise_id = session.get('enterprise_id')
+    cursor, conn = get_cursor()
+    rules, findings = [], []
+    if cursor:
+        try:
+            rules = risk_scanner.rule_status(cursor, enterprise_id)
+            findings = risk_scanner.recent_findings(cursor, enterprise_id, 100)
+        except Exception as e:
+            app.logger.error("Risk scanner page failed: %s", e)
+        finally:
+            cursor.close()
+            conn.close()
+    return render_template('analyst/risk-scanner.html', rules=rules, findings=findings)
+
+@app.route('/analyst/api/risk-scanner/run', methods=['POST'])
+@login_required(['Analyst', 'Admin'])
+def analyst_risk_scan_run():
+    """
+    Run the standing rules for this enterprise now; {"full": true} ignores the watermarks and
+    "budget" (seconds, clamped to 1-300) overrides RISK_SCAN_BUDGET.
+    """
+    body = request.get_json(silent=True)
+    if body is None:
+        body = {}
+    if not isinstance(body, dict):
+        return jsonify(error='expected a JSON object'), 400
+    budget = body.get('budget')
+    if budget is None:
+        budget = float(os.getenv('RISK_SCAN_BUDGET', '60'))
+    elif isinstance(budget, bool) or not isinstance(budget, (int, float)) or not math.isfinite(budget):
+        return jsonify(error='budget must be a number of seconds'), 400
+    budget = max(1.0, min(float(budget), 300.0))
+    enterprise_id = session.get('enterprise_id')
+    cursor, conn = get_cursor()
+    if not cursor:
+        return jsonify(error='database unavailable'), 503
+    try:
+        summary = risk_scanner.scan(conn, enterprise_id, budget=budget, full=bool(body.get('full')))
+    except Exception as e:
+        app.logger.error("Risk scan failed: %s", e)
+        return jsonify(error='scan failed'), 500
+    finally:
+        try:
+            cursor.close()
+            conn.close()
+        except Exception:
+            pass
+    if summary is None:
+        return jsonify(error='a scan is already running for this enterprise'), 409
+    if summary['findings']:
+        feed_hub.publish(enterprise_id, 'scan', {'findings': summary['findings'], 'projects': summary['projects']})
+    return jsonify(summary)
+
+@app.route('/analyst/api/risk-scanner/findings')
+@login_required(['Analyst', 'Admin'])
+def analyst_risk_scan_findings():
+    limit = max(1, min(request.args.get('limit', 100, type=int), 500))
+    cursor, conn = get_cursor()
+    if not cursor:
+        return jsonify(error='database unavailable'), 503
+    try:
+        return jsonify(findings=risk_scanner.recent_findings(cursor, session.get('enterprise_id'), limit))
+    finally:
+        cursor.close()
+        conn.close()
+
 @app.route('/logout')
 def logout():
     session.clear()
@@ -374,4 +1288,5 @@ def logout():
 if __name__ == '__main__':
     print(" RISK SENTINEL - STARTING")
     print("✅ default test: admin / pass123 (use email admin@remshatech.com if logging by email)")
+    serving.warm_up(app, db_pool)
     app.run(debug=True, port=5000)
\ No newline at end of file
@@ -0,0 +1,88 @@
+# ===== PASSWORD HASHING + LOGIN VERIFICATION =====
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from passlib.context import CryptContext
+
+# bcrypt for new hashes; legacy plaintext rows still verify and are rehashed on next login
+pwd_context = CryptContext(
+    schemes=['bcrypt', 'plaintext'],
+    deprecated=['plaintext'],
+    bcrypt__rounds=int(os.getenv('AUTH_BCRYPT_ROUNDS', '12')),
+)
+
+LOGIN_LOOKUP_SQL = """
+    SELECT id, username, role, enterprise_id, is_active, email, password
+    FROM users WHERE LOWER(email) = %s
+"""
+
+
+class AuthBusy(Exception):
+    """Raised when the hashing pool is saturated; callers should answer 503, not queue."""
+
+
+class PasswordVerifier:
+    """
+    Runs bcrypt checks on a small bounded thread pool. At most `max_pending` checks may be
+    queued or running; a caller waits up to `queue_wait` seconds for a slot and then fails
+    with AuthBusy, so a credential-stuffing burst cannot pile up request threads behind the
+    CPU-bound hash.
+    """
+
+    def __init__(self, workers=4, max_pending=16, queue_wait=0.5, timeout=5.0):
+        self.workers = workers
+        self.queue_wait = queue_wait
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self.rejected = 0
+
+    def _check(self, password, stored):
+        if stored is None:
+            # unknown email: spend the same time as a real check so responses don't leak existence
+            pwd_context.dummy_verify()
+            return False, None
+        return pwd_context.verify_and_update(password, stored)
+
+    def verify(self, password, stored):
+        """Returns (ok, new_hash); new_hash is set when the stored value should be replaced."""
+        if not self._slots.acquire(timeout=self.queue_wait):
+            self.rejected += 1
+            raise AuthBusy('login verification pool is saturated')
+        try:
+            future = self._pool.submit(self._check, password or '', stored)
+        except BaseException:
+            self._slots.release()
+            raise
+        # the slot is held until the hash finishes, not until we stop waiting for it: a check that
+        # timed out still occupies a pool thread
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise AuthBusy('login verification timed out')
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+
+
+def verifier_from_env():
+    workers = int(os.getenv('AUTH_HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
+    # default queue depth keeps the worst wait to a few hash times rather than seconds
+    return PasswordVerifier(
+        workers=workers,
+        max_pending=int(os.getenv('AUTH_MAX_PENDING', str(workers * 4))),
+        queue_wait=float(os.getenv('AUTH_QUEUE_WAIT', '0.5')),
+        timeout=float(os.getenv('AUTH_VERIFY_TIMEOUT', '5')),
+    )
+
+
+def lookup_user(cursor, email):
+    """User row (including the stored hash) for a normalized email, or None."""
+    cursor.execute(LOGIN_LOOKUP_SQL, (email,))
+    return cursor.fetchone()
+
+
+def save_rehash(cursor, user_id, new_hash):
+    cursor.execute("UPDATE users SET password = %s WHERE id = %s", (new_hash, user_id))
@@ -0,0 +1,415 @@
+"""
+Streaming bulk import of risks / tasks from CSV or JSON (array or one object per line).
+Rows are validated as they are read, inserted with executemany in batches and committed
+in chunks; bad rows are reported by number without stopping the import. Risk scores are
+computed per batch, project health once for all touched projects at the end.
+
+    python backend/bulk_import.py risks legacy_risks.csv --enterprise 3
+    python backend/bulk_import.py tasks tasks.json --enterprise 3 --sqlite instance/risk_sentinel_bench.db
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from datetime import date, datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend import risk_scoring
+from backend.health_scheduler import recompute as recompute_health
+from backend.jobs import db_now
+
+MAX_REPORTED_ERRORS = 100
+
+
+class BulkImportError(ValueError):
+    """Request-level problem (unknown table / format, unreadable input)."""
+
+
+class RowError(ValueError):
+    pass
+
+
+# ---- field parsers: raise RowError with a readable message ----
+def _text(max_len, required=False):
+    def parse(value):
+        value = '' if value is None else str(value).strip()
+        if not value:
+            if required:
+                raise RowError('is required')
+            return None
+        if len(value) > max_len:
+            raise RowError(f'is longer than {max_len} characters')
+        return value
+    return parse
+
+
+def _number(kind, low=None, high=None, required=False):
+    def parse(value):
+        if value is None or (isinstance(value, str) and not value.strip()):
+            if required:
+                raise RowError('is required')
+            return None
+        try:
+            number = kind(value) if kind is float else int(float(value))
+        except (TypeError, ValueError):
+            raise RowError(f'must be a number, got {value!r}')
+        if (low is not None and number < low) or (high is not None and number > high):
+            raise RowError(f'must be between {low} and {high}')
+        return number
+    return parse
+
+
+def _choice(*choices, default=None):
+    lookup = {c.lower(): c for c in choices}
+
+    def parse(value):
+        value = '' if value is None else str(value).strip()
+        if not value:
+            return default
+        if value.lower() not in lookup:
+            raise RowError(f"must be one of {', '.join(choices)}")
+        return lookup[value.lower()]
+    return parse
+
+
+def _flag(value):
+    if value in (None, ''):
+        return 0
+    text = str(value).strip().lower()
+    if text in ('1', 'true', 'yes', 'y'):
+        return 1
+    if text in ('0', 'false', 'no', 'n'):
+        return 0
+    raise RowError('must be true/false')
+
+
+def _date(value):
+    if value in (None, ''):
+        return None
+    try:
+        return date.fromisoformat(str(value).strip()[:10])
+    except ValueError:
+        raise RowError(f'must be a YYYY-MM-DD date, got {value!r}')
+
+
+def _datetime(value):
+    if value in (None, ''):
+        return None
+    try:
+        return datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        raise RowError(f'must be an ISO date/time, got {value!r}')
+
+
+# table -> importable columns and their parsers (project_id is required; it and every id in
+# REFERENCES must belong to the importing enterprise)
+IMPORT_COLUMNS = {
+    'risks': {
+        'project_id': _number(int, required=True),
+        'title': _text(200, required=True),
+        'description': _text(65535),
+        'severity': _choice('Low', 'Medium', 'High', 'Critical', default='Medium'),
+        'probability': _number(float, 0, 100),
+        'impact_score': _number(int, 0, 5),
+        'status': _choice('Identified', 'Open', 'InProgress', 'Mitigated', 'Closed', default='Identified'),
+        'risk_category': _choice('Testing', 'Finance', 'Technical', 'Vendor', 'Compliance', 'Operational',
+                                 default='Operational'),
+        'finance_impact': _number(float, 0),
+        'milestone_delay_days': _number(int, 0),
+        'project_blocker': _flag,
+        'assigned_to': _number(int),
+        'vendor_id': _number(int),
+        'comments': _text(65535),
+    },
+    'tasks': {
+        'project_id': _number(int, required=True),
+        'title': _text(255, required=True),
+        'description': _text(65535),
+        'risk_id': _number(int),
+        'status': _choice('NotStarted', 'InProgress', 'Testing', 'Completed', default='NotStarted'),
+        'priority': _choice('High', 'Medium', 'Low', default='Medium'),
+        'assigned_to': _number(int),
+        'due_date': _date,
+        'completed_at': _datetime,
+        'created_by': _number(int),
+    },
+}
+
+# columns filled in by the importer rather than the file
+DERIVED_COLUMNS = {
+    'risks': ('risk_score', 'rag_status', 'health_impact', 'created_at', 'last_updated'),
+    'tasks': ('created_at',),
+}
+
+
+# id column -> query for the ids of that kind the enterprise owns (param: enterprise_id)
+REFERENCES = {
+    'project_id': "SELECT id FROM projects WHERE enterprise_id = %s",
+    'vendor_id': """
+        SELECT v.id FROM vendors v JOIN projects p ON p.id = v.assigned_project_id WHERE p.enterprise_id = %s
+    """,
+    'risk_id': "SELECT r.id FROM risks r JOIN projects p ON p.id = r.project_id WHERE p.enterprise_id = %s",
+    'assigned_to': "SELECT id FROM users WHERE enterprise_id = %s",
+    'created_by': "SELECT id FROM users WHERE enterprise_id = %s",
+}
+
+
+def load_references(cursor, table, enterprise_id):
+    """{column: set of ids this enterprise owns} for the reference columns of `table`."""
+    allowed = {}
+    for column in IMPORT_COLUMNS[table]:
+        if column in REFERENCES:
+            cursor.execute(REFERENCES[column], (enterprise_id,))
+            allowed[column] = {row[0] for row in cursor.fetchall()}
+    return allowed
+
+
+def insert_sql(table):
+    columns = list(IMPORT_COLUMNS[table]) + list(DERIVED_COLUMNS[table])
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+
+
+# ---- readers: yield (row_number, dict) without loading the whole input ----
+def iter_csv(stream):
+    reader = csv.DictReader(stream)
+    for number, row in enumerate(reader, start=1):
+        yield number, row
+
+
+def iter_json(stream, chunk_size=65536):
+    """
+    Objects from a JSON array or from concatenated / newline-delimited objects,
+    decoded incrementally so the document is never held in memory at once.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, number = '', 0, 0
+    eof = False
+    while True:
+        while pos < len(buf) and buf[pos] in ' \t\r\n,[]':
+            pos += 1
+        if pos >= len(buf):
+            if eof:
+                return
+            buf, pos = stream.read(chunk_size), 0
+            eof = not buf
+            continue
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise BulkImportError(f'invalid JSON after row {number}')
+            more = stream.read(chunk_size)
+            eof = not more
+            buf, pos = buf[pos:] + more, 0
+            continue
+        number += 1
+        if not isinstance(obj, dict):
+            raise BulkImportError(f'row {number} is not a JSON object')
+        yield number, obj
+        pos = end
+
+
+def text_stream(binary):
+    """Wrap a binary request/file stream for the readers (UTF-8, BOM-tolerant)."""
+    return io.TextIOWrapper(binary, encoding='utf-8-sig', newline='')
+
+
+def validate(table, raw, allowed):
+    """Parsed values in IMPORT_COLUMNS order; `allowed` is load_references() for the enterprise."""
+    values = []
+    for column, parse in IMPORT_COLUMNS[table].items():
+        try:
+            value = parse(raw.get(column))
+        except RowError as e:
+            raise RowError(f'{column} {e}')
+        if value is not None and column in allowed and value not in allowed[column]:
+            raise RowError(f'{column} {value} does not belong to this enterprise')
+        values.append(value)
+    return values
+
+
+def derive(table, rows, now, config=None):
+    """Append importer-filled columns; risk scores are computed for the whole batch at once."""
+    if table == 'tasks':
+        return [tuple(r) + (now,) for r in rows]
+    cols = list(IMPORT_COLUMNS['risks'])
+
+    def column(name):
+        idx = cols.index(name)
+        return [float('nan') if r[idx] is None else float(r[idx]) for r in rows]
+
+    score, rag, health = risk_scoring.score_arrays(
+        column('probability'), column('impact_score'), column('finance_impact'),
+        column('milestone_delay_days'), column('project_blocker'), config)
+    return [tuple(r) + (float(s), str(risk_scoring.RAG_LABELS[g]), str(risk_scoring.HEALTH_LABELS[h]), now, now)
+            for r, s, g, h in zip(rows, score, rag, health)]
+
+
+class ImportResult:
+    __slots__ = ('table', 'rows', 'inserted', 'failed', 'errors', 'projects', 'health_updated', 'started', 'aborted')
+
+    def __init__(self, table):
+        self.table = table
+        self.aborted = None  # why reading stopped early; rows before that point are stored
+        self.rows = 0
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+        self.projects = set()
+        self.health_updated = 0
+        self.started = time.perf_counter()
+
+    def error(self, number, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': number, 'error': message})
+
+    def as_dict(self):
+        return {
+            'table': self.table, 'rows': self.rows, 'inserted': self.inserted, 'failed': self.failed,
+            'errors': self.errors, 'errors_truncated': self.failed > len(self.errors),
+            'projects_touched': len(self.projects), 'health_updated': self.health_updated, 'aborted': self.aborted,
+            'duration_ms': int((time.perf_counter() - self.started) * 1000),
+        }
+
+
+def _insert_batch(cursor, table, batch, result, now, config):
+    """
+    executemany the batch under a savepoint; if it fails, roll just the batch back and
+    retry it row by row to isolate the bad rows.
+    """
+    sql = insert_sql(table)
+    rows = derive(table, [values for _, values in batch], now, config)
+    cursor.execute("SAVEPOINT import_batch")
+    try:
+        cursor.executemany(sql, rows)
+        cursor.execute("RELEASE SAVEPOINT import_batch")
+        result.inserted += len(rows)
+        result.projects.update(values[0] for _, values in batch)
+        return
+    except Exception:
+        cursor.execute("ROLLBACK TO SAVEPOINT import_batch")
+    for (number, values), row in zip(batch, rows):
+        try:
+            cursor.execute(sql, row)
+            result.inserted += 1
+            result.projects.add(values[0])
+        except Exception as e:
+            result.error(number, f'rejected by the database: {e}')
+
+
+def import_rows(conn, table, records, enterprise_id, batch_size=1000, chunk_rows=10000, config=None):
+    """
+    Validate and insert `records` ((row_number, dict) pairs). Each chunk of `chunk_rows`
+    is one transaction; within it rows go out `batch_size` at a time. Input that becomes
+    unreadable part way stops the import but keeps the rows read before it (earlier chunks
+    are committed already), with the reason in result.aborted. Returns ImportResult.
+    """
+    if table not in IMPORT_COLUMNS:
+        raise BulkImportError(f'unknown import: {table}')
+    result = ImportResult(table)
+    cursor = conn.cursor()
+    allowed = load_references(cursor, table, enterprise_id)
+    cursor.execute("SELECT NOW()")
+    now = cursor.fetchone()[0]
+
+    batch, in_chunk = [], 0
+    records = iter(records)
+    conn.start_transaction()
+    try:
+        while True:
+            try:
+                number, raw = next(records)
+            except StopIteration:
+                break
+            except BulkImportError as e:
+                result.aborted = str(e)
+                break
+            except (csv.Error, UnicodeDecodeError) as e:
+                result.aborted = f'unreadable input after row {result.rows}: {e}'
+                break
+            result.rows += 1
+            try:
+                batch.append((number, validate(table, raw, allowed)))
+            except RowError as e:
+                result.error(number, str(e))
+                continue
+            if len(batch) >= batch_size:
+                _insert_batch(cursor, table, batch, result, now, config)
+                in_chunk += len(batch)
+                batch = []
+                if in_chunk >= chunk_rows:
+                    conn.commit()
+                    conn.start_transaction()
+                    in_chunk = 0
+        if batch:
+            _insert_batch(cursor, table, batch, result, now, config)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return result
+
+
+def refresh_derived(conn, result):
+    """One project-health pass over every project the import touched."""
+    if not result.projects:
+        return
+    cursor = conn.cursor()
+    try:
+        result.health_updated, _ = recompute_health(cursor, sorted(result.projects), db_now(cursor))
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+def run_import(conn, table, binary_stream, enterprise_id, fmt='csv', batch_size=1000, chunk_rows=10000):
+    """Parse, validate, insert and refresh; returns the summary dict."""
+    if fmt not in ('csv', 'json'):
+        raise BulkImportError('format must be csv or json')
+    stream = text_stream(binary_stream)
+    records = iter_csv(stream) if fmt == 'csv' else iter_json(stream)
+    result = import_rows(conn, table, records, enterprise_id, batch_size, chunk_rows,
+                         risk_scoring.ScoringConfig.from_env())
+    refresh_derived(conn, result)
+    return result.as_dict()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk import risks or tasks for an enterprise.')
+    parser.add_argument('table', choices=sorted(IMPORT_COLUMNS))
+    parser.add_argument('path', help="CSV / JSON file, or - for stdin")
+    parser.add_argument('--enterprise', type=int, required=True)
+    parser.add_argument('--format', choices=('csv', 'json'), help='default: from the file extension')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--chunk-rows', type=int, default=10000, help='rows per transaction')
+    parser.add_argument('--sqlite', help='import into this SQLite file instead of MySQL')
+    args = parser.parse_args()
+
+    fmt = args.format or ('json' if args.path.endswith(('.json', '.jsonl', '.ndjson')) else 'csv')
+    if args.sqlite:
+        from backend import sqlite_compat
+        conn = sqlite_compat.connect(args.sqlite)
+    else:
+        from backend.db_pool import mysql_connect
+        conn = mysql_connect()
+    source = sys.stdin.buffer if args.path == '-' else open(args.path, 'rb')
+    try:
+        summary = run_import(conn, args.table, source, args.enterprise, fmt, args.batch_size, args.chunk_rows)
+    except BulkImportError as e:
+        sys.exit(f'import failed: {e}')
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+        conn.close()
+    print(json.dumps(summary, indent=2))
+    sys.exit(1 if summary['failed'] or summary['aborted'] else 0)
+
+
+if __name__ == '__main__':
+    main()
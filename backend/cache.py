@@ -0,0 +1,182 @@
+# ===== CACHE LAYER =====
+import fnmatch
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+# tables whose writes change an enterprise's cached aggregates (the last three are written by background jobs)
+ENTERPRISE_WRITE_TABLES = {'risks', 'projects', 'tasks', 'vendors', 'budgets', 'activities',
+                           'milestones', 'project_health', 'risk_daily_rollups'}
+
+
+class MemoryBackend:
+    """In-process LRU store; entries are (value, expires_at)."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class SharedBackend:
+    """
+    Store shared between worker processes. `client` is anything exposing the
+    redis get / set(ex=) / delete calls; eviction is the store's own LRU policy.
+    """
+
+    def __init__(self, client, prefix='rs:'):
+        self.client = client
+        self.prefix = prefix
+        self.evictions = 0
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return None if raw is None else pickle.loads(raw)
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=max(1, int(ttl)))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def clear(self):
+        # only this app's keys: the store may be shared with other prefixes / other apps
+        batch = []
+        for name in self.client.scan_iter(match=self.prefix + '*', count=500):
+            batch.append(name)
+            if len(batch) >= 500:
+                self.client.delete(*batch)
+                batch = []
+        if batch:
+            self.client.delete(*batch)
+
+
+class LocalSharedStore:
+    """Local stand-in for the shared store (same calls as a redis client)."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        with self._lock:
+            entry = self._data.get(name)
+            if entry is None or (entry[1] is not None and entry[1] < time.monotonic()):
+                self._data.pop(name, None)
+                return None
+            return entry[0]
+
+    def set(self, name, value, ex=None):
+        with self._lock:
+            self._data[name] = (value, time.monotonic() + ex if ex else None)
+        return True
+
+    def delete(self, *names):
+        with self._lock:
+            return sum(1 for n in names if self._data.pop(n, None) is not None)
+
+    def scan_iter(self, match='*', count=None):
+        with self._lock:
+            names = [n for n in self._data if fnmatch.fnmatchcase(n, match)]
+        return iter(names)
+
+    def publish(self, channel, message):
+        return 0
+
+
+class TTLCache:
+    """Namespaced TTL cache over a backend with hit / miss counters."""
+
+    def __init__(self, backend, ttl=60, namespace='cache'):
+        self.backend = backend
+        self.ttl = ttl
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, key):
+        return f'{self.namespace}:{key}'
+
+    def get(self, key):
+        value = self.backend.get(self._key(key))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        self.backend.set(self._key(key), value, ttl or self.ttl)
+
+    def invalidate(self, key):
+        self.backend.delete(self._key(key))
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'evictions': getattr(self.backend, 'evictions', 0)}
+
+
+def backend_from_env(max_entries=1024):
+    """CACHE_BACKEND=memory (default) | local | redis (uses CACHE_URL)."""
+    kind = os.getenv('CACHE_BACKEND', 'memory').lower()
+    if kind == 'redis':
+        import redis  # optional dependency, only needed for the shared store
+        return SharedBackend(redis.Redis.from_url(os.getenv('CACHE_URL', 'redis://localhost:6379/0')))
+    if kind == 'local':
+        return SharedBackend(_local_store)
+    return MemoryBackend(max_entries)
+
+
+_local_store = LocalSharedStore()
+
+# --------------------------
+# per-enterprise invalidation
+# --------------------------
+_enterprise_caches = []
+
+
+def register_enterprise_cache(cache):
+    """Caches registered here are keyed by enterprise_id and dropped on writes."""
+    _enterprise_caches.append(cache)
+    return cache
+
+
+def notify_enterprise_write(enterprise_id, table=None):
+    """Call after writing `table` rows that belong to `enterprise_id`."""
+    if enterprise_id is None or (table is not None and table not in ENTERPRISE_WRITE_TABLES):
+        return
+    for cache in _enterprise_caches:
+        cache.invalidate(enterprise_id)
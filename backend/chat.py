@@ -0,0 +1,316 @@
+# ===== VENDOR CHAT: BUFFERED WRITES, ROOM RINGS, KEYSET HISTORY =====
+import json
+import logging
+import threading
+from bisect import insort
+from collections import OrderedDict, deque
+from datetime import datetime
+
+from backend.cache import MemoryBackend, TTLCache
+
+log = logging.getLogger('risk_sentinel.chat')
+
+CHANNEL = 'risk_sentinel:chat'
+MAX_MESSAGE_LENGTH = 4000
+ER_DUP_ENTRY = 1062
+
+# keyset page on idx_chat_messages_room (room_id, message_id); newest first
+HISTORY_SQL = """
+    SELECT m.message_id, m.room_id, m.user_id, u.username, m.message, m.created_at
+    FROM chat_messages m
+    LEFT JOIN users u ON u.id = m.user_id
+    WHERE m.room_id = %s AND m.message_id < %s
+    ORDER BY m.message_id DESC
+    LIMIT %s
+"""
+
+# one multi-row statement per batch: InnoDB hands a simple insert consecutive AUTO_INCREMENT ids,
+# and lastrowid is the first of them
+INSERT_SQL = "INSERT INTO chat_messages (room_id, user_id, message, created_at) VALUES "
+INSERT_ROW = "(%s, %s, %s, %s)"
+
+ROOM_ENTERPRISE_SQL = """
+    SELECT p.enterprise_id FROM chat_rooms r JOIN projects p ON p.id = r.project_id WHERE r.room_id = %s
+"""
+
+ROOMS_SQL = """
+    SELECT r.room_id, r.project_id, r.name, p.name AS project_name
+    FROM chat_rooms r JOIN projects p ON p.id = r.project_id
+    WHERE p.enterprise_id = %s
+    ORDER BY r.room_id
+"""
+
+UNBOUNDED = 2 ** 62
+
+
+class ChatError(ValueError):
+    """Invalid message (empty / too long) or room."""
+
+
+class RoomRing:
+    """
+    The newest `size` messages of one room, ordered by message_id. `complete` means the ring
+    holds the room's entire history (nothing older exists in the database).
+    """
+    __slots__ = ('messages', 'ids', 'size', 'complete')
+
+    def __init__(self, messages, size, complete):
+        self.messages = deque(messages, maxlen=size)
+        self.ids = set(m['message_id'] for m in self.messages)
+        self.size = size
+        self.complete = complete
+
+    def add(self, message):
+        mid = message['message_id']
+        if mid in self.ids:
+            return
+        if len(self.messages) == self.size:
+            if mid < self.messages[0]['message_id']:
+                return
+            self.ids.discard(self.messages.popleft()['message_id'])
+            self.complete = False
+        if self.messages and mid < self.messages[-1]['message_id']:
+            # another worker's flush arrived late; keep id order
+            items = list(self.messages)
+            insort(items, message, key=lambda m: m['message_id'])
+            self.messages = deque(items, maxlen=self.size)
+        else:
+            self.messages.append(message)
+        self.ids.add(mid)
+
+    def page(self, before, limit):
+        """Newest-first page below `before`, or None when the ring can't answer it alone."""
+        older = [m for m in self.messages if m['message_id'] < before]
+        if len(older) < limit and not self.complete:
+            return None
+        return older[::-1][:limit]
+
+
+class ChatService:
+    """
+    Incoming messages are queued and written by one flusher thread in batches (group commit):
+    posters wait at most `flush_interval` for their message id. After each commit the batch is
+    broadcast on the pub/sub backend; every process appends it to its room rings and pushes it
+    to that room's live subscribers through `hub`.
+
+    Rings serve history only with a shared backend (FEED_BACKEND=redis). With the process-local
+    default (`shared_backend=False`), other workers' messages never reach this process, so its
+    rings could be missing messages. In that mode every page is a keyset query.
+    """
+
+    def __init__(self, connect, hub, backend, ring_size=200, active_rooms=1000,
+                 batch_size=500, flush_interval=0.02, max_pending=20000, shared_backend=True):
+        self.connect = connect
+        self.hub = hub
+        self.backend = backend
+        self.shared_backend = shared_backend
+        self.ring_size = ring_size
+        self.active_rooms = active_rooms
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()  # one writer per process keeps ids in arrival order
+        self._rings = OrderedDict()
+        self._rings_lock = threading.Lock()
+        self._room_owners = TTLCache(MemoryBackend(active_rooms * 4), ttl=300, namespace='chat_room')
+        self._thread = None
+        self._stopping = False
+        self.stats_counters = {'posted': 0, 'flushed': 0, 'batches': 0, 'flush_errors': 0,
+                               'ring_hits': 0, 'ring_misses': 0}
+        self.backend.listen(CHANNEL, self._on_batch)
+
+    # ---- writes ----
+    def post(self, room_id, user_id, text, username=None, wait=True, timeout=5.0):
+        """Queue a message. With wait=True block until it is committed and return it with its id."""
+        text = (text or '').strip()
+        if not text:
+            raise ChatError('message is empty')
+        if len(text) > MAX_MESSAGE_LENGTH:
+            raise ChatError(f'message is longer than {MAX_MESSAGE_LENGTH} characters')
+        entry = {'room_id': room_id, 'user_id': user_id, 'username': username, 'message': text,
+                 'created_at': datetime.now().replace(microsecond=0), 'done': threading.Event() if wait else None}
+        with self._cond:
+            if len(self._pending) >= self.max_pending:
+                raise ChatError('chat is overloaded, try again')
+            self._pending.append(entry)
+            self.stats_counters['posted'] += 1
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+        done = entry['done']  # _write() pops it, possibly before we get here
+        if self._thread is None:
+            self.flush()
+        if not wait:
+            return None
+        if not done.wait(timeout):
+            raise ChatError('message was not saved in time')
+        if 'error' in entry:
+            raise ChatError(entry['error'])
+        return entry['saved']
+
+    def _take_batch(self):
+        with self._cond:
+            batch = []
+            while self._pending and len(batch) < self.batch_size:
+                batch.append(self._pending.popleft())
+            return batch
+
+    def flush(self):
+        """Write everything queued so far; returns the number of messages written."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    return written
+                self._write(batch)
+                written += len(batch)
+
+    def _write(self, batch, attempts=3):
+        for attempt in range(attempts):
+            conn = None
+            try:
+                conn = self.connect()
+                cursor = conn.cursor()
+                conn.start_transaction()
+                cursor.execute(INSERT_SQL + ', '.join([INSERT_ROW] * len(batch)),
+                               [v for e in batch for v in (e['room_id'], e['user_id'], e['message'], e['created_at'])])
+                first_id = cursor.lastrowid
+                for i, entry in enumerate(batch):
+                    entry['message_id'] = first_id + i
+                conn.commit()
+                cursor.close()
+                break
+            except Exception as e:
+                if conn is not None:
+                    try:
+                        conn.rollback()
+                    except Exception:
+                        pass
+                self.stats_counters['flush_errors'] += 1
+                if attempt == attempts - 1 or getattr(e, 'errno', None) != ER_DUP_ENTRY:
+                    log.error("chat flush of %d messages failed: %s", len(batch), e)
+                    for entry in batch:
+                        entry['error'] = 'message could not be saved'
+                        if entry['done'] is not None:
+                            entry['done'].set()
+                    return
+            finally:
+                if conn is not None:
+                    conn.close()
+
+        messages = []
+        for entry in batch:
+            done = entry.pop('done')
+            entry['saved'] = {k: entry[k] for k in ('message_id', 'room_id', 'user_id', 'username', 'message', 'created_at')}
+            messages.append(entry['saved'])
+            if done is not None:
+                done.set()
+        self.stats_counters['flushed'] += len(batch)
+        self.stats_counters['batches'] += 1
+        self.backend.publish(CHANNEL, json.dumps(messages, default=str))
+
+    def _on_batch(self, payload):
+        for message in json.loads(payload):
+            message['created_at'] = datetime.fromisoformat(message['created_at'])
+            with self._rings_lock:
+                ring = self._rings.get(message['room_id'])
+                if ring is not None:
+                    ring.add(message)
+            self.hub.deliver_local(message['room_id'], 'message', message)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if len(self._pending) < self.batch_size and not self._stopping:
+                    self._cond.wait(self.flush_interval)
+                stopping = self._stopping
+            try:
+                self.flush()
+            except Exception:
+                log.exception("chat flusher failed")
+            if stopping:
+                return
+
+    def start(self):
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name='chat-flusher', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Flush what is queued and stop the flusher thread."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    # ---- reads ----
+    def _ring(self, room_id):
+        with self._rings_lock:
+            ring = self._rings.get(room_id)
+            if ring is not None:
+                self._rings.move_to_end(room_id)
+            return ring
+
+    def _load_ring(self, room_id):
+        rows = self._query(HISTORY_SQL, (room_id, UNBOUNDED, self.ring_size))
+        ring = RoomRing(reversed(rows), self.ring_size, complete=len(rows) < self.ring_size)
+        with self._rings_lock:
+            existing = self._rings.get(room_id)
+            if existing is not None:
+                return existing  # someone else loaded it (and may have added newer messages)
+            self._rings[room_id] = ring
+            while len(self._rings) > self.active_rooms:
+                self._rings.popitem(last=False)
+        return ring
+
+    def _query(self, sql, params):
+        conn = self.connect()
+        try:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            cursor.close()
+            return rows
+        finally:
+            conn.close()
+
+    def room_enterprise(self, room_id):
+        """enterprise_id owning the room (cached), or None when the room does not exist."""
+        owner = self._room_owners.get(room_id)
+        if owner is None:
+            rows = self._query(ROOM_ENTERPRISE_SQL, (room_id,))
+            if not rows:
+                return None
+            owner = rows[0]['enterprise_id']
+            self._room_owners.set(room_id, owner)
+        return owner
+
+    def history(self, room_id, before=None, limit=50):
+        """Newest-first page of messages with message_id < before; open rooms come from memory."""
+        before = before or UNBOUNDED
+        ring = self._ring(room_id) if self.shared_backend else None
+        if ring is None and before == UNBOUNDED and self.shared_backend:
+            ring = self._load_ring(room_id)
+        if ring is not None:
+            page = ring.page(before, limit)
+            if page is not None:
+                self.stats_counters['ring_hits'] += 1
+                return page
+        self.stats_counters['ring_misses'] += 1
+        return self._query(HISTORY_SQL, (room_id, before, limit))
+
+    def stats(self):
+        with self._cond:
+            pending = len(self._pending)
+        return dict(self.stats_counters, pending=pending, active_rooms=len(self._rings))
+
+
+def list_rooms(cursor, enterprise_id):
+    cursor.execute(ROOMS_SQL, (enterprise_id,))
+    return cursor.fetchall()
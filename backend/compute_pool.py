@@ -0,0 +1,54 @@
+# ===== LONG-LIVED PROCESS POOL FOR CPU-BOUND REQUESTS =====
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# One pool per web worker, started on first use (so after gunicorn has forked the worker) and
+# reused by every request. Children come from a forkserver: forking a threaded worker directly
+# would copy whatever locks its other threads happen to hold.
+_lock = threading.Lock()
+_pool = None
+_pid = None
+
+
+def size():
+    return int(os.getenv('COMPUTE_WORKERS', str(os.cpu_count() or 1)))
+
+
+def executor():
+    """This process's pool; a pool inherited across fork() belongs to the parent and is replaced."""
+    global _pool, _pid
+    with _lock:
+        if _pool is None or _pid != os.getpid():
+            _pool = ProcessPoolExecutor(max_workers=size(), mp_context=multiprocessing.get_context('forkserver'))
+            _pid = os.getpid()
+        return _pool
+
+
+def run(fn, *iterables):
+    """list(executor().map(fn, *iterables)); a pool broken by a dead child is dropped for the next call."""
+    pool = executor()
+    try:
+        return list(pool.map(fn, *iterables))
+    except BrokenProcessPool:
+        global _pool
+        with _lock:
+            if _pool is pool:
+                _pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+
+
+def shutdown():
+    global _pool
+    with _lock:
+        pool = _pool if _pid == os.getpid() else None
+        _pool = None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+atexit.register(shutdown)
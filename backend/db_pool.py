@@ -0,0 +1,220 @@
+# ===== DATABASE CONNECTION POOL =====
+import os
+import logging
+import threading
+import time
+import weakref
+from collections import deque
+
+import mysql.connector
+
+log = logging.getLogger(__name__)
+
+
+class PoolExhausted(Exception):
+    """Raised when no connection could be checked out within the timeout."""
+
+
+class PooledConnection:
+    """
+    Proxy around a raw connection; close() hands it back to the pool. A proxy garbage
+    collected without close() queues its connection for the pool to reclaim, so a leaked
+    checkout costs a slot until the next acquire() rather than for the life of the process.
+    """
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._returned = False
+        self._finalizer = weakref.finalize(self, pool._orphans.append, (raw, created_at))
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def close(self):
+        if not self._returned:
+            self._returned = True
+            self._finalizer.detach()
+            self._pool._release(self._raw, self._created_at)
+
+
+class ConnectionPool:
+    """
+    Per-process pool of MySQL connections.
+    size: max open connections, timeout: seconds to wait on checkout,
+    recycle: seconds before a connection is closed and replaced.
+    """
+
+    def __init__(self, connect, size=10, timeout=5.0, recycle=1800):
+        self._connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self._idle = deque()
+        # connections of proxies collected without close(); deque.append is safe from a finalizer
+        # that runs inside another thread's critical section, taking the lock there would not be
+        self._orphans = deque()
+        self._open = 0
+        self._cond = threading.Condition()
+        self._pid = os.getpid()
+        self.stats = {'hits': 0, 'misses': 0, 'waits': 0, 'exhausted': 0,
+                      'recycled': 0, 'ping_failures': 0, 'leaked': 0}
+
+    def _check_fork(self):
+        # connections must never be shared across a fork
+        if self._pid != os.getpid():
+            self._idle.clear()
+            self._orphans.clear()
+            self._open = 0
+            self._pid = os.getpid()
+
+    def _count(self, key):
+        with self._cond:
+            self.stats[key] += 1
+
+    def _reclaim(self):
+        # caller holds self._cond
+        while self._orphans:
+            raw, created_at = self._orphans.popleft()
+            self.stats['leaked'] += 1
+            log.warning("reclaimed a pooled connection that was never closed")
+            self._checkin(raw, created_at)
+
+    def _alive(self, raw):
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except Exception:
+            self._count('ping_failures')
+            return False
+
+    def _discard(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        waited = False
+        while True:
+            with self._cond:
+                self._check_fork()
+                self._reclaim()
+                while not self._idle and self._open >= self.size:
+                    self._reclaim()
+                    if self._idle:
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.stats['exhausted'] += 1
+                        raise PoolExhausted('no connection available after %.1fs' % self.timeout)
+                    if not waited:
+                        waited = True
+                        self.stats['waits'] += 1
+                    # wake now and then: a finalizer queues orphans without notifying
+                    self._cond.wait(min(remaining, 0.1))
+                if self._idle:
+                    raw, created_at = self._idle.pop()
+                else:
+                    raw, created_at = None, None
+                    self._open += 1
+
+            # ping / connect outside the lock so other threads keep moving
+            if raw is None:
+                try:
+                    raw = self._connect()
+                except Exception:
+                    self._drop()
+                    raise
+                self._count('misses')
+                return PooledConnection(self, raw, time.monotonic())
+            if time.monotonic() - created_at > self.recycle:
+                self._count('recycled')
+            elif self._alive(raw):
+                self._count('hits')
+                return PooledConnection(self, raw, created_at)
+            self._discard(raw)
+            self._drop()
+
+    def _drop(self):
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+    def _release(self, raw, created_at):
+        with self._cond:
+            if self._pid != os.getpid():
+                return
+            self._checkin(raw, created_at)
+
+    def _checkin(self, raw, created_at):
+        # caller holds self._cond
+        try:
+            raw.consume_results()
+            if raw.in_transaction:
+                raw.rollback()
+        except Exception:
+            self._open -= 1
+            self._discard(raw)
+            self._cond.notify()
+            return
+        self._idle.append((raw, created_at))
+        self._cond.notify()
+
+    def warm(self, count=None):
+        """Open up to `count` idle connections ahead of traffic."""
+        conns = []
+        try:
+            for _ in range(min(count or self.size, self.size)):
+                conns.append(self.acquire())
+        finally:
+            for c in conns:
+                c.close()
+        return len(conns)
+
+    def close_all(self):
+        with self._cond:
+            while self._idle:
+                raw, _ = self._idle.pop()
+                self._open -= 1
+                self._discard(raw)
+
+    def snapshot(self):
+        with self._cond:
+            self._check_fork()
+            self._reclaim()
+            return dict(self.stats, open=self._open, idle=len(self._idle), size=self.size)
+
+
+def mysql_connect(**overrides):
+    """Open a raw connection using the DB_* environment settings."""
+    params = dict(
+        host=os.getenv('DB_HOST', 'localhost'),
+        user=os.getenv('DB_USER', 'root'),
+        password=os.getenv('DB_PASS', 'admin'),
+        database=os.getenv('DB_NAME', 'risk_sentinel'),
+        autocommit=True
+    )
+    params.update(overrides)
+    return mysql.connector.connect(**params)
+
+
+def sqlite_connect():
+    """Local stand-in: DB_BACKEND=sqlite uses the file at DB_SQLITE_PATH."""
+    from backend import sqlite_compat
+    return sqlite_compat.connect(os.getenv('DB_SQLITE_PATH', 'instance/risk_sentinel_bench.db'))
+
+
+def connect_from_env():
+    return sqlite_connect() if os.getenv('DB_BACKEND', 'mysql') == 'sqlite' else mysql_connect()
+
+
+def pool_from_env(connect=connect_from_env):
+    return ConnectionPool(
+        connect,
+        size=int(os.getenv('DB_POOL_SIZE', '10')),
+        timeout=float(os.getenv('DB_POOL_TIMEOUT', '5')),
+        recycle=int(os.getenv('DB_POOL_RECYCLE', '1800'))
+    )
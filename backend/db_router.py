@@ -0,0 +1,259 @@
+# ===== READ/WRITE SPLITTING: REPLICA ROUTING =====
+import itertools
+import logging
+import math
+import os
+import threading
+import time
+
+from backend.cache import TTLCache, backend_from_env
+from backend.db_pool import ConnectionPool, PoolExhausted, mysql_connect
+
+log = logging.getLogger(__name__)
+
+
+def replica_lag(cursor):
+    """
+    Seconds the replica's applier is behind its source; None when the server is not a
+    replica or cannot say (the SQLite stand-in), float('inf') when replication is stopped.
+    """
+    for sql, column in (("SHOW REPLICA STATUS", 'Seconds_Behind_Source'),
+                        ("SHOW SLAVE STATUS", 'Seconds_Behind_Master')):
+        try:
+            cursor.execute(sql)
+            rows = cursor.fetchall()
+        except Exception:
+            continue
+        if not rows:
+            return None
+        names = [d[0] for d in cursor.description]
+        value = rows[0][names.index(column)]
+        return float('inf') if value is None else float(value)
+    return None
+
+
+class Replica:
+    """One read replica: its own pool plus the health the checker and failed checkouts report."""
+
+    def __init__(self, name, pool):
+        self.name = name
+        self.pool = pool
+        self.healthy = False  # until the first check passes
+        self.lag = None
+        self.successes = 0
+        self.error = None
+        self.checked_at = None
+        self.stats = {'reads': 0, 'failures': 0, 'checks': 0}
+
+    def busy(self):
+        snapshot = self.pool.snapshot()
+        return snapshot['open'] - snapshot['idle']
+
+    def snapshot(self):
+        return dict(self.stats, healthy=int(self.healthy), lag_s=self.lag if self.lag is not None else 0,
+                    busy=self.busy())
+
+
+class RecentWrites:
+    """
+    Enterprises written to within the last `window` seconds. Registered with
+    register_enterprise_cache(), so notify_enterprise_write() marks the enterprise and its
+    reads stay on the primary until replicas have caught up; that also keeps cache refills
+    right after an invalidation from reading a lagging replica. Shared across workers when
+    CACHE_BACKEND is.
+    """
+
+    def __init__(self, backend, window):
+        self.window = window
+        self._cache = TTLCache(backend, ttl=max(1, math.ceil(window)), namespace='recent_writes')
+
+    def invalidate(self, enterprise_id):
+        self._cache.set(enterprise_id, time.time())
+
+    def __contains__(self, enterprise_id):
+        # backends expire in whole seconds; the stored write time makes the window exact
+        wrote_at = self._cache.get(enterprise_id) if enterprise_id is not None else None
+        return wrote_at is not None and time.time() - wrote_at < self.window
+
+
+class ReplicaRouter:
+    """
+    Hands out primary connections for writes and replica connections for reads.
+    Reads go to the healthy replica with the fewest checked-out connections (round robin
+    between equals) and fall back to the primary when none is usable. A replica leaves
+    rotation on its first failed check or checkout, or when its lag exceeds max_lag, and
+    returns after `rise` consecutive good checks. A replica whose lag cannot be read (not a
+    replica, no REPLICATION CLIENT privilege) counts as failing its check unless
+    allow_unknown_lag is set. Without replicas every call is the primary.
+    """
+
+    def __init__(self, primary, replicas=(), max_lag=5.0, check_interval=2.0, rise=2, window=10.0,
+                 recent_writes=None, allow_unknown_lag=False):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.max_lag = max_lag
+        self.allow_unknown_lag = allow_unknown_lag
+        self.check_interval = check_interval
+        self.rise = rise
+        self.window = window
+        self.recent_writes = recent_writes or RecentWrites(backend_from_env(), window)
+        self.stats = {'primary_reads': 0, 'replica_reads': 0, 'fallbacks': 0, 'pinned': 0}
+        self._rotation = itertools.count()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def enabled(self):
+        return bool(self.replicas)
+
+    def pinned(self, wrote_at=None, enterprise_id=None):
+        """True while this session (wrote_at: epoch seconds of its last write) or its enterprise must read the primary."""
+        if not self.enabled:
+            return False
+        if (wrote_at and time.time() - wrote_at < self.window) or enterprise_id in self.recent_writes:
+            self.stats['pinned'] += 1
+            return True
+        return False
+
+    def acquire(self, read_only=False):
+        """A pooled connection; read_only=True may come from a replica. conn.close() returns it."""
+        if read_only and self.replicas:
+            tried = set()
+            while True:
+                replica = self._pick(tried)
+                if replica is None:
+                    self.stats['fallbacks'] += 1
+                    break
+                tried.add(replica.name)
+                try:
+                    conn = replica.pool.acquire()
+                except PoolExhausted:
+                    continue  # busy, not broken: try the next one
+                except Exception as e:
+                    self._mark_down(replica, e)
+                    continue
+                replica.stats['reads'] += 1
+                self.stats['replica_reads'] += 1
+                return conn
+        if read_only:
+            self.stats['primary_reads'] += 1
+        return self.primary.acquire()
+
+    def _pick(self, tried):
+        candidates = [r for r in self.replicas if r.healthy and r.name not in tried]
+        if not candidates:
+            return None
+        turn = next(self._rotation)
+        n = len(self.replicas)
+        return min(candidates, key=lambda r: (r.busy(), (self.replicas.index(r) - turn) % n))
+
+    def _mark_down(self, replica, error):
+        with self._lock:
+            was_healthy = replica.healthy
+            replica.healthy = False
+            replica.successes = 0
+            replica.error = str(error)
+            replica.stats['failures'] += 1
+        if was_healthy:
+            log.warning("replica %s out of rotation: %s", replica.name, error)
+
+    def check(self, replica):
+        """Probe one replica (SELECT 1 and its lag) and update its rotation state."""
+        replica.stats['checks'] += 1
+        replica.checked_at = time.time()
+        conn = None
+        try:
+            conn = replica.pool.acquire()
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            lag = replica_lag(cursor)
+            cursor.close()
+        except Exception as e:
+            self._mark_down(replica, e)
+            return False
+        finally:
+            if conn is not None:
+                conn.close()
+        replica.lag = lag
+        if lag is None and not self.allow_unknown_lag:
+            self._mark_down(replica, 'replication lag unknown')
+            return False
+        if lag is not None and lag > self.max_lag:
+            self._mark_down(replica, f'lag {lag}s > {self.max_lag}s')
+            return False
+        with self._lock:
+            replica.successes += 1
+            replica.error = None
+            if not replica.healthy and replica.successes >= self.rise:
+                replica.healthy = True
+                log.info("replica %s back in rotation (lag %ss)", replica.name, lag)
+        return replica.healthy
+
+    def check_all(self):
+        return {r.name: self.check(r) for r in self.replicas}
+
+    def start(self):
+        """Start the background health checks (again after a fork: threads do not survive it)."""
+        if self.replicas and (self._thread is None or not self._thread.is_alive()):
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='replica-checks', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _loop(self):
+        # reads use the primary until a replica has passed `rise` checks, so bring them up back to back
+        rounds = self.rise
+        while not self._stop.is_set():
+            try:
+                self.check_all()
+            except Exception as e:
+                log.error("replica checks failed: %s", e)
+            rounds -= 1
+            if rounds <= 0:
+                self._stop.wait(self.check_interval)
+
+    def snapshot(self):
+        return {'router': dict(self.stats), 'replicas': {r.name: r.snapshot() for r in self.replicas}}
+
+
+def replica_connect(spec):
+    """Connector for one DB_REPLICAS entry: host[:port] for MySQL, a file path with DB_BACKEND=sqlite."""
+    if os.getenv('DB_BACKEND', 'mysql') == 'sqlite':
+        from backend import sqlite_compat
+        return lambda: sqlite_compat.connect(spec)
+    host, _, port = spec.partition(':')
+    overrides = dict(host=host, connection_timeout=int(os.getenv('DB_REPLICA_CONNECT_TIMEOUT', '2')))
+    if port:
+        overrides['port'] = int(port)
+    return lambda: mysql_connect(**overrides)
+
+
+def router_from_env(primary):
+    """
+    DB_REPLICAS: comma-separated replicas (empty: everything uses the primary pool);
+    DB_REPLICA_MAX_LAG, DB_REPLICA_CHECK_INTERVAL, DB_REPLICA_POOL_SIZE,
+    DB_READ_YOUR_WRITES (seconds a session or enterprise reads the primary after a write) and
+    DB_REPLICA_ALLOW_UNKNOWN_LAG=1 to keep replicas whose lag cannot be read in rotation.
+    """
+    specs = [s.strip() for s in os.getenv('DB_REPLICAS', '').split(',') if s.strip()]
+    size = int(os.getenv('DB_REPLICA_POOL_SIZE', os.getenv('DB_POOL_SIZE', '10')))
+    replicas = [
+        Replica(spec, ConnectionPool(replica_connect(spec), size=size,
+                                     timeout=float(os.getenv('DB_POOL_TIMEOUT', '5')),
+                                     recycle=int(os.getenv('DB_POOL_RECYCLE', '1800'))))
+        for spec in specs
+    ]
+    return ReplicaRouter(
+        primary, replicas,
+        max_lag=float(os.getenv('DB_REPLICA_MAX_LAG', '5')),
+        check_interval=float(os.getenv('DB_REPLICA_CHECK_INTERVAL', '2')),
+        window=float(os.getenv('DB_READ_YOUR_WRITES', '10')),
+        allow_unknown_lag=os.getenv('DB_REPLICA_ALLOW_UNKNOWN_LAG', '0') == '1'
+    )
@@ -0,0 +1,114 @@
+# ===== STREAMING EXPORTS =====
+import csv
+import io
+import json
+import zlib
+
+# table -> exportable columns (first is the default sort key); everything is enterprise-scoped via projects
+EXPORT_COLUMNS = {
+    'risks': ['id', 'project_id', 'title', 'severity', 'status', 'probability', 'impact_score', 'risk_score',
+              'rag_status', 'risk_category', 'finance_impact', 'milestone_delay_days', 'vendor_id',
+              'created_at', 'last_updated'],
+    'tasks': ['id', 'project_id', 'risk_id', 'title', 'status', 'priority', 'assigned_to', 'due_date',
+              'completed_at', 'created_at'],
+    'activities': ['id', 'project_id', 'user_id', 'action', 'details', 'created_at'],
+}
+
+FETCH_BATCH = 5000
+
+
+class ExportError(ValueError):
+    pass
+
+
+def select_columns(table, requested=None):
+    """Validate a comma separated column list against the whitelist (all columns when empty)."""
+    if table not in EXPORT_COLUMNS:
+        raise ExportError(f'unknown export: {table}')
+    allowed = EXPORT_COLUMNS[table]
+    if not requested:
+        return list(allowed)
+    columns = [c.strip() for c in requested.split(',') if c.strip()]
+    unknown = [c for c in columns if c not in allowed]
+    if unknown or not columns:
+        raise ExportError(f"unknown columns for {table}: {', '.join(unknown) or '(none)'}")
+    return columns
+
+
+def export_query(table, columns):
+    cols = ', '.join(f't.{c}' for c in columns)
+    return f"""
+        SELECT {cols} FROM {table} t
+        JOIN projects p ON t.project_id = p.id
+        WHERE p.enterprise_id = %s
+        ORDER BY t.id
+    """
+
+
+def iter_rows(cursor, batch_size=FETCH_BATCH):
+    """Drain an unbuffered cursor in fixed-size batches."""
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            return
+        yield batch
+
+
+def _csv_chunks(columns, batches):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    for batch in batches:
+        writer.writerows(batch)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def _json_chunks(columns, batches):
+    yield '['
+    first = True
+    for batch in batches:
+        parts = []
+        for row in batch:
+            parts.append(('' if first else ',') + '\n' + json.dumps(dict(zip(columns, row)), default=str))
+            first = False
+        yield ''.join(parts)
+    yield '\n]\n'
+
+
+def encode_stream(columns, batches, fmt='csv', gzip=False):
+    """Turn row batches into CSV/JSON byte chunks, gzip-compressed on the fly when asked."""
+    chunks = (_csv_chunks if fmt == 'csv' else _json_chunks)(columns, batches)
+    if not gzip:
+        for chunk in chunks:
+            yield chunk.encode('utf-8')
+        return
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(conn, table, columns, enterprise_id, fmt='csv', gzip=False, on_close=None):
+    """
+    Generator over the encoded export. Uses a plain unbuffered cursor so only one
+    batch is held in memory; `on_close` runs when the stream ends or is abandoned after
+    it started. A body that is never iterated (HEAD, early disconnect) never runs it, so
+    the caller also registers the release with Response.call_on_close.
+    """
+    cursor = conn.cursor(buffered=False)
+    try:
+        cursor.execute(export_query(table, columns), (enterprise_id,))
+        yield from encode_stream(columns, iter_rows(cursor), fmt, gzip)
+    finally:
+        try:
+            cursor.close()
+        except Exception:
+            pass
+        if on_close:
+            on_close()
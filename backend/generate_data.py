@@ -0,0 +1,285 @@
+"""
+Synthetic large-tenant data generator. Bulk-inserts enterprises, users, projects,
+risks, tasks, milestones, vendors, budgets, activities and chat messages with a
+fixed seed, in executemany batches.
+
+    # local SQLite file in instance/ (schema is created)
+    python backend/generate_data.py --sqlite instance/risk_sentinel_bench.db --enterprises 2 --projects 200 --risks 500
+    # MySQL configured by DB_* (schema must already exist)
+    python backend/generate_data.py --enterprises 1 --projects 2000 --risks 500 --tasks 200
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.migrate import MIGRATIONS
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS enterprises (id INTEGER PRIMARY KEY, name TEXT NOT NULL, pm_user_id INTEGER, created_at DATETIME);
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY, username TEXT NOT NULL, role TEXT NOT NULL, email TEXT NOT NULL UNIQUE,
+    password TEXT NOT NULL, enterprise_id INTEGER, is_active INTEGER DEFAULT 1, projects_assigned TEXT,
+    activity_log TEXT, created_at DATETIME);
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY, name TEXT NOT NULL, enterprise_id INTEGER, pm_user_id INTEGER, team_lead_id INTEGER,
+    status TEXT DEFAULT 'Planning', created_at DATETIME, budget_total REAL, budget_spent REAL DEFAULT 0,
+    description TEXT, charter_status TEXT DEFAULT 'Draft', start_date DATE, end_date DATE,
+    stakeholder_list TEXT, team_size INTEGER DEFAULT 0);
+CREATE TABLE IF NOT EXISTS risks (
+    id INTEGER PRIMARY KEY, risk_type_id INTEGER, project_id INTEGER, title TEXT NOT NULL, description TEXT,
+    severity TEXT, probability REAL, impact_score INTEGER, risk_score REAL, health_impact TEXT,
+    assigned_to INTEGER, tracker_id INTEGER, vendor_id INTEGER, status TEXT DEFAULT 'Identified',
+    progress INTEGER DEFAULT 0, mitigation_progress INTEGER DEFAULT 0, vendor_status TEXT DEFAULT 'pending',
+    created_at DATETIME, last_updated DATETIME, risk_category TEXT DEFAULT 'Operational', test_type TEXT,
+    finance_impact REAL DEFAULT 0, rag_status TEXT DEFAULT 'Amber', project_blocker INTEGER DEFAULT 0,
+    flagged_by INTEGER, comments TEXT, milestone_delay_days INTEGER DEFAULT 0);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY, risk_id INTEGER, project_id INTEGER, assigned_to INTEGER, title TEXT NOT NULL,
+    description TEXT, status TEXT DEFAULT 'NotStarted', priority TEXT DEFAULT 'Medium', due_date DATE,
+    completed_at DATETIME, created_by INTEGER, created_at DATETIME, duration_days INTEGER, updated_at DATETIME);
+CREATE TABLE IF NOT EXISTS milestones (
+    id INTEGER PRIMARY KEY, project_id INTEGER, title TEXT NOT NULL, target_date DATE,
+    status TEXT DEFAULT 'Pending', completed_date DATE, updated_at DATETIME, projected_date DATE,
+    slip_days INTEGER NOT NULL DEFAULT 0, driving_path TEXT);
+CREATE TABLE IF NOT EXISTS schedule_dependencies (
+    id INTEGER PRIMARY KEY, project_id INTEGER NOT NULL, predecessor_type TEXT NOT NULL,
+    predecessor_id INTEGER NOT NULL, successor_type TEXT NOT NULL, successor_id INTEGER NOT NULL,
+    lag_days INTEGER NOT NULL DEFAULT 0, created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (successor_type, successor_id, predecessor_type, predecessor_id));
+CREATE TABLE IF NOT EXISTS vendors (
+    id INTEGER PRIMARY KEY, company_name TEXT NOT NULL, email TEXT NOT NULL UNIQUE, password TEXT NOT NULL,
+    generated_by_admin_id INTEGER, assigned_project_id INTEGER, delivery_assets TEXT, delivery_timeline DATE,
+    quality_status TEXT, completion_percent INTEGER, risk_score REAL DEFAULT 0, status TEXT DEFAULT 'Active',
+    created_at DATETIME, enterprise_id INTEGER, updated_at DATETIME);
+CREATE TABLE IF NOT EXISTS budgets (id INTEGER PRIMARY KEY, project_id INTEGER, total REAL, spent REAL);
+CREATE TABLE IF NOT EXISTS activities (
+    id INTEGER PRIMARY KEY, project_id INTEGER, user_id INTEGER, action TEXT, details TEXT, created_at DATETIME);
+CREATE TABLE IF NOT EXISTS chat_rooms (room_id INTEGER PRIMARY KEY, project_id INTEGER, name TEXT, created_at DATETIME);
+CREATE TABLE IF NOT EXISTS chat_messages (
+    message_id INTEGER PRIMARY KEY, room_id INTEGER, user_id INTEGER, message TEXT NOT NULL, created_at DATETIME);
+CREATE TABLE IF NOT EXISTS project_health (
+    id INTEGER PRIMARY KEY, project_id INTEGER, health_score TEXT, calculated_at DATETIME);
+CREATE TABLE IF NOT EXISTS job_watermarks (job TEXT PRIMARY KEY, watermark DATETIME NOT NULL);
+CREATE TABLE IF NOT EXISTS job_runs (
+    id INTEGER PRIMARY KEY, job TEXT NOT NULL, watermark_from DATETIME, watermark_to DATETIME,
+    projects_touched INTEGER DEFAULT 0, duration_ms INTEGER DEFAULT 0, ran_at DATETIME DEFAULT CURRENT_TIMESTAMP);
+CREATE TABLE IF NOT EXISTS risk_findings (
+    rule_key TEXT NOT NULL, source_id INTEGER NOT NULL, enterprise_id INTEGER NOT NULL, risk_id INTEGER NOT NULL,
+    found_at DATETIME NOT NULL, PRIMARY KEY (rule_key, source_id));
+CREATE TABLE IF NOT EXISTS risk_daily_rollups (
+    enterprise_id INTEGER NOT NULL, project_id INTEGER NOT NULL, dimension TEXT NOT NULL, value TEXT NOT NULL,
+    day DATE NOT NULL, risks INTEGER NOT NULL DEFAULT 0, open_risks INTEGER NOT NULL DEFAULT 0,
+    high_risks INTEGER NOT NULL DEFAULT 0, score_sum REAL NOT NULL DEFAULT 0, finance_sum REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (enterprise_id, project_id, dimension, day, value));
+"""
+
+TABLE_COLUMNS = {
+    'enterprises': ('id', 'name', 'pm_user_id', 'created_at'),
+    'users': ('id', 'username', 'role', 'email', 'password', 'enterprise_id', 'is_active', 'created_at'),
+    'projects': ('id', 'name', 'enterprise_id', 'pm_user_id', 'team_lead_id', 'status', 'created_at',
+                 'budget_total', 'budget_spent', 'start_date', 'end_date', 'team_size'),
+    'risks': ('id', 'project_id', 'title', 'severity', 'probability', 'impact_score', 'assigned_to', 'vendor_id',
+              'status', 'progress', 'mitigation_progress', 'created_at', 'last_updated', 'risk_category',
+              'finance_impact', 'rag_status', 'project_blocker', 'milestone_delay_days'),
+    'tasks': ('id', 'risk_id', 'project_id', 'assigned_to', 'title', 'status', 'priority', 'due_date',
+              'completed_at', 'created_by', 'created_at'),
+    'milestones': ('id', 'project_id', 'title', 'target_date', 'status', 'completed_date'),
+    'vendors': ('id', 'company_name', 'email', 'password', 'generated_by_admin_id', 'assigned_project_id',
+                'delivery_timeline', 'quality_status', 'completion_percent', 'status', 'created_at'),
+    'budgets': ('id', 'project_id', 'total', 'spent'),
+    'activities': ('id', 'project_id', 'user_id', 'action', 'details', 'created_at'),
+    'chat_rooms': ('room_id', 'project_id', 'name', 'created_at'),
+    'chat_messages': ('message_id', 'room_id', 'user_id', 'message', 'created_at'),
+}
+
+PROJECT_STATUSES = ['Active'] * 5 + ['Planning'] * 2 + ['OnHold', 'Complete']
+RISK_STATUSES = ['Identified', 'Open', 'Open', 'InProgress', 'Mitigated', 'Closed']
+CATEGORIES = ['Testing', 'Finance', 'Technical', 'Vendor', 'Compliance', 'Operational']
+TASK_STATUSES = ['NotStarted', 'InProgress', 'Testing', 'Completed']
+ACTIONS = ['created risk', 'updated risk', 'closed task', 'uploaded asset', 'approved budget']
+
+
+class BulkWriter:
+    """Buffers rows per table and flushes them with executemany, committing every flush."""
+
+    def __init__(self, conn, batch_size=5000):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.batch_size = batch_size
+        self.buffers = {t: [] for t in TABLE_COLUMNS}
+        self.counts = {t: 0 for t in TABLE_COLUMNS}
+
+    def add(self, table, row):
+        buf = self.buffers[table]
+        buf.append(row)
+        if len(buf) >= self.batch_size:
+            self.flush(table)
+
+    def flush(self, table=None):
+        for name in ([table] if table else list(self.buffers)):
+            rows = self.buffers[name]
+            if not rows:
+                continue
+            cols = TABLE_COLUMNS[name]
+            self.conn.start_transaction()
+            self.cursor.executemany(
+                f"INSERT INTO {name} ({', '.join(cols)}) VALUES ({', '.join(['%s'] * len(cols))})", rows)
+            self.conn.commit()
+            self.counts[name] += len(rows)
+            self.buffers[name] = []
+
+
+def next_ids(conn):
+    cursor = conn.cursor()
+    ids = {}
+    for table, cols in TABLE_COLUMNS.items():
+        cursor.execute(f"SELECT COALESCE(MAX({cols[0]}), 0) FROM {table}")
+        ids[table] = cursor.fetchone()[0] + 1
+    cursor.close()
+    return ids
+
+
+def generate(conn, enterprises=1, projects=100, risks=200, tasks=100, milestones=8, vendors=3,
+             activities=50, members=25, rooms=1, messages=200, seed=42, batch_size=5000, log=print):
+    """Generate `enterprises` tenants; every count except `enterprises` is per project (members per enterprise)."""
+    rnd = random.Random(seed)
+    ids = next_ids(conn)
+    w = BulkWriter(conn, batch_size)
+    now = datetime(2026, 10, 1)
+
+    def take(table):
+        value = ids[table]
+        ids[table] += 1
+        return value
+
+    def when(days_back=730):
+        return now - timedelta(seconds=rnd.randint(0, days_back * 86400))
+
+    started = time.perf_counter()
+    for _ in range(enterprises):
+        eid = take('enterprises')
+        user_ids = []
+        for role, count in (('Admin', 1), ('PM', max(1, members // 10)), ('Analyst', max(1, members // 10)),
+                            ('TL', max(1, members // 10)), ('SeniorDev', members)):
+            for _ in range(count):
+                uid = take('users')
+                w.add('users', (uid, f'{role.lower()}_{uid}', role, f'{role.lower()}{uid}@tenant{eid}.bench',
+                                'pass123', eid, 1 if rnd.random() < 0.9 else 0, when()))
+                user_ids.append((uid, role))
+        pms = [u for u, r in user_ids if r == 'PM']
+        tls = [u for u, r in user_ids if r == 'TL']
+        staff = [u for u, _ in user_ids]
+        w.add('enterprises', (eid, f'Enterprise {eid}', pms[0], when()))
+
+        for _ in range(projects):
+            pid = take('projects')
+            start = when(900).date()
+            total = round(rnd.uniform(5e4, 2e6), 2)
+            spent = round(total * rnd.uniform(0.0, 1.3), 2)
+            w.add('projects', (pid, f'Project {pid}', eid, rnd.choice(pms), rnd.choice(tls), rnd.choice(PROJECT_STATUSES),
+                               when(900), total, spent, start, start + timedelta(days=rnd.randint(90, 720)),
+                               rnd.randint(3, 40)))
+            w.add('budgets', (take('budgets'), pid, total, spent))
+            vendor_ids = []
+            for _ in range(vendors):
+                vid = take('vendors')
+                vendor_ids.append(vid)
+                w.add('vendors', (vid, f'Vendor {vid}', f'vendor{vid}@supplier.bench', 'pass123', staff[0], pid,
+                                  start + timedelta(days=rnd.randint(30, 400)), rnd.choice(['Good', 'Fair', 'Poor']),
+                                  rnd.randint(0, 100), 'Active', when()))
+            for m in range(milestones):
+                status = rnd.choice(['Pending', 'InProgress', 'Completed', 'Delayed'])
+                target = start + timedelta(days=30 * (m + 1))
+                w.add('milestones', (take('milestones'), pid, f'Milestone {m + 1}', target, status,
+                                     target if status == 'Completed' else None))
+            risk_ids = []
+            for _ in range(risks):
+                rid = take('risks')
+                risk_ids.append(rid)
+                created = when()
+                severity = rnd.choices(['Low', 'Medium', 'High'], [5, 3, 2])[0]
+                w.add('risks', (rid, pid, f'Risk {rid}', severity, round(rnd.betavariate(2, 3), 3), rnd.randint(1, 5),
+                                rnd.choice(staff), rnd.choice(vendor_ids) if vendor_ids and rnd.random() < 0.2 else None,
+                                rnd.choice(RISK_STATUSES), rnd.randint(0, 100), rnd.randint(0, 100), created,
+                                created + timedelta(days=rnd.randint(0, 60)), rnd.choice(CATEGORIES),
+                                round(rnd.expovariate(1 / 20000), 2), rnd.choices(['Green', 'Amber', 'Red'], [5, 3, 2])[0],
+                                1 if rnd.random() < 0.03 else 0, rnd.choice([0, 0, 0, 3, 7, 14, 30])))
+            for _ in range(tasks):
+                tid = take('tasks')
+                created = when()
+                status = rnd.choice(TASK_STATUSES)
+                w.add('tasks', (tid, rnd.choice(risk_ids) if risk_ids and rnd.random() < 0.5 else None, pid,
+                                rnd.choice(staff), f'Task {tid}', status, rnd.choice(['High', 'Medium', 'Low']),
+                                (created + timedelta(days=rnd.randint(1, 120))).date(),
+                                created + timedelta(days=rnd.randint(1, 90)) if status == 'Completed' else None,
+                                rnd.choice(pms), created))
+            for _ in range(activities):
+                aid = take('activities')
+                w.add('activities', (aid, pid, rnd.choice(staff), rnd.choice(ACTIONS), f'auto-generated #{aid}', when()))
+            for _ in range(rooms):
+                room_id = take('chat_rooms')
+                w.add('chat_rooms', (room_id, pid, f'Project {pid} vendor chat', when()))
+                t = when()
+                for _ in range(messages):
+                    t += timedelta(seconds=rnd.randint(5, 3600))
+                    mid = take('chat_messages')
+                    w.add('chat_messages', (mid, room_id, rnd.choice(staff), f'message {mid}', t))
+    w.flush()
+    elapsed = time.perf_counter() - started
+    total = sum(w.counts.values())
+    log(f"✅ inserted {total:,} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s)")
+    for table, count in w.counts.items():
+        log(f"   {table:<14} {count:>12,}")
+    return w.counts
+
+
+def create_sqlite_schema(conn):
+    cursor = conn.cursor()
+    for statement in SQLITE_SCHEMA.split(';'):
+        if statement.strip():
+            cursor.execute(statement)
+    # reuse the migration index definitions so SQLite plans look like production's
+    for _, _, statements in MIGRATIONS:
+        for statement in statements:
+            if statement.startswith('CREATE INDEX'):
+                cursor.execute(statement.replace('CREATE INDEX', 'CREATE INDEX IF NOT EXISTS', 1))
+    cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sqlite', help='write to this SQLite file (created with the schema) instead of MySQL')
+    parser.add_argument('--enterprises', type=int, default=1)
+    parser.add_argument('--projects', type=int, default=100, help='per enterprise')
+    parser.add_argument('--risks', type=int, default=200, help='per project')
+    parser.add_argument('--tasks', type=int, default=100, help='per project')
+    parser.add_argument('--milestones', type=int, default=8, help='per project')
+    parser.add_argument('--vendors', type=int, default=3, help='per project')
+    parser.add_argument('--activities', type=int, default=50, help='per project')
+    parser.add_argument('--members', type=int, default=25, help='developers per enterprise')
+    parser.add_argument('--messages', type=int, default=200, help='chat messages per project room')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    if args.sqlite:
+        from backend import sqlite_compat
+        os.makedirs(os.path.dirname(os.path.abspath(args.sqlite)), exist_ok=True)
+        conn = sqlite_compat.connect(args.sqlite)
+        create_sqlite_schema(conn)
+    else:
+        from backend.db_pool import mysql_connect
+        conn = mysql_connect()
+    try:
+        generate(conn, args.enterprises, args.projects, args.risks, args.tasks, args.milestones, args.vendors,
+                 args.activities, args.members, messages=args.messages, seed=args.seed, batch_size=args.batch_size)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
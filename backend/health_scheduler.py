@@ -0,0 +1,183 @@
+"""
+Incremental ProjectHealth recomputation. Each run only revisits projects whose
+risks or tasks changed, or whose open tasks fell due, since the previous run's watermark.
+project_health keeps one row per change of a project's score: a run only writes a row
+when the score moved, and drops rows older than `history_days` except each project's latest.
+
+    python backend/health_scheduler.py --once            # cron mode
+    python backend/health_scheduler.py --interval 300    # loop in the foreground
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.jobs import (JobScheduler, connector, db_now, enterprises_of, notify_enterprises, read_watermark, save_run,
+                         serve, with_lock)
+
+log = logging.getLogger('risk_sentinel.health')
+
+JOB_NAME = 'project_health'
+EPOCH = datetime(1970, 1, 1)
+CHUNK = 500
+HISTORY_DAYS = 90
+
+# per-project inputs for the health rule, computed set-based for a chunk of projects
+HEALTH_INPUTS_SQL = """
+    SELECT p.id AS project_id,
+           COALESCE(r.total, 0) AS risks, COALESCE(r.red, 0) AS red, COALESCE(r.amber, 0) AS amber,
+           COALESCE(r.blockers, 0) AS blockers, COALESCE(t.overdue, 0) AS overdue
+    FROM projects p
+    LEFT JOIN (
+        SELECT project_id, COUNT(*) AS total, SUM(rag_status = 'Red') AS red,
+               SUM(rag_status = 'Amber') AS amber, SUM(project_blocker = 1) AS blockers
+        FROM risks
+        WHERE project_id IN ({ids}) AND status NOT IN ('Mitigated', 'Closed')
+        GROUP BY project_id
+    ) r ON r.project_id = p.id
+    LEFT JOIN (
+        SELECT project_id, COUNT(*) AS overdue
+        FROM tasks
+        WHERE project_id IN ({ids}) AND status <> 'Completed' AND due_date < CURDATE()
+        GROUP BY project_id
+    ) t ON t.project_id = p.id
+    WHERE p.id IN ({ids})
+"""
+
+
+def health_score(risks, red, amber, blockers, overdue):
+    """Red/Yellow/Green from open-risk RAG mix, blockers and overdue tasks."""
+    if blockers > 0 or red >= 3 or (risks and red / risks >= 0.25):
+        return 'Red'
+    if red > 0 or overdue > 0 or (risks and amber / risks >= 0.3):
+        return 'Yellow'
+    return 'Green'
+
+
+def changed_projects(cursor, since, until):
+    """
+    Projects with a risk or task written in (since, until], plus those with an open task that
+    fell due in between: an overdue task changes health without any row being written.
+    """
+    cursor.execute("""
+        SELECT project_id FROM risks WHERE last_updated > %s AND last_updated <= %s
+        UNION
+        SELECT project_id FROM tasks WHERE updated_at > %s AND updated_at <= %s
+        UNION
+        SELECT project_id FROM tasks
+        WHERE due_date >= DATE(%s) AND due_date < DATE(%s) AND status <> 'Completed'
+    """, (since, until) * 3)
+    return sorted(r[0] for r in cursor.fetchall() if r[0] is not None)
+
+
+def latest_rows(cursor, ids, chunk):
+    """{project_id: (row id, health_score)} of each project's newest project_health row."""
+    cursor.execute(f"SELECT MAX(id) FROM project_health WHERE project_id IN ({ids}) GROUP BY project_id", chunk)
+    latest = [row[0] for row in cursor.fetchall()]
+    if not latest:
+        return {}
+    cursor.execute(f"SELECT id, project_id, health_score FROM project_health WHERE id IN ({in_list(latest)})", latest)
+    return {project_id: (row_id, score) for row_id, project_id, score in cursor.fetchall()}
+
+
+def in_list(values):
+    return ', '.join(['%s'] * len(values))
+
+
+def recompute(cursor, project_ids, calculated_at, history_days=HISTORY_DAYS):
+    """
+    Recompute health for `project_ids` in chunks. A row is written only for projects whose score
+    changed; rows older than `history_days` are pruned, keeping each project's latest.
+    Returns (projects evaluated, rows written).
+    """
+    touched = written = 0
+    cutoff = calculated_at - timedelta(days=history_days)
+    for start in range(0, len(project_ids), CHUNK):
+        chunk = project_ids[start:start + CHUNK]
+        ids = in_list(chunk)
+        cursor.execute(HEALTH_INPUTS_SQL.format(ids=ids), tuple(chunk) * 3)
+        scores = [(pid, health_score(int(total), int(red), int(amber), int(blockers), int(overdue)))
+                  for pid, total, red, amber, blockers, overdue in cursor.fetchall()]
+        latest = latest_rows(cursor, ids, chunk)
+        rows = [(pid, score, calculated_at) for pid, score in scores if latest.get(pid, (None, None))[1] != score]
+        if rows:
+            cursor.executemany(
+                "INSERT INTO project_health (project_id, health_score, calculated_at) VALUES (%s, %s, %s)", rows)
+        changed = {row[0] for row in rows}
+        keep = [row_id for pid, (row_id, _) in latest.items() if pid not in changed]
+        cursor.execute(f"""
+            DELETE FROM project_health WHERE project_id IN ({ids}) AND calculated_at < %s
+            {f"AND id NOT IN ({in_list(keep)})" if keep else ''}
+        """, (*chunk, cutoff, *keep))
+        touched += len(scores)
+        written += len(rows)
+    return touched, written
+
+
+def run_once(conn, history_days=HISTORY_DAYS):
+    """
+    One incremental pass. Guarded by a named lock so concurrent schedulers
+    (cron + in-process, several workers) never overlap. Returns the run record or None if skipped.
+    """
+    cursor = conn.cursor()
+    since = read_watermark(cursor, JOB_NAME) or EPOCH
+    cursor.close()
+    enterprises = set()
+
+    def work(cursor):
+        started = time.perf_counter()
+        until = db_now(cursor)
+        project_ids = changed_projects(cursor, since, until)
+        touched, written = recompute(cursor, project_ids, until, history_days)
+        if written:
+            enterprises.update(enterprises_of(cursor, project_ids))
+        duration_ms = int((time.perf_counter() - started) * 1000)
+        save_run(cursor, JOB_NAME, since, until, touched, duration_ms)
+        record = {'since': since, 'until': until, 'projects_touched': touched, 'written': written,
+                  'duration_ms': duration_ms}
+        log.info("project health run: %s", record)
+        return record
+    record = with_lock(conn, JOB_NAME, work)
+    notify_enterprises(enterprises, 'project_health')  # empty unless the run committed
+    return record
+
+
+class HealthScheduler(JobScheduler):
+    """Background thread calling run_once every `interval` seconds."""
+    name = 'health-scheduler'
+
+    def __init__(self, connect, interval=300, history_days=HISTORY_DAYS):
+        super().__init__(connect, interval)
+        self.history_days = history_days
+
+    def run(self, conn):
+        run_once(conn, self.history_days)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--once', action='store_true', help='run a single pass and exit (cron)')
+    parser.add_argument('--interval', type=int, default=300)
+    parser.add_argument('--history-days', type=int, default=HISTORY_DAYS, help='keep superseded rows this long')
+    parser.add_argument('--sqlite', help='SQLite file instead of MySQL')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    connect = connector(args.sqlite)
+    if args.once:
+        conn = connect()
+        try:
+            record = run_once(conn, args.history_days)
+        finally:
+            conn.close()
+        print("⏭️  another run holds the lock" if record is None else
+              f"✅ {record['projects_touched']} project(s), {record['written']} changed, in {record['duration_ms']}ms")
+        return
+    serve(HealthScheduler(connect, args.interval, args.history_days).start())
+
+
+if __name__ == '__main__':
+    main()
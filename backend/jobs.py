@@ -0,0 +1,166 @@
+"""
+Plumbing shared by the watermarked background jobs (health, rollups, vendor scores,
+schedule graph, risk scanner): the job clock, the watermark / run log in job_watermarks
+and job_runs, the named lock that keeps concurrent runners (cron, in-process, several
+workers) from overlapping, cache invalidation after a run, the scheduler thread and the
+CLI connection.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+from backend.cache import notify_enterprise_write
+
+log = logging.getLogger('risk_sentinel.jobs')
+
+
+def db_now(cursor):
+    # stop a second short of "now" so rows written later in the current second land in the next run
+    cursor.execute("SELECT NOW()")
+    row = cursor.fetchone()
+    now = next(iter(row.values())) if isinstance(row, dict) else row[0]
+    now = datetime.fromisoformat(now) if isinstance(now, str) else now
+    return now - timedelta(seconds=1)
+
+
+def read_watermark(cursor, job):
+    """The job's last watermark (a datetime), or None before its first run."""
+    cursor.execute("SELECT watermark FROM job_watermarks WHERE job = %s", (job,))
+    row = cursor.fetchone()
+    value = (row['watermark'] if isinstance(row, dict) else row[0]) if row else None
+    if not value:
+        return None
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def save_watermark(cursor, job, watermark, exists=None):
+    # explicit UPDATE / INSERT rather than ON DUPLICATE KEY so the SQLite stand-in can run the jobs too
+    if exists is None:
+        exists = read_watermark(cursor, job) is not None
+    if exists:
+        cursor.execute("UPDATE job_watermarks SET watermark = %s WHERE job = %s", (watermark, job))
+    else:
+        cursor.execute("INSERT INTO job_watermarks (job, watermark) VALUES (%s, %s)", (job, watermark))
+
+
+def save_run(cursor, job, since, until, touched, duration_ms):
+    """Move the job's watermark to `until` and log the run in job_runs."""
+    save_watermark(cursor, job, until)
+    cursor.execute("""
+        INSERT INTO job_runs (job, watermark_from, watermark_to, projects_touched, duration_ms)
+        VALUES (%s, %s, %s, %s, %s)
+    """, (job, since, until, touched, duration_ms))
+
+
+def acquire(cursor, name):
+    cursor.execute("SELECT GET_LOCK(%s, 0)", (name,))
+    return bool(cursor.fetchone()[0])
+
+
+def release(cursor, name):
+    cursor.execute("SELECT RELEASE_LOCK(%s)", (name,))
+    cursor.fetchone()
+
+
+def with_lock(conn, job, work, dictionary=False):
+    """
+    Run work(cursor) under the job's named lock in one transaction; None if another run holds it.
+    `dictionary` picks the cursor work() gets.
+    """
+    lock = conn.cursor()
+    if not acquire(lock, 'rs_' + job):
+        lock.close()
+        return None
+    cursor = conn.cursor(dictionary=True) if dictionary else lock
+    try:
+        conn.start_transaction()
+        record = work(cursor)
+        conn.commit()
+        return record
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if cursor is not lock:
+            cursor.close()
+        release(lock, 'rs_' + job)
+        lock.close()
+
+
+def enterprises_of(cursor, project_ids, chunk=500):
+    """enterprise_ids owning `project_ids`."""
+    project_ids, found = sorted(project_ids), set()
+    for start in range(0, len(project_ids), chunk):
+        ids = project_ids[start:start + chunk]
+        cursor.execute(f"SELECT DISTINCT enterprise_id FROM projects WHERE id IN ({', '.join(['%s'] * len(ids))})", ids)
+        found.update(row['enterprise_id'] if isinstance(row, dict) else row[0] for row in cursor.fetchall())
+    found.discard(None)
+    return found
+
+
+def notify_enterprises(enterprise_ids, table):
+    """
+    Drop the cached aggregates of every enterprise a committed run wrote to. Only caches
+    registered in this process (or kept in the shared store) are reached; a cron run in its
+    own process leaves the app's in-memory caches to their TTL.
+    """
+    for enterprise_id in sorted(enterprise_ids):
+        notify_enterprise_write(enterprise_id, table)
+
+
+class JobScheduler:
+    """Background thread calling run(conn) every `interval` seconds; subclasses set `name` and run()."""
+    name = 'job'
+
+    def __init__(self, connect, interval=300):
+        self.connect = connect
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run(self, conn):
+        raise NotImplementedError
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = self.connect()
+                self.run(conn)
+            except Exception as e:
+                log.error("%s run failed: %s", self.name, e)
+            finally:
+                if conn is not None:
+                    conn.close()
+            self._stop.wait(self.interval)
+
+
+def connector(sqlite_path=None):
+    """connect() for a job's CLI: the SQLite file when given, else MySQL from the DB_* settings."""
+    if sqlite_path:
+        from backend import sqlite_compat
+        return lambda: sqlite_compat.connect(sqlite_path)
+    from backend.db_pool import mysql_connect
+    return mysql_connect
+
+
+def serve(scheduler):
+    """Run a started scheduler in the foreground until Ctrl-C."""
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        scheduler.stop()
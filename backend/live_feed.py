@@ -0,0 +1,353 @@
+# ===== LIVE ACTIVITY / RISK FEED (SERVER-SENT EVENTS) =====
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import deque
+
+log = logging.getLogger('risk_sentinel.live_feed')
+
+CHANNEL = 'risk_sentinel:feed'
+
+
+class LocalPubSub:
+    """In-process stand-in for the pub/sub backend: publish() calls listeners synchronously."""
+
+    def __init__(self):
+        self._listeners = {}
+
+    def publish(self, channel, message):
+        listeners = list(self._listeners.get(channel, ()))
+        for listener in listeners:
+            listener(message)
+        return len(listeners)
+
+    def listen(self, channel, handler):
+        self._listeners.setdefault(channel, []).append(handler)
+
+    def after_fork(self):
+        pass
+
+
+class RedisPubSub:
+    """Redis PUBLISH/SUBSCRIBE backend so events written by one worker reach every worker's hub."""
+
+    def __init__(self, client):
+        self.client = client
+        self._subscriptions = []
+
+    def publish(self, channel, message):
+        return self.client.publish(channel, message)
+
+    def listen(self, channel, handler):
+        self._subscriptions.append((channel, handler))
+        self._subscribe(channel, handler)
+
+    def after_fork(self):
+        """Listener threads do not survive fork(); a pre-forked worker subscribes again."""
+        for channel, handler in self._subscriptions:
+            self._subscribe(channel, handler)
+
+    def _subscribe(self, channel, handler):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(channel)
+
+        def run():
+            for item in pubsub.listen():
+                try:
+                    handler(item['data'].decode() if isinstance(item['data'], bytes) else item['data'])
+                except Exception:
+                    log.exception("live feed handler failed")
+
+        threading.Thread(target=run, name='live-feed-pubsub', daemon=True).start()
+
+
+class Subscription:
+    """
+    One connected client. Events queue up to `max_queue`; when a client falls that far behind
+    its queue is replaced by a single `resync` event (reload the snapshot) instead of growing.
+    After `max_overflows` such resets the client is disconnected.
+    """
+    __slots__ = ('enterprise_id', 'queue', 'max_queue', 'max_overflows', 'overflows', 'dropped',
+                 'closed', '_cond')
+
+    def __init__(self, enterprise_id, max_queue, max_overflows):
+        self.enterprise_id = enterprise_id
+        self.queue = deque()
+        self.max_queue = max_queue
+        self.max_overflows = max_overflows
+        self.overflows = 0
+        self.dropped = 0
+        self.closed = False
+        self._cond = threading.Condition(threading.Lock())
+
+    def push(self, event):
+        """Returns False when the subscriber should be dropped (too slow, repeatedly)."""
+        with self._cond:
+            if self.closed:
+                return False
+            if len(self.queue) >= self.max_queue:
+                self.dropped += len(self.queue)
+                self.overflows += 1
+                self.queue.clear()
+                if self.overflows > self.max_overflows:
+                    self.closed = True
+                    self._cond.notify()
+                    return False
+                self.queue.append(RESYNC)
+            else:
+                self.queue.append(event)
+            self._cond.notify()
+            return True
+
+    def drain(self, timeout, linger=0.0):
+        """
+        Wait up to `timeout` seconds for events and return all that are queued. With `linger`,
+        sleep that long after the first event so a burst costs one wakeup and one write.
+        """
+        with self._cond:
+            if not self.queue and not self.closed:
+                self._cond.wait(timeout)
+            if not linger or not self.queue or self.closed:
+                return self._take()
+        time.sleep(linger)
+        with self._cond:
+            return self._take()
+
+    def _take(self):
+        events = list(self.queue)
+        self.queue.clear()
+        return events
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify()
+
+
+# sentinel telling the client to refetch the dashboard (it missed events)
+RESYNC = (0, 'resync', '{}')
+
+
+class FeedHub:
+    """
+    Single in-process fan-out point. publish() goes through the pub/sub backend so every
+    process (including this one) delivers the event to its own subscribers exactly once.
+    Each enterprise keeps a short replay ring so reconnecting clients can resume by Last-Event-ID.
+    Event ids are `<boot nonce>-<seq>`: every worker numbers its own events, so an id issued by
+    another worker (or before a restart) is never mistaken for one of ours and gets a resync.
+    """
+
+    def __init__(self, backend=None, max_queue=256, max_overflows=3, replay=100):
+        self.backend = backend or LocalPubSub()
+        self.max_queue = max_queue
+        self.max_overflows = max_overflows
+        self.replay = replay
+        self._lock = threading.Lock()
+        self._subs = {}      # enterprise_id -> set of Subscription
+        self._recent = {}    # enterprise_id -> deque of (seq, kind, data)
+        self._seq = 0
+        self.nonce = secrets.token_hex(4)
+        self.published = 0
+        self.delivered = 0
+        self.evicted = 0
+        self.backend.listen(CHANNEL, self._on_message)
+
+    # ---- producers ----
+    def publish(self, enterprise_id, kind, data):
+        """Broadcast `data` (JSON-serializable) to the enterprise's subscribers in every process."""
+        if enterprise_id is None:
+            return
+        message = json.dumps({'e': enterprise_id, 'k': kind, 'd': data}, default=str)
+        self.published += 1
+        self.backend.publish(CHANNEL, message)
+
+    def deliver_local(self, enterprise_id, kind, data):
+        """Deliver to this process's subscribers only (used by the per-process DB tailer)."""
+        self._deliver(enterprise_id, kind, json.dumps(data, default=str))
+
+    def _on_message(self, message):
+        msg = json.loads(message)
+        self._deliver(msg['e'], msg['k'], json.dumps(msg['d']))
+
+    def _deliver(self, enterprise_id, kind, payload):
+        with self._lock:
+            self._seq += 1
+            event = (self._seq, kind, payload)
+            ring = self._recent.get(enterprise_id)
+            if ring is None:
+                ring = self._recent[enterprise_id] = deque(maxlen=self.replay)
+            ring.append(event)
+            subs = list(self._subs.get(enterprise_id, ()))
+        slow = [sub for sub in subs if not sub.push(event)]
+        with self._lock:
+            self.delivered += len(subs) - len(slow)
+            self.evicted += len(slow)
+        for sub in slow:
+            self.unsubscribe(sub)
+
+    # ---- consumers ----
+    def subscribe(self, enterprise_id, last_event_id=None):
+        """`last_event_id` is the client's Last-Event-ID header as sent (a string), or None."""
+        sub = Subscription(enterprise_id, self.max_queue, self.max_overflows)
+        with self._lock:
+            self._subs.setdefault(enterprise_id, set()).add(sub)
+            if last_event_id is not None:
+                seq = self._own_seq(last_event_id)
+                ring = self._recent.get(enterprise_id, ())
+                if seq is None or (ring and ring[0][0] > seq + 1):
+                    sub.queue.append(RESYNC)  # not our id (other worker, restart), or older than the ring
+                if seq is not None:
+                    missed = [e for e in ring if e[0] > seq]
+                    sub.queue.extend(missed[-self.max_queue:])
+        return sub
+
+    def _own_seq(self, event_id):
+        """The seq of an id this hub issued, else None."""
+        nonce, _, seq = str(event_id).partition('-')
+        if nonce != self.nonce or not seq.isdigit() or int(seq) > self._seq:
+            return None
+        return int(seq)
+
+    def event_id(self, seq):
+        return f'{self.nonce}-{seq}'
+
+    def unsubscribe(self, sub):
+        sub.close()
+        with self._lock:
+            subs = self._subs.get(sub.enterprise_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subs[sub.enterprise_id]
+
+    def subscriber_count(self, enterprise_id=None):
+        with self._lock:
+            if enterprise_id is not None:
+                return len(self._subs.get(enterprise_id, ()))
+            return sum(len(s) for s in self._subs.values())
+
+    def stats(self):
+        return {'subscribers': self.subscriber_count(), 'published': self.published,
+                'delivered': self.delivered, 'evicted': self.evicted}
+
+
+def format_event(hub, event):
+    seq, kind, payload = event
+    return f'id: {hub.event_id(seq)}\nevent: {kind}\ndata: {payload}\n\n' if seq else f'event: {kind}\ndata: {payload}\n\n'
+
+
+def sse_stream(hub, sub, heartbeat=15.0, linger=0.05):
+    """Generator of SSE text for one subscription; comment heartbeats keep proxies from timing out."""
+    try:
+        yield 'retry: 3000\n\n'
+        while not sub.closed:
+            events = sub.drain(heartbeat, linger)
+            yield ''.join(format_event(hub, e) for e in events) if events else ': ping\n\n'
+    finally:
+        hub.unsubscribe(sub)
+
+
+# --------------------------
+# DB tailer
+# --------------------------
+TAIL_ACTIVITIES_SQL = """
+    SELECT a.id, p.enterprise_id, a.project_id, a.action, a.details, a.created_at, u.username
+    FROM activities a
+    JOIN projects p ON p.id = a.project_id
+    LEFT JOIN users u ON u.id = a.user_id
+    WHERE a.id > %s
+    ORDER BY a.id
+    LIMIT %s
+"""
+
+TAIL_RISKS_SQL = """
+    SELECT r.id, p.enterprise_id, r.project_id, r.title, r.severity, r.status, p.name AS project_name, r.created_at
+    FROM risks r
+    JOIN projects p ON p.id = r.project_id
+    WHERE r.id > %s
+    ORDER BY r.id
+    LIMIT %s
+"""
+
+
+class FeedTailer(threading.Thread):
+    """
+    Polls for new activities / risks by primary key so rows inserted by other processes
+    (imports, scanners, the PM app) reach the feed. Every process tails for its own
+    subscribers, hence deliver_local(); one indexed query per table per interval, none
+    while nobody is subscribed here.
+    """
+
+    def __init__(self, hub, connect, interval=2.0, batch=500):
+        super().__init__(name='live-feed-tailer', daemon=True)
+        self.hub = hub
+        self.connect = connect
+        self.interval = interval
+        self.batch = batch
+        self.watermarks = {}
+        self._stop_event = threading.Event()
+
+    def poll(self, conn):
+        cursor = conn.cursor(dictionary=True)
+        try:
+            for table, sql, kind in (('activities', TAIL_ACTIVITIES_SQL, 'activity'), ('risks', TAIL_RISKS_SQL, 'risk')):
+                if table not in self.watermarks:
+                    cursor.execute(f"SELECT COALESCE(MAX(id), 0) AS id FROM {table}")
+                    self.watermarks[table] = cursor.fetchone()['id']
+                    continue
+                cursor.execute(sql, (self.watermarks[table], self.batch))
+                rows = cursor.fetchall()
+                if len(rows) == self.batch:
+                    # bulk write (import, generator): tell the affected tenants to reload instead
+                    # of replaying thousands of rows, and skip to the end
+                    cursor.execute(f"SELECT COALESCE(MAX(id), 0) AS id FROM {table}")
+                    end = cursor.fetchone()['id']
+                    cursor.execute(f"""
+                        SELECT DISTINCT p.enterprise_id FROM {table} t JOIN projects p ON p.id = t.project_id
+                        WHERE t.id > %s AND t.id <= %s
+                    """, (self.watermarks[table], end))
+                    for row in cursor.fetchall():
+                        self.hub.deliver_local(row['enterprise_id'], 'resync', {})
+                    self.watermarks[table] = end
+                    continue
+                for row in rows:
+                    self.watermarks[table] = row['id']
+                    self.hub.deliver_local(row.pop('enterprise_id'), kind, row)
+        finally:
+            cursor.close()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            if not self.hub.subscriber_count():
+                self.watermarks.clear()  # resume from "now" when someone subscribes again
+                continue
+            conn = None
+            try:
+                conn = self.connect()
+                self.poll(conn)
+            except Exception:
+                log.exception("live feed tail failed")
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def hub_from_env():
+    """FEED_BACKEND=local (default) | redis (uses FEED_URL, falling back to CACHE_URL)."""
+    backend = None
+    if os.getenv('FEED_BACKEND', 'local').lower() == 'redis':
+        import redis  # optional dependency, only needed for cross-process fan-out
+        url = os.getenv('FEED_URL') or os.getenv('CACHE_URL', 'redis://localhost:6379/0')
+        backend = RedisPubSub(redis.Redis.from_url(url))
+    return FeedHub(
+        backend,
+        max_queue=int(os.getenv('FEED_MAX_QUEUE', '256')),
+        max_overflows=int(os.getenv('FEED_MAX_OVERFLOWS', '3')),
+        replay=int(os.getenv('FEED_REPLAY', '100'))
+    )
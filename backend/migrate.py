@@ -0,0 +1,196 @@
+"""
+Versioned schema migrations. Applied versions are recorded in schema_migrations,
+so each migration runs once per database.
+
+    python backend/migrate.py            # apply pending migrations
+    python backend/migrate.py --status   # list applied / pending
+"""
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.db_pool import mysql_connect
+
+ER_DUP_KEYNAME = 1061
+
+# (version, name, statements) - append only, never edit an applied entry
+MIGRATIONS = [
+    (1, 'user_management_indexes', [
+        "CREATE INDEX idx_users_enterprise_created ON users (enterprise_id, created_at, id)",
+        "CREATE INDEX idx_users_enterprise_username ON users (enterprise_id, username)",
+        "CREATE INDEX idx_users_enterprise_email ON users (enterprise_id, email)",
+    ]),
+    (2, 'job_watermarks_and_change_indexes', [
+        """CREATE TABLE IF NOT EXISTS job_watermarks (
+            job VARCHAR(50) PRIMARY KEY,
+            watermark DATETIME NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS job_runs (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            job VARCHAR(50) NOT NULL,
+            watermark_from DATETIME,
+            watermark_to DATETIME,
+            projects_touched INT DEFAULT 0,
+            duration_ms INT DEFAULT 0,
+            ran_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            INDEX idx_job_runs_job (job, ran_at)
+        )""",
+        "CREATE INDEX idx_risks_last_updated ON risks (last_updated)",
+        "CREATE INDEX idx_tasks_created ON tasks (created_at)",
+        "CREATE INDEX idx_tasks_completed ON tasks (completed_at)",
+        "CREATE INDEX idx_project_health_project ON project_health (project_id, calculated_at)",
+    ]),
+    (3, 'hot_query_indexes', [
+        "CREATE INDEX idx_risks_project_created ON risks (project_id, created_at)",
+        "CREATE INDEX idx_activities_project_created ON activities (project_id, created_at)",
+        "CREATE INDEX idx_projects_enterprise_status ON projects (enterprise_id, status)",
+        "CREATE INDEX idx_projects_enterprise_created ON projects (enterprise_id, created_at)",
+        "CREATE INDEX idx_tasks_project ON tasks (project_id)",
+        "CREATE INDEX idx_vendors_assigned_project ON vendors (assigned_project_id)",
+        "CREATE INDEX idx_budgets_project ON budgets (project_id)",
+        # functional index (MySQL 8.0.13+) so the login's LOWER(email) = %s lookup is an index probe
+        "CREATE INDEX idx_users_email_lower ON users ((LOWER(email)))",
+    ]),
+    (4, 'chat_indexes', [
+        # keyset history: WHERE room_id = ? AND message_id < ? ORDER BY message_id DESC
+        "CREATE INDEX idx_chat_messages_room ON chat_messages (room_id, message_id)",
+        "CREATE INDEX idx_chat_rooms_project ON chat_rooms (project_id)",
+    ]),
+    (5, 'risk_scanner', [
+        # one row per (rule, source row) ever raised; the scanner anti-joins on the primary key
+        """CREATE TABLE IF NOT EXISTS risk_findings (
+            rule_key VARCHAR(40) NOT NULL,
+            source_id INT NOT NULL,
+            enterprise_id INT NOT NULL,
+            risk_id INT NOT NULL,
+            found_at DATETIME NOT NULL,
+            PRIMARY KEY (rule_key, source_id)
+        )""",
+        "CREATE INDEX idx_risk_findings_enterprise ON risk_findings (enterprise_id, found_at)",
+        # incremental overdue scan: due dates reached since the last watermark
+        "CREATE INDEX idx_tasks_due ON tasks (due_date)",
+        "CREATE INDEX idx_milestones_project ON milestones (project_id)",
+    ]),
+    (6, 'risk_daily_rollups', [
+        # project_id 0 = enterprise-wide; analytics range reads are a primary key range
+        """CREATE TABLE IF NOT EXISTS risk_daily_rollups (
+            enterprise_id INT NOT NULL,
+            project_id INT NOT NULL,
+            dimension VARCHAR(16) NOT NULL,
+            value VARCHAR(32) NOT NULL,
+            day DATE NOT NULL,
+            risks INT NOT NULL DEFAULT 0,
+            open_risks INT NOT NULL DEFAULT 0,
+            high_risks INT NOT NULL DEFAULT 0,
+            score_sum DOUBLE NOT NULL DEFAULT 0,
+            finance_sum DOUBLE NOT NULL DEFAULT 0,
+            PRIMARY KEY (enterprise_id, project_id, dimension, day, value)
+        )""",
+        "CREATE INDEX idx_risk_rollups_project ON risk_daily_rollups (project_id, day)",
+        "CREATE INDEX idx_risk_rollups_enterprise_day ON risk_daily_rollups (enterprise_id, day)",
+    ]),
+    (7, 'vendor_scores', [
+        # enterprise_id is kept by the vendor scorer; updated_at flags delivery edits for incremental runs.
+        # risk_score becomes DOUBLE so a page cursor's score compares equal to the stored value
+        """ALTER TABLE vendors
+            MODIFY COLUMN risk_score DOUBLE DEFAULT 0,
+            ADD COLUMN enterprise_id INT NULL,
+            ADD COLUMN updated_at DATETIME NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP""",
+        "UPDATE vendors v JOIN projects p ON p.id = v.assigned_project_id SET v.enterprise_id = p.enterprise_id",
+        # riskiest-vendors pages: WHERE enterprise_id = ? ORDER BY risk_score DESC, id DESC
+        "CREATE INDEX idx_vendors_enterprise_score ON vendors (enterprise_id, risk_score, id)",
+        "CREATE INDEX idx_vendors_updated ON vendors (updated_at)",
+        "CREATE INDEX idx_vendors_delivery ON vendors (delivery_timeline)",
+        "CREATE INDEX idx_risks_vendor ON risks (vendor_id)",
+    ]),
+    (8, 'schedule_graph', [
+        # edges of the task / milestone graph: the successor starts lag_days after the predecessor finishes
+        """CREATE TABLE IF NOT EXISTS schedule_dependencies (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            project_id INT NOT NULL,
+            predecessor_type VARCHAR(9) NOT NULL,
+            predecessor_id INT NOT NULL,
+            successor_type VARCHAR(9) NOT NULL,
+            successor_id INT NOT NULL,
+            lag_days INT NOT NULL DEFAULT 0,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE KEY uq_schedule_dependency (successor_type, successor_id, predecessor_type, predecessor_id)
+        )""",
+        # updated_at flags edits for the incremental schedule runs; the projection columns are its output
+        """ALTER TABLE tasks
+            ADD COLUMN duration_days INT NULL,
+            ADD COLUMN updated_at DATETIME NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP""",
+        """ALTER TABLE milestones
+            ADD COLUMN updated_at DATETIME NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            ADD COLUMN projected_date DATE NULL,
+            ADD COLUMN slip_days INT NOT NULL DEFAULT 0,
+            ADD COLUMN driving_path TEXT NULL""",
+        "CREATE INDEX idx_schedule_deps_project ON schedule_dependencies (project_id)",
+        "CREATE INDEX idx_schedule_deps_created ON schedule_dependencies (created_at)",
+        "CREATE INDEX idx_tasks_updated ON tasks (updated_at)",
+        "CREATE INDEX idx_tasks_risk ON tasks (risk_id)",
+        "CREATE INDEX idx_milestones_updated ON milestones (updated_at)",
+        # PM dashboard: this PM's projects, then their milestones with slip_days > 0
+        "CREATE INDEX idx_projects_pm ON projects (pm_user_id)",
+        "CREATE INDEX idx_milestones_slip ON milestones (project_id, slip_days)",
+    ]),
+]
+
+
+def ensure_version_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def applied_versions(cursor):
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def migrate(conn, target=None, log=print):
+    """Apply pending migrations up to `target` (all when None). Returns versions applied."""
+    cursor = conn.cursor()
+    ensure_version_table(cursor)
+    done = applied_versions(cursor)
+    applied = []
+    for version, name, statements in MIGRATIONS:
+        if version in done or (target is not None and version > target):
+            continue
+        log(f"applying {version:04d}_{name}")
+        # MySQL DDL auto-commits, so a failure leaves the version unrecorded and it is retried next run
+        for statement in statements:
+            try:
+                cursor.execute(statement)
+            except Exception as e:
+                if getattr(e, 'errno', None) != ER_DUP_KEYNAME:
+                    raise
+                log(f"  index already present, skipping: {statement}")
+        cursor.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+        applied.append(version)
+    cursor.close()
+    return applied
+
+
+def main():
+    conn = mysql_connect()
+    try:
+        if '--status' in sys.argv:
+            cursor = conn.cursor()
+            ensure_version_table(cursor)
+            done = applied_versions(cursor)
+            for version, name, _ in MIGRATIONS:
+                print(f"{'applied' if version in done else 'pending'}  {version:04d}_{name}")
+            return
+        applied = migrate(conn)
+        print(f"✅ {len(applied)} migration(s) applied" if applied else "✅ schema up to date")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+# ===== BUDGET-CONSTRAINED MITIGATION PLANNER =====
+import hashlib
+import os
+from collections import defaultdict
+from dataclasses import dataclass
+
+import numpy as np
+
+from backend import compute_pool
+from backend.cache import MemoryBackend, TTLCache
+
+planner_cache = TTLCache(MemoryBackend(int(os.getenv('MITIGATION_CACHE_SIZE', '1024'))),
+                         ttl=int(os.getenv('MITIGATION_CACHE_TTL', '3600')), namespace='mitigation')
+
+
+@dataclass
+class PlannerConfig:
+    """
+    For an open risk with remaining = 1 - max(progress, mitigation_progress) / 100:
+        cost  = remaining * max(cost_ratio * finance_impact, min_cost)
+        value = remaining * (probability * finance_impact + score_value * risk_score)
+    The plan maximises total value with total cost <= the project's remaining budget.
+    """
+    cost_ratio: float = 0.25
+    min_cost: float = 1000.0
+    score_value: float = 10000.0
+    swap_rounds: float = 25.0
+    swap_candidates: float = 64.0
+
+    @classmethod
+    def from_env(cls, **overrides):
+        values = {}
+        for name in cls.__dataclass_fields__:
+            env = os.getenv('MITIGATION_' + name.upper())
+            if env is not None:
+                values[name] = float(env)
+        values.update({k: float(v) for k, v in overrides.items() if k in cls.__dataclass_fields__})
+        return cls(**values)
+
+    def key(self):
+        return ','.join(f'{getattr(self, name):g}' for name in self.__dataclass_fields__)
+
+
+def load_candidates(conn, enterprise_id, project_id=None):
+    """
+    Remaining budget and open risks per project:
+    {project_id: {'budget': float, 'risks': [(id, title, finance, score, probability, impact, done_pct), ...]}}
+    """
+    cursor = conn.cursor()
+    scope = "p.enterprise_id = %s" + (" AND p.id = %s" if project_id is not None else "")
+    params = (enterprise_id,) + ((project_id,) if project_id is not None else ())
+    cursor.execute(f"""
+        SELECT p.id, COALESCE(p.budget_total, 0) - COALESCE(p.budget_spent, 0)
+        FROM projects p WHERE {scope}
+    """, params)
+    portfolio = {pid: {'budget': max(float(left or 0), 0.0), 'risks': []} for pid, left in cursor.fetchall()}
+    cursor.execute(f"""
+        SELECT r.project_id, r.id, r.title, r.finance_impact, r.risk_score, r.probability, r.impact_score,
+               r.progress, r.mitigation_progress
+        FROM risks r JOIN projects p ON r.project_id = p.id
+        WHERE {scope} AND r.status IN ('Identified', 'Open', 'InProgress')
+        ORDER BY r.project_id, r.id
+    """, params)
+    for pid, rid, title, finance, score, prob, impact, progress, mitigated in cursor.fetchall():
+        portfolio[pid]['risks'].append((rid, title, finance or 0.0, score, prob or 0.0, impact or 0,
+                                        max(progress or 0, mitigated or 0)))
+    cursor.close()
+    return portfolio
+
+
+def candidate_version(risks, config):
+    """
+    Content hash of the numeric candidate fields and the cost/value config; neither the
+    budget nor the titles are part of it, so renames and budget edits keep the frontier.
+    """
+    fields = np.array([(r[0], r[2], -1.0 if r[3] is None else r[3], r[4], r[5], r[6]) for r in risks],
+                      dtype=np.float64)
+    h = hashlib.sha1(fields.tobytes())
+    h.update(config.key().encode())
+    return h.hexdigest()[:16]
+
+
+def frontier(risks, config):
+    """
+    Budget-independent part of the plan: per-candidate cost and value, the candidates in
+    descending value/cost order and the running cost along that order.
+    """
+    n = len(risks)
+    finance = np.fromiter((r[2] for r in risks), dtype=np.float64, count=n)
+    prob = np.fromiter((r[4] for r in risks), dtype=np.float64, count=n)
+    prob = np.clip(np.where(prob > 1.0, prob / 100.0, prob), 0.0, 1.0)
+    impact = np.fromiter((r[5] for r in risks), dtype=np.float64, count=n)
+    # unscored risks fall back to the exposure term of the scoring rule
+    score = np.fromiter((prob[i] * impact[i] if r[3] is None else r[3] for i, r in enumerate(risks)),
+                        dtype=np.float64, count=n)
+    remaining = 1.0 - np.clip(np.fromiter((r[6] for r in risks), dtype=np.float64, count=n), 0.0, 100.0) / 100.0
+    cost = remaining * np.maximum(config.cost_ratio * finance, config.min_cost)
+    value = remaining * (prob * finance + config.score_value * score)
+    ratio = np.divide(value, cost, out=np.zeros(n), where=cost > 0)
+    order = np.lexsort((np.arange(n), -ratio))
+    return {'cost': cost, 'value': value, 'order': order, 'prefix': np.cumsum(cost[order])}
+
+
+def _fill(chosen, cost, order, left):
+    """Add any unchosen candidate that still fits, best value/cost first."""
+    for i in order[(cost[order] <= left) & ~chosen[order]]:
+        if cost[i] <= left:
+            chosen[i] = True
+            left -= cost[i]
+    return left
+
+
+def solve(front, budget, config):
+    """
+    Greedy by value/cost, then local search: best single affordable candidate as a floor
+    (covers the greedy's worst case) and improving 1-for-1 swaps. Returns a boolean mask.
+    """
+    cost, value, order, prefix = front['cost'], front['value'], front['order'], front['prefix']
+    n = len(cost)
+    chosen = np.zeros(n, dtype=bool)
+    if n == 0 or budget <= 0:
+        return chosen
+    k = int(np.searchsorted(prefix, budget, side='right'))
+    chosen[order[:k]] = True
+    left = _fill(chosen, cost, order[k:], budget - (prefix[k - 1] if k else 0.0))
+
+    affordable = cost <= budget
+    if affordable.any():
+        best = int(np.argmax(np.where(affordable, value, -1.0)))
+        if value[best] > value[chosen].sum():
+            chosen[:] = False
+            chosen[best] = True
+            left = _fill(chosen, cost, order, budget - cost[best])
+
+    for _ in range(int(config.swap_rounds)):
+        outside = np.flatnonzero(~chosen)
+        inside = np.flatnonzero(chosen)
+        if not len(outside) or not len(inside):
+            break
+        top = outside[np.argsort(-value[outside], kind='stable')[:int(config.swap_candidates)]]
+        gain = value[top][:, None] - value[inside][None, :]
+        gain[(cost[top][:, None] - cost[inside][None, :]) > left] = 0.0
+        a, b = np.unravel_index(int(np.argmax(gain)), gain.shape)
+        if gain[a, b] <= 1e-9:
+            break
+        chosen[top[a]] = True
+        chosen[inside[b]] = False
+        left = _fill(chosen, cost, order, left + cost[inside[b]] - cost[top[a]])
+    return chosen
+
+
+def summarize(risks, front, chosen, budget):
+    cost, value = front['cost'], front['value']
+    total_value = float(value.sum())
+    picked = np.flatnonzero(chosen)
+    picked = picked[np.argsort(-value[picked], kind='stable')]
+    costs, values = np.round(cost[picked], 2).tolist(), np.round(value[picked], 2).tolist()
+    return {
+        'budget': round(budget, 2),
+        'spend': round(float(cost[chosen].sum()), 2),
+        'value': round(float(value[chosen].sum()), 2),
+        'coverage': round(float(value[chosen].sum()) / total_value, 4) if total_value else 0.0,
+        'candidates': len(risks),
+        'selected': [{'risk_id': risks[i][0], 'title': risks[i][1], 'cost': c, 'value': v}
+                     for i, c, v in zip(picked.tolist(), costs, values)],
+    }
+
+
+def _frontier_for(project_id, risks, config):
+    key = f'frontier:{project_id}:{candidate_version(risks, config)}'
+    front = planner_cache.get(key)
+    if front is None:
+        front = frontier(risks, config)
+        planner_cache.set(key, front)
+    return front
+
+
+def plan_project(inputs, project_id, budget=None, config=None):
+    """
+    Plan one project. The frontier is cached per candidate set, so re-planning the same
+    risks under another budget skips straight to the (linear) solve.
+    """
+    config = config or PlannerConfig.from_env()
+    budget = inputs['budget'] if budget is None else max(float(budget), 0.0)
+    front = _frontier_for(project_id, inputs['risks'], config)
+    return summarize(inputs['risks'], front, solve(front, budget, config), budget)
+
+
+def _plan_chunk(chunk, config, budget_scale):
+    """Worker: plan a group of projects; returns plans and the frontiers built on the way."""
+    plans, fronts = {}, {}
+    for project_id, inputs in chunk:
+        front = frontier(inputs['risks'], config)
+        budget = inputs['budget'] * budget_scale
+        plans[project_id] = summarize(inputs['risks'], front, solve(front, budget, config), budget)
+        fronts[project_id] = front
+    return plans, fronts
+
+
+def _chunks(items, parts):
+    """Split projects into `parts` groups of similar candidate counts (largest first, greedy)."""
+    groups = [[] for _ in range(parts)]
+    loads = [0] * parts
+    for item in sorted(items, key=lambda it: -len(it[1]['risks'])):
+        i = loads.index(min(loads))
+        groups[i].append(item)
+        loads[i] += len(item[1]['risks']) or 1
+    return [g for g in groups if g]
+
+
+def plan_enterprise(portfolio, budget_scale=1.0, config=None, workers=None, parallel_threshold=5000):
+    """
+    Plan every project in `portfolio` with its remaining budget times `budget_scale`.
+    Projects whose frontier is cached are solved in-process; the rest are built and solved
+    in the shared process pool when there are more than `parallel_threshold` uncached candidates.
+    """
+    config = config or PlannerConfig.from_env()
+    plans, todo = {}, []
+    for project_id, inputs in portfolio.items():
+        key = f'frontier:{project_id}:{candidate_version(inputs["risks"], config)}'
+        front = planner_cache.get(key)
+        if front is None:
+            todo.append((project_id, inputs))
+            continue
+        budget = inputs['budget'] * budget_scale
+        plans[project_id] = summarize(inputs['risks'], front, solve(front, budget, config), budget)
+
+    pending = sum(len(inputs['risks']) for _, inputs in todo)
+    workers = workers or int(os.getenv('MITIGATION_WORKERS', str(compute_pool.size())))
+    if workers > 1 and pending > parallel_threshold and len(todo) > 1:
+        chunks = _chunks(todo, min(workers, len(todo)))
+        parts = compute_pool.run(_plan_chunk, chunks, [config] * len(chunks), [budget_scale] * len(chunks))
+    else:
+        parts = [_plan_chunk(todo, config, budget_scale)] if todo else []
+    for part_plans, fronts in parts:
+        plans.update(part_plans)
+        for project_id, front in fronts.items():
+            version = candidate_version(portfolio[project_id]['risks'], config)
+            planner_cache.set(f'frontier:{project_id}:{version}', front)
+
+    totals = defaultdict(float)
+    for plan in plans.values():
+        for field in ('budget', 'spend', 'value'):
+            totals[field] += plan[field]
+        totals['selected'] += len(plan['selected'])
+        totals['candidates'] += plan['candidates']
+    return {
+        'budget_scale': budget_scale,
+        'projects': {str(pid): plans[pid] for pid in sorted(plans)},
+        'portfolio': {k: round(v, 2) if k in ('budget', 'spend', 'value') else int(v) for k, v in totals.items()},
+    }
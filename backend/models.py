@@ -21,6 +21,14 @@ class User(db.Model, UserMixin):
     activity_log = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # keyset pagination + prefix search on the admin user list (migration 0001);
+    # migration 0003 also adds the functional idx_users_email_lower on LOWER(email) for login
+    __table_args__ = (
+        db.Index('idx_users_enterprise_created', 'enterprise_id', 'created_at', 'id'),
+        db.Index('idx_users_enterprise_username', 'enterprise_id', 'username'),
+        db.Index('idx_users_enterprise_email', 'enterprise_id', 'email'),
+    )
+
 # ========== VENDORS (MATCH YOUR REAL DB) ==========
 class Vendor(db.Model):
     __tablename__ = 'vendors'
@@ -34,9 +42,18 @@ class Vendor(db.Model):
     delivery_timeline = db.Column(db.Date)
     quality_status = db.Column(db.String(50))
     completion_percent = db.Column(db.Integer)
-    risk_score = db.Column(db.Float, default=0.00)
+    risk_score = db.Column(db.Float(precision=53), default=0.00)  # DOUBLE: keyset cursors compare on it
     status = db.Column(db.String(20), default='Active')  # ← CHANGED from Enum
     created_at = db.Column(db.DateTime)
+    enterprise_id = db.Column(db.Integer)  # set by backend/vendor_scoring.py
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('idx_vendors_assigned_project', 'assigned_project_id'),
+        db.Index('idx_vendors_enterprise_score', 'enterprise_id', 'risk_score', 'id'),
+        db.Index('idx_vendors_updated', 'updated_at'),
+        db.Index('idx_vendors_delivery', 'delivery_timeline'),
+    )
 
 # ========== ENTERPRISES ==========
 class Enterprise(db.Model):
@@ -65,6 +82,12 @@ class Project(db.Model):
     end_date = db.Column(db.Date)
     stakeholder_list = db.Column(db.Text)
 
+    __table_args__ = (
+        db.Index('idx_projects_enterprise_status', 'enterprise_id', 'status'),
+        db.Index('idx_projects_enterprise_created', 'enterprise_id', 'created_at'),
+        db.Index('idx_projects_pm', 'pm_user_id'),
+    )
+
 # ========== ALL OTHER MODELS (unchanged) ==========
 class ProjectHealth(db.Model):
     __tablename__ = 'project_health'
@@ -73,6 +96,10 @@ class ProjectHealth(db.Model):
     health_score = db.Column(db.Enum('Red','Yellow','Green'))
     calculated_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('idx_project_health_project', 'project_id', 'calculated_at'),
+    )
+
 class RiskType(db.Model):
     __tablename__ = 'risk_types'
     type_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
@@ -109,6 +136,12 @@ class Risk(db.Model):
     comments = db.Column(db.Text)
     milestone_delay_days = db.Column(db.Integer, default=0)
 
+    __table_args__ = (
+        db.Index('idx_risks_project_created', 'project_id', 'created_at'),
+        db.Index('idx_risks_last_updated', 'last_updated'),
+        db.Index('idx_risks_vendor', 'vendor_id'),
+    )
+
 class Task(db.Model):
     __tablename__ = 'tasks'
     task_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
@@ -123,6 +156,17 @@ class Task(db.Model):
     completed_at = db.Column(db.DateTime)
     created_by = db.Column(db.Integer, db.ForeignKey('users.user_id'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    duration_days = db.Column(db.Integer)  # NULL: due_date - created_at
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('idx_tasks_project', 'project_id'),
+        db.Index('idx_tasks_created', 'created_at'),
+        db.Index('idx_tasks_completed', 'completed_at'),
+        db.Index('idx_tasks_due', 'due_date'),
+        db.Index('idx_tasks_updated', 'updated_at'),
+        db.Index('idx_tasks_risk', 'risk_id'),
+    )
 
 class Milestone(db.Model):
     __tablename__ = 'milestones'
@@ -132,6 +176,36 @@ class Milestone(db.Model):
     target_date = db.Column(db.Date)
     status = db.Column(db.Enum('Pending','InProgress','Completed','Delayed'), default='Pending')
     completed_date = db.Column(db.Date)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # written by backend/schedule_graph.py
+    projected_date = db.Column(db.Date)
+    slip_days = db.Column(db.Integer, nullable=False, default=0)
+    driving_path = db.Column(db.Text)  # JSON [[type, id, projected date], ...], root cause first
+
+    __table_args__ = (
+        db.Index('idx_milestones_project', 'project_id'),
+        db.Index('idx_milestones_updated', 'updated_at'),
+        db.Index('idx_milestones_slip', 'project_id', 'slip_days'),
+    )
+
+class ScheduleDependency(db.Model):
+    """successor (task or milestone) starts lag_days after predecessor finishes; same project only."""
+    __tablename__ = 'schedule_dependencies'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.project_id'), nullable=False)
+    predecessor_type = db.Column(db.String(9), nullable=False)  # 'task' | 'milestone'
+    predecessor_id = db.Column(db.Integer, nullable=False)
+    successor_type = db.Column(db.String(9), nullable=False)
+    successor_id = db.Column(db.Integer, nullable=False)
+    lag_days = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('successor_type', 'successor_id', 'predecessor_type', 'predecessor_id',
+                            name='uq_schedule_dependency'),
+        db.Index('idx_schedule_deps_project', 'project_id'),
+        db.Index('idx_schedule_deps_created', 'created_at'),
+    )
 
 class ChatRoom(db.Model):
     __tablename__ = 'chat_rooms'
@@ -140,6 +214,10 @@ class ChatRoom(db.Model):
     name = db.Column(db.String(100))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('idx_chat_rooms_project', 'project_id'),
+    )
+
 class ChatMessage(db.Model):
     __tablename__ = 'chat_messages'
     message_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
@@ -147,3 +225,8 @@ class ChatMessage(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'))
     message = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # keyset history pages (migration 0004)
+    __table_args__ = (
+        db.Index('idx_chat_messages_room', 'room_id', 'message_id'),
+    )
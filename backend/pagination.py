@@ -0,0 +1,53 @@
+# ===== KEYSET PAGINATION HELPERS =====
+import base64
+from datetime import datetime
+
+
+def encode_cursor(*values):
+    """Opaque, URL-safe cursor for a row's sort key (datetimes, floats and ints)."""
+    parts = []
+    for v in values:
+        if isinstance(v, datetime):
+            parts.append('d' + v.isoformat())
+        elif isinstance(v, float):
+            parts.append('f' + repr(v))  # exact round trip, so keyset equality still matches
+        else:
+            parts.append('i' + str(int(v)))
+    return base64.urlsafe_b64encode('|'.join(parts).encode()).decode().rstrip('=')
+
+
+def decode_cursor(token, shape=None):
+    """
+    Inverse of encode_cursor; returns None for missing or malformed tokens. `shape` lists the
+    kinds the caller's sort key has ('d' datetime, 'f' float, 'i' int; e.g. 'di' for
+    (created_at, id)): a token with a different number or kind of values is malformed too.
+    """
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        parts = raw.split('|')
+        if shape is not None and ''.join(part[:1] for part in parts) != shape:
+            return None
+        values = []
+        for part in parts:
+            kind, text = part[0], part[1:]
+            if kind == 'd':
+                values.append(datetime.fromisoformat(text))
+            else:
+                values.append(float(text) if kind == 'f' else int(text))
+        return tuple(values)
+    except Exception:
+        return None
+
+
+def clamp_page_size(value, default=25, maximum=100):
+    try:
+        return max(1, min(int(value), maximum))
+    except (TypeError, ValueError):
+        return default
+
+
+def like_prefix(term):
+    """Escape LIKE wildcards so user input only ever matches as a prefix."""
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
@@ -0,0 +1,234 @@
+# ===== REQUEST PROFILING + PROMETHEUS METRICS =====
+import logging
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+
+from flask import g, request, has_request_context, before_render_template, template_rendered
+
+slow_log = logging.getLogger('risk_sentinel.slow_query')
+
+# request latency buckets in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_LITERALS = re.compile(r"'(?:[^'\\]|\\.)*'|\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r'\s+')
+_IN_LISTS = re.compile(r'\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))+\s*\)')
+
+
+def normalize_sql(sql):
+    """Collapse whitespace, replace literals with ? and IN lists with (...) so similar queries group."""
+    text = _SPACES.sub(' ', sql).strip()
+    text = _LITERALS.sub('?', text)
+    return _IN_LISTS.sub('(...)', text)
+
+
+class RequestStats:
+    __slots__ = ('started', 'db_time', 'queries', 'rows', 'render_time', '_render_started')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_time = 0.0
+        self.queries = 0
+        self.rows = 0
+        self.render_time = 0.0
+        self._render_started = None
+
+
+class ProfiledCursor:
+    """Times execute() and counts fetched rows into the current request's stats."""
+
+    def __init__(self, cursor, stats, profiler):
+        self._cursor = cursor
+        self._stats = stats
+        self._profiler = profiler
+
+    def _timed(self, method, sql, *args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return method(sql, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - t0
+            self._stats.db_time += elapsed
+            self._stats.queries += 1
+            if elapsed * 1000 >= self._profiler.slow_query_ms:
+                self._profiler.record_slow_query(sql, elapsed)
+
+    def execute(self, sql, *args, **kwargs):
+        return self._timed(self._cursor.execute, sql, *args, **kwargs)
+
+    def executemany(self, sql, *args, **kwargs):
+        return self._timed(self._cursor.executemany, sql, *args, **kwargs)
+
+    def _count(self, t0, rows):
+        self._stats.db_time += time.perf_counter() - t0
+        self._stats.rows += len(rows) if isinstance(rows, list) else (rows is not None)
+        return rows
+
+    def fetchone(self):
+        t0 = time.perf_counter()
+        return self._count(t0, self._cursor.fetchone())
+
+    def fetchmany(self, *args, **kwargs):
+        t0 = time.perf_counter()
+        return self._count(t0, self._cursor.fetchmany(*args, **kwargs))
+
+    def fetchall(self):
+        t0 = time.perf_counter()
+        return self._count(t0, self._cursor.fetchall())
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class ProfiledConnection:
+    """Connection proxy whose cursor() calls are profiled too (engines open their own cursors)."""
+
+    def __init__(self, conn, stats, profiler):
+        self._conn = conn
+        self._stats = stats
+        self._profiler = profiler
+
+    def cursor(self, *args, **kwargs):
+        return ProfiledCursor(self._conn.cursor(*args, **kwargs), self._stats, self._profiler)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class Profiler:
+    """
+    Per-route wall / DB / render time, query and row counts, exported as Prometheus text.
+    sample_rate 0 turns instrumentation off (requests are still counted); 1 profiles everything.
+    """
+
+    def __init__(self, app=None, sample_rate=1.0, slow_query_ms=200.0, slow_query_limit=100):
+        self.sample_rate = sample_rate
+        self.slow_query_ms = slow_query_ms
+        self.slow_query_limit = slow_query_limit
+        self._lock = threading.Lock()
+        self.requests = defaultdict(int)          # (route, method, status) -> count
+        self.sampled = defaultdict(int)           # route -> sampled requests
+        self.histogram = defaultdict(lambda: [0] * (len(BUCKETS) + 1))
+        self.sums = defaultdict(lambda: defaultdict(float))  # route -> metric -> total
+        self.slow_queries = defaultdict(lambda: [0, 0.0])    # normalized sql -> [count, seconds]
+        self.extra_collectors = []
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.before_request(self._before)
+        app.after_request(self._after)
+        before_render_template.connect(self._render_start, app)
+        template_rendered.connect(self._render_end, app)
+
+    # ---- request hooks ----
+    def _before(self):
+        if self.sample_rate > 0 and (self.sample_rate >= 1 or random.random() < self.sample_rate):
+            g.profile = RequestStats()
+
+    def _render_start(self, sender, **extra):
+        stats = g.get('profile')
+        if stats is not None:
+            stats._render_started = time.perf_counter()
+
+    def _render_end(self, sender, **extra):
+        stats = g.get('profile')
+        if stats is not None and stats._render_started is not None:
+            stats.render_time += time.perf_counter() - stats._render_started
+            stats._render_started = None
+
+    def _after(self, response):
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        stats = g.pop('profile', None)
+        with self._lock:
+            self.requests[(route, request.method, response.status_code)] += 1
+            if stats is not None:
+                wall = time.perf_counter() - stats.started
+                self.sampled[route] += 1
+                hist = self.histogram[route]
+                for i, bound in enumerate(BUCKETS):
+                    if wall <= bound:
+                        hist[i] += 1
+                        break
+                else:
+                    hist[-1] += 1
+                sums = self.sums[route]
+                sums['wall'] += wall
+                sums['db'] += stats.db_time
+                sums['render'] += stats.render_time
+                sums['queries'] += stats.queries
+                sums['rows'] += stats.rows
+        return response
+
+    # ---- cursor instrumentation ----
+    def wrap(self, cursor, conn):
+        """Wrap a (cursor, conn) pair for the current request when it is being sampled."""
+        stats = g.get('profile') if cursor is not None and has_request_context() else None
+        if stats is None:
+            return cursor, conn
+        return ProfiledCursor(cursor, stats, self), ProfiledConnection(conn, stats, self)
+
+    def record_slow_query(self, sql, elapsed):
+        text = normalize_sql(sql)
+        with self._lock:
+            entry = self.slow_queries.get(text)
+            if entry is None and len(self.slow_queries) >= self.slow_query_limit:
+                entry = [0, 0.0]  # table full: still log, stop tracking new shapes
+            else:
+                entry = self.slow_queries[text]
+            entry[0] += 1
+            entry[1] += elapsed
+        route = request.url_rule.rule if has_request_context() and request.url_rule else '-'
+        slow_log.warning("slow query %.1fms route=%s sql=%s", elapsed * 1000, route, text)
+
+    # ---- exposition ----
+    def prometheus(self):
+        lines = []
+
+        def metric(name, kind, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        def esc(value):
+            return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+        with self._lock:
+            metric('rs_http_requests_total', 'counter', 'HTTP requests by route, method and status.')
+            for (route, method, status), n in sorted(self.requests.items()):
+                lines.append(f'rs_http_requests_total{{route="{esc(route)}",method="{method}",status="{status}"}} {n}')
+
+            metric('rs_request_seconds', 'histogram', 'Wall time of sampled requests.')
+            for route, hist in sorted(self.histogram.items()):
+                cumulative = 0
+                for bound, n in zip(BUCKETS + ('+Inf',), hist):
+                    cumulative += n
+                    lines.append(f'rs_request_seconds_bucket{{route="{esc(route)}",le="{bound}"}} {cumulative}')
+                lines.append(f'rs_request_seconds_sum{{route="{esc(route)}"}} {self.sums[route]["wall"]:.6f}')
+                lines.append(f'rs_request_seconds_count{{route="{esc(route)}"}} {self.sampled[route]}')
+
+            for key, name, help_text in (
+                ('db', 'rs_request_db_seconds_total', 'Time spent in DB calls by sampled requests.'),
+                ('render', 'rs_request_render_seconds_total', 'Template render time of sampled requests.'),
+                ('queries', 'rs_request_queries_total', 'Queries issued by sampled requests.'),
+                ('rows', 'rs_request_rows_fetched_total', 'Rows fetched by sampled requests.'),
+            ):
+                metric(name, 'counter', help_text)
+                for route, sums in sorted(self.sums.items()):
+                    value = sums[key]
+                    lines.append(f'{name}{{route="{esc(route)}"}} {value:.6f}' if key in ('db', 'render')
+                                 else f'{name}{{route="{esc(route)}"}} {int(value)}')
+
+            metric('rs_slow_queries_total', 'counter', 'Queries slower than the slow-query threshold.')
+            for text, (n, _) in sorted(self.slow_queries.items()):
+                lines.append(f'rs_slow_queries_total{{sql="{esc(text[:200])}"}} {n}')
+
+        for collect in self.extra_collectors:
+            for name, kind, help_text, samples in collect():
+                metric(name, kind, help_text)
+                for labels, value in samples:
+                    label_text = ','.join(f'{k}="{esc(v)}"' for k, v in labels.items())
+                    lines.append(f'{name}{{{label_text}}} {value}' if label_text else f'{name} {value}')
+        return '\n'.join(lines) + '\n'
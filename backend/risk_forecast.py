@@ -0,0 +1,214 @@
+# ===== MONTE CARLO RISK FORECAST =====
+import hashlib
+import os
+from collections import defaultdict
+from datetime import timedelta
+
+import numpy as np
+
+from backend import compute_pool
+from backend.cache import MemoryBackend, TTLCache
+
+PERCENTILES = (50, 80, 95)
+# trials x risks simulated per slab; bounds memory at ~8MB of float32 per array
+SLAB_CELLS = 2_000_000
+
+forecast_cache = TTLCache(MemoryBackend(int(os.getenv('FORECAST_CACHE_SIZE', '256'))),
+                          ttl=int(os.getenv('FORECAST_CACHE_TTL', '3600')), namespace='forecast')
+# per-trial cost / slip of a project (float32, 8 bytes x trials per entry): what the portfolio
+# totals are built from, so an unchanged project is not simulated again
+trial_cache = TTLCache(MemoryBackend(int(os.getenv('FORECAST_TRIAL_CACHE_SIZE', '64'))),
+                       ttl=int(os.getenv('FORECAST_CACHE_TTL', '3600')), namespace='forecast_trials')
+
+
+def load_portfolio(conn, enterprise_id, project_id=None):
+    """
+    Open risks and pending milestones grouped by project:
+    {project_id: {'risks': [(p, cost, delay), ...], 'milestones': [(id, title, target_date), ...]}}
+    """
+    cursor = conn.cursor()
+    scope = "p.enterprise_id = %s" + (" AND p.id = %s" if project_id is not None else "")
+    params = (enterprise_id,) + ((project_id,) if project_id is not None else ())
+    cursor.execute(f"""
+        SELECT r.project_id, r.probability, r.finance_impact, r.milestone_delay_days
+        FROM risks r JOIN projects p ON r.project_id = p.id
+        WHERE {scope} AND r.status IN ('Identified', 'Open', 'InProgress')
+        ORDER BY r.project_id, r.id
+    """, params)
+    portfolio = defaultdict(lambda: {'risks': [], 'milestones': []})
+    for pid, prob, cost, delay in cursor.fetchall():
+        portfolio[pid]['risks'].append((prob or 0.0, cost or 0.0, delay or 0))
+    cursor.execute(f"""
+        SELECT m.project_id, m.id, m.title, m.target_date
+        FROM milestones m JOIN projects p ON m.project_id = p.id
+        WHERE {scope} AND m.status <> 'Completed' AND m.target_date IS NOT NULL
+        ORDER BY m.project_id, m.target_date
+    """, params)
+    for pid, mid, title, target in cursor.fetchall():
+        portfolio[pid]['milestones'].append((mid, title, target))
+    cursor.close()
+    return dict(portfolio)
+
+
+def risk_set_version(inputs):
+    """Content hash of a project's open risks and milestones; changes whenever either does."""
+    h = hashlib.sha1()
+    h.update(repr(inputs['risks']).encode())
+    h.update(repr(inputs['milestones']).encode())
+    return h.hexdigest()[:16]
+
+
+def simulate_project(project_id, risks, trials, seed):
+    """
+    Per-trial cost exposure and schedule slip (days) for one project.
+    Each risk fires with its probability; a fired risk's impact is scaled by a
+    triangular(0.5, 1, 1.5) factor. The RNG stream depends only on (seed, project_id).
+    """
+    cost = np.zeros(trials)
+    slip = np.zeros(trials)
+    if not risks:
+        return cost, slip
+    arr = np.asarray(risks, dtype=np.float64)
+    p = arr[:, 0]
+    p = np.clip(np.where(p > 1.0, p / 100.0, p), 0.0, 1.0).astype(np.float32)
+    impacts = arr[:, 1:3].astype(np.float32)
+    safe_p = np.maximum(p, np.float32(1e-12))
+
+    rng = np.random.default_rng(np.random.SeedSequence([seed, int(project_id)]))
+    step = max(1, SLAB_CELLS // len(p))
+    for start in range(0, trials, step):
+        n = min(step, trials - start)
+        u = rng.random((n, len(p)), dtype=np.float32)
+        fired = u < p
+        # given the risk fired, u / p is itself uniform, so one draw gives both event and severity
+        v = u / safe_p
+        factor = np.where(v < 0.5, 0.5 + np.sqrt(v * 0.5), 1.5 - np.sqrt(np.maximum(1.0 - v, 0.0) * 0.5))
+        factor *= fired
+        out = factor @ impacts
+        cost[start:start + n] = out[:, 0]
+        slip[start:start + n] = out[:, 1]
+    return cost, slip
+
+
+def summarize(cost, slip, milestones):
+    cost_pct = np.percentile(cost, PERCENTILES)
+    slip_pct = np.percentile(slip, PERCENTILES)
+    return {
+        'cost': {f'p{q}': round(float(v), 2) for q, v in zip(PERCENTILES, cost_pct)},
+        'slip_days': {f'p{q}': round(float(v), 1) for q, v in zip(PERCENTILES, slip_pct)},
+        'prob_slip': round(float((slip > 0).mean()), 4),
+        'milestones': [
+            {'id': mid, 'title': title, 'target_date': target.isoformat(),
+             **{f'p{q}': (target + timedelta(days=int(np.ceil(v)))).isoformat() for q, v in zip(PERCENTILES, slip_pct)}}
+            for mid, title, target in milestones
+        ],
+    }
+
+
+def project_key(project_id, version, trials, seed):
+    return f'{project_id}:{version}:{trials}:{seed}'
+
+
+def _run_chunk(chunk, trials, seed):
+    """
+    Worker: simulate a group of projects. Returns {project_id: (summary, cost, slip)} with
+    float32 per-trial arrays (exact: the simulation computes in float32), None without risks.
+    """
+    results = {}
+    for project_id, inputs in chunk:
+        cost, slip = simulate_project(project_id, inputs['risks'], trials, seed)
+        summary = summarize(cost, slip, inputs['milestones'])
+        if inputs['risks']:
+            results[project_id] = (summary, cost.astype(np.float32), slip.astype(np.float32))
+        else:
+            results[project_id] = (summary, None, None)
+    return results
+
+
+def _chunks(items, parts):
+    """Split projects into `parts` groups of similar risk counts (largest first, greedy)."""
+    groups = [[] for _ in range(parts)]
+    loads = [0] * parts
+    for item in sorted(items, key=lambda it: -len(it[1]['risks'])):
+        i = loads.index(min(loads))
+        groups[i].append(item)
+        loads[i] += len(item[1]['risks']) or 1
+    return [g for g in groups if g]
+
+
+def forecast(portfolio, trials=100_000, seed=2026, workers=None, parallel_threshold=500):
+    """
+    Forecast every project in `portfolio` plus the portfolio total.
+    Projects whose risk set is unchanged come from the per-project cache; the rest are
+    simulated, split by project across the shared process pool when more than
+    `parallel_threshold` of their risks are open.
+    """
+    versions = {pid: risk_set_version(inputs) for pid, inputs in portfolio.items()}
+    portfolio_key = 'portfolio:' + hashlib.sha1(
+        repr(sorted(versions.items())).encode()).hexdigest()[:16] + f':{trials}:{seed}'
+    cached = forecast_cache.get(portfolio_key)
+    if cached is not None:
+        return cached
+
+    results, todo = {}, []
+    for pid, inputs in portfolio.items():
+        key = project_key(pid, versions[pid], trials, seed)
+        summary = forecast_cache.get(key)
+        arrays = trial_cache.get(key) if inputs['risks'] else (None, None)
+        if summary is not None and arrays is not None:
+            results[pid] = (summary,) + tuple(arrays)
+        else:
+            todo.append((pid, inputs))
+
+    pending = sum(len(inputs['risks']) for _, inputs in todo)
+    workers = workers or int(os.getenv('FORECAST_WORKERS', str(compute_pool.size())))
+    if workers > 1 and pending > parallel_threshold and len(todo) > 1:
+        chunks = _chunks(todo, min(workers, len(todo)))
+        parts = compute_pool.run(_run_chunk, chunks, [trials] * len(chunks), [seed] * len(chunks))
+    else:
+        parts = [_run_chunk(todo, trials, seed)] if todo else []
+    for part in parts:
+        for pid, (summary, part_cost, part_slip) in part.items():
+            key = project_key(pid, versions[pid], trials, seed)
+            forecast_cache.set(key, summary)
+            if part_cost is not None:
+                trial_cache.set(key, (part_cost, part_slip))
+            results[pid] = (summary, part_cost, part_slip)
+
+    # summed in project order, so the totals do not depend on chunking or on what was cached
+    cost = np.zeros(trials)
+    worst_slip = np.zeros(trials)
+    for pid in sorted(results):
+        _, part_cost, part_slip = results[pid]
+        if part_cost is not None:
+            cost += part_cost
+            np.maximum(worst_slip, part_slip, out=worst_slip)
+    projects = {pid: summary for pid, (summary, _, _) in results.items()}
+    total_risks = sum(len(inputs['risks']) for inputs in portfolio.values())
+
+    result = {
+        'trials': trials,
+        'seed': seed,
+        'projects': {str(pid): projects[pid] for pid in sorted(projects)},
+        'portfolio': {
+            'cost': {f'p{q}': round(float(v), 2) for q, v in zip(PERCENTILES, np.percentile(cost, PERCENTILES))},
+            # latest-finishing project in each trial
+            'worst_slip_days': {f'p{q}': round(float(v), 1) for q, v in zip(PERCENTILES, np.percentile(worst_slip, PERCENTILES))},
+            'open_risks': total_risks,
+        },
+    }
+    forecast_cache.set(portfolio_key, result)
+    return result
+
+
+def forecast_project(inputs, project_id, trials=100_000, seed=2026):
+    """Single-project forecast, served from cache when the risk set has not changed."""
+    key = project_key(project_id, risk_set_version(inputs), trials, seed)
+    cached = forecast_cache.get(key)
+    if cached is not None:
+        return cached
+    summary, cost, slip = _run_chunk([(project_id, inputs)], trials, seed)[project_id]
+    forecast_cache.set(key, summary)
+    if cost is not None:
+        trial_cache.set(key, (cost, slip))  # a later portfolio forecast reuses this project
+    return summary
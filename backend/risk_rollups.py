@@ -0,0 +1,306 @@
+"""
+Daily risk rollups for analytics. risk_daily_rollups holds, per day a risk was
+raised, counts broken down by severity, rag_status, risk_category and status,
+for every project and (project_id = 0) for the whole enterprise. Counts reflect
+each risk's current state; incremental runs rebuild only the project days whose
+risks changed since the last watermark and shift the enterprise rows by the difference.
+Deleted risks and risks moved to another project leave no last_updated trace, so each
+run also reconciles the last `reconcile_days` days: project days whose risk count no
+longer matches their rollup rows are rebuilt too. Older drift of that kind (and rows of
+deleted projects) needs --backfill.
+
+    python backend/risk_rollups.py --backfill        # rebuild everything in bulk
+    python backend/risk_rollups.py --once            # cron mode
+    python backend/risk_rollups.py --interval 300    # loop in the foreground
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.jobs import (JobScheduler, connector, db_now, notify_enterprises, read_watermark, save_run, serve,
+                         with_lock)
+
+log = logging.getLogger('risk_sentinel.rollups')
+
+JOB_NAME = 'risk_rollups'
+CHUNK = 500
+RECONCILE_DAYS = 30
+ENTERPRISE = 0  # project_id of enterprise-wide rows
+DIMENSIONS = ('severity', 'rag_status', 'risk_category', 'status')
+
+# one dimension's per-project daily counts straight from risks; {scope} narrows the rebuild
+PROJECT_ROLLUP_SQL = """
+    INSERT INTO risk_daily_rollups (enterprise_id, project_id, dimension, value, day,
+                                    risks, open_risks, high_risks, score_sum, finance_sum)
+    SELECT p.enterprise_id, r.project_id, '{dimension}', COALESCE(r.{dimension}, ''), DATE(r.created_at),
+           COUNT(*), SUM(CASE WHEN r.status IN ('Mitigated', 'Closed') THEN 0 ELSE 1 END),
+           SUM(CASE WHEN r.risk_score > 3 THEN 1 ELSE 0 END),
+           COALESCE(SUM(r.risk_score), 0), COALESCE(SUM(r.finance_impact), 0)
+    FROM risks r
+    JOIN projects p ON p.id = r.project_id
+    WHERE r.created_at IS NOT NULL {scope}
+    GROUP BY p.enterprise_id, r.project_id, COALESCE(r.{dimension}, ''), DATE(r.created_at)
+"""
+
+# enterprise rows are summed from the project rows, never from risks
+ENTERPRISE_ROLLUP_SQL = """
+    INSERT INTO risk_daily_rollups (enterprise_id, project_id, dimension, value, day,
+                                    risks, open_risks, high_risks, score_sum, finance_sum)
+    SELECT enterprise_id, 0, dimension, value, day,
+           SUM(risks), SUM(open_risks), SUM(high_risks), SUM(score_sum), SUM(finance_sum)
+    FROM risk_daily_rollups
+    WHERE project_id <> 0 {scope}
+    GROUP BY enterprise_id, dimension, value, day
+"""
+
+SERIES_SQL = """
+    SELECT day, value, risks, open_risks, high_risks, score_sum, finance_sum
+    FROM risk_daily_rollups
+    WHERE enterprise_id = %s AND project_id = %s AND dimension = %s AND day >= %s AND day <= %s
+    ORDER BY day, value
+"""
+
+TOTALS_SQL = """
+    SELECT value, SUM(risks) AS risks, SUM(open_risks) AS open_risks, SUM(high_risks) AS high_risks
+    FROM risk_daily_rollups
+    WHERE enterprise_id = %s AND project_id = %s AND dimension = %s
+    GROUP BY value
+"""
+
+
+def in_list(values):
+    return ', '.join(['%s'] * len(values))
+
+
+def read_rows(cursor, project_id, days, delta, sign):
+    """Add (sign=1) or subtract (sign=-1) a project's rows for `days` into `delta`."""
+    cursor.execute(f"""
+        SELECT dimension, value, day, risks, open_risks, high_risks, score_sum, finance_sum
+        FROM risk_daily_rollups WHERE project_id = %s AND day IN ({in_list(days)})
+    """, (project_id,) + days)
+    for row in cursor.fetchall():
+        counts = delta.setdefault(row[:3], [0, 0, 0, 0.0, 0.0])
+        for i, value in enumerate(row[3:]):
+            counts[i] += sign * value
+
+
+def rebuild_project_days(cursor, project_id, days, delta):
+    """Replace one project's rows for `days`; the change per (dimension, value, day) accumulates in `delta`."""
+    days = sorted(days)
+    for start in range(0, len(days), CHUNK):
+        chunk = tuple(days[start:start + CHUNK])
+        read_rows(cursor, project_id, chunk, delta, -1)
+        cursor.execute(f"DELETE FROM risk_daily_rollups WHERE project_id = %s AND day IN ({in_list(chunk)})",
+                       (project_id,) + chunk)
+        scope = f"AND r.project_id = %s AND DATE(r.created_at) IN ({in_list(chunk)})"
+        for dimension in DIMENSIONS:
+            cursor.execute(PROJECT_ROLLUP_SQL.format(dimension=dimension, scope=scope), (project_id,) + chunk)
+        read_rows(cursor, project_id, chunk, delta, 1)
+
+
+def apply_enterprise_delta(cursor, enterprise_id, delta):
+    """
+    Shift the enterprise rows by the project-level change instead of re-summing whole days,
+    so scattered edits cost rows touched, not days touched.
+    """
+    emptied = []
+    for (dimension, value, day), counts in delta.items():
+        if not any(counts):
+            continue
+        key = (enterprise_id, dimension, value, day)
+        cursor.execute("""
+            UPDATE risk_daily_rollups
+            SET risks = risks + %s, open_risks = open_risks + %s, high_risks = high_risks + %s,
+                score_sum = score_sum + %s, finance_sum = finance_sum + %s
+            WHERE enterprise_id = %s AND project_id = 0 AND dimension = %s AND value = %s AND day = %s
+        """, tuple(counts) + key)
+        if not cursor.rowcount:
+            cursor.execute("""
+                INSERT INTO risk_daily_rollups (enterprise_id, project_id, dimension, value, day,
+                                                risks, open_risks, high_risks, score_sum, finance_sum)
+                VALUES (%s, 0, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, key + tuple(counts))
+        if counts[0] < 0:
+            emptied.append(key)
+    if emptied:
+        cursor.executemany("""
+            DELETE FROM risk_daily_rollups
+            WHERE enterprise_id = %s AND project_id = 0 AND dimension = %s AND value = %s AND day = %s AND risks <= 0
+        """, emptied)
+
+
+def changed_groups(cursor, since, until):
+    """{enterprise_id: {project_id: days}} for risks written in (since, until]."""
+    cursor.execute("""
+        SELECT DISTINCT p.enterprise_id, r.project_id, DATE(r.created_at)
+        FROM risks r JOIN projects p ON p.id = r.project_id
+        WHERE r.last_updated > %s AND r.last_updated <= %s AND r.created_at IS NOT NULL
+    """, (since, until))
+    groups = {}
+    for enterprise_id, project_id, day in cursor.fetchall():
+        groups.setdefault(enterprise_id, {}).setdefault(project_id, set()).add(day)
+    return groups
+
+
+def stale_groups(cursor, start, groups, chunk=CHUNK):
+    """
+    Add to `groups` the (project, day) pairs since `start` whose risk count differs from their
+    rollup rows: what deletes and project moves leave behind. Walks projects in chunks so both
+    sides read through their (project_id, day) indexes.
+    """
+    cursor.execute("SELECT id, enterprise_id FROM projects ORDER BY id")
+    owners = dict(cursor.fetchall())
+    project_ids = list(owners)
+    for offset in range(0, len(project_ids), chunk):
+        ids = tuple(project_ids[offset:offset + chunk])
+        cursor.execute(f"""
+            SELECT project_id, DATE(created_at), COUNT(*) FROM risks
+            WHERE project_id IN ({in_list(ids)}) AND created_at >= %s
+            GROUP BY project_id, DATE(created_at)
+        """, ids + (start,))
+        counts = {(project_id, str(day)): (day, n) for project_id, day, n in cursor.fetchall()}
+        # every risk is counted once per dimension, so any one dimension's rows hold the project day's total
+        cursor.execute(f"""
+            SELECT project_id, day, SUM(risks) FROM risk_daily_rollups
+            WHERE project_id IN ({in_list(ids)}) AND day >= %s AND dimension = %s
+            GROUP BY project_id, day
+        """, ids + (start, DIMENSIONS[0]))
+        rolled = {(project_id, str(day)): (day, n) for project_id, day, n in cursor.fetchall()}
+        for key in counts.keys() | rolled.keys():
+            if counts.get(key, (None, 0))[1] != rolled.get(key, (None, 0))[1]:
+                day = (counts.get(key) or rolled[key])[0]
+                groups.setdefault(owners[key[0]], {}).setdefault(key[0], set()).add(day)
+    return groups
+
+
+def backfill(conn):
+    """Rebuild every rollup row in bulk (set-based INSERT ... SELECT) and reset the watermark."""
+    enterprises = []
+
+    def work(cursor):
+        started = time.perf_counter()
+        until = db_now(cursor)
+        cursor.execute("DELETE FROM risk_daily_rollups")
+        for dimension in DIMENSIONS:
+            cursor.execute(PROJECT_ROLLUP_SQL.format(dimension=dimension, scope=''))
+        cursor.execute(ENTERPRISE_ROLLUP_SQL.format(scope=''))
+        cursor.execute("SELECT COUNT(*) FROM risk_daily_rollups")
+        rows = cursor.fetchone()[0]
+        cursor.execute("SELECT DISTINCT enterprise_id FROM risk_daily_rollups WHERE project_id = 0")
+        enterprises.extend(row[0] for row in cursor.fetchall())
+        duration_ms = int((time.perf_counter() - started) * 1000)
+        save_run(cursor, JOB_NAME, None, until, 0, duration_ms)
+        record = {'until': until, 'rows': rows, 'duration_ms': duration_ms}
+        log.info("risk rollup backfill: %s", record)
+        return record
+    record = with_lock(conn, JOB_NAME, work)
+    notify_enterprises(enterprises, 'risk_daily_rollups')  # empty unless the run committed
+    return record
+
+
+def run_once(conn, reconcile_days=RECONCILE_DAYS):
+    """
+    One incremental pass: rebuild the (project, day) rows of risks written since the watermark,
+    plus any project day of the last `reconcile_days` whose count drifted (0 skips that check),
+    and apply the difference to the enterprise rows. The first run backfills instead.
+    """
+    cursor = conn.cursor()
+    since = read_watermark(cursor, JOB_NAME)
+    cursor.close()
+    if since is None:
+        return backfill(conn)
+    enterprises = []
+
+    def work(cursor):
+        started = time.perf_counter()
+        until = db_now(cursor)
+        groups = changed_groups(cursor, since, until)
+        if reconcile_days > 0:
+            stale_groups(cursor, (until - timedelta(days=reconcile_days)).date(), groups)
+        touched = 0
+        for enterprise_id, projects in groups.items():
+            delta = {}
+            for project_id, days in projects.items():
+                rebuild_project_days(cursor, project_id, days, delta)
+            apply_enterprise_delta(cursor, enterprise_id, delta)
+            touched += len(projects)
+        duration_ms = int((time.perf_counter() - started) * 1000)
+        save_run(cursor, JOB_NAME, since, until, touched, duration_ms)
+        enterprises.extend(groups)
+        record = {'since': since, 'until': until, 'projects_touched': touched, 'duration_ms': duration_ms}
+        log.info("risk rollup run: %s", record)
+        return record
+    record = with_lock(conn, JOB_NAME, work)
+    notify_enterprises(enterprises, 'risk_daily_rollups')  # empty unless the run committed
+    return record
+
+
+def series(cursor, enterprise_id, dimension, start, end, project_id=ENTERPRISE):
+    """Daily rows for one dimension over [start, end]: {value: [{day, risks, open_risks, ...}]}."""
+    if dimension not in DIMENSIONS:
+        raise ValueError(f'unknown dimension {dimension!r}')
+    cursor.execute(SERIES_SQL, (enterprise_id, project_id, dimension, start, end))
+    out = {}
+    for row in cursor.fetchall():
+        row = dict(row)
+        day = row.pop('day')
+        row['day'] = day.isoformat() if isinstance(day, date) else str(day)
+        out.setdefault(row.pop('value'), []).append(row)
+    return out
+
+
+def totals(cursor, enterprise_id, dimension, project_id=ENTERPRISE):
+    """All-time counts per value of one dimension (open_risks is the current open count)."""
+    if dimension not in DIMENSIONS:
+        raise ValueError(f'unknown dimension {dimension!r}')
+    cursor.execute(TOTALS_SQL, (enterprise_id, project_id, dimension))
+    return [{'value': r['value'], 'risks': int(r['risks']), 'open_risks': int(r['open_risks']),
+             'high_risks': int(r['high_risks'])} for r in cursor.fetchall()]
+
+
+class RollupScheduler(JobScheduler):
+    """Background thread calling run_once every `interval` seconds."""
+    name = 'risk-rollups'
+
+    def __init__(self, connect, interval=300, reconcile_days=RECONCILE_DAYS):
+        super().__init__(connect, interval)
+        self.reconcile_days = reconcile_days
+
+    def run(self, conn):
+        run_once(conn, self.reconcile_days)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--once', action='store_true', help='run a single incremental pass and exit (cron)')
+    parser.add_argument('--backfill', action='store_true', help='rebuild all rollups in bulk and exit')
+    parser.add_argument('--interval', type=int, default=300)
+    parser.add_argument('--reconcile-days', type=int, default=RECONCILE_DAYS,
+                        help='recheck counts this many days back for deletes and moves (0 to skip)')
+    parser.add_argument('--sqlite', help='SQLite file instead of MySQL')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    connect = connector(args.sqlite)
+    if args.once or args.backfill:
+        conn = connect()
+        try:
+            record = backfill(conn) if args.backfill else run_once(conn, args.reconcile_days)
+        finally:
+            conn.close()
+        if record is None:
+            print("⏭️  another run holds the lock")
+        elif 'rows' in record:
+            print(f"✅ backfilled {record['rows']} rollup row(s) in {record['duration_ms']}ms")
+        else:
+            print(f"✅ {record['projects_touched']} project(s) in {record['duration_ms']}ms")
+        return
+    serve(RollupScheduler(connect, args.interval, args.reconcile_days).start())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,358 @@
+"""
+Rule-based risk scanner. Standing rules (overdue high-priority tasks, delayed
+milestones, vendors behind their delivery timeline, budget overruns) are
+declared once, compiled to set-based SQL per enterprise, and every match is
+raised as a Risk exactly once (deduplicated on rule + source row through
+risk_findings). Rules with a `since` window only revisit rows that changed or
+crossed a date boundary after the rule's last watermark.
+
+    python backend/risk_scanner.py --once                 # every enterprise
+    python backend/risk_scanner.py --once --enterprise 3 --budget 30
+    python backend/risk_scanner.py --interval 900         # loop in the foreground
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend import risk_scoring
+from backend.cache import notify_enterprise_write
+from backend.jobs import JobScheduler, acquire, connector, db_now, release, save_watermark, serve
+
+log = logging.getLogger('risk_sentinel.scanner')
+
+JOB_PREFIX = 'risk_scanner'
+PAGE_SIZE = 5000
+PROJECT_CHUNK = 100
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    One standing rule over `table` (aliased `s`); `project` is its project id column.
+    `predicate` selects offending rows; `since` (SQL with %s for the watermark)
+    narrows an incremental run to rows that may have started matching after it.
+    Rules without `since` are re-evaluated in full each run (their tables are small).
+    """
+    key: str
+    table: str
+    project: str
+    label: str
+    predicate: str
+    title: str
+    description: str
+    severity: str = 'Medium'
+    probability: float = 0.5
+    impact: int = 3
+    category: str = 'Operational'
+    since: str = None
+    finance: str = '0'
+    delay: str = '0'
+    vendor: str = 'NULL'
+
+
+RULES = (
+    Rule(
+        key='overdue_high_task', table='tasks', project='s.project_id', label='s.title',
+        predicate="s.priority = 'High' AND s.status <> 'Completed' AND s.due_date < CURDATE()",
+        # new since the last run: rows created or edited (priority raised, reopened) after it,
+        # or due dates it had not reached yet
+        since='s.created_at > %s OR s.updated_at > %s OR s.due_date >= DATE(%s)',
+        delay='DATEDIFF(CURDATE(), s.due_date)',
+        title='Overdue high-priority task: {label}',
+        description='High priority task is past its due date and not completed.',
+        severity='High', probability=0.8, impact=3),
+    Rule(
+        key='milestone_delayed', table='milestones', project='s.project_id', label='s.title',
+        predicate="s.status = 'Delayed'",
+        delay='DATEDIFF(CURDATE(), s.target_date)',
+        title='Milestone delayed: {label}',
+        description='Milestone is marked Delayed.',
+        severity='High', probability=0.7, impact=4),
+    Rule(
+        key='milestone_past_target', table='milestones', project='s.project_id', label='s.title',
+        predicate="s.status IN ('Pending', 'InProgress') AND s.target_date < CURDATE()",
+        delay='DATEDIFF(CURDATE(), s.target_date)',
+        title='Milestone past target date: {label}',
+        description='Milestone target date has passed and it is not completed.',
+        severity='Medium', probability=0.6, impact=3),
+    Rule(
+        key='vendor_behind_schedule', table='vendors', project='s.assigned_project_id', label='s.company_name',
+        # behind when completion trails elapsed share of the timeline by more than 15 points
+        predicate="s.status = 'Active' AND s.completion_percent < 100 AND s.delivery_timeline IS NOT NULL "
+                  "AND (s.delivery_timeline < CURDATE() OR (s.completion_percent + 15) "
+                  "* DATEDIFF(s.delivery_timeline, s.created_at) < 100 * DATEDIFF(CURDATE(), s.created_at))",
+        delay='DATEDIFF(CURDATE(), s.delivery_timeline)', vendor='s.id',
+        title='Vendor behind delivery timeline: {label}',
+        description='Vendor completion is behind the time elapsed on its delivery timeline.',
+        severity='Medium', probability=0.6, impact=3, category='Vendor'),
+    Rule(
+        key='budget_overrun', table='projects', project='s.id', label='s.name',
+        predicate='s.budget_total > 0 AND s.budget_spent > s.budget_total',
+        finance='s.budget_spent - s.budget_total',
+        title='Budget overrun: {label}',
+        description='Project spend exceeds its total budget.',
+        severity='High', probability=1.0, impact=4, category='Finance'),
+)
+
+
+def compile_rule(rule, incremental, chunk):
+    """
+    SELECT of the rule's new matches within `chunk` projects. Parameters:
+    project ids, rule key, [watermark * n].
+    """
+    window = f"AND ({rule.since})" if incremental and rule.since else ''
+    ids = ', '.join(['%s'] * chunk)
+    return f"""
+        SELECT s.id, {rule.project}, {rule.label}, {rule.finance}, {rule.delay}, {rule.vendor}
+        FROM {rule.table} s
+        LEFT JOIN risk_findings f ON f.rule_key = %s AND f.source_id = s.id
+        WHERE {rule.project} IN ({ids}) AND f.source_id IS NULL
+          AND ({rule.predicate}) {window}
+    """
+
+
+def job_name(rule, enterprise_id):
+    return f'{JOB_PREFIX}:{enterprise_id}:{rule.key}'
+
+
+def read_watermarks(cursor, enterprise_id):
+    cursor.execute("SELECT job, watermark FROM job_watermarks WHERE job LIKE %s", (f'{JOB_PREFIX}:{enterprise_id}:%',))
+    return {job: watermark for job, watermark in cursor.fetchall()}
+
+
+def to_risks(rule, rows, now, config=None):
+    """Risk rows for a page of matches; scores are computed for the whole page at once."""
+    count = len(rows)
+    score, rag, health = risk_scoring.score_arrays(
+        [rule.probability] * count, [rule.impact] * count,
+        [float(r[3] or 0) for r in rows], [float(r[4] or 0) for r in rows], [0] * count, config)
+    return [(r[1], rule.title.format(label=r[2]), rule.description, rule.severity, rule.probability, rule.impact,
+             float(s), str(risk_scoring.RAG_LABELS[g]), str(risk_scoring.HEALTH_LABELS[h]), r[5],
+             'Identified', rule.category, float(r[3] or 0), max(int(r[4] or 0), 0), f'risk-scanner:{rule.key}', now, now)
+            for r, s, g, h in zip(rows, score, rag, health)]
+
+
+INSERT_RISK_SQL = """
+    INSERT INTO risks (project_id, title, description, severity, probability, impact_score, risk_score,
+                       rag_status, health_impact, vendor_id, status, risk_category, finance_impact,
+                       milestone_delay_days, comments, created_at, last_updated)
+    VALUES """
+INSERT_RISK_ROW = "(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+INSERT_ROWS = 500  # rows per INSERT statement
+
+# the ids one INSERT_RISK_SQL statement got, in row order: AUTO_INCREMENT values are increasing within a
+# statement and start at its lastrowid; ordinary inserts interleaved with it are filtered out
+INSERTED_RISKS_SQL = """
+    SELECT id FROM risks
+    WHERE id >= %s AND comments = %s AND created_at = %s AND project_id IN ({projects})
+    ORDER BY id
+    LIMIT %s
+"""
+
+INSERT_FINDING_SQL = """
+    INSERT INTO risk_findings (rule_key, source_id, enterprise_id, risk_id, found_at) VALUES (%s, %s, %s, %s, %s)
+"""
+
+
+def insert_risks(cursor, risks):
+    """Insert risk rows (to_risks() tuples); returns their ids in the same order."""
+    ids = []
+    for start in range(0, len(risks), INSERT_ROWS):
+        batch = risks[start:start + INSERT_ROWS]
+        cursor.execute(INSERT_RISK_SQL + ', '.join([INSERT_RISK_ROW] * len(batch)), [v for r in batch for v in r])
+        first_id = cursor.lastrowid
+        projects = sorted({r[0] for r in batch})
+        cursor.execute(INSERTED_RISKS_SQL.format(projects=', '.join(['%s'] * len(projects))),
+                       (first_id, batch[0][14], batch[0][15], *projects, len(batch)))
+        batch_ids = [row[0] for row in cursor.fetchall()]
+        if len(batch_ids) != len(batch):
+            raise RuntimeError(f'read back {len(batch_ids)} of {len(batch)} inserted risks')
+        ids.extend(batch_ids)
+    return ids
+
+
+def emit(conn, rule, enterprise_id, rows, now, config=None):
+    """Insert one page of findings as risks plus their dedupe keys, in one transaction."""
+    cursor = conn.cursor()
+    try:
+        conn.start_transaction()
+        risk_ids = insert_risks(cursor, to_risks(rule, rows, now, config))
+        cursor.executemany(INSERT_FINDING_SQL, [(rule.key, r[0], enterprise_id, risk_id, now)
+                                                for r, risk_id in zip(rows, risk_ids)])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return {r[1] for r in rows}
+
+
+def scan_rule(conn, rule, enterprise_id, project_ids, since, now, deadline, page_size=PAGE_SIZE, config=None):
+    """
+    Evaluate the rule over the enterprise's projects a chunk at a time and raise new matches
+    `page_size` per transaction. Returns (findings, project_ids hit, finished before deadline).
+    """
+    window = (since,) * rule.since.count('%s') if since is not None and rule.since else ()
+    cursor = conn.cursor()
+    found, projects = 0, set()
+    try:
+        for start in range(0, len(project_ids), PROJECT_CHUNK):
+            if time.perf_counter() >= deadline:
+                return found, projects, False
+            chunk = tuple(project_ids[start:start + PROJECT_CHUNK])
+            cursor.execute(compile_rule(rule, since is not None, len(chunk)), (rule.key,) + chunk + window)
+            rows = cursor.fetchall()
+            for offset in range(0, len(rows), page_size):
+                if time.perf_counter() >= deadline:
+                    return found, projects, False
+                page = rows[offset:offset + page_size]
+                projects |= emit(conn, rule, enterprise_id, page, now, config)
+                found += len(page)
+        return found, projects, True
+    finally:
+        cursor.close()
+
+
+def scan(conn, enterprise_id, budget=60.0, rules=RULES, full=False, page_size=PAGE_SIZE, config=None):
+    """
+    Run every rule for one enterprise within `budget` seconds. A rule's watermark only moves
+    when it finished; an unfinished rule resumes next run (findings already raised are skipped).
+    Guarded by a named lock per enterprise. Returns the run summary, or None if another scan holds it.
+    """
+    started = time.perf_counter()
+    deadline = started + budget
+    lock = f'rs_{JOB_PREFIX}_{enterprise_id}'
+    cursor = conn.cursor()
+    if not acquire(cursor, lock):
+        cursor.close()
+        return None
+    try:
+        until = db_now(cursor)
+        now = until + timedelta(seconds=1)  # findings are stamped with NOW(); the watermark stays a second short
+        watermarks = read_watermarks(cursor, enterprise_id)
+        cursor.execute("SELECT id FROM projects WHERE enterprise_id = %s ORDER BY id", (enterprise_id,))
+        project_ids = [row[0] for row in cursor.fetchall()]
+        summary = {'enterprise_id': enterprise_id, 'findings': 0, 'complete': True, 'rules': {}, 'projects': set()}
+        for rule in rules:
+            job = job_name(rule, enterprise_id)
+            since = None if full else watermarks.get(job)
+            found, projects, finished = scan_rule(conn, rule, enterprise_id, project_ids, since, now, deadline,
+                                                  page_size, config)
+            if finished:
+                save_watermark(cursor, job, until, job in watermarks)
+            summary['rules'][rule.key] = {'findings': found, 'incremental': since is not None, 'finished': finished}
+            summary['findings'] += found
+            summary['projects'] |= projects
+            summary['complete'] &= finished
+        summary['projects'] = sorted(summary['projects'])
+        if summary['findings']:
+            notify_enterprise_write(enterprise_id, 'risks')  # every page is committed by now
+        summary['duration_ms'] = int((time.perf_counter() - started) * 1000)
+        log.info("risk scan enterprise %s: %d findings in %dms%s", enterprise_id, summary['findings'],
+                 summary['duration_ms'], '' if summary['complete'] else ' (budget exhausted)')
+        return summary
+    finally:
+        release(cursor, lock)
+        cursor.close()
+
+
+def scan_all(conn, budget=60.0, full=False):
+    """Scan every enterprise, splitting what is left of `budget` between those not yet scanned."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT id FROM enterprises ORDER BY id")
+    enterprise_ids = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+    deadline = time.perf_counter() + budget
+    results = []
+    for n, enterprise_id in enumerate(enterprise_ids):
+        share = max(deadline - time.perf_counter(), 0.0) / (len(enterprise_ids) - n)
+        summary = scan(conn, enterprise_id, budget=share, full=full)
+        if summary is not None:
+            results.append(summary)
+    return results
+
+
+RECENT_FINDINGS_SQL = """
+    SELECT f.rule_key, f.source_id, f.found_at, r.id AS risk_id, r.title, r.severity, r.rag_status,
+           r.status, r.project_id, p.name AS project_name
+    FROM risk_findings f
+    JOIN risks r ON r.id = f.risk_id
+    JOIN projects p ON p.id = r.project_id
+    WHERE f.enterprise_id = %s
+    ORDER BY f.found_at DESC, f.risk_id DESC
+    LIMIT %s
+"""
+
+
+def recent_findings(cursor, enterprise_id, limit=100):
+    cursor.execute(RECENT_FINDINGS_SQL, (enterprise_id, limit))
+    return cursor.fetchall()
+
+
+def rule_status(cursor, enterprise_id):
+    """Declared rules with their last completed scan (watermark) for the enterprise."""
+    cursor.execute("""
+        SELECT rule_key, COUNT(*) AS findings FROM risk_findings WHERE enterprise_id = %s GROUP BY rule_key
+    """, (enterprise_id,))
+    counts = {row['rule_key']: row['findings'] for row in cursor.fetchall()}
+    watermarks = {}
+    cursor.execute("SELECT job, watermark FROM job_watermarks WHERE job LIKE %s", (f'{JOB_PREFIX}:{enterprise_id}:%',))
+    for row in cursor.fetchall():
+        watermarks[row['job']] = row['watermark']
+    return [{'key': rule.key, 'name': rule.title.split(':')[0], 'description': rule.description,
+             'severity': rule.severity, 'category': rule.category, 'incremental': rule.since is not None,
+             'last_scan': watermarks.get(job_name(rule, enterprise_id)), 'findings': counts.get(rule.key, 0)}
+            for rule in RULES]
+
+
+class RiskScanner(JobScheduler):
+    """Background thread scanning every enterprise every `interval` seconds."""
+    name = 'risk-scanner'
+
+    def __init__(self, connect, interval=900, budget=60.0):
+        super().__init__(connect, interval)
+        self.budget = budget
+
+    def run(self, conn):
+        scan_all(conn, self.budget)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--once', action='store_true', help='run a single pass and exit (cron)')
+    parser.add_argument('--interval', type=int, default=900)
+    parser.add_argument('--enterprise', type=int, help='scan only this enterprise')
+    parser.add_argument('--budget', type=float, default=60.0, help='seconds per pass')
+    parser.add_argument('--full', action='store_true', help='ignore watermarks (findings are still deduplicated)')
+    parser.add_argument('--sqlite', help='SQLite file instead of MySQL')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    connect = connector(args.sqlite)
+    if args.once:
+        conn = connect()
+        try:
+            if args.enterprise is not None:
+                results = [scan(conn, args.enterprise, args.budget, full=args.full)]
+            else:
+                results = scan_all(conn, args.budget, args.full)
+        finally:
+            conn.close()
+        for summary in results:
+            if summary is None:
+                print("⏭️  another scan holds the lock")
+                continue
+            print(f"{'✅' if summary['complete'] else '⏳'} enterprise {summary['enterprise_id']}: "
+                  f"{summary['findings']} finding(s) in {summary['duration_ms']}ms")
+        return
+    serve(RiskScanner(connect, args.interval, args.budget).start())
+
+
+if __name__ == '__main__':
+    main()
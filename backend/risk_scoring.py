@@ -0,0 +1,194 @@
+# ===== VECTORIZED RISK SCORING =====
+import math
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+RAG_LABELS = np.array(['Green', 'Amber', 'Red'])
+HEALTH_LABELS = np.array(['Green', 'Yellow', 'Red'])
+
+LOAD_COLUMNS = ('id', 'probability', 'impact_score', 'finance_impact', 'milestone_delay_days',
+                'project_blocker', 'risk_score', 'rag_status', 'health_impact')
+
+
+INPUT_COLUMNS = ('probability', 'impact_score', 'finance_impact', 'milestone_delay_days', 'project_blocker')
+
+
+class ScoringInputError(ValueError):
+    """Malformed weights or risk inputs from a request; the message is safe to return to the client."""
+
+
+def _number(name, value):
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ScoringInputError(f'{name} must be a number')
+    try:
+        number = float(value)
+    except ValueError:
+        raise ScoringInputError(f'{name} must be a number') from None
+    if not math.isfinite(number):
+        raise ScoringInputError(f'{name} must be finite')
+    return number
+
+
+@dataclass
+class ScoringConfig:
+    """
+    score (0-5) = w_exposure * probability * impact
+                + w_finance * 5 * min(finance_impact / finance_cap, 1)
+                + w_delay * 5 * min(milestone_delay_days / delay_cap, 1)
+                + w_blocker * 5 * project_blocker
+    """
+    w_exposure: float = 0.70
+    w_finance: float = 0.15
+    w_delay: float = 0.10
+    w_blocker: float = 0.05
+    finance_cap: float = 100000.0
+    delay_cap: float = 30.0
+    red_threshold: float = 3.5
+    amber_threshold: float = 2.0
+
+    @classmethod
+    def from_env(cls, **overrides):
+        values = {}
+        for name, field in cls.__dataclass_fields__.items():
+            env = os.getenv('RISK_SCORE_' + name.upper())
+            if env is not None:
+                values[name] = float(env)
+        values.update({k: _number(k, v) for k, v in overrides.items() if k in cls.__dataclass_fields__})
+        for cap in ('finance_cap', 'delay_cap'):
+            if values.get(cap, 1.0) <= 0:
+                raise ScoringInputError(f'{cap} must be positive')
+        return cls(**values)
+
+    @classmethod
+    def from_request(cls, weights):
+        """from_env() with a request's optional {"name": number} overrides; ScoringInputError if malformed."""
+        if weights is None:
+            return cls.from_env()
+        if not isinstance(weights, dict):
+            raise ScoringInputError('weights must be an object')
+        return cls.from_env(**weights)
+
+
+def score_arrays(probability, impact, finance, delay, blocker, config=None):
+    """
+    Score, RAG band index (0 Green, 1 Amber, 2 Red) and health index for whole columns at once.
+    NULL inputs arrive as NaN and count as zero.
+    """
+    config = config or ScoringConfig()
+    p = np.nan_to_num(np.asarray(probability, dtype=np.float64))
+    p = np.where(p > 1.0, p / 100.0, p)  # tolerate percentages
+    np.clip(p, 0.0, 1.0, out=p)
+    i = np.clip(np.nan_to_num(np.asarray(impact, dtype=np.float64)), 0.0, 5.0)
+    f = np.clip(np.nan_to_num(np.asarray(finance, dtype=np.float64)) / config.finance_cap, 0.0, 1.0)
+    d = np.clip(np.nan_to_num(np.asarray(delay, dtype=np.float64)) / config.delay_cap, 0.0, 1.0)
+    b = np.nan_to_num(np.asarray(blocker, dtype=np.float64)) > 0
+
+    score = (config.w_exposure * p * i
+             + 5.0 * (config.w_finance * f + config.w_delay * d + config.w_blocker * b))
+    score = np.round(score, 2)
+
+    rag = (score >= config.amber_threshold).astype(np.int8) + (score >= config.red_threshold)
+    # a blocker always drags project health to Red, whatever its score
+    health = np.where(b, 2, rag).astype(np.int8)
+    return score, rag, health
+
+
+def _column(rows, idx):
+    return np.fromiter((np.nan if r[idx] is None else r[idx] for r in rows), dtype=np.float64, count=len(rows))
+
+
+def load_risks(conn, project_id=None, enterprise_id=None, batch_size=50000):
+    """Fetch scoring inputs for a project or an enterprise as a dict of NumPy columns."""
+    cursor = conn.cursor()
+    cols = ', '.join('r.' + c for c in LOAD_COLUMNS)
+    if project_id is not None:
+        cursor.execute(f"SELECT {cols} FROM risks r WHERE r.project_id = %s", (project_id,))
+    else:
+        cursor.execute(f"""
+            SELECT {cols} FROM risks r JOIN projects p ON r.project_id = p.id
+            WHERE p.enterprise_id = %s
+        """, (enterprise_id,))
+    rows = []
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            break
+        rows.extend(batch)
+    cursor.close()
+
+    data = {name: _column(rows, idx) for idx, name in enumerate(LOAD_COLUMNS[:7])}
+    data['id'] = data['id'].astype(np.int64)
+    data['rag_status'] = np.array([r[7] for r in rows], dtype=object)
+    data['health_impact'] = np.array([r[8] for r in rows], dtype=object)
+    return data
+
+
+def write_scores(conn, ids, score, rag_labels, health_labels, batch_size=5000):
+    """
+    Bulk write-back: executemany into a temporary table (sent as multi-row INSERTs),
+    then one UPDATE ... JOIN instead of one UPDATE per risk.
+    """
+    if len(ids) == 0:
+        return 0
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TEMPORARY TABLE IF NOT EXISTS tmp_risk_scores (
+            id INT PRIMARY KEY, risk_score DOUBLE, rag_status VARCHAR(5), health_impact VARCHAR(6)
+        ) ENGINE=MEMORY
+    """)
+    cursor.execute("TRUNCATE TABLE tmp_risk_scores")
+    rows = list(zip(ids.tolist(), score.tolist(), rag_labels.tolist(), health_labels.tolist()))
+    for start in range(0, len(rows), batch_size):
+        cursor.executemany(
+            "INSERT INTO tmp_risk_scores (id, risk_score, rag_status, health_impact) VALUES (%s, %s, %s, %s)",
+            rows[start:start + batch_size]
+        )
+    cursor.execute("""
+        UPDATE risks r JOIN tmp_risk_scores s ON r.id = s.id
+        SET r.risk_score = s.risk_score, r.rag_status = s.rag_status,
+            r.health_impact = s.health_impact, r.last_updated = NOW()
+    """)
+    updated = cursor.rowcount
+    cursor.execute("DROP TEMPORARY TABLE IF EXISTS tmp_risk_scores")
+    cursor.close()
+    return updated
+
+
+def rescore(conn, project_id=None, enterprise_id=None, config=None, write=True):
+    """Load, score and (optionally) persist every risk in scope. Only changed rows are written."""
+    data = load_risks(conn, project_id=project_id, enterprise_id=enterprise_id)
+    score, rag, health = score_arrays(data['probability'], data['impact_score'], data['finance_impact'],
+                                      data['milestone_delay_days'], data['project_blocker'], config)
+    rag_labels = RAG_LABELS[rag]
+    health_labels = HEALTH_LABELS[health]
+    old_score = np.nan_to_num(data['risk_score'], nan=-1.0)
+    changed = ((np.abs(old_score - score) > 1e-9)
+               | (data['rag_status'] != rag_labels)
+               | (data['health_impact'] != health_labels))
+
+    updated = 0
+    if write and changed.any():
+        updated = write_scores(conn, data['id'][changed], score[changed],
+                               rag_labels[changed], health_labels[changed])
+    counts = np.bincount(rag, minlength=3)
+    return {
+        'scored': int(len(score)),
+        'changed': int(changed.sum()),
+        'updated': int(updated),
+        'rag_counts': {'Green': int(counts[0]), 'Amber': int(counts[1]), 'Red': int(counts[2])},
+        'mean_score': round(float(score.mean()), 2) if len(score) else 0.0,
+    }
+
+
+def preview(risks, config=None):
+    """Score a list of input dicts without touching the database (calculator page)."""
+    if not isinstance(risks, list) or not all(isinstance(r, dict) for r in risks):
+        raise ScoringInputError('risks must be a list of objects')
+
+    def col(key):
+        return [np.nan if r.get(key) is None else _number(f'risks[{n}].{key}', r[key]) for n, r in enumerate(risks)]
+    score, rag, health = score_arrays(*(col(key) for key in INPUT_COLUMNS), config)
+    return [{'risk_score': float(s), 'rag_status': str(RAG_LABELS[r]), 'health_impact': str(HEALTH_LABELS[h])}
+            for s, r, h in zip(score, rag, health)]
@@ -0,0 +1,628 @@
+"""
+Schedule-slip propagation over each project's task / milestone dependency graph
+(schedule_dependencies). A node's projected finish is the latest of
+    - its own date: a task's due_date plus the milestone_delay_days of its linked open
+      risk, a milestone's target_date; never earlier than today while it is incomplete
+    - its earliest start + duration, where the earliest start is the latest predecessor
+      finish + lag_days, and today for a task whose open risk is a project_blocker
+Completed nodes keep their completion date. One forward and one backward pass in
+topological order give every finish, float and the predecessor that drove it, in
+O(tasks + dependencies). Milestones store projected_date, slip_days and driving_path (the
+chain of nodes that pushed them late, root cause first) for the PM dashboard.
+
+Graphs stay in memory between runs (ScheduleEngine). An incremental run re-evaluates only
+the changed tasks, milestones and risk-linked tasks and what lies downstream of them,
+stopping wherever a finish does not move; added or removed tasks, milestones or
+dependencies rebuild that project's graph. A dependency cycle is cut at its back edge and logged.
+
+    python backend/schedule_graph.py --full              # every project with milestones
+    python backend/schedule_graph.py --once              # cron mode
+    python backend/schedule_graph.py --interval 60       # loop in the foreground
+    python backend/schedule_graph.py --project 42        # print one project's critical path
+"""
+import argparse
+import gc
+import heapq
+import json
+import logging
+import os
+import sys
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.jobs import (JobScheduler, connector, db_now, enterprises_of, notify_enterprises, read_watermark, save_run,
+                         serve, with_lock)
+
+log = logging.getLogger('risk_sentinel.schedule')
+
+JOB_NAME = 'schedule_graph'
+CHUNK = 500
+TASK, MILESTONE = 'task', 'milestone'
+NODE_TYPES = (TASK, MILESTONE)
+NO_DATE = -(1 << 40)  # "no constraint" on the ordinal day scale
+PATH_LIMIT = 25
+CLOSED_RISK = ('Mitigated', 'Closed')
+
+TASKS_SQL = """
+    SELECT t.id, t.project_id, t.status, t.due_date, t.completed_at, t.created_at, t.duration_days,
+           r.status AS risk_status, r.milestone_delay_days, r.project_blocker
+    FROM tasks t
+    LEFT JOIN risks r ON r.id = t.risk_id
+    WHERE {where}
+"""
+
+MILESTONES_SQL = """
+    SELECT id, project_id, title, status, target_date, completed_date, projected_date, slip_days, driving_path
+    FROM milestones
+    WHERE {where}
+"""
+
+DEPENDENCIES_SQL = """
+    SELECT id, predecessor_type, predecessor_id, successor_type, successor_id, lag_days
+    FROM schedule_dependencies
+    WHERE project_id = %s
+"""
+
+# edges, edge ids and node counts: what a cached graph cannot see from updated_at alone
+SIGNATURE_SQL = """
+    SELECT (SELECT COUNT(*) FROM schedule_dependencies WHERE project_id = %s) AS edges,
+           (SELECT COALESCE(SUM(id), 0) FROM schedule_dependencies WHERE project_id = %s) AS edge_ids,
+           (SELECT COUNT(*) FROM tasks WHERE project_id = %s) AS tasks,
+           (SELECT COUNT(*) FROM milestones WHERE project_id = %s) AS milestones
+"""
+
+IMPACTED_SQL = """
+    SELECT m.id, m.title, m.project_id, p.name AS project_name, m.status, m.target_date, m.projected_date,
+           m.slip_days, m.driving_path
+    FROM projects p
+    JOIN milestones m ON m.project_id = p.id
+    WHERE p.pm_user_id = %s AND p.enterprise_id = %s AND m.slip_days > 0 AND m.status <> 'Completed'
+    ORDER BY m.slip_days DESC, m.id
+    LIMIT %s
+"""
+
+
+def ordinal(value):
+    """Day number of a DATE / DATETIME value (SQLite returns strings); None stays None."""
+    if value is None:
+        return None
+    if isinstance(value, date):
+        return value.toordinal()
+    return date.fromisoformat(str(value)[:10]).toordinal()
+
+
+def task_node(row):
+    """(duration, own date, completion date, blocked) for a TASKS_SQL row."""
+    due, created = ordinal(row['due_date']), ordinal(row['created_at'])
+    duration = row['duration_days']
+    if duration is None:
+        duration = max(1, due - created) if due is not None and created is not None else 1
+    done = None
+    if row['status'] == 'Completed':
+        done = ordinal(row['completed_at']) or due or created
+    risk_open = row['risk_status'] is not None and row['risk_status'] not in CLOSED_RISK
+    delay = int(row['milestone_delay_days'] or 0) if risk_open else 0
+    own = due + delay if due is not None else NO_DATE
+    return int(duration), own, done, bool(risk_open and row['project_blocker'])
+
+
+def milestone_node(row):
+    """(duration, own date, completion date, blocked) for a MILESTONES_SQL row."""
+    target = ordinal(row['target_date'])
+    done = ordinal(row['completed_date']) or target if row['status'] == 'Completed' else None
+    return 0, target if target is not None else NO_DATE, done, False
+
+
+class ScheduleGraph:
+    """
+    One project's tasks and milestones as parallel lists indexed by node number.
+    compute() is the linear full pass; update() re-evaluates changed nodes and their
+    descendants in topological order with a heap, stopping where a finish is unchanged.
+    """
+
+    def __init__(self, project_id, today):
+        self.project_id = project_id
+        self.today = today  # ordinal
+        self.index = {}     # (type, id) -> node
+        self.keys = []
+        self.duration, self.own, self.done, self.blocked = [], [], [], []
+        self.preds, self.succs = [], []
+        self.finish, self.driver, self.latest = [], [], []
+        self.order, self.position = [], []
+        self.milestones = {}  # node -> target ordinal (NO_DATE without one)
+        self.written = {}     # node -> (projected_date, slip_days, driving_path) as stored
+        self.signature = None
+        self.back_edges = 0
+        self.end = NO_DATE
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add_node(self, key, duration, own, done, blocked):
+        v = len(self.keys)
+        self.index[key] = v
+        self.keys.append(key)
+        self.duration.append(duration)
+        self.own.append(own)
+        self.done.append(done)
+        self.blocked.append(blocked)
+        self.preds.append([])
+        self.succs.append([])
+        if key[0] == MILESTONE:
+            self.milestones[v] = own
+        return v
+
+    def add_edge(self, predecessor, successor, lag=0):
+        """False when either end is not a node of this graph (deleted or another project's)."""
+        p, s = self.index.get(predecessor), self.index.get(successor)
+        if p is None or s is None or p == s:
+            return False
+        self.succs[p].append((s, lag))
+        self.preds[s].append((p, lag))
+        return True
+
+    def _sort(self):
+        """Reverse DFS postorder: a topological order in which only cycle (back) edges point backwards."""
+        n = len(self.keys)
+        state = bytearray(n)  # 0 new, 1 on the stack, 2 finished
+        post, back = [], 0
+        succs = self.succs
+        for root in range(n):
+            if state[root]:
+                continue
+            state[root] = 1
+            stack = [(root, iter(succs[root]))]
+            while stack:
+                v, edges = stack[-1]
+                for s, _ in edges:
+                    if state[s] == 0:
+                        state[s] = 1
+                        stack.append((s, iter(succs[s])))
+                        break
+                    if state[s] == 1:
+                        back += 1
+                else:
+                    stack.pop()
+                    state[v] = 2
+                    post.append(v)
+        post.reverse()
+        self.order = post
+        self.position = [0] * n
+        for i, v in enumerate(post):
+            self.position[v] = i
+        if back:
+            log.warning("project %s: %d dependency edge(s) close a cycle and are ignored", self.project_id, back)
+        self.back_edges = back
+
+    def _evaluate(self, v):
+        """(finish, driver) of node v from its predecessors' current finishes; driver -1 = its own date."""
+        done = self.done[v]
+        if done is not None:
+            return done, -1
+        position, finish = self.position, self.finish
+        here = position[v]
+        start, driver = NO_DATE, -1
+        for p, lag in self.preds[v]:
+            if position[p] < here and finish[p] + lag > start:
+                start, driver = finish[p] + lag, p
+        if self.blocked[v] and self.today > start:
+            start, driver = self.today, -1
+        own = self.own[v] if self.own[v] > self.today else self.today
+        end = start + self.duration[v]
+        return (end, driver) if end > own else (own, -1)
+
+    def _backward(self):
+        """Latest finishes that keep the project end: float = latest - finish."""
+        self.end = max(self.finish) if self.finish else NO_DATE
+        latest = [self.end] * len(self.keys)
+        position, duration, preds = self.position, self.duration, self.preds
+        for v in reversed(self.order):
+            start = latest[v] - duration[v]
+            here = position[v]
+            for p, lag in preds[v]:
+                if position[p] < here and start - lag < latest[p]:
+                    latest[p] = start - lag
+        self.latest = latest
+
+    def compute(self):
+        """Full pass: topological sort, forward (finish, driver) and backward (latest) passes."""
+        self._sort()
+        n = len(self.keys)
+        self.finish = [NO_DATE] * n
+        self.driver = [-1] * n
+        evaluate, finish, driver = self._evaluate, self.finish, self.driver
+        for v in self.order:
+            finish[v], driver[v] = evaluate(v)
+        self._backward()
+        return self
+
+    def update(self, changes, today=None):
+        """
+        Apply {key: (duration, own, done, blocked)} and re-evaluate the affected subgraph.
+        Returns the nodes re-evaluated, or None when a key is not in the graph (rebuild).
+        A new `today` re-evaluates every incomplete node.
+        """
+        seeds, durations_changed = [], False
+        for key, attrs in changes.items():
+            v = self.index.get(key)
+            if v is None:
+                return None
+            durations_changed |= attrs[0] != self.duration[v]
+            self.duration[v], self.own[v], self.done[v], self.blocked[v] = attrs
+            if v in self.milestones:
+                self.milestones[v] = attrs[1]
+            seeds.append(v)
+        if today is not None and today != self.today:
+            self.today = today
+            seeds = [v for v in range(len(self.keys)) if self.done[v] is None]
+        position, finish, driver, succs = self.position, self.finish, self.driver, self.succs
+        heap = [(position[v], v) for v in set(seeds)]
+        heapq.heapify(heap)
+        queued = {v for _, v in heap}
+        visited = []
+        while heap:
+            _, v = heapq.heappop(heap)
+            queued.discard(v)
+            visited.append(v)
+            new, driver[v] = self._evaluate(v)
+            if new == finish[v]:
+                continue
+            finish[v] = new
+            here = position[v]
+            for s, _ in succs[v]:
+                if position[s] > here and s not in queued:
+                    queued.add(s)
+                    heapq.heappush(heap, (position[s], s))
+        # latest finishes only depend on durations and the project end
+        if durations_changed or (max(finish) if finish else NO_DATE) != self.end:
+            self._backward()
+        return visited
+
+    def float_days(self, v):
+        return self.latest[v] - self.finish[v]
+
+    def driving_path(self, v, limit=PATH_LIMIT):
+        """Nodes that drove v's finish, root cause first (v itself excluded)."""
+        path = []
+        u = self.driver[v]
+        while u != -1 and len(path) < limit:
+            path.append(u)
+            u = self.driver[u]
+        path.reverse()
+        return path
+
+    def critical_path(self, limit=None):
+        """The driving chain of the node that finishes last, ending with it."""
+        if not self.keys:
+            return []
+        last = max(range(len(self.keys)), key=self.finish.__getitem__)
+        return self.driving_path(last, limit or len(self.keys)) + [last]
+
+    def describe(self, v):
+        kind, node_id = self.keys[v]
+        return [kind, node_id, date.fromordinal(self.finish[v]).isoformat()]
+
+    def projection(self, v):
+        """(projected_date, slip_days, driving_path) as stored on a milestone row."""
+        target, finish = self.milestones[v], self.finish[v]
+        slip = max(0, finish - target) if target != NO_DATE else 0
+        path = json.dumps([self.describe(u) for u in self.driving_path(v)]) if slip else None
+        return date.fromordinal(finish), slip, path
+
+    def milestone_updates(self):
+        """[(projected_date, slip_days, driving_path, milestone_id)] for milestones whose stored projection is stale."""
+        updates = []
+        for v in self.milestones:
+            row = self.projection(v)
+            if self.written.get(v) != row:
+                self.written[v] = row
+                updates.append(row + (self.keys[v][1],))
+        return updates
+
+
+class ScheduleEngine:
+    """Graphs kept between runs, least recently used dropped once they hold more than max_nodes."""
+
+    def __init__(self, max_nodes=2_000_000):
+        self.max_nodes = max_nodes
+        self.graphs = OrderedDict()
+        self.stats = {'builds': 0, 'updates': 0, 'evictions': 0}
+
+    def get(self, project_id):
+        graph = self.graphs.get(project_id)
+        if graph is not None:
+            self.graphs.move_to_end(project_id)
+        return graph
+
+    def put(self, graph):
+        self.graphs[graph.project_id] = graph
+        self.graphs.move_to_end(graph.project_id)
+        total = sum(len(g) for g in self.graphs.values())
+        while total > self.max_nodes and len(self.graphs) > 1:
+            _, dropped = self.graphs.popitem(last=False)
+            total -= len(dropped)
+            self.stats['evictions'] += 1
+
+    def discard(self, project_id):
+        self.graphs.pop(project_id, None)
+
+
+@contextmanager
+def gc_paused():
+    """
+    A 100k-node graph is a few hundred thousand small lists and tuples; left on, the cyclic
+    collector rescans the growing heap while they are allocated and the build stops being
+    linear. Graphs hold no reference cycles, so nothing is left for it afterwards.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def load_graph(cursor, project_id, today):
+    """Read one project (tasks with their linked risk, milestones, dependencies) and run the full pass."""
+    with gc_paused():
+        return _load_graph(cursor, project_id, today)
+
+
+def _load_graph(cursor, project_id, today):
+    graph = ScheduleGraph(project_id, today)
+    cursor.execute(TASKS_SQL.format(where="t.project_id = %s"), (project_id,))
+    for row in cursor.fetchall():
+        graph.add_node((TASK, row['id']), *task_node(row))
+    cursor.execute(MILESTONES_SQL.format(where="project_id = %s"), (project_id,))
+    for row in cursor.fetchall():
+        v = graph.add_node((MILESTONE, row['id']), *milestone_node(row))
+        projected = row['projected_date']
+        graph.written[v] = (date.fromordinal(ordinal(projected)) if projected is not None else None,
+                            int(row['slip_days'] or 0), row['driving_path'])
+    cursor.execute(DEPENDENCIES_SQL, (project_id,))
+    for row in cursor.fetchall():
+        graph.add_edge((row['predecessor_type'], row['predecessor_id']),
+                       (row['successor_type'], row['successor_id']), int(row['lag_days'] or 0))
+    graph.signature = graph_signature(cursor, project_id)
+    return graph.compute()
+
+
+def graph_signature(cursor, project_id):
+    cursor.execute(SIGNATURE_SQL, (project_id,) * 4)
+    row = cursor.fetchone()
+    return tuple(int(row[k]) for k in ('edges', 'edge_ids', 'tasks', 'milestones'))
+
+
+def changed_nodes(cursor, since, until):
+    """{project_id: {key: attrs}} for tasks, risk-linked tasks and milestones written in (since, until]."""
+    changes = {}
+    for sql, params, key_type, attrs in (
+        (TASKS_SQL.format(where="t.updated_at > %s AND t.updated_at <= %s"), (since, until), TASK, task_node),
+        # a risk edit moves every task linked to it
+        (TASKS_SQL.format(where="r.last_updated > %s AND r.last_updated <= %s"), (since, until), TASK, task_node),
+        (MILESTONES_SQL.format(where="updated_at > %s AND updated_at <= %s"), (since, until), MILESTONE,
+         milestone_node),
+    ):
+        cursor.execute(sql, params)
+        for row in cursor.fetchall():
+            changes.setdefault(row['project_id'], {})[(key_type, row['id'])] = attrs(row)
+    return changes
+
+
+def write_projections(cursor, updates):
+    # updated_at = updated_at: these writes must not look like edits to the next incremental run
+    for start in range(0, len(updates), CHUNK):
+        cursor.executemany("UPDATE milestones SET projected_date = %s, slip_days = %s, driving_path = %s, "
+                           "updated_at = updated_at WHERE id = %s", updates[start:start + CHUNK])
+
+
+def schedule_project(cursor, engine, project_id, today, changes=None):
+    """
+    Bring one project's graph up to date and write stale milestone projections. Uses the
+    cached graph when its dependencies are unchanged, else rebuilds. Returns (nodes evaluated, rows written).
+    """
+    graph = engine.get(project_id)
+    if graph is not None and changes is not None and graph_signature(cursor, project_id) == graph.signature:
+        visited = graph.update(changes, today)
+        if visited is not None:
+            engine.stats['updates'] += 1
+            # all milestones: a driving path can change under an unchanged finish
+            updates = graph.milestone_updates()
+            write_projections(cursor, updates)
+            return len(visited), len(updates)
+    graph = load_graph(cursor, project_id, today)
+    engine.put(graph)
+    engine.stats['builds'] += 1
+    updates = graph.milestone_updates()
+    write_projections(cursor, updates)
+    return len(graph), len(updates)
+
+
+def run_once(conn, engine, full=False):
+    """
+    One pass. The first run (or full=True) schedules every project with milestones. Later
+    runs take the projects with changed tasks, risks, milestones or dependencies, plus every
+    project with open milestones when the day has turned (incomplete work moves with today).
+    """
+    cursor = conn.cursor(dictionary=True)
+    since = None if full else read_watermark(cursor, JOB_NAME)
+    cursor.close()
+    enterprises = set()
+
+    def work(cursor):
+        started = time.perf_counter()
+        until = db_now(cursor)
+        today = until.date().toordinal()
+        if since is None:
+            cursor.execute("SELECT DISTINCT project_id FROM milestones")
+            plan = {row['project_id']: None for row in cursor.fetchall()}
+        else:
+            plan = changed_nodes(cursor, since, until)
+            cursor.execute("SELECT DISTINCT project_id FROM schedule_dependencies "
+                           "WHERE created_at > %s AND created_at <= %s", (since, until))
+            for row in cursor.fetchall():
+                engine.discard(row['project_id'])
+                plan.setdefault(row['project_id'], {})
+            if until.date() > since.date():
+                cursor.execute("SELECT DISTINCT project_id FROM milestones WHERE status <> 'Completed'")
+                for row in cursor.fetchall():
+                    plan.setdefault(row['project_id'], {})
+        evaluated = written = 0
+        for project_id, changes in plan.items():
+            nodes, rows = schedule_project(cursor, engine, project_id, today, changes)
+            evaluated += nodes
+            written += rows
+        if written:
+            enterprises.update(enterprises_of(cursor, plan))
+        duration_ms = int((time.perf_counter() - started) * 1000)
+        save_run(cursor, JOB_NAME, since, until, len(plan), duration_ms)
+        record = {'since': since, 'until': until, 'projects': len(plan), 'evaluated': evaluated,
+                  'written': written, 'duration_ms': duration_ms}
+        log.info("schedule run: %s", record)
+        return record
+    try:
+        record = with_lock(conn, JOB_NAME, work, dictionary=True)
+    except Exception:
+        engine.graphs.clear()  # they hold projections the rollback just undid
+        raise
+    notify_enterprises(enterprises, 'milestones')  # empty unless the run committed
+    return record
+
+
+def add_dependency(cursor, project_id, predecessor, successor, lag_days=0):
+    """
+    Insert one edge; predecessor / successor are (type, id) of this project's tasks or
+    milestones. Returns the new id, or None when either end is not in the project.
+    """
+    for node_type, node_id in (predecessor, successor):
+        table = 'tasks' if node_type == TASK else 'milestones'
+        cursor.execute(f"SELECT id FROM {table} WHERE id = %s AND project_id = %s", (node_id, project_id))
+        if not cursor.fetchone():
+            return None
+    cursor.execute("""
+        INSERT INTO schedule_dependencies (project_id, predecessor_type, predecessor_id, successor_type,
+                                           successor_id, lag_days, created_at)
+        VALUES (%s, %s, %s, %s, %s, %s, NOW())
+    """, (project_id, predecessor[0], predecessor[1], successor[0], successor[1], int(lag_days)))
+    return cursor.lastrowid
+
+
+def remove_dependency(cursor, dependency_id, project_id):
+    """Delete one edge and touch its successor so the next incremental run rebuilds the project."""
+    cursor.execute("SELECT successor_type, successor_id FROM schedule_dependencies WHERE id = %s AND project_id = %s",
+                   (dependency_id, project_id))
+    row = cursor.fetchone()
+    if not row:
+        return False
+    cursor.execute("DELETE FROM schedule_dependencies WHERE id = %s", (dependency_id,))
+    table = 'tasks' if row['successor_type'] == TASK else 'milestones'
+    cursor.execute(f"UPDATE {table} SET updated_at = NOW() WHERE id = %s", (row['successor_id'],))
+    return True
+
+
+def impacted_milestones(cursor, pm_user_id, enterprise_id, limit=20):
+    """Open milestones of this PM's projects projected past their target, largest slip first."""
+    cursor.execute(IMPACTED_SQL, (pm_user_id, enterprise_id, limit))
+    rows = cursor.fetchall() or []
+    for row in rows:
+        path = json.loads(row.pop('driving_path') or '[]')
+        row['cause'] = {'type': path[0][0], 'id': path[0][1], 'projected': path[0][2]} if path else None
+        row['path_length'] = len(path)
+        for key in ('target_date', 'projected_date'):
+            row[key] = str(row[key])[:10] if row[key] is not None else None
+    return rows
+
+
+def milestone_path(cursor, milestone_id, enterprise_id):
+    """A milestone's stored driving path with titles, statuses and linked risks; None if not in the enterprise."""
+    cursor.execute("""
+        SELECT m.id, m.title, m.project_id, m.target_date, m.projected_date, m.slip_days, m.driving_path
+        FROM milestones m JOIN projects p ON p.id = m.project_id
+        WHERE m.id = %s AND p.enterprise_id = %s
+    """, (milestone_id, enterprise_id))
+    milestone = cursor.fetchone()
+    if not milestone:
+        return None
+    path = json.loads(milestone.pop('driving_path') or '[]')
+    details = {}
+    for node_type, sql in ((TASK, "SELECT t.id, t.title, t.status, t.due_date, t.risk_id, r.title AS risk_title "
+                                  "FROM tasks t LEFT JOIN risks r ON r.id = t.risk_id WHERE t.id IN ({ids})"),
+                           (MILESTONE, "SELECT id, title, status, target_date FROM milestones WHERE id IN ({ids})")):
+        ids = [node_id for kind, node_id, _ in path if kind == node_type]
+        if ids:
+            cursor.execute(sql.format(ids=', '.join(['%s'] * len(ids))), ids)
+            details.update({(node_type, row['id']): row for row in cursor.fetchall()})
+    steps = []
+    for node_type, node_id, projected in path:
+        step = dict(details.get((node_type, node_id), {'id': node_id}), type=node_type, projected=projected)
+        for key in ('due_date', 'target_date'):
+            if step.get(key) is not None:
+                step[key] = str(step[key])[:10]
+        steps.append(step)
+    for key in ('target_date', 'projected_date'):
+        milestone[key] = str(milestone[key])[:10] if milestone[key] is not None else None
+    return dict(milestone, path=steps)
+
+
+class ScheduleScheduler(JobScheduler):
+    """Background thread calling run_once every `interval` seconds with one long-lived ScheduleEngine."""
+    name = 'schedule-graph'
+
+    def __init__(self, connect, interval=60, engine=None):
+        super().__init__(connect, interval)
+        self.engine = engine or ScheduleEngine(int(os.getenv('SCHEDULE_GRAPH_NODES', '2000000')))
+
+    def run(self, conn):
+        run_once(conn, self.engine)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--once', action='store_true', help='run a single incremental pass and exit (cron)')
+    parser.add_argument('--full', action='store_true', help='schedule every project and exit')
+    parser.add_argument('--project', type=int, help="print this project's critical path and impacted milestones")
+    parser.add_argument('--interval', type=int, default=60)
+    parser.add_argument('--sqlite', help='SQLite file instead of MySQL')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    connect = connector(args.sqlite)
+    if args.project:
+        conn = connect()
+        cursor = conn.cursor(dictionary=True)
+        today = db_now(cursor).date().toordinal()
+        started = time.perf_counter()
+        graph = load_graph(cursor, args.project, today)
+        print(f"project {args.project}: {len(graph):,} nodes in {(time.perf_counter() - started) * 1000:.0f}ms, "
+              f"finishes {date.fromordinal(graph.end)}")
+        for v in graph.critical_path(limit=PATH_LIMIT):
+            kind, node_id, projected = graph.describe(v)
+            print(f"   {kind:<9} {node_id:>9}  {projected}  float {graph.float_days(v)}")
+        for v in graph.milestones:
+            projected, slip, _ = graph.projection(v)
+            if slip:
+                print(f"   milestone {graph.keys[v][1]} slips {slip} day(s) to {projected}")
+        cursor.close()
+        conn.close()
+        return
+    if args.once or args.full:
+        conn = connect()
+        try:
+            record = run_once(conn, ScheduleEngine(), full=args.full)
+        finally:
+            conn.close()
+        if record is None:
+            print("⏭️  another run holds the lock")
+        else:
+            print(f"✅ {record['projects']} project(s), {record['evaluated']:,} node(s) evaluated, "
+                  f"{record['written']} milestone(s) written in {record['duration_ms']}ms")
+        return
+    serve(ScheduleScheduler(connect, args.interval).start())
+
+
+if __name__ == '__main__':
+    main()
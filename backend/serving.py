@@ -0,0 +1,95 @@
+# ===== PRODUCTION SERVING: WARM-UP, READINESS, DRAIN =====
+import logging
+import os
+import signal
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+
+class ServingState:
+    """
+    Per-process readiness. A worker is ready once warm_up() has finished and stops being
+    ready as soon as it starts draining, so the load balancer takes it out of rotation
+    while it is still answering the requests already routed to it.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.draining = False
+        self.warmup = {}
+        self.started_at = time.time()
+
+    def snapshot(self):
+        return {'pid': os.getpid(), 'ready': self.ready, 'draining': self.draining,
+                'uptime_s': round(time.time() - self.started_at, 1), 'warmup_ms': self.warmup}
+
+
+state = ServingState()
+
+
+def warm_up(app, db_pool, connections=None):
+    """
+    Open `connections` pooled DB connections (default DB_POOL_WARM, else the pool size) and
+    load every template so the first requests neither connect nor compile. Marks the
+    process ready; a DB failure is logged and left to readiness() to report.
+    """
+    t0 = time.perf_counter()
+    try:
+        opened = db_pool.warm(connections or int(os.getenv('DB_POOL_WARM', '0')) or None)
+    except Exception as e:
+        opened = 0
+        log.error("connection pool warm-up failed: %s", e)
+    t1 = time.perf_counter()
+    templates = [name for name in app.jinja_env.list_templates() if name.endswith('.html')]
+    for name in templates:
+        app.jinja_env.get_template(name)
+    t2 = time.perf_counter()
+    state.warmup = {'connections': opened, 'pool': round((t1 - t0) * 1000, 1),
+                    'templates': len(templates), 'compile': round((t2 - t1) * 1000, 1)}
+    state.ready = True
+    return state.warmup
+
+
+def readiness(db_pool):
+    """(payload, status) for the readiness probe: 503 until warmed, while draining or without a DB."""
+    payload = state.snapshot()
+    if not state.ready or state.draining:
+        return payload, 503
+    conn = None
+    try:
+        conn = db_pool.acquire()
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+        cursor.close()
+    except Exception as e:
+        payload['database'] = str(e)
+        return payload, 503
+    finally:
+        if conn is not None:
+            conn.close()
+    payload['database'] = 'ok'
+    return payload, 200
+
+
+def install_drain(seconds):
+    """
+    Delay this process's SIGTERM handling by `seconds`: readiness turns 503 at once while
+    requests keep being served, then the original handler runs (the server's graceful stop).
+    A second SIGTERM during the drain goes straight to the original handler.
+    """
+    original = signal.getsignal(signal.SIGTERM)
+
+    def on_term(signum, frame):
+        state.draining = True
+        log.info("pid %s draining for %ss", os.getpid(), seconds)
+        if not seconds or not callable(original):
+            return original(signum, frame) if callable(original) else None
+        timer = threading.Timer(seconds, os.kill, (os.getpid(), signal.SIGTERM))
+        timer.daemon = True
+        signal.signal(signal.SIGTERM, original)
+        timer.start()
+
+    signal.signal(signal.SIGTERM, on_term)
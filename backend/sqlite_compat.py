@@ -0,0 +1,142 @@
+# ===== SQLITE STAND-IN FOR LOCAL RUNS =====
+# Lets the app, benchmarks and data generator run against a SQLite file with
+# the same schema as MySQL. Only the subset of MySQL the app uses is covered.
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+
+sqlite3.register_adapter(datetime, lambda v: v.isoformat(' '))
+sqlite3.register_adapter(date, lambda v: v.isoformat())
+sqlite3.register_converter('DATETIME', lambda b: datetime.fromisoformat(b.decode()))
+sqlite3.register_converter('DATE', lambda b: date.fromisoformat(b.decode()[:10]))
+
+_PLACEHOLDER = re.compile(r'%s')
+_FOR_UPDATE = re.compile(r'\s+FOR UPDATE\s*$', re.IGNORECASE)
+_INSERT = re.compile(r'\s*INSERT\b', re.IGNORECASE)
+
+
+def translate(sql):
+    # SQLite has one writer at a time, so row locks are implied by the write transaction
+    return _PLACEHOLDER.sub('?', _FOR_UPDATE.sub('', sql))
+
+
+class Cursor:
+    """mysql.connector-style cursor: %s placeholders, optional dict rows."""
+
+    def __init__(self, conn, dictionary=False):
+        self._conn = conn
+        self._cur = conn._db.cursor()
+        self.dictionary = dictionary
+        self._first_id = None
+
+    def _row(self, row):
+        if row is None or not self.dictionary:
+            return row
+        return dict(zip([d[0] for d in self._cur.description], row))
+
+    def execute(self, sql, params=None):
+        self._cur.execute(translate(sql), tuple(params or ()))
+        self._first_id = None
+        if self._cur.rowcount > 1 and _INSERT.match(sql):
+            # MySQL reports the first id of a multi-row INSERT, SQLite the last; the ids are consecutive
+            self._first_id = self._cur.lastrowid - self._cur.rowcount + 1
+        return self
+
+    def executemany(self, sql, rows):
+        self._first_id = None
+        self._cur.executemany(translate(sql), rows)
+        return self
+
+    def fetchone(self):
+        return self._row(self._cur.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._row(r) for r in self._cur.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(r) for r in self._cur.fetchall()]
+
+    @property
+    def rowcount(self):
+        return self._cur.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._first_id if self._first_id is not None else self._cur.lastrowid
+
+    @property
+    def description(self):
+        return self._cur.description
+
+    def close(self):
+        self._cur.close()
+
+
+class Connection:
+    def __init__(self, path):
+        self._db = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES,
+                                   check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        # deterministic lets SQLite evaluate them once per statement, like MySQL, instead of per row
+        self._db.create_function('NOW', 0, lambda: datetime.now().isoformat(' ', 'seconds'), deterministic=True)
+        self._db.create_function('CURDATE', 0, lambda: date.today().isoformat(), deterministic=True)
+        self._db.create_function('DATEDIFF', 2, _datediff, deterministic=True)
+        self._db.create_function('GET_LOCK', 2, _get_lock)
+        self._db.create_function('RELEASE_LOCK', 1, _release_lock)
+
+    def cursor(self, dictionary=False, buffered=None, **kwargs):
+        return Cursor(self, dictionary)
+
+    @property
+    def in_transaction(self):
+        return self._db.in_transaction
+
+    def start_transaction(self):
+        self._db.execute('BEGIN')
+
+    def commit(self):
+        if self._db.in_transaction:
+            self._db.execute('COMMIT')
+
+    def rollback(self):
+        if self._db.in_transaction:
+            self._db.execute('ROLLBACK')
+
+    def ping(self, reconnect=False):
+        self._db.execute('SELECT 1')
+
+    def consume_results(self):
+        pass
+
+    def close(self):
+        self._db.close()
+
+
+def _datediff(a, b):
+    if a is None or b is None:
+        return None
+    return (date.fromisoformat(str(a)[:10]) - date.fromisoformat(str(b)[:10])).days
+
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _get_lock(name, timeout):
+    with _locks_guard:
+        lock = _locks.setdefault(name, threading.Lock())
+    return 1 if lock.acquire(blocking=False) else 0
+
+
+def _release_lock(name):
+    lock = _locks.get(name)
+    if lock and lock.locked():
+        lock.release()
+        return 1
+    return 0
+
+
+def connect(path):
+    return Connection(path)
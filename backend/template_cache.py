@@ -0,0 +1,112 @@
+# ===== TEMPLATE CACHING =====
+import os
+import uuid
+
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+
+from backend.cache import TTLCache, backend_from_env
+
+
+def bytecode_cache_from_env(root):
+    """
+    On-disk cache of compiled templates so a fresh worker loads bytecode instead of
+    re-parsing. TEMPLATE_BYTECODE_DIR (default <root>/instance/jinja_bytecode); empty disables.
+    Entries are keyed by template name and checked against the source mtime on load.
+    """
+    directory = os.getenv('TEMPLATE_BYTECODE_DIR', os.path.join(root, 'instance', 'jinja_bytecode'))
+    if not directory:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    return FileSystemBytecodeCache(directory)
+
+
+class FragmentCache:
+    """
+    Rendered template fragments over a TTLCache. Every key carries a token for its scope
+    (the first vary value, usually an enterprise id) and a global token; invalidating
+    replaces the token, so old fragments are never read again and simply age out.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def _token(self, scope):
+        token = self.cache.backend.get(self.cache._key(f'token:{scope}'))
+        if token is None:
+            token = uuid.uuid4().hex[:12]
+            self.cache.backend.set(self.cache._key(f'token:{scope}'), token, 86400)
+        return token
+
+    def key(self, template, name, vary):
+        scope = vary[0] if vary else '-'
+        parts = ':'.join(str(v) for v in vary)
+        return f'{self._token("*")}:{self._token(scope)}:{template}:{name}:{parts}'
+
+    def fetch(self, template, name, vary, ttl, render):
+        key = self.key(template, name, vary)
+        value = self.cache.get(key)
+        if value is None:
+            value = render()
+            self.cache.set(key, value, ttl)
+        return value
+
+    def invalidate(self, scope=None):
+        """Drop the fragments of one scope (e.g. an enterprise id), or all of them."""
+        self.cache.backend.delete(self.cache._key(f'token:{"*" if scope is None else scope}'))
+
+    def stats(self):
+        return self.cache.stats()
+
+
+def fragment_cache_from_env():
+    """FRAGMENT_CACHE_SIZE entries, default TTL FRAGMENT_CACHE_TTL seconds (0 disables the tag)."""
+    ttl = int(os.getenv('FRAGMENT_CACHE_TTL', '300'))
+    if ttl <= 0:
+        return None
+    return FragmentCache(TTLCache(backend_from_env(int(os.getenv('FRAGMENT_CACHE_SIZE', '2048'))),
+                                  ttl=ttl, namespace='fragment'))
+
+
+class FragmentCacheExtension(Extension):
+    """
+    {% cache 'sidebar' %}...{% endcache %}                              same for every request
+    {% cache 'overview', current_user.enterprise_id, ttl=60 %}...{% endcache %}
+
+    The template name is part of the key, so the same fragment name can be reused across
+    templates. Vary values after the name pick the variant; the first one is the scope
+    that FragmentCache.invalidate() drops. Renders uncached when no cache is configured.
+    """
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        name = parser.parse_expression()
+        vary, ttl = [], nodes.Const(None)
+        while parser.stream.skip_if('comma'):
+            if parser.stream.current.test('name:ttl') and parser.stream.look().test('assign'):
+                parser.stream.skip(2)
+                ttl = parser.parse_expression()
+            else:
+                vary.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        call = self.call_method('_render', [nodes.Const(parser.name), name, nodes.List(vary), ttl])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render(self, template, name, vary, ttl, caller):
+        cache = self.environment.fragment_cache
+        if cache is None:
+            return caller()
+        return cache.fetch(template, name, vary, ttl, caller)
+
+
+def install(jinja_env, root, fragment_cache=None):
+    """Attach the bytecode cache and the {% cache %} tag to an (unused) Jinja environment."""
+    jinja_env.bytecode_cache = bytecode_cache_from_env(root)
+    jinja_env.add_extension(FragmentCacheExtension)
+    jinja_env.fragment_cache = fragment_cache
+    return jinja_env
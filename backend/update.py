@@ -11,17 +11,21 @@ def get_breadcrumbs(role, page):
         base.append({'title': f'{role.title()} Dashboard', 'url': f'/{role}-dashboard'})
     return base
 
-def get_analyst_dashboard_data(mysql):
-    """Analyst analytics data"""
+def get_analyst_dashboard_data(mysql, enterprise_id):
+    """Analyst analytics data for one enterprise, read from the daily risk rollups"""
     try:
         cur = mysql.connection.cursor()
-        cur.execute("SELECT COUNT(*) as total FROM risks WHERE status != 'Resolved'")
-        active_risks = cur.fetchone()['total']
-        cur.execute("SELECT COUNT(*) as high FROM risks WHERE risk_score > 3")
-        high_risks = cur.fetchone()['high']
-        cur.execute("SELECT rag_status, COUNT(*) as count FROM risks WHERE status != 'Resolved' GROUP BY rag_status")
-        rag_data = cur.fetchall()
+        cur.execute("""
+            SELECT value AS rag_status, SUM(open_risks) AS count, SUM(high_risks) AS high
+            FROM risk_daily_rollups
+            WHERE enterprise_id = %s AND project_id = 0 AND dimension = 'rag_status'
+            GROUP BY value
+        """, (enterprise_id,))
+        rows = cur.fetchall()
         cur.close()
-        return {'active_risks': active_risks, 'high_risks': high_risks, 'rag_data': rag_data}
+        rag_data = [{'rag_status': r['rag_status'], 'count': int(r['count'])} for r in rows if r['count']]
+        return {'active_risks': sum(r['count'] for r in rag_data),
+                'high_risks': sum(int(r['high']) for r in rows),
+                'rag_data': rag_data}
     except:
         return {'active_risks': 0, 'high_risks': 0, 'rag_data': []}
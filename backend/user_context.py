@@ -0,0 +1,99 @@
+# ===== CURRENT-USER TEMPLATE CONTEXT =====
+import os
+import re
+
+from backend.cache import MemoryBackend, TTLCache
+
+# process-wide LRU of user + enterprise records keyed by user_id; the TTL only bounds
+# staleness across worker processes, invalidate_user() handles changes made here
+user_cache = TTLCache(
+    MemoryBackend(int(os.getenv('USER_CACHE_SIZE', '2048'))),
+    ttl=int(os.getenv('USER_CACHE_TTL', '300')),
+    namespace='user'
+)
+
+USER_CONTEXT_SQL = """
+    SELECT u.id, u.username, u.role, u.email, u.enterprise_id, u.is_active, u.projects_assigned,
+           e.name AS enterprise_name
+    FROM users u LEFT JOIN enterprises e ON e.id = u.enterprise_id
+    WHERE u.id = %s
+"""
+
+LED_PROJECTS_SQL = """
+    SELECT id FROM projects
+    WHERE enterprise_id = %s AND (pm_user_id = %s OR team_lead_id = %s)
+"""
+
+_IDS = re.compile(r'\d+')
+
+
+class UserContext:
+    """What templates see as `current_user`; one instance per request, shared record per user."""
+    __slots__ = ('user_id', 'username', 'role', 'email', 'enterprise_id', 'enterprise_name',
+                 'project_ids', 'is_authenticated')
+
+    def __init__(self, user_id=None, username='Guest', role='Guest', email=None, enterprise_id=None,
+                 enterprise_name=None, project_ids=(), is_authenticated=False):
+        self.user_id = user_id
+        self.username = username
+        self.role = role
+        self.email = email
+        self.enterprise_id = enterprise_id
+        self.enterprise_name = enterprise_name
+        self.project_ids = project_ids
+        self.is_authenticated = is_authenticated
+
+    def __repr__(self):
+        return f'<UserContext {self.user_id} {self.username!r} {self.role}>'
+
+
+GUEST = UserContext()
+
+
+def fetch_user_record(cursor, user_id):
+    """User row joined with its enterprise plus assigned / led project ids, or None."""
+    cursor.execute(USER_CONTEXT_SQL, (user_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    project_ids = {int(pid) for pid in _IDS.findall(row.get('projects_assigned') or '')}
+    if row.get('enterprise_id') is not None:
+        cursor.execute(LED_PROJECTS_SQL, (row['enterprise_id'], user_id, user_id))
+        project_ids.update(r['id'] for r in cursor.fetchall())
+    return {
+        'username': row['username'],
+        'role': row['role'],
+        'email': row['email'],
+        'enterprise_id': row['enterprise_id'],
+        'enterprise_name': row['enterprise_name'],
+        'project_ids': tuple(sorted(project_ids)),
+    }
+
+
+def load_user_context(session, get_cursor):
+    """
+    Build the request's UserContext from the cached record, hitting the DB only on a miss.
+    Falls back to the session values when the DB is unavailable or the row is gone.
+    """
+    user_id = session.get('user_id')
+    if user_id is None:
+        return GUEST
+    record = user_cache.get(user_id)
+    if record is None:
+        cursor, conn = get_cursor()
+        if cursor:
+            try:
+                record = fetch_user_record(cursor, user_id)
+            finally:
+                cursor.close()
+                conn.close()
+        if record is None:
+            return UserContext(user_id, session.get('username', 'Admin'), session.get('role', 'Admin'),
+                               enterprise_id=session.get('enterprise_id'), is_authenticated=True)
+        user_cache.set(user_id, record)
+    return UserContext(user_id, is_authenticated=True, **record)
+
+
+def invalidate_user(user_id):
+    """Call after updating a users row (or the projects it is assigned to)."""
+    user_cache.invalidate(user_id)
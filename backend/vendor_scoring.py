@@ -0,0 +1,262 @@
+"""
+Vendor risk scores. One aggregate query per pass reads every vendor in scope with its
+linked risks (risks.vendor_id) and delivery data; the scores are computed as whole NumPy
+columns and only vendors whose score or enterprise changed are written back. Incremental
+runs rescore the vendors whose linked risks or delivery fields changed since the
+watermark, plus, once per day, the vendors whose delivery lag grew overnight.
+
+    python backend/vendor_scoring.py --full          # rescore every vendor
+    python backend/vendor_scoring.py --once          # cron mode
+    python backend/vendor_scoring.py --interval 300  # loop in the foreground
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.pagination import encode_cursor
+from backend.risk_scoring import ScoringInputError, _number
+from backend.jobs import (JobScheduler, connector, db_now, notify_enterprises, read_watermark, save_run, serve,
+                         with_lock)
+
+log = logging.getLogger('risk_sentinel.vendor_scores')
+
+JOB_NAME = 'vendor_scores'
+CHUNK = 500
+QUALITY_PENALTY = {'Poor': 1.0, 'Fair': 0.5}
+
+# {scope} narrows the pass to a set of vendor ids; a vendor without linked risks still gets a row
+VENDOR_INPUTS_SQL = """
+    SELECT v.id, p.enterprise_id, v.enterprise_id AS scored_enterprise_id, v.risk_score,
+           v.delivery_timeline, v.completion_percent, v.quality_status,
+           COALESCE(SUM(CASE WHEN r.status NOT IN ('Mitigated', 'Closed') THEN 1 ELSE 0 END), 0) AS open_risks,
+           AVG(CASE WHEN r.status NOT IN ('Mitigated', 'Closed') THEN r.risk_score END) AS mean_score,
+           MAX(CASE WHEN r.status NOT IN ('Mitigated', 'Closed') THEN r.risk_score END) AS max_score,
+           COALESCE(SUM(CASE WHEN r.status NOT IN ('Mitigated', 'Closed') AND r.vendor_status <> 'approved'
+                             THEN 1 ELSE 0 END), 0) AS unapproved
+    FROM vendors v
+    LEFT JOIN projects p ON p.id = v.assigned_project_id
+    LEFT JOIN risks r ON r.vendor_id = v.id
+    {scope}
+    GROUP BY v.id, p.enterprise_id, v.enterprise_id, v.risk_score, v.delivery_timeline,
+             v.completion_percent, v.quality_status
+"""
+
+RISKIEST_SQL = """
+    SELECT v.id, v.company_name, v.assigned_project_id AS project_id, v.risk_score, v.completion_percent,
+           v.delivery_timeline, v.quality_status, v.status
+    FROM vendors v
+    WHERE {where}
+    ORDER BY v.risk_score DESC, v.id DESC
+    LIMIT %s
+"""
+
+
+@dataclass
+class VendorScoringConfig:
+    """
+    score (0-5) = w_exposure * (mean + max) / 2 of the open linked risks' risk_score
+                + w_volume * 5 * min(open linked risks / volume_cap, 1)
+                + w_unapproved * 5 * share of open linked risks not yet approved
+                + w_lag * 5 * min(days past delivery_timeline while incomplete / lag_cap, 1)
+                + w_quality * 5 * quality penalty (Poor 1, Fair 0.5)
+    """
+    w_exposure: float = 0.45
+    w_volume: float = 0.15
+    w_unapproved: float = 0.10
+    w_lag: float = 0.20
+    w_quality: float = 0.10
+    volume_cap: float = 10.0
+    lag_cap: float = 60.0
+
+    @classmethod
+    def from_env(cls, **overrides):
+        values = {}
+        for name in cls.__dataclass_fields__:
+            env = os.getenv('VENDOR_SCORE_' + name.upper())
+            if env is not None:
+                values[name] = _number('VENDOR_SCORE_' + name.upper(), env)
+        values.update({k: _number(k, v) for k, v in overrides.items() if k in cls.__dataclass_fields__})
+        for cap in ('volume_cap', 'lag_cap'):
+            if values.get(cap, 1.0) <= 0:
+                raise ScoringInputError(f'{cap} must be positive')
+        return cls(**values)
+
+
+def _day(value):
+    if value is None or isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def score_rows(rows, today, config=None):
+    """Scores for VENDOR_INPUTS_SQL rows (tuples), as one float64 array."""
+    config = config or VendorScoringConfig()
+    n = len(rows)
+
+    def column(idx):
+        return np.fromiter((np.nan if r[idx] is None else r[idx] for r in rows), dtype=np.float64, count=n)
+
+    open_risks, mean, top, unapproved = column(7), column(8), column(9), column(10)
+    completion = np.nan_to_num(column(5))
+    exposure = np.clip((np.nan_to_num(mean) + np.nan_to_num(top)) / 2.0, 0.0, 5.0)
+    volume = np.clip(open_risks / config.volume_cap, 0.0, 1.0)
+    pending = np.divide(unapproved, open_risks, out=np.zeros(n), where=open_risks > 0)
+    late = np.fromiter(((today - _day(r[4])).days if r[4] is not None else 0 for r in rows),
+                       dtype=np.float64, count=n)
+    lag = np.where(completion < 100, np.clip(late / config.lag_cap, 0.0, 1.0), 0.0)
+    quality = np.fromiter((QUALITY_PENALTY.get(r[6], 0.0) for r in rows), dtype=np.float64, count=n)
+    score = (config.w_exposure * exposure
+             + 5.0 * (config.w_volume * volume + config.w_unapproved * pending
+                      + config.w_lag * lag + config.w_quality * quality))
+    return np.round(score, 2)
+
+
+def in_list(values):
+    return ', '.join(['%s'] * len(values))
+
+
+def load_inputs(cursor, vendor_ids=None):
+    """VENDOR_INPUTS_SQL rows for `vendor_ids` (in chunks) or for every vendor."""
+    if vendor_ids is None:
+        cursor.execute(VENDOR_INPUTS_SQL.format(scope=''))
+        return cursor.fetchall()
+    ids, rows = sorted(vendor_ids), []
+    for start in range(0, len(ids), CHUNK):
+        chunk = ids[start:start + CHUNK]
+        cursor.execute(VENDOR_INPUTS_SQL.format(scope=f"WHERE v.id IN ({in_list(chunk)})"), chunk)
+        rows.extend(cursor.fetchall())
+    return rows
+
+
+def rescore(cursor, vendor_ids, today, config=None):
+    """
+    Score `vendor_ids` (None = all) and write the rows that changed.
+    Returns (scored, written, enterprise_ids of the written vendors, before and after).
+    """
+    rows = load_inputs(cursor, vendor_ids)
+    if not rows:
+        return 0, 0, set()
+    score = score_rows(rows, today, config)
+    old = np.fromiter((-1.0 if r[3] is None else r[3] for r in rows), dtype=np.float64, count=len(rows))
+    # risk_score is DOUBLE and scores are rounded to 2 decimals; smaller gaps are float noise
+    moved = np.abs(old - score) > 0.004
+    changed = [(r, s) for r, s, m in zip(rows, score.tolist(), moved) if m or r[1] != r[2]]
+    updates = [(float(s), r[1], r[0]) for r, s in changed]
+    for start in range(0, len(updates), CHUNK):
+        # keep updated_at (ON UPDATE CURRENT_TIMESTAMP): changed_vendors() reads it as "edited",
+        # and a score write counting as an edit would queue the vendor again on every run
+        cursor.executemany("UPDATE vendors SET risk_score = %s, enterprise_id = %s, updated_at = updated_at "
+                           "WHERE id = %s", updates[start:start + CHUNK])
+    return len(rows), len(updates), {e for r, _ in changed for e in (r[1], r[2]) if e is not None}
+
+
+def changed_vendors(cursor, since, until, config=None):
+    """Vendors to rescore for writes in (since, until] and for lag that grew since `since`'s day."""
+    config = config or VendorScoringConfig()
+    cursor.execute("""
+        SELECT DISTINCT vendor_id FROM risks
+        WHERE last_updated > %s AND last_updated <= %s AND vendor_id IS NOT NULL
+    """, (since, until))
+    ids = {row[0] for row in cursor.fetchall()}
+    cursor.execute("SELECT id FROM vendors WHERE updated_at > %s AND updated_at <= %s", (since, until))
+    ids.update(row[0] for row in cursor.fetchall())
+    cursor.execute("SELECT id FROM vendors WHERE enterprise_id IS NULL")
+    ids.update(row[0] for row in cursor.fetchall())
+    if until.date() > since.date():
+        # lag = today - delivery_timeline grows daily until it reaches lag_cap
+        cursor.execute("SELECT id FROM vendors WHERE delivery_timeline >= %s AND delivery_timeline < %s",
+                       (since.date() - timedelta(days=int(config.lag_cap) + 1), until.date()))
+        ids.update(row[0] for row in cursor.fetchall())
+    return ids
+
+
+def run_once(conn, full=False, config=None):
+    """
+    One pass. The first run (or full=True) rescores every vendor in a single aggregate;
+    later runs only the vendors changed_vendors() reports. Vendors whose linked risk moved
+    to another vendor are not seen by the old vendor until its next write or a full pass.
+    """
+    config = config or VendorScoringConfig.from_env()
+    cursor = conn.cursor()
+    since = None if full else read_watermark(cursor, JOB_NAME)
+    cursor.close()
+    enterprises = set()
+
+    def work(cursor):
+        started = time.perf_counter()
+        until = db_now(cursor)
+        ids = None if since is None else changed_vendors(cursor, since, until, config)
+        scored, written, touched = rescore(cursor, ids, until.date(), config) if ids is None or ids else (0, 0, set())
+        enterprises.update(touched)
+        duration_ms = int((time.perf_counter() - started) * 1000)
+        save_run(cursor, JOB_NAME, since, until, scored, duration_ms)
+        record = {'since': since, 'until': until, 'scored': scored, 'written': written, 'duration_ms': duration_ms}
+        log.info("vendor score run: %s", record)
+        return record
+    record = with_lock(conn, JOB_NAME, work)
+    notify_enterprises(enterprises, 'vendors')  # empty unless the run committed
+    return record
+
+
+def riskiest(cursor, enterprise_id, after=None, per_page=25):
+    """
+    One keyset page of an enterprise's vendors by risk_score, highest first, ordered by
+    (risk_score, id). `after` is a decoded (risk_score, id) cursor. Returns (vendors, next_cursor).
+    """
+    where = ["v.enterprise_id = %s"]
+    params = [enterprise_id]
+    if after:
+        where.append("(v.risk_score < %s OR (v.risk_score = %s AND v.id < %s))")
+        params += [after[0], after[0], after[1]]
+    cursor.execute(RISKIEST_SQL.format(where=' AND '.join(where)), (*params, per_page + 1))
+    rows = cursor.fetchall() or []
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    for row in rows:
+        if row['delivery_timeline'] is not None:
+            row['delivery_timeline'] = str(row['delivery_timeline'])[:10]
+    next_cursor = encode_cursor(float(rows[-1]['risk_score'] or 0.0), rows[-1]['id']) if has_more else None
+    return rows, next_cursor
+
+
+class VendorScoreScheduler(JobScheduler):
+    """Background thread calling run_once every `interval` seconds."""
+    name = 'vendor-scores'
+
+    def run(self, conn):
+        run_once(conn)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--once', action='store_true', help='run a single incremental pass and exit (cron)')
+    parser.add_argument('--full', action='store_true', help='rescore every vendor and exit')
+    parser.add_argument('--interval', type=int, default=300)
+    parser.add_argument('--sqlite', help='SQLite file instead of MySQL')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    connect = connector(args.sqlite)
+    if args.once or args.full:
+        conn = connect()
+        try:
+            record = run_once(conn, full=args.full)
+        finally:
+            conn.close()
+        if record is None:
+            print("⏭️  another run holds the lock")
+        else:
+            print(f"✅ scored {record['scored']} vendor(s), wrote {record['written']} in {record['duration_ms']}ms")
+        return
+    serve(VendorScoreScheduler(connect, args.interval).start())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""
+Chat backend benchmark on one room with 1M messages: sustained messages/s through
+the batched writer (fire-and-forget and waiting posters), and history page latency
+for the newest page (ring buffer), keyset pages at several depths, and the OFFSET
+query a naive implementation would use at the same depths.
+
+    python benchmarks/bench_chat.py --sqlite instance/risk_sentinel_chat_bench.db
+    python benchmarks/bench_chat.py            # MySQL via DB_* env vars
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.chat import ChatService, ChatError
+from backend.db_pool import ConnectionPool
+from backend.live_feed import FeedHub, LocalPubSub
+from benchmarks.harness import percentile
+
+OFFSET_SQL = """
+    SELECT m.message_id, m.room_id, m.user_id, m.message, m.created_at
+    FROM chat_messages m
+    WHERE m.room_id = %s
+    ORDER BY m.message_id DESC
+    LIMIT %s OFFSET %s
+"""
+
+
+def seed_room(pool, room_id, total, batch=50000):
+    """Top the room up to `total` messages; returns the room's message count."""
+    conn = pool.acquire()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM chat_messages WHERE room_id = %s", (room_id,))
+        have = cursor.fetchone()[0]
+        if have >= total:
+            return have
+        cursor.execute("SELECT COUNT(*) FROM chat_rooms WHERE room_id = %s", (room_id,))
+        if not cursor.fetchone()[0]:
+            cursor.execute("INSERT INTO chat_rooms (room_id, project_id, name, created_at) VALUES (%s, NULL, %s, %s)",
+                           (room_id, 'bench room', datetime(2026, 1, 1)))
+        cursor.execute("SELECT COALESCE(MAX(message_id), 0) FROM chat_messages")
+        next_id = cursor.fetchone()[0] + 1
+        started = datetime(2026, 1, 1)
+        print(f"seeding {total - have:,} messages into room {room_id} ...")
+        t0 = time.perf_counter()
+        for offset in range(have, total, batch):
+            rows = [(next_id + i, room_id, 1 + i % 25, f'bench message {offset + i}', started + timedelta(seconds=offset + i))
+                    for i in range(min(batch, total - offset))]
+            next_id += len(rows)
+            conn.start_transaction()
+            cursor.executemany("INSERT INTO chat_messages (message_id, room_id, user_id, message, created_at) "
+                               "VALUES (%s, %s, %s, %s, %s)", rows)
+            conn.commit()
+        print(f"seeded in {time.perf_counter() - t0:.1f}s")
+        return total
+    finally:
+        conn.close()
+
+
+def timed(fn, runs):
+    timings = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    return percentile(timings, 50), percentile(timings, 99)
+
+
+def bench_writes(service, room_id, messages, threads, wait):
+    latencies = []
+    per_thread = messages // threads
+
+    def producer():
+        for i in range(per_thread):
+            t0 = time.perf_counter()
+            while True:
+                try:
+                    service.post(room_id, 1, f'load message {i}', wait=wait)
+                    break
+                except ChatError:
+                    time.sleep(service.flush_interval)  # queue full: back off like a client would
+            if wait:
+                latencies.append((time.perf_counter() - t0) * 1000)
+
+    workers = [threading.Thread(target=producer) for _ in range(threads)]
+    t0 = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    service.flush()
+    elapsed = time.perf_counter() - t0
+    label = f"{threads} posters, {'wait for id' if wait else 'fire-and-forget'}"
+    extra = f"  post p50 {percentile(latencies, 50):.1f}ms p99 {percentile(latencies, 99):.1f}ms" if wait else ''
+    print(f"{label:<36} {per_thread * threads / elapsed:>10,.0f} msgs/s{extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sqlite', help='SQLite file (created with the schema) instead of MySQL')
+    parser.add_argument('--room', type=int, default=999999)
+    parser.add_argument('--messages', type=int, default=1_000_000, help='room size to benchmark against')
+    parser.add_argument('--writes', type=int, default=50000)
+    parser.add_argument('--page', type=int, default=50)
+    parser.add_argument('--runs', type=int, default=200)
+    args = parser.parse_args()
+
+    if args.sqlite:
+        from backend import sqlite_compat
+        from backend.generate_data import create_sqlite_schema
+        os.makedirs(os.path.dirname(os.path.abspath(args.sqlite)), exist_ok=True)
+        conn = sqlite_compat.connect(args.sqlite)
+        create_sqlite_schema(conn)
+        conn.close()
+        pool = ConnectionPool(lambda: sqlite_compat.connect(args.sqlite), size=8)
+    else:
+        from backend.db_pool import pool_from_env
+        pool = pool_from_env()
+
+    seed_room(pool, args.room, args.messages)
+    service = ChatService(pool.acquire, FeedHub(LocalPubSub()), LocalPubSub()).start()
+
+    print(f"\n-- writes (batch {service.batch_size}, flush every {service.flush_interval * 1000:.0f}ms)")
+    bench_writes(service, args.room, args.writes, 8, wait=False)
+    bench_writes(service, args.room, min(args.writes, 5000), 50, wait=True)
+
+    conn = pool.acquire()
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("SELECT COUNT(*) AS n FROM chat_messages WHERE room_id = %s", (args.room,))
+    total = cursor.fetchone()['n']
+    # ids at a given depth from the newest message
+    depths = [('1%', total // 100), ('50%', total // 2), ('99%', total * 99 // 100)]
+    anchors = {}
+    for label, depth in depths:
+        cursor.execute(OFFSET_SQL, (args.room, 1, depth))
+        anchors[label] = cursor.fetchone()['message_id']
+
+    print(f"\n-- history, {args.page}-message pages in a {total:,}-message room: p50 / p99 ms")
+    service.history(args.room, limit=args.page)  # open the room (loads the ring)
+    p50, p99 = timed(lambda: service.history(args.room, limit=args.page), args.runs)
+    print(f"{'newest page (ring buffer)':<36} {p50:>8.3f} {p99:>8.3f}")
+    for label, depth in depths:
+        p50, p99 = timed(lambda: service.history(args.room, before=anchors[label], limit=args.page), args.runs)
+        print(f"{'keyset at ' + label + ' depth':<36} {p50:>8.3f} {p99:>8.3f}")
+    for label, depth in depths:
+        def offset_page():
+            cursor.execute(OFFSET_SQL, (args.room, args.page, depth))
+            cursor.fetchall()
+        p50, p99 = timed(offset_page, max(5, args.runs // 20))
+        print(f"{'OFFSET at ' + label + ' depth (naive)':<36} {p50:>8.3f} {p99:>8.3f}")
+    cursor.close()
+    conn.close()
+    service.stop()
+    print(f"\n{service.stats()}")
+
+
+if __name__ == '__main__':
+    main()
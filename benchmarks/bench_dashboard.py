@@ -0,0 +1,92 @@
+"""
+Compare build_dashboard_data (consolidated, uncached) with the per-query reference
+on a large seeded enterprise. Needs the MySQL database configured by DB_* env vars.
+
+    python benchmarks/bench_dashboard.py --projects 500 --risks 200 --runs 20
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import app as app_module
+from backend.db_pool import mysql_connect
+from benchmarks.harness import install_query_counter
+
+
+def seed(enterprise_id, projects, risks_per_project, tasks_per_project, seed_value=42):
+    rnd = random.Random(seed_value)
+    conn = mysql_connect(autocommit=False)
+    cur = conn.cursor()
+    cur.execute("SELECT COUNT(*) FROM projects WHERE enterprise_id = %s", (enterprise_id,))
+    if cur.fetchone()[0] >= projects:
+        conn.close()
+        return
+    statuses = ['Active', 'Planning', 'OnHold', 'Complete']
+    cur.executemany(
+        "INSERT INTO projects (name, enterprise_id, status, budget_total, budget_spent, created_at) VALUES (%s, %s, %s, %s, %s, NOW())",
+        [(f'bench-{enterprise_id}-{i}', enterprise_id, rnd.choice(statuses), 100000.0, rnd.uniform(0, 120000)) for i in range(projects)]
+    )
+    cur.execute("SELECT id FROM projects WHERE enterprise_id = %s", (enterprise_id,))
+    project_ids = [r[0] for r in cur.fetchall()]
+    for pid in project_ids:
+        cur.executemany(
+            "INSERT INTO risks (project_id, title, severity, status, created_at) VALUES (%s, %s, %s, 'Open', NOW())",
+            [(pid, f'risk {pid}-{k}', rnd.choice(['Low', 'Medium', 'High'])) for k in range(risks_per_project)]
+        )
+        cur.executemany(
+            "INSERT INTO tasks (project_id, title) VALUES (%s, %s)",
+            [(pid, f'task {pid}-{k}') for k in range(tasks_per_project)]
+        )
+        cur.execute("INSERT INTO budgets (project_id, total, spent) VALUES (%s, %s, %s)",
+                    (pid, 100000.0, rnd.uniform(0, 120000)))
+        cur.execute("INSERT INTO activities (project_id, action, details, created_at) VALUES (%s, 'bench', 'seeded', NOW())", (pid,))
+        conn.commit()
+    conn.close()
+
+
+def measure(fn, enterprise_id, runs):
+    counter, restore = install_query_counter(app_module)
+    timings = []
+    try:
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            result = fn(enterprise_id)
+            timings.append((time.perf_counter() - t0) * 1000)
+    finally:
+        restore()
+    return result, counter['queries'] / runs, timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--enterprise', type=int, default=9001)
+    parser.add_argument('--projects', type=int, default=500)
+    parser.add_argument('--risks', type=int, default=200, help='risks per project')
+    parser.add_argument('--tasks', type=int, default=100, help='tasks per project')
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    seed(args.enterprise, args.projects, args.risks, args.tasks)
+    candidates = [
+        ('per-query', app_module.get_complete_dashboard_data_per_query),
+        ('consolidated', lambda eid: app_module.build_dashboard_data(eid)[0]),
+    ]
+    results = {}
+    for name, fn in candidates:
+        measure(fn, args.enterprise, 2)  # warm caches / pool
+        data, queries, timings = measure(fn, args.enterprise, args.runs)
+        results[name] = data
+        print(f"{name:<13} queries={queries:.0f} p50={statistics.median(timings):.1f}ms "
+              f"max={max(timings):.1f}ms")
+
+    keys = [k for k in results['per-query'] if k not in ('recent_risks', 'recent_activities')]
+    mismatched = [k for k in keys if results['per-query'][k] != results['consolidated'][k]]
+    print("results match" if not mismatched else f"MISMATCH: {mismatched}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Stream an export of synthetic risks through backend.export and check that peak
+RSS stays flat. Exits non-zero when the RSS growth exceeds --limit-mb.
+
+    python benchmarks/bench_export.py --rows 1000000 --format csv --gzip
+    python benchmarks/bench_export.py --enterprise 9001      # real DB_* database instead
+"""
+import argparse
+import os
+import resource
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend import export
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # kB on Linux
+
+
+class SyntheticCursor:
+    """Unbuffered-cursor stand-in that produces rows lazily, like a server-side cursor."""
+
+    def __init__(self, rows, columns):
+        self.rows = rows
+        self.columns = columns
+        self.next_id = 1
+        self.base = datetime(2026, 1, 1)
+
+    def execute(self, sql, params=None):
+        self.next_id = 1
+
+    def fetchmany(self, size):
+        end = min(self.next_id + size, self.rows + 1)
+        batch = []
+        for i in range(self.next_id, end):
+            row = {'id': i, 'project_id': i % 500, 'title': f'Risk {i}', 'severity': ('Low', 'Medium', 'High')[i % 3],
+                   'status': 'Open', 'probability': (i % 100) / 100, 'impact_score': i % 5 + 1, 'risk_score': 2.5,
+                   'rag_status': 'Amber', 'risk_category': 'Technical', 'finance_impact': 1000.0 * (i % 50),
+                   'milestone_delay_days': i % 30, 'vendor_id': None,
+                   'created_at': self.base + timedelta(seconds=i), 'last_updated': self.base + timedelta(seconds=i)}
+            batch.append(tuple(row[c] for c in self.columns))
+        self.next_id = end
+        return batch
+
+    def close(self):
+        pass
+
+
+class SyntheticConn:
+    def __init__(self, rows, columns):
+        self.rows = rows
+        self.columns = columns
+
+    def cursor(self, **kwargs):
+        return SyntheticCursor(self.rows, self.columns)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--format', choices=['csv', 'json'], default='csv')
+    parser.add_argument('--gzip', action='store_true')
+    parser.add_argument('--limit-mb', type=float, default=64.0, help='allowed peak RSS growth')
+    parser.add_argument('--enterprise', type=int, help='export this enterprise from the database instead')
+    args = parser.parse_args()
+
+    columns = export.select_columns('risks')
+    if args.enterprise:
+        from backend.db_pool import mysql_connect
+        conn = mysql_connect()
+    else:
+        conn = SyntheticConn(args.rows, columns)
+
+    baseline = peak_rss_mb()
+    t0 = time.perf_counter()
+    total = 0
+    for chunk in export.stream_export(conn, 'risks', columns, args.enterprise, args.format, args.gzip):
+        total += len(chunk)
+    elapsed = time.perf_counter() - t0
+    growth = peak_rss_mb() - baseline
+    print(f"exported {total / 1e6:.1f}MB in {elapsed:.1f}s; peak RSS growth {growth:.1f}MB (limit {args.limit_mb}MB)")
+    if growth > args.limit_mb:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Credential-stuffing load test for POST /enterprise-login: N concurrent attempts
+(a mix of valid logins, wrong passwords and unknown emails, spread over many
+client IPs) through the Flask test client. Reports throughput, p50/p99 latency
+and how many attempts were answered 200/302, 429 (rate limited) or 503 (hash
+pool saturated). Exits non-zero when p99 exceeds --max-p99-ms.
+
+    python backend/generate_data.py --sqlite instance/risk_sentinel_bench.db
+    DB_BACKEND=sqlite DB_SQLITE_PATH=instance/risk_sentinel_bench.db python benchmarks/bench_login.py
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import app as app_module
+from benchmarks.harness import percentile
+
+
+def known_emails(limit):
+    cursor, conn = app_module.get_cursor()
+    if not cursor:
+        return []
+    try:
+        cursor.execute("SELECT email FROM users WHERE is_active = 1 ORDER BY id LIMIT %s", (limit,))
+        return [row['email'] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def attempts(total, emails, password, ips):
+    """Every 10th attempt is a real login, the rest are stuffing: wrong passwords and unknown emails."""
+    for i in range(total):
+        if i % 10 == 0 and emails:
+            email, pw = emails[i % len(emails)], password
+        elif i % 2:
+            email, pw = emails[i % len(emails)] if emails else f'user{i}@example.com', f'guess{i}'
+        else:
+            email, pw = f'stuffed{i}@example.com', f'guess{i}'
+        yield f'10.{(i % ips) // 250}.{(i % ips) % 250}.1', email, pw
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--attempts', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=500)
+    parser.add_argument('--ips', type=int, default=100, help='distinct client addresses')
+    parser.add_argument('--password', default='pass123', help='password of the generated users')
+    parser.add_argument('--max-p99-ms', type=float, default=0, help='fail when p99 exceeds this (0 = report only)')
+    args = parser.parse_args()
+
+    emails = known_emails(50)
+    clients = threading.local()
+    start = threading.Barrier(min(args.concurrency, args.attempts))
+
+    def attempt(job):
+        ip, email, pw = job
+        if not hasattr(clients, 'c'):
+            clients.c = app_module.app.test_client()
+            try:
+                start.wait(timeout=30)  # release the first wave together
+            except threading.BrokenBarrierError:
+                pass
+        t0 = time.perf_counter()
+        resp = clients.c.post('/enterprise-login', data={'email': email, 'password': pw},
+                              environ_base={'REMOTE_ADDR': ip})
+        return resp.status_code, (time.perf_counter() - t0) * 1000
+
+    jobs = list(attempts(args.attempts, emails, args.password, args.ips))
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(attempt, jobs))
+    elapsed = time.perf_counter() - t0
+
+    timings = [ms for _, ms in results]
+    statuses = Counter(status for status, _ in results)
+    p99 = percentile(timings, 99)
+    print(f"attempts      {len(results)} over {elapsed:.2f}s ({len(results) / elapsed:.0f}/s)")
+    print(f"latency       p50 {percentile(timings, 50):.1f}ms  p99 {p99:.1f}ms  max {max(timings):.1f}ms")
+    print(f"statuses      " + '  '.join(f'{code}:{n}' for code, n in sorted(statuses.items())))
+    print(f"hash workers  {app_module.password_verifier.workers}  pool rejections {app_module.password_verifier.rejected}")
+    sys.exit(1 if args.max_p99_ms and p99 > args.max_p99_ms else 0)
+
+
+if __name__ == '__main__':
+    main()
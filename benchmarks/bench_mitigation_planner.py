@@ -0,0 +1,100 @@
+"""
+Mitigation planner on synthetic portfolios: per-project solve time for thousands of
+candidate risks, optimality gap against the fractional-knapsack (LP) upper bound,
+re-planning under a new budget from the cached frontier, and an enterprise-wide
+plan run serially vs. across a process pool. Exits non-zero if a plan overspends
+or a project solve exceeds --max-ms.
+
+    python benchmarks/bench_mitigation_planner.py --projects 200 --risks 1000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend import mitigation_planner as mp
+
+
+def synthetic_risks(n, rnd, first_id=1):
+    return [(first_id + i, f'Risk {first_id + i}', round(rnd.expovariate(1 / 20000), 2),
+             round(rnd.uniform(0, 5), 2) if rnd.random() < 0.9 else None, round(rnd.betavariate(2, 3), 3),
+             rnd.randint(1, 5), rnd.choice([0, 0, 0, 20, 50, 80])) for i in range(n)]
+
+
+def lp_bound(front, budget):
+    """Fractional knapsack optimum: no 0/1 plan can beat it."""
+    cost, value, order, prefix = front['cost'], front['value'], front['order'], front['prefix']
+    k = int(np.searchsorted(prefix, budget, side='right'))
+    bound = float(value[order[:k]].sum())
+    if k < len(order):
+        spent = prefix[k - 1] if k else 0.0
+        bound += value[order[k]] * (budget - spent) / cost[order[k]]
+    return bound
+
+
+def timed_ms(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - t0) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='1000,2000,5000,10000', help='candidate risks per project')
+    parser.add_argument('--projects', type=int, default=200, help='projects in the enterprise-wide run')
+    parser.add_argument('--risks', type=int, default=1000, help='candidates per project in the enterprise-wide run')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--max-ms', type=float, default=500.0, help='per-project plan limit')
+    args = parser.parse_args()
+    os.environ['COMPUTE_WORKERS'] = str(args.workers)  # size of the shared pool (backend/compute_pool.py)
+    rnd = random.Random(2026)
+    config = mp.PlannerConfig()
+    errors = []
+
+    print("-- one project: cold plan / re-plan at 60% budget (cached frontier), gap to LP bound")
+    for n in (int(s) for s in args.sizes.split(',')):
+        risks = synthetic_risks(n, rnd)
+        inputs = {'budget': sum(r[2] for r in risks) * config.cost_ratio * 0.3, 'risks': risks}
+        mp.planner_cache.clear()
+        cold_ms, plan = timed_ms(lambda: mp.plan_project(inputs, n, config=config))
+        warm_ms, replan = timed_ms(lambda: mp.plan_project(inputs, n, budget=inputs['budget'] * 0.6, config=config))
+        front = mp.frontier(risks, config)
+        gap = 1 - plan['value'] / lp_bound(front, inputs['budget'])
+        print(f"{n:>6} risks   cold {cold_ms:>7.1f}ms   re-plan {warm_ms:>6.1f}ms   "
+              f"selected {len(plan['selected']):>5}   gap {gap * 100:.3f}%")
+        for p, budget in ((plan, inputs['budget']), (replan, inputs['budget'] * 0.6)):
+            if p['spend'] > budget + 0.01:
+                errors.append(f'{n} risks: spend {p["spend"]} over budget {budget:.2f}')
+        if cold_ms > args.max_ms:
+            errors.append(f'{n} risks: {cold_ms:.0f}ms over the {args.max_ms:.0f}ms limit')
+
+    portfolio = {}
+    for pid in range(1, args.projects + 1):
+        risks = synthetic_risks(rnd.randint(args.risks // 2, args.risks * 3 // 2), rnd, pid * 100000)
+        portfolio[pid] = {'budget': sum(r[2] for r in risks) * config.cost_ratio * rnd.uniform(0.1, 0.6), 'risks': risks}
+    total = sum(len(v['risks']) for v in portfolio.values())
+    print(f"\n-- enterprise: {args.projects} projects, {total:,} candidate risks")
+    mp.planner_cache.clear()
+    serial_ms, _ = timed_ms(lambda: mp.plan_enterprise(portfolio, config=config, workers=1))
+    print(f"{'serial':<28} {serial_ms:>8.0f}ms")
+    mp.planner_cache.clear()
+    parallel_ms, result = timed_ms(lambda: mp.plan_enterprise(portfolio, config=config, workers=args.workers,
+                                                              parallel_threshold=0))
+    print(f"{f'{args.workers} worker processes':<28} {parallel_ms:>8.0f}ms")
+    scaled_ms, scaled = timed_ms(lambda: mp.plan_enterprise(portfolio, budget_scale=0.8, config=config))
+    print(f"{'budget x0.8 (cached)':<28} {scaled_ms:>8.0f}ms")
+    print(f"\nportfolio {result['portfolio']}\nat 80%     {scaled['portfolio']}")
+    if scaled['portfolio']['value'] > result['portfolio']['value']:
+        errors.append('a smaller budget produced a more valuable plan')
+
+    for e in errors:
+        print('ERROR', e)
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == '__main__':
+    main()
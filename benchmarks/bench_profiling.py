@@ -0,0 +1,64 @@
+"""
+Measure the per-request cost of the profiling middleware: the same routes with
+sampling off (PROFILE_SAMPLE_RATE=0) and fully on (1.0). Exits non-zero when the
+median overhead exceeds --max-overhead-ms.
+
+    DB_BACKEND=sqlite DB_SQLITE_PATH=instance/risk_sentinel_bench.db python benchmarks/bench_profiling.py
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import app as app_module
+
+ROUTES = ['/admin/dashboard', '/admin/user_management', '/admin/projects', '/']
+
+
+def run(client, rate, runs):
+    app_module.profiler.sample_rate = rate
+    per_route = {}
+    for path in ROUTES:
+        timings = []
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            client.get(path).get_data()
+            timings.append((time.perf_counter() - t0) * 1000)
+        per_route[path] = statistics.median(timings)
+    return per_route
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--enterprise', type=int, default=1)
+    parser.add_argument('--runs', type=int, default=200)
+    parser.add_argument('--max-overhead-ms', type=float, default=0.5)
+    args = parser.parse_args()
+
+    client = app_module.app.test_client()
+    with client.session_transaction() as s:
+        s.update(user_id=1, username='bench', role='Admin', enterprise_id=args.enterprise)
+    run(client, 1.0, 10)  # warm templates, pool and cache
+
+    # alternate off/on rounds so drift (cache expiry, page cache) hits both sides equally
+    off, on = {p: [] for p in ROUTES}, {p: [] for p in ROUTES}
+    for _ in range(3):
+        for path, ms in run(client, 0.0, args.runs).items():
+            off[path].append(ms)
+        for path, ms in run(client, 1.0, args.runs).items():
+            on[path].append(ms)
+
+    worst = 0.0
+    print(f"{'route':<28} {'off ms':>8} {'on ms':>8} {'overhead':>9}")
+    for path in ROUTES:
+        a, b = statistics.median(off[path]), statistics.median(on[path])
+        worst = max(worst, b - a)
+        print(f"{path:<28} {a:>8.3f} {b:>8.3f} {b - a:>+9.3f}")
+    print(f"worst median overhead {worst:.3f}ms (bound {args.max_overhead_ms}ms)")
+    sys.exit(1 if worst > args.max_overhead_ms else 0)
+
+
+if __name__ == '__main__':
+    main()
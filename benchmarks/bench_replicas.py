@@ -0,0 +1,175 @@
+"""
+Read/write splitting against local stand-ins: the DB_SQLITE_PATH file is the primary and
+--replicas copies of it are the replicas (snapshots, so a row changed on the primary
+afterwards shows which database served a read). Checks, through the app:
+    - GET requests read a replica, non-GET requests the primary
+    - a session that just wrote reads the primary for DB_READ_YOUR_WRITES seconds
+    - notify_enterprise_write() pins the whole enterprise for the same window
+    - reads spread across the replicas
+    - a replica that stops answering leaves rotation, reads fall back to the primary
+      without failed requests, and it returns after its health checks pass again
+then times the checkout overhead of the router. Exits non-zero on any failed check.
+
+    DB_BACKEND=sqlite DB_SQLITE_PATH=instance/risk_sentinel_bench.db python benchmarks/bench_replicas.py
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.harness import percentile
+
+MARKER = 'written on the primary'
+
+
+def copy_database(source, target):
+    src, dst = sqlite3.connect(source), sqlite3.connect(target)
+    src.backup(dst)
+    src.close()
+    dst.close()
+
+
+def prepare_primary(path):
+    """Make sure vendors are scored (the probe reads /admin/api/vendors/riskiest); returns (enterprise, vendor)."""
+    from backend import sqlite_compat, vendor_scoring
+    conn = sqlite_compat.connect(path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT MIN(enterprise_id) FROM vendors")
+    if cursor.fetchone()[0] is None:
+        vendor_scoring.run_once(conn, full=True)
+    cursor.execute("SELECT enterprise_id, id FROM vendors WHERE enterprise_id IS NOT NULL "
+                   "ORDER BY enterprise_id, risk_score DESC, id DESC LIMIT 1")
+    enterprise_id, vendor_id = cursor.fetchone()
+    cursor.close()
+    conn.close()
+    return enterprise_id, vendor_id
+
+
+def set_name(path, vendor_id, name):
+    """Rename a vendor on one database only; returns the previous name."""
+    conn = sqlite3.connect(path)
+    previous = conn.execute("SELECT company_name FROM vendors WHERE id = ?", (vendor_id,)).fetchone()[0]
+    conn.execute("UPDATE vendors SET company_name = ? WHERE id = ?", (name, vendor_id))
+    conn.commit()
+    conn.close()
+    return previous
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--replicas', type=int, default=1)
+    parser.add_argument('--window', type=float, default=1.5, help='DB_READ_YOUR_WRITES for the run')
+    parser.add_argument('--reads', type=int, default=200)
+    parser.add_argument('--runs', type=int, default=2000)
+    args = parser.parse_args()
+    if os.getenv('DB_BACKEND') != 'sqlite':
+        sys.exit('run against the SQLite stand-in: DB_BACKEND=sqlite DB_SQLITE_PATH=...')
+    primary = os.getenv('DB_SQLITE_PATH', 'instance/risk_sentinel_bench.db')
+    enterprise_id, vendor_id = prepare_primary(primary)
+
+    tmp = tempfile.mkdtemp(prefix='rs_replicas_')
+    replicas = [os.path.join(tmp, f'replica{n}.db') for n in range(args.replicas)]
+    for path in replicas:
+        copy_database(primary, path)
+    original_name = set_name(primary, vendor_id, MARKER)
+    # SQLite copies cannot report replication lag
+    os.environ.update(DB_REPLICAS=','.join(replicas), DB_REPLICA_CHECK_INTERVAL='0.2',
+                      DB_REPLICA_ALLOW_UNKNOWN_LAG='1', DB_READ_YOUR_WRITES=str(args.window),
+                      FEED_TAIL_INTERVAL='0')
+    import app as app_module
+    from backend.cache import notify_enterprise_write
+    router = app_module.db_router
+    failures = []
+
+    def check(label, ok, detail=''):
+        print(f"{'ok' if ok else 'FAIL':<5} {label}{': ' + detail if detail else ''}")
+        if not ok:
+            failures.append(label)
+
+    def wait_healthy(count, timeout=10):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if sum(r.healthy for r in router.replicas) == count:
+                return True
+            time.sleep(0.05)
+        return False
+
+    def client():
+        c = app_module.app.test_client()
+        with c.session_transaction() as s:
+            s.update(user_id=1, username='bench', role='Admin', enterprise_id=enterprise_id)
+        return c
+
+    def served_by(c):
+        resp = c.get('/admin/api/vendors/riskiest?per_page=1')
+        if resp.status_code != 200:
+            return f'HTTP {resp.status_code}'
+        return 'primary' if resp.get_json()['vendors'][0]['company_name'] == MARKER else 'replica'
+
+    try:
+        check('replicas enter rotation', wait_healthy(len(replicas)))
+        alice, bob = client(), client()
+        check('GET reads a replica', served_by(alice) == 'replica')
+        alice.post('/analyst/api/risk-score/preview', json={})
+        check('session that wrote reads the primary', served_by(alice) == 'primary')
+        check('other sessions still read a replica', served_by(bob) == 'replica')
+        time.sleep(args.window + 0.1)
+        check('window over: replica again', served_by(alice) == 'replica')
+        notify_enterprise_write(enterprise_id, 'risks')
+        check('enterprise write pins every session', served_by(bob) == 'primary')
+        time.sleep(args.window + 0.1)
+
+        before = {r.name: r.stats['reads'] for r in router.replicas}
+        results = [served_by(bob) for _ in range(args.reads)]
+        spread = {os.path.basename(r.name): r.stats['reads'] - before[r.name] for r in router.replicas}
+        check(f'{args.reads} reads spread over {len(replicas)} replica(s)',
+              results.count('replica') == args.reads and max(spread.values()) - min(spread.values()) <= 1,
+              str(spread))
+
+        # outage: the file disappears and its open connections go with it
+        down = router.replicas[0]
+        shutil.move(down.name, down.name + '.away')
+        os.mkdir(down.name)
+        down.pool.close_all()
+        time.sleep(0.5)
+        check('failed replica leaves rotation', not down.healthy, down.error or '')
+        results = [served_by(bob) for _ in range(50)]
+        others = 'replica' if len(replicas) > 1 else 'primary'
+        check(f'reads during the outage are served ({others})', results.count(others) == 50,
+              f"fallbacks {router.stats['fallbacks']}")
+        os.rmdir(down.name)
+        shutil.move(down.name + '.away', down.name)
+        check('replica returns after its checks pass', wait_healthy(len(replicas)))
+        check('and serves reads again', served_by(bob) == 'replica')
+
+        with app_module.app.test_request_context('/admin/dashboard'):
+            for label, read_only in (('primary checkout', False), ('replica checkout', True)):
+                timings = []
+                for _ in range(args.runs):
+                    t0 = time.perf_counter()
+                    conn = router.acquire(read_only)
+                    conn.close()
+                    timings.append((time.perf_counter() - t0) * 1e6)
+                print(f"{label:<34} p50 {percentile(timings, 50):>6.1f}us   p95 {percentile(timings, 95):>6.1f}us")
+            timings = []
+            for _ in range(args.runs):
+                t0 = time.perf_counter()
+                app_module.read_only_request()
+                timings.append((time.perf_counter() - t0) * 1e6)
+            print(f"{'routing decision':<34} p50 {percentile(timings, 50):>6.1f}us   p95 {percentile(timings, 95):>6.1f}us")
+        print(router.snapshot())
+    finally:
+        router.stop()
+        set_name(primary, vendor_id, original_name)
+        shutil.rmtree(tmp, ignore_errors=True)
+        for f in failures:
+            print('ERROR', f)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
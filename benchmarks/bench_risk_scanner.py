@@ -0,0 +1,129 @@
+"""
+Risk scanner on one tenant with 1M tasks: the first (full) scan, an incremental
+rescan with nothing changed, an incremental scan after a batch of new tasks, and
+a full rescan that must raise nothing new. Each pass must finish inside --budget
+seconds; exits non-zero on a blown budget or on any duplicate finding.
+
+    python benchmarks/bench_risk_scanner.py --sqlite instance/risk_sentinel_scan_bench.db
+    python benchmarks/bench_risk_scanner.py            # MySQL via DB_* env vars (tenant must exist)
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend import risk_scanner
+
+
+def seed_tenant(conn, projects, tasks):
+    """Generate one enterprise of `projects` x `tasks` unless the file already holds one; returns its id."""
+    from backend.generate_data import create_sqlite_schema, generate
+    create_sqlite_schema(conn)
+    cursor = conn.cursor()
+    cursor.execute("SELECT MIN(id) FROM enterprises")
+    row = cursor.fetchone()
+    if row[0] is None:
+        print(f"generating a tenant with {projects * tasks:,} tasks ...")
+        generate(conn, enterprises=1, projects=projects, risks=5, tasks=tasks, milestones=8, vendors=3,
+                 activities=0, members=25, messages=0, log=lambda *a: None)
+        cursor.execute("SELECT MIN(id) FROM enterprises")
+        row = cursor.fetchone()
+    cursor.close()
+    return row[0]
+
+
+def add_tasks(conn, enterprise_id, count):
+    """New tasks on the tenant's projects, a third of them already overdue and High priority."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT id FROM projects WHERE enterprise_id = %s ORDER BY id", (enterprise_id,))
+    project_ids = [r[0] for r in cursor.fetchall()]
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM tasks")
+    next_id = cursor.fetchone()[0] + 1
+    now = datetime.now().replace(microsecond=0)
+    rows = [(next_id + i, project_ids[i % len(project_ids)], f'Bench task {next_id + i}', 'InProgress',
+             'High' if i % 3 == 0 else 'Low', (now - timedelta(days=5 if i % 3 == 0 else -5)).date(), now)
+            for i in range(count)]
+    conn.start_transaction()
+    cursor.executemany("INSERT INTO tasks (id, project_id, title, status, priority, due_date, created_at) "
+                       "VALUES (%s, %s, %s, %s, %s, %s, %s)", rows)
+    conn.commit()
+    cursor.close()
+    return (count + 2) // 3
+
+
+def duplicates(conn, enterprise_id):
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT COUNT(*) FROM (
+            SELECT project_id, comments, title FROM risks
+            WHERE comments LIKE 'risk-scanner:%%' AND project_id IN (SELECT id FROM projects WHERE enterprise_id = %s)
+            GROUP BY project_id, comments, title HAVING COUNT(*) > 1
+        ) d
+    """, (enterprise_id,))
+    count = cursor.fetchone()[0]
+    cursor.close()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sqlite', help='SQLite file (generated on first run) instead of MySQL')
+    parser.add_argument('--enterprise', type=int, help='tenant to scan (default: the first one)')
+    parser.add_argument('--projects', type=int, default=1000)
+    parser.add_argument('--tasks', type=int, default=1000, help='per project')
+    parser.add_argument('--new-tasks', type=int, default=10000)
+    parser.add_argument('--budget', type=float, default=60.0, help='seconds allowed per pass')
+    args = parser.parse_args()
+
+    if args.sqlite:
+        from backend import sqlite_compat
+        os.makedirs(os.path.dirname(os.path.abspath(args.sqlite)), exist_ok=True)
+        conn = sqlite_compat.connect(args.sqlite)
+        enterprise_id = args.enterprise or seed_tenant(conn, args.projects, args.tasks)
+    else:
+        from backend.db_pool import mysql_connect
+        conn = mysql_connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT MIN(id) FROM enterprises")
+        enterprise_id = args.enterprise or cursor.fetchone()[0]
+        cursor.close()
+
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM tasks t JOIN projects p ON p.id = t.project_id WHERE p.enterprise_id = %s",
+                   (enterprise_id,))
+    print(f"tenant {enterprise_id}: {cursor.fetchone()[0]:,} tasks, budget {args.budget:.0f}s per pass\n")
+    cursor.close()
+
+    errors = []
+
+    def run(label, full=False, expect=None):
+        t0 = time.perf_counter()
+        summary = risk_scanner.scan(conn, enterprise_id, budget=args.budget, full=full)
+        elapsed = time.perf_counter() - t0
+        per_rule = ', '.join(f"{k} {v['findings']}" for k, v in summary['rules'].items())
+        print(f"{label:<28} {elapsed:>7.2f}s  {summary['findings']:>8,} new  ({per_rule})")
+        if not summary['complete'] or elapsed > args.budget:
+            errors.append(f'{label}: over the {args.budget:.0f}s budget')
+        if expect is not None and summary['findings'] != expect:
+            errors.append(f"{label}: expected {expect} findings, got {summary['findings']}")
+
+    run('first scan (full)')
+    run('incremental, no changes', expect=0)
+    overdue = add_tasks(conn, enterprise_id, args.new_tasks)
+    run(f'incremental, +{args.new_tasks:,} tasks', expect=overdue)
+    run('full rescan (dedupe)', full=True, expect=0)
+
+    dupes = duplicates(conn, enterprise_id)
+    print(f"\nduplicate findings: {dupes}")
+    if dupes:
+        errors.append(f'{dupes} duplicated findings')
+    conn.close()
+    for e in errors:
+        print('ERROR', e)
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Time the vectorized scoring pass on synthetic risks, and optionally a full
+load/score/write-back against an enterprise in the DB_* database.
+
+    python benchmarks/bench_risk_scoring.py --rows 1000000
+    python benchmarks/bench_risk_scoring.py --enterprise 9001
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend import risk_scoring
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--enterprise', type=int, help='also rescore this enterprise in the database')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    n = args.rows
+    inputs = (rng.random(n), rng.integers(1, 6, n), rng.random(n) * 200000,
+              rng.integers(0, 60, n), rng.random(n) < 0.05)
+    t0 = time.perf_counter()
+    score, rag, _ = risk_scoring.score_arrays(*inputs)
+    labels = risk_scoring.RAG_LABELS[rag]
+    elapsed = time.perf_counter() - t0
+    print(f"scored {n:,} risks in {elapsed * 1000:.0f}ms ({n / elapsed:,.0f} rows/s); "
+          f"red={int((labels == 'Red').sum()):,}")
+
+    if args.enterprise:
+        from backend.db_pool import mysql_connect
+        conn = mysql_connect()
+        try:
+            t0 = time.perf_counter()
+            summary = risk_scoring.rescore(conn, enterprise_id=args.enterprise)
+            print(f"db rescore: {summary} in {time.perf_counter() - t0:.2f}s")
+        finally:
+            conn.close()
+
+
+if __name__ == '__main__':
+    main()
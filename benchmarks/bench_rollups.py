@@ -0,0 +1,129 @@
+"""
+Daily risk rollups: bulk backfill time, an incremental refresh after a batch of
+risk edits, and a one-year analytics range query read from the rollups versus the
+same GROUP BY over risks. Exits non-zero when the rollups disagree with risks.
+
+    python benchmarks/bench_rollups.py --sqlite instance/risk_sentinel_rollup_bench.db
+    python benchmarks/bench_rollups.py            # MySQL via DB_* env vars (tenant must exist)
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend import risk_rollups
+from benchmarks.harness import percentile
+
+RAW_SQL = """
+    SELECT DATE(r.created_at) AS day, r.{dimension} AS value, COUNT(*) AS risks,
+           SUM(CASE WHEN r.status IN ('Mitigated', 'Closed') THEN 0 ELSE 1 END) AS open_risks
+    FROM risks r JOIN projects p ON p.id = r.project_id
+    WHERE p.enterprise_id = %s AND r.created_at >= %s AND r.created_at < %s
+    GROUP BY DATE(r.created_at), r.{dimension}
+"""
+
+
+def seed(conn, projects, risks):
+    from backend.generate_data import create_sqlite_schema, generate
+    create_sqlite_schema(conn)
+    cursor = conn.cursor()
+    cursor.execute("SELECT MIN(id) FROM enterprises")
+    row = cursor.fetchone()
+    if row[0] is None:
+        print(f"generating a tenant with {projects * risks:,} risks ...")
+        generate(conn, enterprises=1, projects=projects, risks=risks, tasks=0, milestones=0, vendors=1,
+                 activities=0, members=25, messages=0, log=lambda *a: None)
+        cursor.execute("SELECT MIN(id) FROM enterprises")
+        row = cursor.fetchone()
+    cursor.close()
+    return row[0]
+
+
+def timed(fn, runs):
+    timings, result = [], None
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    return percentile(timings, 50), result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sqlite', help='SQLite file (generated on first run) instead of MySQL')
+    parser.add_argument('--enterprise', type=int)
+    parser.add_argument('--projects', type=int, default=500)
+    parser.add_argument('--risks', type=int, default=400, help='per project')
+    parser.add_argument('--edits', type=int, default=2000, help='risks changed before the incremental run')
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.sqlite:
+        from backend import sqlite_compat
+        os.makedirs(os.path.dirname(os.path.abspath(args.sqlite)), exist_ok=True)
+        conn = sqlite_compat.connect(args.sqlite)
+        enterprise_id = args.enterprise or seed(conn, args.projects, args.risks)
+    else:
+        from backend.db_pool import mysql_connect
+        conn = mysql_connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT MIN(id) FROM enterprises")
+        enterprise_id = args.enterprise or cursor.fetchone()[0]
+        cursor.close()
+
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("SELECT COUNT(*) AS n, MAX(r.created_at) AS last FROM risks r JOIN projects p ON p.id = r.project_id "
+                   "WHERE p.enterprise_id = %s", (enterprise_id,))
+    row = cursor.fetchone()
+    last = row['last'] if not isinstance(row['last'], str) else date.fromisoformat(row['last'][:10])
+    end = last if isinstance(last, date) and not hasattr(last, 'hour') else last.date()
+    start = end - timedelta(days=364)
+    print(f"tenant {enterprise_id}: {row['n']:,} risks; analytics window {start} .. {end}\n")
+
+    record = risk_rollups.backfill(conn)
+    print(f"{'backfill':<34} {record['duration_ms']:>8}ms  {record['rows']:,} rollup rows")
+
+    time.sleep(1.1)  # the run's watermark stops a second short of now
+    cursor.execute("SELECT r.id FROM risks r JOIN projects p ON p.id = r.project_id WHERE p.enterprise_id = %s "
+                   "ORDER BY r.id LIMIT %s", (enterprise_id, args.edits * 7))
+    ids = [r['id'] for r in cursor.fetchall()][::7]
+    conn.start_transaction()
+    cursor.executemany("UPDATE risks SET status = 'Closed', risk_score = 4.0, last_updated = NOW() WHERE id = %s",
+                       [(i,) for i in ids])
+    conn.commit()
+    time.sleep(1.1)
+    record = risk_rollups.run_once(conn)
+    print(f"{'incremental after ' + str(len(ids)) + ' edits':<34} {record['duration_ms']:>8}ms  "
+          f"{record['projects_touched']} projects rebuilt")
+
+    errors = []
+    print(f"\n-- one-year range by dimension: p50 ms (rows read)")
+    for dimension in risk_rollups.DIMENSIONS:
+        raw_sql = RAW_SQL.format(dimension=dimension)
+
+        def raw():
+            cursor.execute(raw_sql, (enterprise_id, start, end + timedelta(days=1)))
+            return cursor.fetchall()
+
+        def rolled():
+            cursor.execute(risk_rollups.SERIES_SQL, (enterprise_id, 0, dimension, start, end))
+            return cursor.fetchall()
+
+        raw_ms, raw_rows = timed(raw, args.runs)
+        roll_ms, roll_rows = timed(rolled, args.runs)
+        print(f"{dimension:<16} risks scan {raw_ms:>8.2f}  rollups {roll_ms:>7.2f} ({len(roll_rows)} rows)  "
+              f"{raw_ms / max(roll_ms, 1e-6):>6.1f}x")
+        key = lambda r: (str(r['day'])[:10], r['value'] or '', int(r['risks']), int(r['open_risks']))  # noqa: E731
+        if sorted(map(key, raw_rows)) != sorted(map(key, roll_rows)):
+            errors.append(f'{dimension}: rollups disagree with risks')
+    cursor.close()
+    conn.close()
+    for e in errors:
+        print('ERROR', e)
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Drive every GET route in app.py (plus the login POST) through the Flask test
+client and report p50/p95 latency and query count per route.
+
+    # against the local SQLite stand-in
+    python backend/generate_data.py --sqlite instance/risk_sentinel_bench.db --projects 200 --risks 500
+    DB_BACKEND=sqlite DB_SQLITE_PATH=instance/risk_sentinel_bench.db python benchmarks/bench_routes.py
+    # against MySQL (DB_* env vars)
+    python benchmarks/bench_routes.py --enterprise 1 --runs 50
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import app as app_module
+from benchmarks.harness import install_query_counter, percentile
+
+ROLE_BY_PREFIX = (('/admin', 'Admin'), ('/analyst', 'Analyst'), ('/pm', 'PM'), ('/vendor', 'Vendor'))
+
+# routes that write, never finish (SSE) or are not worth timing in a read benchmark
+SKIP_ENDPOINTS = {'static', 'logout', 'live_feed', 'chat_stream'}
+
+EXTRA_REQUESTS = [
+    ('POST /enterprise-login', 'post', '/enterprise-login', {'data': {'email': 'nobody@example.com', 'password': 'x'}}),
+    ('POST /analyst/api/risk-score/preview', 'post', '/analyst/api/risk-score/preview',
+     {'json': {'risks': [{'probability': 0.4, 'impact_score': 4}] * 50}}),
+]
+
+
+def role_for(path):
+    for prefix, role in ROLE_BY_PREFIX:
+        if path.startswith(prefix):
+            return role
+    return 'Admin'
+
+
+def route_requests(defaults):
+    """One concrete GET request per route, filling URL arguments from `defaults`."""
+    requests = []
+    for rule in sorted(app_module.app.url_map.iter_rules(), key=lambda r: r.rule):
+        if rule.endpoint in SKIP_ENDPOINTS or 'GET' not in rule.methods:
+            continue
+        try:
+            path = re.sub(r'<(?:[^:>]+:)?([^>]+)>', lambda m: str(defaults[m.group(1)]), rule.rule)
+        except KeyError as e:
+            print(f"  skipping {rule.rule}: no default for {e}")
+            continue
+        if rule.endpoint == 'admin_export':
+            path += '?columns=id,title'
+        requests.append((f'GET {rule.rule}', 'get', path, {}))
+    return requests + EXTRA_REQUESTS
+
+
+def first_id(sql, enterprise_id):
+    cursor, conn = app_module.get_cursor()
+    if not cursor:
+        return 0
+    try:
+        cursor.execute(sql, (enterprise_id,))
+        row = cursor.fetchone()
+        return row['id'] if row else 0
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--enterprise', type=int, default=1)
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--no-cache', action='store_true', help='clear the dashboard cache before every request')
+    args = parser.parse_args()
+
+    defaults = {
+        'project_id': first_id("SELECT id FROM projects WHERE enterprise_id = %s ORDER BY id LIMIT 1", args.enterprise),
+        'room_id': first_id("SELECT r.room_id AS id FROM chat_rooms r JOIN projects p ON p.id = r.project_id "
+                            "WHERE p.enterprise_id = %s ORDER BY r.room_id LIMIT 1", args.enterprise),
+        'table': 'risks', 'token': 'bench-token'
+    }
+    client = app_module.app.test_client()
+    counter, restore = install_query_counter(app_module)
+
+    print(f"{'route':<48} {'status':>6} {'p50 ms':>9} {'p95 ms':>9} {'queries':>8}")
+    try:
+        for name, method, path, kwargs in route_requests(defaults):
+            with client.session_transaction() as s:
+                s.update(user_id=1, username='bench', role=role_for(path), enterprise_id=args.enterprise)
+            timings, queries, status = [], [], None
+            for _ in range(args.runs):
+                if args.no_cache:
+                    app_module.dashboard_cache.clear()
+                counter['queries'] = 0
+                t0 = time.perf_counter()
+                resp = getattr(client, method)(path, **kwargs)
+                resp.get_data()  # drain streamed bodies
+                timings.append((time.perf_counter() - t0) * 1000)
+                queries.append(counter['queries'])
+                status = resp.status_code
+            print(f"{name:<48} {status:>6} {percentile(timings, 50):>9.1f} {percentile(timings, 95):>9.1f} "
+                  f"{sum(queries) / len(queries):>8.1f}")
+    finally:
+        restore()
+
+
+if __name__ == '__main__':
+    main()
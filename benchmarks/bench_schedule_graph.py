@@ -0,0 +1,261 @@
+"""
+Schedule-slip propagation on one large project: --tasks tasks in --lanes chains with
+cross-lane links (about 1.5 dependencies per task) and --milestones milestones gating the
+lanes. Times the full pass (from the database, and in memory at 1/4, 1/2 and all of the
+tasks to show it grows linearly), incremental runs after a task, a risk, a milestone and a
+dependency change, and the PM dashboard's impacted-milestones read. Exits non-zero when an
+incremental run leaves any finish or stored milestone projection different from a full
+recompute.
+
+    python benchmarks/bench_schedule_graph.py --sqlite instance/risk_sentinel_schedule_bench.db
+    python benchmarks/bench_schedule_graph.py            # MySQL via DB_* env vars (tenant must exist)
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend import schedule_graph
+from backend.schedule_graph import MILESTONE, TASK, ScheduleEngine, ScheduleGraph
+from benchmarks.harness import percentile
+
+
+def plan(tasks, lanes, milestones, seed=7):
+    """
+    Synthetic plan as (task rows, milestone rows, dependency rows). Task i of a lane is due
+    3 days after task i-1 and takes 1-4 days, so lanes mostly keep up until a cross-lane
+    link or a long task pushes them; milestone k closes every lane at depth (k+1)*depth/milestones.
+    """
+    rnd = random.Random(seed)
+    depth = tasks // lanes
+    start = date.today() - timedelta(days=30)
+    task_rows, deps = [], []
+    for lane in range(lanes):
+        for i in range(depth):
+            n = lane * depth + i
+            task_rows.append((n, rnd.randint(1, 4), start + timedelta(days=3 * (i + 1) + rnd.randint(0, 2))))
+            if i:
+                deps.append(((TASK, n - 1), (TASK, n), 0))
+                if rnd.random() < 0.5:
+                    other = (lane + rnd.choice((-1, 1))) % lanes
+                    deps.append(((TASK, other * depth + max(0, i - rnd.randint(1, 3))), (TASK, n), rnd.randint(0, 1)))
+    step = max(1, depth // milestones)
+    milestone_rows = []
+    for k in range(milestones):
+        gate = min(depth - 1, (k + 1) * step - 1)
+        milestone_rows.append((k, start + timedelta(days=3 * (gate + 1) + 5)))
+        for lane in range(0, lanes, 10):
+            deps.append(((TASK, lane * depth + gate), (MILESTONE, k), 0))
+        if k:
+            deps.append(((MILESTONE, k - 1), (MILESTONE, k), 0))
+    return task_rows, milestone_rows, list({(p, s): (p, s, lag) for p, s, lag in deps}.values())
+
+
+def in_memory(tasks, lanes, milestones):
+    """Build and fully compute the plan without a database; returns (graph, ms)."""
+    task_rows, milestone_rows, deps = plan(tasks, lanes, milestones)
+    today = date.today().toordinal()
+    t0 = time.perf_counter()
+    with schedule_graph.gc_paused():
+        graph = ScheduleGraph(0, today)
+        for n, duration, due in task_rows:
+            graph.add_node((TASK, n), duration, due.toordinal(), None, False)
+        for k, target in milestone_rows:
+            graph.add_node((MILESTONE, k), 0, target.toordinal(), None, False)
+        for p, s, lag in deps:
+            graph.add_edge(p, s, lag)
+        graph.compute()
+    return graph, (time.perf_counter() - t0) * 1000
+
+
+def seed(conn, tasks, lanes, milestones, risks):
+    """One tenant and one project holding the synthetic plan; returns (project_id, pm_user_id, enterprise_id)."""
+    from backend.generate_data import create_sqlite_schema, generate
+    create_sqlite_schema(conn)
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, pm_user_id, enterprise_id FROM projects ORDER BY id LIMIT 1")
+    row = cursor.fetchone()
+    if row is None:
+        generate(conn, enterprises=1, projects=1, risks=risks, tasks=0, milestones=0, vendors=0, activities=0,
+                 members=25, messages=0, log=lambda *a: None)
+        cursor.execute("SELECT id, pm_user_id, enterprise_id FROM projects ORDER BY id LIMIT 1")
+        row = cursor.fetchone()
+    project_id = row[0]
+    cursor.execute("SELECT COUNT(*) FROM tasks WHERE project_id = %s", (project_id,))
+    if cursor.fetchone()[0] == 0:
+        print(f"generating a project with {tasks:,} tasks and {milestones} milestones ...")
+        task_rows, milestone_rows, deps = plan(tasks, lanes, milestones)
+        cursor.execute("SELECT id FROM risks WHERE project_id = %s", (project_id,))
+        risk_ids = [r[0] for r in cursor.fetchall()]
+        rnd = random.Random(11)
+        created = date.today() - timedelta(days=40)
+        conn.start_transaction()
+        task_ids, milestone_ids = {}, {}
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM tasks")
+        base = cursor.fetchone()[0] + 1
+        cursor.executemany(
+            "INSERT INTO tasks (id, risk_id, project_id, title, status, due_date, created_at, duration_days, updated_at) "
+            "VALUES (%s, %s, %s, %s, 'NotStarted', %s, %s, %s, %s)",
+            [(base + n, rnd.choice(risk_ids) if risk_ids and rnd.random() < 0.05 else None, project_id,
+              f'Task {base + n}', due, created, duration, created) for n, duration, due in task_rows])
+        task_ids = {n: base + n for n, _, _ in task_rows}
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM milestones")
+        base = cursor.fetchone()[0] + 1
+        cursor.executemany("INSERT INTO milestones (id, project_id, title, target_date, status, updated_at) "
+                           "VALUES (%s, %s, %s, %s, 'Pending', %s)",
+                           [(base + k, project_id, f'Milestone {k + 1}', target, created) for k, target in milestone_rows])
+        milestone_ids = {k: base + k for k, _ in milestone_rows}
+        real = {TASK: task_ids, MILESTONE: milestone_ids}
+        cursor.executemany(
+            "INSERT INTO schedule_dependencies (project_id, predecessor_type, predecessor_id, successor_type, "
+            "successor_id, lag_days, created_at) VALUES (%s, %s, %s, %s, %s, %s, %s)",
+            [(project_id, p[0], real[p[0]][p[1]], s[0], real[s[0]][s[1]], lag, created) for p, s, lag in deps])
+        conn.commit()
+    cursor.close()
+    return row
+
+
+def verify(cursor, engine, project_id, label, errors):
+    """Cached graph and stored projections against a fresh full load."""
+    fresh = schedule_graph.load_graph(cursor, project_id, engine.get(project_id).today)
+    cached = engine.get(project_id)
+    moved = [key for key, v in fresh.index.items() if cached.finish[cached.index[key]] != fresh.finish[v]]
+    if moved:
+        errors.append(f'{label}: {len(moved)} finish(es) differ from a full recompute, e.g. {moved[:3]}')
+    if fresh.milestone_updates():
+        errors.append(f'{label}: stored milestone projections are stale')
+    if any(cached.latest[cached.index[key]] != fresh.latest[v] for key, v in fresh.index.items()):
+        errors.append(f'{label}: latest finishes (float) differ from a full recompute')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sqlite', help='SQLite file (generated on first run) instead of MySQL')
+    parser.add_argument('--project', type=int)
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--lanes', type=int, default=200)
+    parser.add_argument('--milestones', type=int, default=20)
+    parser.add_argument('--risks', type=int, default=2000)
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.sqlite:
+        from backend import sqlite_compat
+        os.makedirs(os.path.dirname(os.path.abspath(args.sqlite)), exist_ok=True)
+        conn = sqlite_compat.connect(args.sqlite)
+        project_id, pm_user_id, enterprise_id = seed(conn, args.tasks, args.lanes, args.milestones, args.risks)
+    else:
+        from backend.db_pool import mysql_connect
+        conn = mysql_connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, pm_user_id, enterprise_id FROM projects WHERE id = %s OR %s IS NULL "
+                       "ORDER BY id LIMIT 1", (args.project, args.project))
+        project_id, pm_user_id, enterprise_id = cursor.fetchone()
+        cursor.close()
+
+    print("-- in-memory full pass (build + sort + forward + backward)")
+    per_node = []
+    for fraction in (4, 2, 1):
+        n = args.tasks // fraction
+        graph, ms = in_memory(n, max(1, args.lanes // fraction), args.milestones)
+        edges = sum(len(s) for s in graph.succs)
+        per_node.append(ms * 1000 / len(graph))
+        print(f"{n:>9,} tasks {edges:>9,} deps {ms:>9.0f}ms  {per_node[-1]:.2f}us/node")
+
+    raw = conn.cursor()
+    today = schedule_graph.db_now(raw).date().toordinal()
+    cursor = conn.cursor(dictionary=True)
+    engine = ScheduleEngine()
+    t0 = time.perf_counter()
+    graph = schedule_graph.load_graph(cursor, project_id, today)
+    load_ms = (time.perf_counter() - t0) * 1000
+    print(f"\nproject {project_id}: {len(graph):,} nodes, {sum(len(s) for s in graph.succs):,} deps, "
+          f"finishes {date.fromordinal(graph.end)}, {graph.back_edges} cycle edge(s)")
+    print(f"{'load from DB + full pass':<34} {load_ms:>9.0f}ms")
+    record = schedule_graph.run_once(conn, engine, full=True)
+    print(f"{'run_once --full':<34} {record['duration_ms']:>9}ms  {record['written']} milestone(s) written")
+    critical = graph.critical_path()
+    print(f"critical path: {len(critical):,} nodes, ends at {graph.keys[critical[-1]]}")
+
+    errors = []
+
+    def edit(label, sql, params):
+        time.sleep(1.1)  # the run's watermark stops a second short of now
+        conn.start_transaction()
+        raw.execute(sql, params)
+        conn.commit()
+        time.sleep(1.1)
+        record = schedule_graph.run_once(conn, engine)
+        print(f"{label:<34} {record['duration_ms']:>9}ms  {record['evaluated']:,} node(s) evaluated, "
+              f"{record['written']} milestone(s) written")
+        verify(cursor, engine, project_id, label, errors)
+
+    print("\n-- incremental runs")
+    cached = engine.get(project_id)
+    tasks = [k[1] for k in cached.index if k[0] == TASK]
+    mid_task = tasks[len(tasks) // 2 + args.tasks // args.lanes // 2]
+    critical_task = next(cached.keys[v][1] for v in cached.critical_path()
+                         if cached.keys[v][0] == TASK and cached.driver[v] != -1)
+    # set updated_at / last_updated explicitly: MySQL's ON UPDATE does it, the SQLite stand-in has no such clause
+    edit('task +15 days (mid-lane)', "UPDATE tasks SET duration_days = duration_days + 15, updated_at = NOW() "
+         "WHERE id = %s", (mid_task,))
+    edit('task on the critical path +3 days', "UPDATE tasks SET duration_days = duration_days + 3, "
+         "updated_at = NOW() WHERE id = %s", (critical_task,))
+    raw.execute("SELECT risk_id FROM tasks WHERE project_id = %s AND risk_id IS NOT NULL LIMIT 1", (project_id,))
+    risk_id = raw.fetchone()[0]
+    edit('risk opened, 30-day delay, blocker', "UPDATE risks SET status = 'Open', milestone_delay_days = 30, "
+         "project_blocker = 1, last_updated = NOW() WHERE id = %s", (risk_id,))
+    milestone_id = max(k[1] for k in cached.index if k[0] == MILESTONE)
+    target = date.fromordinal(cached.milestones[cached.index[(MILESTONE, milestone_id)]])
+    edit('milestone target 10 days earlier', "UPDATE milestones SET target_date = %s, updated_at = NOW() "
+         "WHERE id = %s", (target - timedelta(days=10), milestone_id))
+    time.sleep(1.1)
+    conn.start_transaction()
+    dependency_id = schedule_graph.add_dependency(cursor, project_id, (TASK, mid_task), (TASK, tasks[0]), 2)
+    conn.commit()
+    time.sleep(1.1)
+    record = schedule_graph.run_once(conn, engine)
+    print(f"{'dependency added (rebuild)':<34} {record['duration_ms']:>9}ms  {record['evaluated']:,} node(s) evaluated")
+    verify(cursor, engine, project_id, 'dependency added', errors)
+    time.sleep(1.1)
+    conn.start_transaction()
+    schedule_graph.remove_dependency(cursor, dependency_id, project_id)
+    conn.commit()
+    time.sleep(1.1)
+    record = schedule_graph.run_once(conn, engine)
+    print(f"{'dependency removed (rebuild)':<34} {record['duration_ms']:>9}ms  {record['evaluated']:,} node(s) evaluated")
+    verify(cursor, engine, project_id, 'dependency removed', errors)
+    time.sleep(1.1)
+    record = schedule_graph.run_once(conn, engine)
+    print(f"{'nothing changed':<34} {record['duration_ms']:>9}ms  {record['projects']} project(s)")
+
+    print("\n-- PM dashboard read: p50 ms")
+    timings = []
+    for _ in range(args.runs):
+        t0 = time.perf_counter()
+        impacted = schedule_graph.impacted_milestones(cursor, pm_user_id, enterprise_id, 10)
+        timings.append((time.perf_counter() - t0) * 1000)
+    print(f"{'impacted milestones (stored)':<34} {percentile(timings, 50):>9.2f}  {len(impacted)} milestone(s)")
+    t0 = time.perf_counter()
+    schedule_graph.load_graph(cursor, project_id, today)
+    print(f"{'recomputed per request instead':<34} {(time.perf_counter() - t0) * 1000:>9.0f}")
+    if impacted:
+        path = schedule_graph.milestone_path(cursor, impacted[0]['id'], enterprise_id)
+        print(f"worst: {impacted[0]['title']} +{impacted[0]['slip_days']}d, driving path of {len(path['path'])} "
+              f"node(s) from {impacted[0]['cause']}")
+    if per_node[-1] > 3 * per_node[0]:
+        errors.append(f'full pass is not linear: {per_node[0]:.2f} -> {per_node[-1]:.2f}us/node')
+
+    raw.close()
+    cursor.close()
+    conn.close()
+    for e in errors:
+        print('ERROR', e)
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+Throughput of the development server (run.py) against the pre-forked gunicorn setup
+(gunicorn.conf.py) on the same machine and database, then the gunicorn lifecycle: a
+SIGHUP worker reload under load must not fail requests, and after SIGTERM /readyz must
+answer 503 while pages are still served until the drain window ends. Exits non-zero on
+any failed request or lifecycle check.
+
+    DB_BACKEND=sqlite DB_SQLITE_PATH=instance/risk_sentinel_bench.db python benchmarks/bench_serving.py
+"""
+import argparse
+import http.client
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from benchmarks.harness import percentile
+
+PATHS = ['/admin/dashboard', '/admin/reports', '/analyst/api/analytics?dimension=severity&days=90']
+
+
+def session_cookie(enterprise_id):
+    os.environ.setdefault('FEED_TAIL_INTERVAL', '0')
+    from app import app
+    serializer = app.session_interface.get_signing_serializer(app)
+    value = serializer.dumps(dict(user_id=1, username='bench', role='Admin', enterprise_id=enterprise_id))
+    return f'session={value}'
+
+
+def get(port, path, cookie='', conn=None, timeout=10):
+    conn = conn or http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+    conn.request('GET', path, headers={'Cookie': cookie})
+    resp = conn.getresponse()
+    resp.read()
+    return resp.status, conn
+
+
+def wait_ready(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if get(port, '/readyz', timeout=2)[0] == 200:
+                return True
+        except OSError:
+            pass
+        time.sleep(0.2)
+    return False
+
+
+def load(port, cookie, clients, seconds, during=None):
+    """`clients` keep-alive connections looping over PATHS for `seconds`; returns (count, errors, ms list)."""
+    timings, errors, lock = [], [], threading.Lock()
+    stop = time.monotonic() + seconds
+
+    def client(n):
+        conn, i = None, n
+        while time.monotonic() < stop:
+            path = PATHS[i % len(PATHS)]
+            i += 1
+            t0 = time.perf_counter()
+            try:
+                status, conn = get(port, path, cookie, conn)
+            except (OSError, http.client.HTTPException) as e:
+                status, conn = repr(e), None
+            with lock:
+                if status == 200:
+                    timings.append((time.perf_counter() - t0) * 1000)
+                else:
+                    errors.append(f'{path}: {status}')
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    for t in threads:
+        t.start()
+    if during:
+        time.sleep(seconds / 3)
+        during()
+    for t in threads:
+        t.join()
+    return len(timings), errors, timings
+
+
+def report(label, count, errors, timings, seconds):
+    print(f"{label:<34} {count / seconds:>8.1f} req/s   p50 {percentile(timings, 50):>7.1f}ms   "
+          f"p95 {percentile(timings, 95):>7.1f}ms   errors {len(errors)}")
+
+
+def stop(proc):
+    if proc.poll() is None:
+        os.killpg(proc.pid, signal.SIGKILL)
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--enterprise', type=int, default=1)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=15)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+    cookie = session_cookie(args.enterprise)
+    env = dict(os.environ, FEED_TAIL_INTERVAL='0')
+    failures = []
+
+    print(f"-- {args.clients} clients, {args.seconds:g}s per server, paths: {', '.join(PATHS)}")
+    dev = subprocess.Popen([sys.executable, 'run.py'], cwd=ROOT, env=env, start_new_session=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_ready(5000):
+            failures.append('dev server never became ready')
+        else:
+            count, errors, timings = load(5000, cookie, args.clients, args.seconds)
+            report('run.py (dev server)', count, errors, timings, args.seconds)
+            failures += [f'dev: {e}' for e in errors[:5]]
+    finally:
+        stop(dev)
+
+    env.update(WEB_BIND=f'127.0.0.1:{args.port}', WEB_WORKERS=str(args.workers), WEB_THREADS=str(args.threads),
+               WEB_DRAIN_SECONDS='3')
+    gunicorn = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'], cwd=ROOT, env=env,
+                                start_new_session=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        started = time.monotonic()
+        if not wait_ready(args.port):
+            failures.append('gunicorn never became ready')
+            return
+        print(f"{'gunicorn ready after':<34} {time.monotonic() - started:>8.1f}s")
+        count, errors, timings = load(args.port, cookie, args.clients, args.seconds)
+        report(f'gunicorn {args.workers}x{args.threads}', count, errors, timings, args.seconds)
+        failures += [f'gunicorn: {e}' for e in errors[:5]]
+
+        count, errors, timings = load(args.port, cookie, args.clients, args.seconds,
+                                      during=lambda: gunicorn.send_signal(signal.SIGHUP))
+        report('gunicorn, SIGHUP reload under load', count, errors, timings, args.seconds)
+        failures += [f'reload: {e}' for e in errors[:5]]
+        if not wait_ready(args.port):
+            failures.append('not ready after SIGHUP')
+
+        gunicorn.send_signal(signal.SIGTERM)
+        time.sleep(0.5)
+        ready, page = get(args.port, '/readyz')[0], get(args.port, PATHS[0], cookie)[0]
+        print(f"{'during drain':<34} /readyz {ready}, {PATHS[0]} {page}")
+        if (ready, page) != (503, 200):
+            failures.append(f'drain: /readyz {ready}, page {page} (want 503, 200)')
+        gunicorn.wait(timeout=60)
+    finally:
+        stop(gunicorn)
+        for f in failures:
+            print('ERROR', f)
+        sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
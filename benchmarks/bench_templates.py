@@ -0,0 +1,127 @@
+"""
+Admin template cold start and render time. Cold start loads every admin template in a
+fresh interpreter three ways: without the bytecode cache, with an empty cache directory
+(compile + write) and with the populated directory (what every restart after the first
+sees). Render time replays the context each admin page was rendered with, with the
+{% cache %} fragments warm and with the fragment cache switched off; exits non-zero if
+the cached output differs from the uncached one.
+
+    DB_BACKEND=sqlite DB_SQLITE_PATH=instance/risk_sentinel_bench.db python benchmarks/bench_templates.py
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.harness import percentile
+
+TEMPLATES = ['admin/dashboard.html', 'admin/reports.html', 'admin/user_management.html',
+             'admin/project_detail.html', 'admin/projects.html', 'components/alerts.html']
+PAGES = {'admin/dashboard.html': '/admin/dashboard', 'admin/reports.html': '/admin/reports',
+         'admin/user_management.html': '/admin/user_management', 'admin/projects.html': '/admin/projects',
+         'admin/project_detail.html': '/admin/projectdetail/{project_id}'}
+
+
+def child():
+    """Runs in a fresh interpreter: time loading each template, print JSON."""
+    import app as app_module
+    timings = {}
+    for name in TEMPLATES:
+        t0 = time.perf_counter()
+        app_module.app.jinja_env.get_template(name)
+        timings[name] = (time.perf_counter() - t0) * 1000
+    print(json.dumps(timings))
+
+
+def cold_start(bytecode_dir, runs):
+    env = dict(os.environ, TEMPLATE_BYTECODE_DIR=bytecode_dir, FEED_TAIL_INTERVAL='0')
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), '--child'], env=env,
+                             capture_output=True, text=True, check=True).stdout
+        samples.append(json.loads(out.strip().splitlines()[-1]))
+    return {name: percentile([s[name] for s in samples], 50) for name in TEMPLATES}
+
+
+def render_contexts(app_module, enterprise_id):
+    """Render each admin page once through the app and keep the template context it used."""
+    from flask import before_render_template
+    captured = {}
+
+    def keep(sender, template, context, **extra):
+        captured.setdefault(template.name, dict(context))
+
+    cursor, conn = app_module.get_cursor()
+    cursor.execute("SELECT id FROM projects WHERE enterprise_id = %s ORDER BY id LIMIT 1", (enterprise_id,))
+    project_id = (cursor.fetchone() or {'id': 0})['id']
+    cursor.close()
+    conn.close()
+    client = app_module.app.test_client()
+    with client.session_transaction() as s:
+        s.update(user_id=1, username='bench', role='Admin', enterprise_id=enterprise_id)
+    before_render_template.connect(keep, app_module.app)
+    try:
+        for path in PAGES.values():
+            client.get(path.format(project_id=project_id)).get_data()
+    finally:
+        before_render_template.disconnect(keep, app_module.app)
+    return captured
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--enterprise', type=int, default=1)
+    parser.add_argument('--cold-runs', type=int, default=5)
+    parser.add_argument('--runs', type=int, default=200)
+    args = parser.parse_args()
+    if args.child:
+        return child()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        modes = [('no bytecode cache', cold_start('', args.cold_runs))]
+        modes.append(('empty cache dir', cold_start(tmp, 1)))
+        modes.append(('populated cache dir', cold_start(tmp, args.cold_runs)))
+    print(f"-- cold start: p50 ms to load each template in a fresh process")
+    print(f"{'template':<30}" + ''.join(f"{label:>22}" for label, _ in modes))
+    for name in TEMPLATES + ['total']:
+        cells = [sum(t.values()) if name == 'total' else t[name] for _, t in modes]
+        print(f"{name:<30}" + ''.join(f"{v:>22.2f}" for v in cells))
+
+    import app as app_module
+    contexts = render_contexts(app_module, args.enterprise)
+    env, fragments = app_module.app.jinja_env, app_module.fragment_cache
+    errors = []
+    print(f"\n-- render: p50 / p95 ms over {args.runs} renders")
+    print(f"{'template':<30} {'uncached':>18} {'fragments warm':>18}")
+    with app_module.app.test_request_context():
+        for name in PAGES:
+            if name not in contexts:
+                errors.append(f'{name} was not rendered by {PAGES[name]}')
+                continue
+            template, context = env.get_template(name), contexts[name]
+            results = []
+            for cache in (None, fragments):
+                env.fragment_cache = cache
+                html = template.render(context)
+                timings = []
+                for _ in range(args.runs):
+                    t0 = time.perf_counter()
+                    template.render(context)
+                    timings.append((time.perf_counter() - t0) * 1000)
+                results.append((html, percentile(timings, 50), percentile(timings, 95)))
+            env.fragment_cache = fragments
+            print(f"{name:<30} {results[0][1]:>8.3f} / {results[0][2]:<7.3f} {results[1][1]:>8.3f} / {results[1][2]:.3f}")
+            if results[0][0] != results[1][0]:
+                errors.append(f'{name}: cached render differs from the uncached one')
+    for e in errors:
+        print('ERROR', e)
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == '__main__':
+    main()
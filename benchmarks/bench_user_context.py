@@ -0,0 +1,93 @@
+"""
+Render the admin templates with the legacy `type('User', ...)` context processor
+and with the cached UserContext, and report the median render time of each.
+Also reports the queries spent building the context on a cold and a warm cache.
+
+    DB_BACKEND=sqlite DB_SQLITE_PATH=instance/risk_sentinel_bench.db python benchmarks/bench_user_context.py
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import app as app_module
+from flask import render_template, session
+from benchmarks.harness import install_query_counter
+
+TEMPLATES = ['admin/dashboard.html', 'admin/reports.html', 'admin/projects.html',
+             'admin/user_management.html', 'admin/project_detail.html']
+
+
+def legacy_inject_user():
+    """The original per-render processor, kept here for comparison."""
+    if 'user_id' in session:
+        user_obj = type('User', (), {
+            'is_authenticated': True,
+            'username': session.get('username', 'Admin'),
+            'role': session.get('role', 'Admin')
+        })()
+        return dict(current_user=user_obj)
+    guest = type('User', (), {'is_authenticated': False, 'username': 'Guest', 'role': 'Guest'})()
+    return dict(current_user=guest)
+
+
+def render_all(app, session_data, context, renders, runs):
+    """Median ms for `renders` template renders inside one request, per template."""
+    out = {}
+    for name in TEMPLATES:
+        timings = []
+        for _ in range(runs):
+            with app.test_request_context('/admin/dashboard'):
+                session.update(session_data)
+                t0 = time.perf_counter()
+                for _ in range(renders):
+                    render_template(name, **context)
+                timings.append((time.perf_counter() - t0) * 1000)
+        out[name] = statistics.median(timings)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--user', type=int, default=1)
+    parser.add_argument('--runs', type=int, default=200)
+    parser.add_argument('--renders', type=int, default=3, help='renders per request (layouts, partials, emails)')
+    args = parser.parse_args()
+
+    app = app_module.app
+    session_data = dict(user_id=args.user, username='bench', role='Admin', enterprise_id=1)
+    context = dict(app_module.empty_dashboard_data(), users=[], projects=[], project=None,
+                   next_cursor=None, prev_cursor=None, search='')
+    processors = app.template_context_processors[None]
+    index = processors.index(app_module.inject_user)
+
+    counter, restore = install_query_counter(app_module)
+    try:
+        app_module.user_cache.clear()
+        for label in ('cold', 'warm'):
+            counter['queries'] = 0
+            with app.test_request_context('/'):
+                session.update(session_data)
+                user = app_module.inject_user()['current_user']
+            print(f"context build ({label} cache): {counter['queries']} queries -> {user!r}")
+    finally:
+        restore()
+
+    render_all(app, session_data, context, args.renders, 5)  # compile templates
+    processors[index] = legacy_inject_user
+    try:
+        legacy = render_all(app, session_data, context, args.renders, args.runs)
+    finally:
+        processors[index] = app_module.inject_user
+    cached = render_all(app, session_data, context, args.renders, args.runs)
+
+    print(f"{'template':<30} {'legacy ms':>10} {'cached ms':>10} {'saving':>8}")
+    for name in TEMPLATES:
+        a, b = legacy[name], cached[name]
+        print(f"{name:<30} {a:>10.3f} {b:>10.3f} {(a - b) / a * 100:>7.1f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""
+Vendor risk scores: the set-based full pass against scoring vendor by vendor (one risks
+query each), an incremental run after a batch of risk and delivery edits, and riskiest-
+vendors pages read through idx_vendors_enterprise_score against sorting the scored join on
+every request. Exits non-zero when the incremental scores differ from a full recompute or
+when paging through the API skips, repeats or misorders a vendor.
+
+    python benchmarks/bench_vendor_scoring.py --sqlite instance/risk_sentinel_vendor_bench.db
+    python benchmarks/bench_vendor_scoring.py            # MySQL via DB_* env vars (tenant must exist)
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend import vendor_scoring
+from backend.pagination import decode_cursor
+from benchmarks.harness import percentile
+
+PER_VENDOR_SQL = """
+    SELECT r.status, r.risk_score, r.vendor_status FROM risks r WHERE r.vendor_id = %s
+"""
+
+# what a request would run without stored scores: aggregate, score and sort on the fly
+UNINDEXED_SQL = vendor_scoring.VENDOR_INPUTS_SQL.format(scope="WHERE p.enterprise_id = %s")
+
+
+def seed(conn, projects, risks, vendors):
+    from backend.generate_data import create_sqlite_schema, generate
+    create_sqlite_schema(conn)
+    cursor = conn.cursor()
+    cursor.execute("SELECT MIN(id) FROM enterprises")
+    row = cursor.fetchone()
+    if row[0] is None:
+        print(f"generating a tenant with {projects * vendors:,} vendors and {projects * risks:,} risks ...")
+        generate(conn, enterprises=1, projects=projects, risks=risks, tasks=0, milestones=0, vendors=vendors,
+                 activities=0, members=25, messages=0, log=lambda *a: None)
+        cursor.execute("SELECT MIN(id) FROM enterprises")
+        row = cursor.fetchone()
+    cursor.close()
+    return row[0]
+
+
+def per_vendor(cursor, today, config):
+    """The loop the set-based pass replaces: one query per vendor, scored row by row."""
+    cursor.execute("SELECT v.id, p.enterprise_id, v.enterprise_id, v.risk_score, v.delivery_timeline, "
+                   "v.completion_percent, v.quality_status FROM vendors v "
+                   "LEFT JOIN projects p ON p.id = v.assigned_project_id")
+    vendors = cursor.fetchall()
+    scores = {}
+    for v in vendors:
+        cursor.execute(PER_VENDOR_SQL, (v[0],))
+        open_risks, open_scores, unapproved = 0, [], 0
+        for status, score, vendor_status in cursor.fetchall():
+            if status not in ('Mitigated', 'Closed'):
+                open_risks += 1
+                unapproved += vendor_status is not None and vendor_status != 'approved'
+                if score is not None:
+                    open_scores.append(score)
+        row = tuple(v) + (open_risks, sum(open_scores) / len(open_scores) if open_scores else None,
+                          max(open_scores) if open_scores else None, unapproved)
+        scores[v[0]] = float(vendor_scoring.score_rows([row], today, config)[0])
+    return scores
+
+
+def timed(fn, runs):
+    timings, result = [], None
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    return percentile(timings, 50), result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sqlite', help='SQLite file (generated on first run) instead of MySQL')
+    parser.add_argument('--enterprise', type=int)
+    parser.add_argument('--projects', type=int, default=500)
+    parser.add_argument('--risks', type=int, default=200, help='per project')
+    parser.add_argument('--vendors', type=int, default=20, help='per project')
+    parser.add_argument('--edits', type=int, default=1000, help='risks and vendors changed before the incremental run')
+    parser.add_argument('--per-page', type=int, default=25)
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.sqlite:
+        from backend import sqlite_compat
+        os.makedirs(os.path.dirname(os.path.abspath(args.sqlite)), exist_ok=True)
+        conn = sqlite_compat.connect(args.sqlite)
+        enterprise_id = args.enterprise or seed(conn, args.projects, args.risks, args.vendors)
+    else:
+        from backend.db_pool import mysql_connect
+        conn = mysql_connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT MIN(id) FROM enterprises")
+        enterprise_id = args.enterprise or cursor.fetchone()[0]
+        cursor.close()
+
+    config = vendor_scoring.VendorScoringConfig.from_env()
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*), SUM(CASE WHEN vendor_id IS NOT NULL THEN 1 ELSE 0 END) FROM risks")
+    risks, linked = cursor.fetchone()
+    cursor.execute("SELECT COUNT(*) FROM vendors")
+    vendors = cursor.fetchone()[0]
+    print(f"tenant {enterprise_id}: {vendors:,} vendors, {risks:,} risks ({linked:,} linked to a vendor)\n")
+
+    today = vendor_scoring.db_now(cursor).date()
+    loop_ms, loop_scores = timed(lambda: per_vendor(cursor, today, config), 1)
+    print(f"{'per-vendor queries':<34} {loop_ms:>8.0f}ms  {len(loop_scores):,} queries + 1")
+    record = vendor_scoring.run_once(conn, full=True, config=config)
+    print(f"{'set-based full pass':<34} {record['duration_ms']:>8}ms  {record['written']:,} rows written  "
+          f"{loop_ms / max(record['duration_ms'], 1):.1f}x")
+    record = vendor_scoring.run_once(conn, full=True, config=config)
+    print(f"{'full pass, nothing changed':<34} {record['duration_ms']:>8}ms  {record['written']:,} rows written")
+
+    errors = []
+    cursor.execute("SELECT id, risk_score FROM vendors")
+    stored = dict(cursor.fetchall())
+    drift = [v for v, s in loop_scores.items() if abs(stored[v] - s) > 0.005]
+    if drift:
+        errors.append(f'{len(drift)} vendor(s) differ from the per-vendor scores, e.g. {drift[:5]}')
+
+    time.sleep(1.1)  # the run's watermark stops a second short of now
+    cursor.execute("SELECT id FROM risks WHERE vendor_id IS NOT NULL ORDER BY id LIMIT %s", (args.edits * 7,))
+    risk_ids = [r[0] for r in cursor.fetchall()][::7]
+    cursor.execute("SELECT id FROM vendors ORDER BY id LIMIT %s", (args.edits * 5,))
+    vendor_ids = [r[0] for r in cursor.fetchall()][::5]
+    conn.start_transaction()
+    cursor.executemany("UPDATE risks SET status = 'Open', risk_score = 5.0, vendor_status = 'pending', "
+                       "last_updated = NOW() WHERE id = %s", [(i,) for i in risk_ids])
+    # set updated_at explicitly: MySQL's ON UPDATE does it, the SQLite stand-in has no such clause
+    cursor.executemany("UPDATE vendors SET completion_percent = 10, quality_status = 'Poor', updated_at = NOW() "
+                       "WHERE id = %s", [(i,) for i in vendor_ids])
+    conn.commit()
+    time.sleep(1.1)
+    record = vendor_scoring.run_once(conn, config=config)
+    print(f"{'incremental after edits':<34} {record['duration_ms']:>8}ms  {record['scored']:,} vendors rescored, "
+          f"{record['written']:,} written ({len(risk_ids)} risks, {len(vendor_ids)} vendors edited)")
+
+    cursor.execute("SELECT id, risk_score FROM vendors")
+    incremental = dict(cursor.fetchall())
+    rows = vendor_scoring.load_inputs(cursor)
+    expected = dict(zip((r[0] for r in rows), vendor_scoring.score_rows(rows, today, config).tolist()))
+    stale = [v for v, s in expected.items() if abs(incremental[v] - s) > 0.005]
+    if stale:
+        errors.append(f'{len(stale)} vendor(s) stale after the incremental run, e.g. {stale[:5]}')
+
+    dict_cursor = conn.cursor(dictionary=True)
+    pages, seen, previous, after = 0, [], None, None
+    while True:
+        page, token = vendor_scoring.riskiest(dict_cursor, enterprise_id, after, args.per_page)
+        pages += 1
+        for v in page:
+            key = (v['risk_score'], v['id'])
+            if previous is not None and key >= previous:
+                errors.append(f'page {pages}: vendor {v["id"]} out of order')
+            previous = key
+            seen.append(v['id'])
+        if not token:
+            break
+        after = decode_cursor(token)
+    cursor.execute("SELECT COUNT(*) FROM vendors WHERE enterprise_id = %s", (enterprise_id,))
+    in_scope = cursor.fetchone()[0]
+    if len(seen) != len(set(seen)) or len(seen) != in_scope:
+        errors.append(f'paging returned {len(seen)} vendor(s) ({len(set(seen))} distinct), expected {in_scope}')
+
+    print(f"\n-- riskiest vendors, {args.per_page} per page: p50 ms")
+    first_ms, _ = timed(lambda: vendor_scoring.riskiest(dict_cursor, enterprise_id, None, args.per_page), args.runs)
+    deep_after = decode_cursor(vendor_scoring.riskiest(dict_cursor, enterprise_id, None, in_scope // 2)[1])
+    deep_ms, _ = timed(lambda: vendor_scoring.riskiest(dict_cursor, enterprise_id, deep_after, args.per_page),
+                       args.runs)
+
+    def unindexed():
+        cursor.execute(UNINDEXED_SQL, (enterprise_id,))
+        rows = cursor.fetchall()
+        scores = vendor_scoring.score_rows(rows, today, config)
+        return sorted(zip(scores.tolist(), (r[0] for r in rows)), reverse=True)[:args.per_page]
+
+    raw_ms, _ = timed(unindexed, max(1, args.runs // 4))
+    print(f"{'first page (index)':<34} {first_ms:>8.2f}")
+    print(f"{'page at the midpoint (index)':<34} {deep_ms:>8.2f}")
+    print(f"{'first page scored per request':<34} {raw_ms:>8.2f}  {raw_ms / max(first_ms, 1e-6):.0f}x")
+    print(f"walked {pages} pages, {len(seen):,} vendors")
+    dict_cursor.close()
+    cursor.close()
+    conn.close()
+    for e in errors:
+        print('ERROR', e)
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == '__main__':
+    main()
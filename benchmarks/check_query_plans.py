@@ -0,0 +1,230 @@
+"""
+Query-plan regression check. Drives every query path in app.py (GET and POST routes,
+chat included) and backend/update.py against the DB_* database, runs EXPLAIN on each
+SELECT / UPDATE / DELETE as it is issued, and exits non-zero if any plan does a full
+table scan (type=ALL).
+
+Run it against a realistically sized database (e.g. after benchmarks/bench_dashboard.py
+has seeded an enterprise) with all migrations applied; on near-empty tables MySQL
+legitimately prefers scans. The POST paths write: one chat message, one imported task,
+rescored risks and scan findings for the enterprise, and a dependency that is removed again.
+
+    python backend/migrate.py && python benchmarks/check_query_plans.py --enterprise 9001
+
+Without a reachable MySQL server (or with DB_BACKEND=sqlite) it prints SKIP and exits 0,
+so CI can run it unconditionally; --require-mysql turns that into a failure.
+tests/test_query_plans.py runs it when PLAN_CHECK_ENTERPRISE is set.
+"""
+import argparse
+import io
+import json
+import os
+import re
+import sys
+
+import mysql.connector
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.db_pool import mysql_connect
+
+# full scans we accept for now, with the reason; keep this list short
+ALLOWED_SCANS = set()
+
+
+def normalize(sql):
+    return re.sub(r'\s+', ' ', sql).strip()
+
+
+class ExplainingCursor:
+    """Cursor wrapper: EXPLAINs every read statement on a side connection before running it."""
+
+    def __init__(self, cursor, recorder):
+        self._cursor = cursor
+        self._recorder = recorder
+
+    def execute(self, sql, params=None):
+        self._recorder.explain(sql, params)
+        return self._cursor.execute(sql, params)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class ExplainingConnection:
+    def __init__(self, conn, recorder):
+        self._conn = conn
+        self._recorder = recorder
+
+    def cursor(self, *args, **kwargs):
+        return ExplainingCursor(self._conn.cursor(*args, **kwargs), self._recorder)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class PlanRecorder:
+    def __init__(self):
+        self.conn = mysql_connect()
+        self.context = None
+        self.findings = []
+        self.unexplained = []
+        self.seen = set()
+
+    def explain(self, sql, params):
+        text = normalize(sql)
+        if not re.match(r'(?i)^(select|with|update|delete)\b', text) or (self.context, text) in self.seen:
+            return
+        self.seen.add((self.context, text))
+        cursor = self.conn.cursor(dictionary=True)
+        try:
+            cursor.execute('EXPLAIN ' + sql, params)
+            rows = cursor.fetchall()
+        except mysql.connector.Error as e:
+            # e.g. a TEMPORARY table that only exists on the request's own connection
+            self.unexplained.append((self.context, str(e), text))
+            return
+        finally:
+            cursor.close()
+        for row in rows:
+            table = row.get('table') or ''
+            if row.get('type') == 'ALL' and not table.startswith('<'):
+                self.findings.append((self.context, table, text))
+
+
+def first_id(cursor, sql, *params):
+    cursor.execute(sql, params)
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--enterprise', type=int, default=9001)
+    parser.add_argument('--require-mysql', action='store_true', help='fail instead of skipping without MySQL')
+    args = parser.parse_args()
+
+    if os.getenv('DB_BACKEND', 'mysql') != 'mysql':
+        print(f"SKIP: EXPLAIN needs MySQL (DB_BACKEND={os.getenv('DB_BACKEND')})")
+        sys.exit(1 if args.require_mysql else 0)
+    try:
+        recorder = PlanRecorder()
+    except mysql.connector.Error as e:
+        print(f"SKIP: MySQL is not reachable: {e}")
+        sys.exit(1 if args.require_mysql else 0)
+
+    import app as app_module
+    from backend import update
+
+    seed = recorder.conn.cursor()
+    seed.execute("ANALYZE TABLE users, projects, risks, tasks, vendors, budgets, activities, milestones, "
+                 "risk_daily_rollups, schedule_dependencies, chat_rooms, chat_messages")
+    seed.fetchall()
+    project_id = first_id(seed, "SELECT id FROM projects WHERE enterprise_id = %s LIMIT 1", args.enterprise)
+    milestone_id = first_id(seed, "SELECT id FROM milestones WHERE project_id = %s LIMIT 1", project_id)
+    seed.execute("SELECT id FROM tasks WHERE project_id = %s ORDER BY id LIMIT 2", (project_id,))
+    task_ids = [r[0] for r in seed.fetchall()] + [0, 0]
+    room_id = first_id(seed, "SELECT r.room_id FROM chat_rooms r JOIN projects p ON p.id = r.project_id "
+                             "WHERE p.enterprise_id = %s LIMIT 1", args.enterprise)
+    seed.close()
+
+    original = app_module.get_cursor
+    original_chat_connect = app_module.chat_service.connect
+
+    def explaining_get_cursor(read_only=None):
+        cursor, conn = original(read_only)
+        if not cursor:
+            return None, None
+        return ExplainingCursor(cursor, recorder), ExplainingConnection(conn, recorder)
+
+    app_module.get_cursor = explaining_get_cursor
+    app_module.chat_service.connect = lambda: ExplainingConnection(original_chat_connect(), recorder)
+    app_module.dashboard_cache.clear()
+    client = app_module.app.test_client()
+
+    def login(role):
+        with client.session_transaction() as s:
+            s.update(user_id=1, username='plan-check', role=role, enterprise_id=args.enterprise)
+
+    def add_and_remove_dependency():
+        response = client.post('/pm/api/dependencies', json={
+            'project_id': project_id, 'predecessor': {'type': 'task', 'id': task_ids[0]},
+            'successor': {'type': 'task', 'id': task_ids[1]}})
+        recorder.context = 'pm_remove_dependency'
+        dependency_id = (response.get_json() or {}).get('id')
+        if dependency_id:
+            client.delete(f'/pm/api/dependencies/{dependency_id}')
+
+    def chat_history_pages():
+        client.get(f'/api/chat/rooms/{room_id}/messages')  # loads the ring
+        page = client.get(f'/api/chat/rooms/{room_id}/messages?limit=5').get_json() or {}
+        if page.get('next_before'):
+            client.get(f"/api/chat/rooms/{room_id}/messages?before={page['next_before']}&limit=200")
+
+    imported_task = json.dumps([{'project_id': project_id, 'title': 'plan-check import'}]).encode()
+
+    paths = [
+        ('enterprise_login', lambda: client.post('/enterprise-login', data={'email': 'nobody@example.com', 'password': 'x'})),
+        ('admin_dashboard', lambda: client.get('/admin/dashboard')),
+        ('admin_reports', lambda: (app_module.dashboard_cache.clear(), client.get('/admin/reports'))),
+        ('admin_user_management', lambda: client.get('/admin/user_management')),
+        ('admin_user_management:search', lambda: client.get('/admin/user_management?q=a')),
+        ('admin_projects', lambda: client.get('/admin/projects')),
+        ('admin_project_detail', lambda: client.get(f'/admin/projectdetail/{project_id}')),
+        ('admin_export', lambda: client.get('/admin/export/risks?columns=id').get_data()),
+        ('admin_import', lambda: client.post('/admin/import/tasks?format=json', data=io.BytesIO(imported_task),
+                                             content_type='application/json')),
+        ('analyst_risk_score_preview', lambda: client.post('/analyst/api/risk-score/preview',
+                                                           json={'risks': [{'probability': 0.5, 'impact_score': 3}]})),
+        ('analyst_risk_rescore', lambda: client.post('/analyst/api/risk-score/rescore', json={'project_id': project_id})),
+        ('analyst_risk_rescore:enterprise', lambda: client.post('/analyst/api/risk-score/rescore', json={})),
+        ('analyst_risk_forecast_data', lambda: client.get(f'/analyst/api/risk-forecast?project_id={project_id}&trials=1000')),
+        ('analyst_risk_forecast_data:enterprise', lambda: client.get('/analyst/api/risk-forecast?trials=1000')),
+        ('analyst_mitigation_plan', lambda: client.get(f'/analyst/api/mitigation-plan?project_id={project_id}')),
+        ('analyst_mitigation_plan:enterprise', lambda: client.get('/analyst/api/mitigation-plan')),
+        ('analyst_analytics_data', lambda: client.get('/analyst/api/analytics?dimension=rag_status&days=365')),
+        ('analyst_risk_scanner', lambda: client.get('/analyst/risk-scanner')),
+        ('analyst_risk_scan_run', lambda: client.post('/analyst/api/risk-scanner/run', json={'budget': 60})),
+        ('analyst_risk_scan_findings', lambda: client.get('/analyst/api/risk-scanner/findings')),
+        ('admin_riskiest_vendors', lambda: client.get('/admin/api/vendors/riskiest')),
+        ('admin_riskiest_vendors:after', lambda: client.get(
+            '/admin/api/vendors/riskiest?after=' + ((client.get('/admin/api/vendors/riskiest').get_json() or {}).get('next_cursor') or ''))),
+        ('chat_rooms', lambda: client.get('/api/chat/rooms')),
+        ('chat_messages', chat_history_pages),
+        ('chat_messages:post', lambda: client.post(f'/api/chat/rooms/{room_id}/messages', json={'message': 'plan-check'})),
+        ('pm_dashboard', lambda: (login('PM'), client.get('/pm/dashboard'))),
+        ('pm_impacted_milestones', lambda: client.get('/pm/api/impacted-milestones?pm_user_id=1')),
+        ('pm_milestone_path', lambda: client.get(f'/pm/api/milestones/{milestone_id}/path')),
+        ('pm_add_dependency', add_and_remove_dependency),
+        ('get_complete_dashboard_data_per_query', lambda: app_module.get_complete_dashboard_data_per_query(args.enterprise)),
+    ]
+    for name, call in paths:
+        recorder.context = name
+        login('Admin')
+        try:
+            call()
+        except Exception as e:
+            print(f"  ! {name}: {e}")
+
+    recorder.context = 'get_analyst_dashboard_data'
+    conn = mysql_connect()
+    shim = type('MySQL', (), {'connection': ExplainingConnection(conn, recorder)})()
+    original_cursor = shim.connection.cursor
+    shim.connection.cursor = lambda: original_cursor(dictionary=True)
+    update.get_analyst_dashboard_data(shim, args.enterprise)
+    conn.close()
+    app_module.get_cursor = original
+    app_module.chat_service.connect = original_chat_connect
+    app_module.stop_worker()
+
+    failures = [f for f in recorder.findings if (f[0].split(':')[0], f[1]) not in ALLOWED_SCANS]
+    print(f"explained {len(recorder.seen)} statements")
+    for context, table, sql in recorder.findings:
+        status = 'FAIL' if (context, table, sql) in failures else 'allowed'
+        print(f"  [{status}] {context}: full scan of {table}\n      {sql[:160]}")
+    for context, error, sql in recorder.unexplained:
+        print(f"  [skipped] {context}: {error}\n      {sql[:160]}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
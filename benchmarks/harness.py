@@ -0,0 +1,64 @@
+"""Shared helpers for the benchmark scripts: query counting and percentiles."""
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class CountingCursor:
+    """Wraps a cursor and counts execute() calls and fetched rows."""
+
+    def __init__(self, cursor, counter):
+        self._cursor = cursor
+        self._counter = counter
+
+    def execute(self, *args, **kwargs):
+        self._counter['queries'] += 1
+        return self._cursor.execute(*args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        self._counter['queries'] += 1
+        return self._cursor.executemany(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class CountingConnection:
+    def __init__(self, conn, counter):
+        self._conn = conn
+        self._counter = counter
+
+    def cursor(self, *args, **kwargs):
+        return CountingCursor(self._conn.cursor(*args, **kwargs), self._counter)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def install_query_counter(app_module):
+    """Route app.get_cursor through counting wrappers. Returns (counter, restore)."""
+    counter = {'queries': 0}
+    original = app_module.get_cursor
+
+    def counting_get_cursor():
+        cursor, conn = original()
+        if not cursor:
+            return None, None
+        return CountingCursor(cursor, counter), CountingConnection(conn, counter)
+
+    app_module.get_cursor = counting_get_cursor
+
+    def restore():
+        app_module.get_cursor = original
+    return counter, restore
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * q / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
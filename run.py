@@ -1,6 +1,11 @@
-from app import app
+import os
+from app import app, db_pool
+from backend import serving
 print("🚀 Risk Sentinel - USING YOUR EXISTING DATABASE!")
 print("✅ http://localhost:5000")
 print("✅ PM Login: pm_john@remshatech.com / pass123")
 print("✅ Admin: admin@remshatech.com / pass123")
-app.run(debug=True, port=5000)
+serving.warm_up(app, db_pool)
+# development only: production runs gunicorn -c gunicorn.conf.py. FLASK_DEBUG=1 turns on the
+# reloader and debugger; never expose that outside localhost
+app.run(debug=os.getenv('FLASK_DEBUG') == '1', port=5000, threaded=True)
@@ -0,0 +1,61 @@
+"""
+Shared fixtures. The app is imported once against a small generated SQLite tenant
+(DB_BACKEND=sqlite) with a deliberately small pool, so a leaked checkout shows up fast.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix='rs_tests_'), 'risk_sentinel.db')
+os.environ.update(DB_BACKEND='sqlite', DB_SQLITE_PATH=DB_PATH, DB_POOL_SIZE='3', DB_POOL_TIMEOUT='0.5',
+                  FEED_TAIL_INTERVAL='0', RATELIMIT_ENABLED='0')
+
+
+@pytest.fixture(scope='session')
+def app_module():
+    from backend import sqlite_compat
+    from backend.generate_data import create_sqlite_schema, generate
+    conn = sqlite_compat.connect(DB_PATH)
+    create_sqlite_schema(conn)
+    generate(conn, enterprises=2, projects=3, risks=20, tasks=20, milestones=3, vendors=2, activities=5,
+             members=10, messages=5, log=lambda *a: None)
+    conn.close()
+    import app as module
+    yield module
+    module.stop_worker()
+
+
+@pytest.fixture(scope='session')
+def tenant(app_module):
+    """(enterprise_id, pm_user_id, project_id) of the first generated tenant."""
+    conn = app_module.db_pool.acquire()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT enterprise_id, pm_user_id, id FROM projects ORDER BY id LIMIT 1")
+        return cursor.fetchone()
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def login(app_module, tenant):
+    """login(role, **session) -> a test client with that session."""
+    def make(role='Admin', **extra):
+        client = app_module.app.test_client()
+        with client.session_transaction() as s:
+            s.update(user_id=extra.pop('user_id', 1), username='test', role=role, enterprise_id=tenant[0], **extra)
+        return client
+    return make
+
+
+@pytest.fixture
+def pool_checked_in(app_module):
+    """Asserts the test left every pooled connection idle."""
+    yield app_module.db_pool
+    snapshot = app_module.db_pool.snapshot()
+    assert snapshot['open'] == snapshot['idle'], snapshot
@@ -0,0 +1,32 @@
+"""
+The hashing pool's admission slots track running checks, including ones the caller gave up on.
+"""
+import threading
+
+import pytest
+
+from backend.auth import AuthBusy, PasswordVerifier
+
+
+def test_timed_out_check_keeps_its_slot_until_it_finishes(monkeypatch):
+    verifier = PasswordVerifier(workers=1, max_pending=1, queue_wait=0.05, timeout=0.05)
+    hashing = threading.Event()
+    finish = threading.Event()
+
+    def slow(password, stored):
+        hashing.set()
+        finish.wait(5)
+        return True, None
+    monkeypatch.setattr(verifier, '_check', slow)
+
+    with pytest.raises(AuthBusy, match='timed out'):
+        verifier.verify('pw', 'hash')
+    assert hashing.is_set()
+    with pytest.raises(AuthBusy, match='saturated'):
+        verifier.verify('pw', 'hash')
+    assert verifier.rejected == 1
+
+    finish.set()
+    verifier.queue_wait = 1.0
+    assert verifier.verify('pw', 'hash') == (True, None)
+    verifier.shutdown()
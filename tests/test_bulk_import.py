@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def foreign_ids(app_module, tenant):
+    """A vendor, a user and a risk that belong to the other generated enterprise."""
+    conn = app_module.db_pool.acquire()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT v.id FROM vendors v JOIN projects p ON p.id = v.assigned_project_id "
+                       "WHERE p.enterprise_id <> %s LIMIT 1", (tenant[0],))
+        vendor_id = cursor.fetchone()[0]
+        cursor.execute("SELECT id FROM users WHERE enterprise_id <> %s LIMIT 1", (tenant[0],))
+        user_id = cursor.fetchone()[0]
+        cursor.execute("SELECT r.id FROM risks r JOIN projects p ON p.id = r.project_id "
+                       "WHERE p.enterprise_id <> %s LIMIT 1", (tenant[0],))
+        risk_id = cursor.fetchone()[0]
+        return vendor_id, user_id, risk_id
+    finally:
+        conn.close()
+
+
+def test_rejects_ids_of_another_enterprise(login, tenant, foreign_ids, pool_checked_in):
+    vendor_id, user_id, risk_id = foreign_ids
+    project_id = tenant[2]
+    risks = (f"project_id,title,vendor_id,assigned_to\n"
+             f"{project_id},ok,,\n{project_id},foreign vendor,{vendor_id},\n{project_id},foreign user,,{user_id}\n")
+    response = login('Admin').post('/admin/import/risks?format=csv', data=risks)
+    summary = response.get_json()
+    assert response.status_code == 207
+    assert summary['inserted'] == 1 and summary['failed'] == 2
+    assert [e['row'] for e in summary['errors']] == [2, 3]
+    assert 'does not belong to this enterprise' in summary['errors'][0]['error']
+
+    tasks = json.dumps([{'project_id': project_id, 'title': 'foreign risk', 'risk_id': risk_id},
+                        {'project_id': project_id, 'title': 'foreign creator', 'created_by': user_id}])
+    summary = login('Admin').post('/admin/import/tasks?format=json', data=tasks).get_json()
+    assert summary['inserted'] == 0 and summary['failed'] == 2
+
+
+def test_unreadable_tail_is_a_partial_import(login, tenant, pool_checked_in):
+    rows = ''.join(json.dumps({'project_id': tenant[2], 'title': f'row {n}'}) + '\n' for n in range(5))
+    response = login('Admin').post('/admin/import/risks?format=json&chunk_rows=2&batch_size=2',
+                                   data=rows + '{"project_id": oops\n')
+    summary = response.get_json()
+    assert response.status_code == 207
+    assert summary['inserted'] == 5 and summary['aborted'].startswith('invalid JSON after row 5')
+    assert summary['health_updated'] == 1
+
+
+def test_unreadable_from_the_start_is_a_bad_request(login, pool_checked_in):
+    response = login('Admin').post('/admin/import/risks?format=json', data='{"project_id": oops')
+    assert response.status_code == 400
+    assert response.get_json()['inserted'] == 0
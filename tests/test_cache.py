@@ -0,0 +1,19 @@
+"""
+Clearing a cache over the shared store drops this app's keys and nothing else.
+"""
+from backend.cache import LocalSharedStore, SharedBackend, TTLCache
+
+
+def test_shared_clear_deletes_only_prefixed_keys():
+    store = LocalSharedStore()
+    store.set('other:keep', b'x')
+    cache = TTLCache(SharedBackend(store), ttl=60, namespace='dash')
+    for i in range(1200):
+        cache.set(i, {'n': i})
+    assert cache.get(7) == {'n': 7}
+
+    cache.clear()
+
+    assert cache.get(7) is None
+    assert list(store.scan_iter(match='rs:*')) == []
+    assert store.get('other:keep') == b'x'
@@ -0,0 +1,52 @@
+"""
+Chat history rings across workers, and message ids from batched writes.
+"""
+import json
+
+from backend.chat import ChatService
+from backend.live_feed import FeedHub, LocalPubSub
+
+
+def worker(app_module, backend=None):
+    """A second process's ChatService on the same database; without `backend`, its own local one."""
+    return ChatService(app_module.db_pool.acquire, FeedHub(LocalPubSub()), backend or LocalPubSub(),
+                       ring_size=50, shared_backend=backend is not None)
+
+
+def first_room(app_module):
+    return app_module.chat_service._query("SELECT MIN(room_id) AS r FROM chat_rooms", ())[0]['r']
+
+
+def test_local_backend_reads_history_from_the_database(app_module):
+    room_id = first_room(app_module)
+    a, b = worker(app_module), worker(app_module)
+    a.history(room_id)
+    saved = b.post(room_id, 1, 'from worker b')
+    assert a.history(room_id)[0]['message_id'] == saved['message_id']
+    assert a.stats_counters['ring_hits'] == 0 and a.stats()['active_rooms'] == 0
+
+
+def test_shared_backend_serves_open_rooms_from_the_ring(app_module):
+    room_id = first_room(app_module)
+    shared = LocalPubSub()  # stands in for redis: every service hears every flush
+    a, b = worker(app_module, shared), worker(app_module, shared)
+    a.history(room_id)
+    saved = b.post(room_id, 1, 'from worker b')
+    assert a.history(room_id)[0]['message_id'] == saved['message_id']
+    assert a.stats_counters['ring_hits'] == 2 and a.stats_counters['ring_misses'] == 0
+
+
+def test_batched_messages_get_their_database_ids(app_module):
+    room_id = first_room(app_module)
+    service = worker(app_module)
+    sub = service.hub.subscribe(room_id)
+    service._thread = True  # as if a flusher were running: queue now, write as one batch below
+    for i in range(3):
+        service.post(room_id, 1, f'batched {i}', wait=False)
+    service._thread = None
+    assert service.flush() == 3
+
+    sent = [json.loads(event[2]) for event in sub.drain(0)]
+    stored = service._query("SELECT message_id, message FROM chat_messages WHERE message_id >= %s ORDER BY message_id",
+                            (sent[0]['message_id'],))
+    assert [(m['message_id'], m['message']) for m in sent] == [(m['message_id'], m['message']) for m in stored]
@@ -0,0 +1,18 @@
+"""
+The admin overview fragment follows the dashboard_cache entry it was rendered from.
+"""
+
+
+def test_overview_fragment_rerenders_when_dashboard_entry_is_rebuilt(app_module, login, tenant, monkeypatch):
+    assert app_module.fragment_cache is not None
+    client = login('Admin')
+    assert client.get('/admin/dashboard').status_code == 200
+
+    # the dashboard entry expires on its own (no notify_enterprise_write) and is rebuilt with new figures
+    build = app_module.build_dashboard_data
+    monkeypatch.setattr(app_module, 'build_dashboard_data',
+                        lambda enterprise_id: (dict(build(enterprise_id)[0], active_projects=4242), True))
+    app_module.dashboard_cache.invalidate(tenant[0])
+
+    page = client.get('/admin/dashboard').get_data(as_text=True)
+    assert 'Active<br>4242' in page
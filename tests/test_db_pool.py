@@ -0,0 +1,56 @@
+import gc
+import threading
+
+import pytest
+
+from backend.db_pool import ConnectionPool, PoolExhausted
+
+
+class FakeConnection:
+    in_transaction = False
+
+    def ping(self, reconnect=False):
+        pass
+
+    def consume_results(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_closed_connection_is_reused():
+    pool = ConnectionPool(FakeConnection, size=1, timeout=0.1)
+    first = pool.acquire()
+    raw = first._raw
+    first.close()
+    first.close()  # idempotent
+    second = pool.acquire()
+    assert second._raw is raw
+    assert pool.snapshot()['hits'] == 1
+
+
+def test_exhausted_pool_raises():
+    pool = ConnectionPool(FakeConnection, size=1, timeout=0.05)
+    held = pool.acquire()
+    with pytest.raises(PoolExhausted):
+        pool.acquire()
+    held.close()
+
+
+def test_unclosed_checkout_is_reclaimed():
+    pool = ConnectionPool(FakeConnection, size=1, timeout=0.5)
+    pool.acquire()  # dropped without close()
+    gc.collect()
+    conn = pool.acquire()
+    snapshot = pool.snapshot()
+    assert snapshot['leaked'] == 1 and snapshot['open'] == 1
+    conn.close()
+
+
+def test_waiter_picks_up_a_connection_leaked_meanwhile():
+    pool = ConnectionPool(FakeConnection, size=1, timeout=1.0)
+    holder = [pool.acquire()]
+    threading.Timer(0.2, lambda: (holder.clear(), gc.collect())).start()
+    pool.acquire().close()
+    assert pool.snapshot()['leaked'] == 1
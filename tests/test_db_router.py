@@ -0,0 +1,35 @@
+"""
+Replica health: a replica that cannot report its lag stays out of rotation unless allowed.
+"""
+from backend import sqlite_compat
+from backend.db_pool import ConnectionPool
+from backend.db_router import Replica, ReplicaRouter, replica_lag
+from backend.generate_data import create_sqlite_schema
+
+
+def make_router(tmp_path, **kwargs):
+    path = str(tmp_path / 'replica.db')
+    conn = sqlite_compat.connect(path)
+    create_sqlite_schema(conn)
+    conn.close()
+    pool = ConnectionPool(lambda: sqlite_compat.connect(path), size=1, timeout=0.5)
+    primary = ConnectionPool(lambda: sqlite_compat.connect(path), size=1, timeout=0.5)
+    return ReplicaRouter(primary, [Replica('r1', pool)], rise=1, **kwargs)
+
+
+def test_unknown_lag_is_unhealthy_by_default(tmp_path):
+    router = make_router(tmp_path)
+    conn = router.primary.acquire()
+    assert replica_lag(conn.cursor()) is None  # the SQLite stand-in cannot say
+    conn.close()
+    assert router.check_all() == {'r1': False}
+    assert router.replicas[0].error == 'replication lag unknown'
+    router.acquire(read_only=True).close()
+    assert router.stats['fallbacks'] == 1
+
+
+def test_unknown_lag_allowed_by_opt_out(tmp_path):
+    router = make_router(tmp_path, allow_unknown_lag=True)
+    assert router.check_all() == {'r1': True}
+    router.acquire(read_only=True).close()
+    assert router.stats['replica_reads'] == 1
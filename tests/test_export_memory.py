@@ -0,0 +1,31 @@
+"""
+benchmarks/bench_export.py as a test: streaming an export keeps peak RSS flat. Each run is
+its own process so the peak is the export's, not the test session's. The 1M-row check is
+slow and opt-in: set EXPORT_RSS_CHECK=1 (EXPORT_RSS_LIMIT_MB overrides the 64MB ceiling).
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+
+SCRIPT = os.path.join(ROOT, 'benchmarks', 'bench_export.py')
+
+
+def run(*args):
+    return subprocess.run([sys.executable, SCRIPT, *args], capture_output=True, text=True, timeout=1800)
+
+
+def test_small_export_runs():
+    result = run('--rows', '20000', '--format', 'csv', '--gzip')
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert 'peak RSS growth' in result.stdout
+
+
+@pytest.mark.skipif(not os.getenv('EXPORT_RSS_CHECK'), reason='EXPORT_RSS_CHECK is not set')
+@pytest.mark.parametrize('args', [('--format', 'csv', '--gzip'), ('--format', 'json')])
+def test_million_row_export_stays_under_rss_ceiling(args):
+    result = run('--rows', '1000000', '--limit-mb', os.getenv('EXPORT_RSS_LIMIT_MB', '64'), *args)
+    assert result.returncode == 0, result.stdout + result.stderr
@@ -0,0 +1,57 @@
+"""
+Which projects an incremental health run revisits, and what it keeps in project_health.
+"""
+from datetime import datetime
+
+from backend import sqlite_compat
+from backend.generate_data import create_sqlite_schema
+from backend.health_scheduler import changed_projects, recompute, run_once
+
+SINCE = datetime(2026, 5, 4, 12, 0, 0)
+UNTIL = datetime(2026, 5, 6, 12, 0, 0)
+
+
+def test_changed_projects(tmp_path):
+    conn = sqlite_compat.connect(str(tmp_path / 'health.db'))
+    create_sqlite_schema(conn)
+    cursor = conn.cursor()
+    cursor.executemany(
+        "INSERT INTO tasks (project_id, title, status, due_date, created_at, completed_at, updated_at) "
+        "VALUES (%s, %s, %s, %s, %s, %s, %s)", [
+            (1, 'reassigned in the window', 'InProgress', '2026-09-01', '2026-01-01 00:00:00', None, '2026-05-05 09:00:00'),
+            (2, 'fell due in the window', 'InProgress', '2026-05-05', '2026-01-01 00:00:00', None, '2026-01-01 00:00:00'),
+            (3, 'fell due, already done', 'Completed', '2026-05-05', '2026-01-01 00:00:00', '2026-04-01 00:00:00',
+             '2026-04-01 00:00:00'),
+            (4, 'overdue before the window', 'InProgress', '2026-05-03', '2026-01-01 00:00:00', None, '2026-01-01 00:00:00'),
+            (5, 'due today, not yet overdue', 'InProgress', '2026-05-06', '2026-01-01 00:00:00', None, '2026-01-01 00:00:00'),
+            (6, 'updated after the window', 'InProgress', '2026-09-01', '2026-01-01 00:00:00', None, '2026-05-06 12:00:01'),
+        ])
+    cursor.execute("INSERT INTO risks (project_id, title, last_updated) VALUES (%s, %s, %s)",
+                   (7, 'rescored', '2026-05-06 12:00:00'))
+    conn.commit()
+    assert changed_projects(cursor, SINCE, UNTIL) == [1, 2, 7]
+    conn.close()
+
+
+def test_rows_are_written_on_change_and_pruned(tmp_path):
+    conn = sqlite_compat.connect(str(tmp_path / 'health.db'))
+    create_sqlite_schema(conn)
+    cursor = conn.cursor()
+    cursor.executemany("INSERT INTO projects (id, name, enterprise_id) VALUES (%s, %s, %s)",
+                       [(1, 'steady', 1), (2, 'turns red', 1)])
+    first, second = datetime(2026, 1, 1), datetime(2026, 1, 2)
+    assert recompute(cursor, [1, 2], first) == (2, 2)
+    assert recompute(cursor, [1, 2], second) == (2, 0)
+
+    cursor.executemany("INSERT INTO risks (project_id, title, rag_status, status, last_updated) "
+                       "VALUES (%s, %s, %s, %s, %s)", [(2, f'red {i}', 'Red', 'Identified', second) for i in range(3)])
+    later = datetime(2026, 5, 1)
+    assert recompute(cursor, [1, 2], later, history_days=90) == (2, 1)
+    cursor.execute("SELECT project_id, health_score, calculated_at FROM project_health ORDER BY project_id")
+    # project 1 keeps its only (old) row; project 2's superseded Green row is past the history window
+    assert cursor.fetchall() == [(1, 'Green', first), (2, 'Red', later)]
+
+    record = run_once(conn)  # first run: everything written since the epoch
+    assert (record['projects_touched'], record['written']) == (1, 0)
+    assert run_once(conn)['since'] == record['until']
+    conn.close()
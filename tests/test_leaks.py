@@ -0,0 +1,74 @@
+"""
+Requests whose response body never runs must still give back what the view checked out.
+Responses are closed the way a WSGI server closes them (PEP 3333 close()), never iterated.
+"""
+
+
+def test_export_head_returns_connection(login, pool_checked_in):
+    client = login('Admin')
+    for _ in range(pool_checked_in.size + 1):
+        response = client.head('/admin/export/risks')
+        assert response.status_code == 200
+        response.close()
+    with client.get('/admin/export/risks?columns=id') as response:
+        assert response.status_code == 200
+        assert response.get_data().startswith(b'id')
+
+
+def test_export_abandoned_stream_returns_connection(login, pool_checked_in):
+    client = login('Admin')
+    for _ in range(pool_checked_in.size + 1):
+        response = client.get('/admin/export/risks')
+        assert response.status_code == 200
+        response.close()
+
+
+def test_login_returns_connection_when_lookup_fails(app_module, monkeypatch, pool_checked_in):
+    def broken(cursor, email):
+        raise RuntimeError('lookup failed')
+    monkeypatch.setattr(app_module, 'lookup_user', broken)
+    client = app_module.app.test_client()
+    for _ in range(pool_checked_in.size + 1):
+        client.post('/enterprise-login', data={'email': 'nobody@example.com', 'password': 'x'})
+
+
+def test_live_feed_head_unsubscribes(app_module, login):
+    client = login('Admin')
+    before = app_module.feed_hub.subscriber_count()
+    for method in (client.head, client.get):
+        response = method('/api/live/feed')
+        assert response.status_code == 200
+        response.close()
+    assert app_module.feed_hub.subscriber_count() == before
+
+
+def test_chat_stream_head_unsubscribes(app_module, login, tenant):
+    conn = app_module.db_pool.acquire()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT room_id FROM chat_rooms WHERE project_id = %s", (tenant[2],))
+        room_id = cursor.fetchone()[0]
+    finally:
+        conn.close()
+    client = login('Admin')
+    before = app_module.chat_hub.subscriber_count()
+    for method in (client.head, client.get):
+        response = method(f'/api/chat/rooms/{room_id}/stream')
+        assert response.status_code == 200
+        response.close()
+    assert app_module.chat_hub.subscriber_count() == before
+
+
+def test_sse_streams_are_capped_and_slots_come_back(app_module, login, monkeypatch):
+    import threading
+    monkeypatch.setattr(app_module, 'sse_slots', threading.BoundedSemaphore(1))
+    client = login('Admin')
+    first = client.get('/api/live/feed')
+    assert first.status_code == 200
+    refused = client.get('/api/live/feed')
+    assert refused.status_code == 503 and refused.headers['Retry-After']
+    first.close()
+    again = client.head('/api/live/feed')
+    assert again.status_code == 200
+    again.close()
+    assert app_module.sse_slots.acquire(blocking=False)
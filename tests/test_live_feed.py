@@ -0,0 +1,53 @@
+"""
+FeedHub replay and resync: reconnecting clients resume by Last-Event-ID, and anything that
+cannot be replayed exactly becomes a single resync event.
+"""
+from backend.live_feed import RESYNC, FeedHub
+
+
+def kinds(events):
+    return [e[1] for e in events]
+
+
+def test_reconnect_replays_only_missed_events():
+    hub = FeedHub(replay=10)
+    for i in range(5):
+        hub.publish(1, 'activity', {'n': i})
+    hub.publish(2, 'activity', {'n': 'other tenant'})
+    sub = hub.subscribe(1, last_event_id=hub.event_id(3))
+    assert [e[0] for e in sub.drain(0)] == [4, 5]
+    assert hub.subscribe(1, last_event_id=hub.event_id(5)).drain(0) == []
+
+
+def test_gap_older_than_the_ring_resyncs():
+    hub = FeedHub(replay=3)
+    for i in range(6):
+        hub.publish(1, 'activity', {'n': i})
+    events = hub.subscribe(1, last_event_id=hub.event_id(1)).drain(0)
+    assert events[0] == RESYNC and [e[0] for e in events[1:]] == [4, 5, 6]
+    assert hub.subscribe(1, last_event_id=hub.event_id(99)).drain(0) == [RESYNC]
+
+
+def test_id_from_another_worker_resyncs():
+    # each worker numbers its own events; the same seq means nothing to a different hub
+    a, b = FeedHub(), FeedHub()
+    for hub in (a, b):
+        for i in range(5):
+            hub.publish(1, 'activity', {'n': i})
+    assert b.subscribe(1, last_event_id=a.event_id(3)).drain(0) == [RESYNC]
+    assert b.subscribe(1, last_event_id='3').drain(0) == [RESYNC]
+    assert [e[0] for e in b.subscribe(1, last_event_id=b.event_id(3)).drain(0)] == [4, 5]
+
+
+def test_slow_subscriber_gets_resync_then_is_evicted():
+    hub = FeedHub(max_queue=2, max_overflows=1)
+    sub = hub.subscribe(1)
+    for i in range(3):
+        hub.publish(1, 'risk', {'n': i})
+    assert kinds(sub.drain(0)) == ['resync']
+    assert sub.overflows == 1 and sub.dropped == 2
+
+    for i in range(3):
+        hub.publish(1, 'risk', {'n': i})
+    assert sub.closed and hub.evicted == 1
+    assert hub.subscriber_count(1) == 0
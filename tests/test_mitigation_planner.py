@@ -0,0 +1,67 @@
+"""
+mitigation_planner.solve(): never over budget, and close to the exact optimum on small instances.
+"""
+import itertools
+import random
+
+import numpy as np
+
+from backend import mitigation_planner as mp
+
+
+def front(cost, value):
+    cost, value = np.asarray(cost, dtype=np.float64), np.asarray(value, dtype=np.float64)
+    ratio = np.divide(value, cost, out=np.zeros(len(cost)), where=cost > 0)
+    order = np.lexsort((np.arange(len(cost)), -ratio))
+    return {'cost': cost, 'value': value, 'order': order, 'prefix': np.cumsum(cost[order])}
+
+
+def best_value(f, budget):
+    n = len(f['cost'])
+    best = 0.0
+    for r in range(n + 1):
+        for picked in itertools.combinations(range(n), r):
+            if f['cost'][list(picked)].sum() <= budget:
+                best = max(best, f['value'][list(picked)].sum())
+    return best
+
+
+def test_within_budget_and_near_optimal():
+    rnd = random.Random(2026)
+    config = mp.PlannerConfig()
+    ratios = []
+    for _ in range(200):
+        n = rnd.randint(1, 10)
+        f = front([rnd.uniform(1, 100) for _ in range(n)], [rnd.uniform(0, 100) for _ in range(n)])
+        budget = rnd.uniform(0, f['cost'].sum())
+        chosen = mp.solve(f, budget, config)
+        assert f['cost'][chosen].sum() <= budget + 1e-9
+        optimum = best_value(f, budget)
+        if optimum:
+            ratios.append(f['value'][chosen].sum() / optimum)
+    assert min(ratios) >= 0.5  # guaranteed by the best-single-candidate floor
+    assert sum(ratios) / len(ratios) >= 0.99
+
+
+def test_single_big_item_beats_greedy_ratio():
+    # greedy by value/cost takes the cheap item and then cannot afford the valuable one
+    f = front([1.0, 100.0], [2.0, 150.0])
+    chosen = mp.solve(f, 100.0, mp.PlannerConfig())
+    assert chosen.tolist() == [False, True]
+
+
+def test_no_budget_or_candidates():
+    config = mp.PlannerConfig()
+    assert not mp.solve(front([5.0], [9.0]), 0.0, config).any()
+    assert len(mp.solve(front([], []), 100.0, config)) == 0
+
+
+def test_plan_project_reuses_the_frontier_for_other_budgets():
+    risks = [(i, f'risk {i}', 10000.0 * (i + 1), 2.5, 0.5, 3, 0) for i in range(8)]
+    inputs = {'budget': 20000.0, 'risks': risks}
+    mp.planner_cache.clear()
+    full = mp.plan_project(inputs, 1)
+    half = mp.plan_project(inputs, 1, budget=10000.0)
+    assert full['spend'] <= 20000.0 and half['spend'] <= 10000.0
+    assert half['value'] <= full['value']
+    assert mp.planner_cache.get(f'frontier:1:{mp.candidate_version(risks, mp.PlannerConfig.from_env())}') is not None
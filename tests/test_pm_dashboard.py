@@ -0,0 +1,24 @@
+"""
+The PM dashboard renders with the view's context, including the Impacted Milestones card.
+"""
+
+
+def test_pm_dashboard_lists_impacted_milestones(app_module, login, tenant):
+    enterprise_id, pm_user_id, project_id = tenant
+    conn = app_module.db_pool.acquire()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM milestones WHERE project_id = %s ORDER BY id LIMIT 1", (project_id,))
+        milestone_id = cursor.fetchone()[0]
+        cursor.execute("UPDATE milestones SET title = %s, status = %s, target_date = %s, projected_date = %s, "
+                       "slip_days = %s, driving_path = %s WHERE id = %s",
+                       ('Go-live', 'Pending', '2026-03-01', '2026-03-09', 8, '[["task", 7, 20519]]', milestone_id))
+        conn.commit()
+    finally:
+        conn.close()
+
+    response = login('PM', user_id=pm_user_id).get('/pm/dashboard')
+    assert response.status_code == 200
+    page = response.get_data(as_text=True)
+    assert 'Impacted Milestones' in page
+    assert 'Go-live' in page and '+8d' in page and 'driven by task #7' in page
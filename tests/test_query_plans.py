@@ -0,0 +1,35 @@
+"""
+benchmarks/check_query_plans.py in CI: it needs MySQL and a seeded enterprise, and skips cleanly without them.
+Set PLAN_CHECK_ENTERPRISE (plus the DB_HOST / DB_USER / DB_PASS / DB_NAME settings) to run the real check.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+
+SCRIPT = os.path.join(ROOT, 'benchmarks', 'check_query_plans.py')
+# set by conftest.py for the in-process app; the script gets the caller's own database settings
+TEST_SETTINGS = ('DB_BACKEND', 'DB_SQLITE_PATH', 'DB_POOL_SIZE', 'DB_POOL_TIMEOUT')
+
+
+def run(*args, **env):
+    environ = {k: v for k, v in os.environ.items() if k not in TEST_SETTINGS}
+    environ.update(env)
+    return subprocess.run([sys.executable, SCRIPT, *args], env=environ, capture_output=True, text=True, timeout=600)
+
+
+@pytest.mark.parametrize('env', [{'DB_BACKEND': 'sqlite'}, {'DB_HOST': 'mysql.invalid'}])
+def test_skips_without_mysql(env):
+    result = run(**env)
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert result.stdout.startswith('SKIP')
+    assert run('--require-mysql', **env).returncode == 1
+
+
+@pytest.mark.skipif(not os.getenv('PLAN_CHECK_ENTERPRISE'), reason='PLAN_CHECK_ENTERPRISE is not set')
+def test_no_full_table_scans():
+    result = run('--require-mysql', '--enterprise', os.environ['PLAN_CHECK_ENTERPRISE'])
+    assert result.returncode == 0, result.stdout + result.stderr
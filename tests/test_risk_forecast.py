@@ -0,0 +1,69 @@
+"""
+Portfolio forecasts reuse per-project results and give the same numbers however they were computed.
+"""
+from datetime import date
+
+import pytest
+
+from backend import compute_pool, risk_forecast
+
+TRIALS = 2000
+
+
+def portfolio():
+    return {
+        pid: {'risks': [(0.1 * (pid + i % 5), 1000.0 * (i + 1), i % 7) for i in range(pid * 3)],
+              'milestones': [(pid * 10, f'M{pid}', date(2026, 6, 1))]}
+        for pid in (1, 2, 3, 4)
+    }
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    risk_forecast.forecast_cache.clear()
+    risk_forecast.trial_cache.clear()
+    yield
+    risk_forecast.forecast_cache.clear()
+    risk_forecast.trial_cache.clear()
+
+
+def count_simulations(monkeypatch):
+    calls = []
+    simulate = risk_forecast.simulate_project
+
+    def counted(project_id, risks, trials, seed):
+        calls.append(project_id)
+        return simulate(project_id, risks, trials, seed)
+    monkeypatch.setattr(risk_forecast, 'simulate_project', counted)
+    return calls
+
+
+def test_changed_project_is_the_only_one_simulated_again(monkeypatch):
+    data = portfolio()
+    risk_forecast.forecast(data, TRIALS, workers=1)
+    data[2]['risks'].append((0.9, 50000.0, 30))
+    calls = count_simulations(monkeypatch)
+    warm = risk_forecast.forecast(data, TRIALS, workers=1)
+    assert calls == [2]
+
+    risk_forecast.forecast_cache.clear()
+    risk_forecast.trial_cache.clear()
+    assert risk_forecast.forecast(data, TRIALS, workers=1) == warm
+
+
+def test_project_forecast_warms_the_portfolio(monkeypatch):
+    data = portfolio()
+    single = risk_forecast.forecast_project(data[3], 3, TRIALS)
+    calls = count_simulations(monkeypatch)
+    result = risk_forecast.forecast(data, TRIALS, workers=1)
+    assert sorted(calls) == [1, 2, 4]
+    assert result['projects']['3'] == single
+
+
+def test_pooled_forecast_matches_serial():
+    serial = risk_forecast.forecast(portfolio(), TRIALS, workers=1)
+    risk_forecast.forecast_cache.clear()
+    risk_forecast.trial_cache.clear()
+    pooled = risk_forecast.forecast(portfolio(), TRIALS, workers=2, parallel_threshold=0)
+    assert pooled == serial
+    assert compute_pool.executor() is compute_pool.executor()
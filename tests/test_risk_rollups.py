@@ -0,0 +1,111 @@
+"""
+Incremental rollups: shifting the enterprise rows by project deltas must match a full backfill.
+"""
+import random
+from datetime import datetime, timedelta
+
+from backend import risk_rollups, sqlite_compat
+from backend.generate_data import create_sqlite_schema
+
+SEVERITIES = ('Low', 'Medium', 'High', 'Critical')
+STATUSES = ('Identified', 'InProgress', 'Mitigated', 'Closed')
+START = datetime(2026, 4, 1, 9, 0, 0)
+BEFORE, AFTER = '2026-01-01 00:00:00', '2026-01-02 00:00:00'  # either side of the stored watermark
+
+
+def random_risk(rnd):
+    score = round(rnd.uniform(0.5, 5.0), 2)
+    return (rnd.choice(SEVERITIES), rnd.choice(STATUSES), rnd.choice(('Red', 'Amber', 'Green')),
+            rnd.choice(('Operational', 'Financial', 'Technical')), score, round(rnd.uniform(0, 50000), 2))
+
+
+def rollup_rows(cursor):
+    cursor.execute("""
+        SELECT enterprise_id, project_id, dimension, value, day, risks, open_risks, high_risks,
+               ROUND(score_sum, 6), ROUND(finance_sum, 6)
+        FROM risk_daily_rollups ORDER BY enterprise_id, project_id, dimension, value, day
+    """)
+    return [tuple(row) for row in cursor.fetchall()]
+
+
+def test_incremental_run_matches_backfill(tmp_path):
+    rnd = random.Random(2026)
+    conn = sqlite_compat.connect(str(tmp_path / 'rollups.db'))
+    create_sqlite_schema(conn)
+    cursor = conn.cursor()
+    # two enterprises so deltas from one never leak into the other
+    cursor.executemany("INSERT INTO projects (id, name, enterprise_id) VALUES (%s, %s, %s)",
+                       [(pid, f'project {pid}', 1 if pid <= 3 else 2) for pid in range(1, 6)])
+    risks = []
+    for rid in range(1, 121):
+        created = START + timedelta(days=rnd.randint(0, 9), hours=rnd.randint(0, 8))
+        risks.append((rid, rnd.randint(1, 5), f'risk {rid}', created, BEFORE) + random_risk(rnd))
+    cursor.executemany("""
+        INSERT INTO risks (id, project_id, title, created_at, last_updated,
+                           severity, status, rag_status, risk_category, risk_score, finance_impact)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, risks)
+    conn.commit()
+    assert risk_rollups.run_once(conn)['rows'] > 0
+    cursor.execute("UPDATE job_watermarks SET watermark = %s WHERE job = %s", (BEFORE, risk_rollups.JOB_NAME))
+
+    # edit some risks in place, and add some on days that had none
+    for rid in rnd.sample(range(1, 121), 30):
+        cursor.execute("""
+            UPDATE risks SET severity = %s, status = %s, rag_status = %s, risk_category = %s,
+                             risk_score = %s, finance_impact = %s, last_updated = %s
+            WHERE id = %s
+        """, random_risk(rnd) + (AFTER, rid))
+    for rid in range(121, 131):
+        created = START + timedelta(days=rnd.randint(10, 12))
+        cursor.execute("""
+            INSERT INTO risks (id, project_id, title, created_at, last_updated,
+                               severity, status, rag_status, risk_category, risk_score, finance_impact)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (rid, rnd.randint(1, 5), f'risk {rid}', created, AFTER) + random_risk(rnd))
+    # move every risk of one (severity, day) group elsewhere so its enterprise row must disappear
+    cursor.execute("SELECT DATE(created_at), severity FROM risks WHERE id = 1")
+    day, severity = cursor.fetchone()
+    other = next(s for s in SEVERITIES if s != severity)
+    cursor.execute("UPDATE risks SET severity = %s, last_updated = %s WHERE DATE(created_at) = %s AND severity = %s",
+                   (other, AFTER, day, severity))
+    conn.commit()
+
+    record = risk_rollups.run_once(conn)
+    assert record['projects_touched'] == 5
+    incremental = rollup_rows(cursor)
+    assert not [row for row in incremental if row[2] == 'severity' and row[3] == severity and row[4] == day]
+
+    risk_rollups.backfill(conn)
+    assert incremental == rollup_rows(cursor)
+    conn.close()
+
+
+def test_reconcile_picks_up_deleted_and_moved_risks(tmp_path):
+    rnd = random.Random(18)
+    conn = sqlite_compat.connect(str(tmp_path / 'reconcile.db'))
+    create_sqlite_schema(conn)
+    cursor = conn.cursor()
+    cursor.executemany("INSERT INTO projects (id, name, enterprise_id) VALUES (%s, %s, %s)",
+                       [(1, 'a', 1), (2, 'b', 1), (3, 'c', 2)])
+    cursor.executemany("""
+        INSERT INTO risks (id, project_id, title, created_at, last_updated,
+                           severity, status, rag_status, risk_category, risk_score, finance_impact)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, [(rid, rid % 3 + 1, f'risk {rid}', START + timedelta(days=rid % 4), BEFORE) + random_risk(rnd)
+          for rid in range(1, 41)])
+    conn.commit()
+    risk_rollups.run_once(conn)
+
+    # neither write touches last_updated: a delete, and a move straight to another project (and enterprise)
+    cursor.execute("DELETE FROM risks WHERE id = 4")
+    cursor.execute("UPDATE risks SET project_id = 3 WHERE id = 6")
+    conn.commit()
+
+    assert risk_rollups.run_once(conn, reconcile_days=0)['projects_touched'] == 0
+    assert risk_rollups.run_once(conn, reconcile_days=36500)['projects_touched'] == 3
+    incremental = rollup_rows(cursor)
+    risk_rollups.backfill(conn)
+    assert incremental == rollup_rows(cursor)
+    assert risk_rollups.run_once(conn, reconcile_days=36500)['projects_touched'] == 0
+    conn.close()
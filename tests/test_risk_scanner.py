@@ -0,0 +1,95 @@
+"""
+Incremental rule windows: which rows a run after the watermark looks at again; cached
+dashboards of an enterprise a scan raised risks for are dropped; the run route's input checks.
+"""
+from datetime import datetime
+
+import pytest
+
+from backend import cache, risk_scanner, sqlite_compat
+from backend.generate_data import create_sqlite_schema
+from backend.risk_scanner import RULES, compile_rule, scan
+
+SINCE = datetime(2026, 5, 4, 12, 0, 0)
+
+
+def test_overdue_high_task_window_includes_edited_tasks(tmp_path):
+    rule = next(r for r in RULES if r.key == 'overdue_high_task')
+    conn = sqlite_compat.connect(str(tmp_path / 'scan.db'))
+    create_sqlite_schema(conn)
+    cursor = conn.cursor()
+    cursor.executemany(
+        "INSERT INTO tasks (id, project_id, title, priority, status, due_date, created_at, updated_at) "
+        "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)", [
+            (1, 1, 'raised to High after the run', 'High', 'InProgress', '2026-04-01', '2026-01-01 00:00:00',
+             '2026-05-05 08:00:00'),
+            (2, 1, 'untouched since before the run', 'High', 'InProgress', '2026-04-01', '2026-01-01 00:00:00',
+             '2026-03-01 00:00:00'),
+            (3, 1, 'created after the run', 'High', 'NotStarted', '2026-04-01', '2026-05-05 09:00:00',
+             '2026-05-05 09:00:00'),
+        ])
+    conn.commit()
+    cursor.execute(compile_rule(rule, True, 1), (rule.key, 1) + (SINCE,) * rule.since.count('%s'))
+    assert sorted(row[0] for row in cursor.fetchall()) == [1, 3]
+    conn.close()
+
+
+def test_scan_with_findings_drops_the_enterprise_caches(tmp_path, monkeypatch):
+    dashboards = cache.TTLCache(cache.MemoryBackend(), namespace='test_dashboard')
+    monkeypatch.setattr(cache, '_enterprise_caches', [dashboards])
+    conn = sqlite_compat.connect(str(tmp_path / 'scan.db'))
+    create_sqlite_schema(conn)
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO enterprises (id, name) VALUES (1, 'acme')")
+    cursor.execute("INSERT INTO projects (id, name, enterprise_id) VALUES (1, 'p', 1)")
+    cursor.execute("INSERT INTO tasks (id, project_id, title, priority, status, due_date, created_at, updated_at) "
+                   "VALUES (1, 1, 'late', 'High', 'InProgress', '2026-01-01', '2026-01-01', '2026-01-01')")
+    conn.commit()
+
+    dashboards.set(1, {'total_risks': 0})
+    assert scan(conn, 1)['findings'] == 1
+    assert dashboards.get(1) is None
+
+    dashboards.set(1, {'total_risks': 1})
+    assert scan(conn, 1)['findings'] == 0
+    assert dashboards.get(1) == {'total_risks': 1}
+    conn.close()
+
+
+
+def test_findings_point_at_the_risks_raised_for_them(tmp_path, monkeypatch):
+    monkeypatch.setattr(risk_scanner, 'INSERT_ROWS', 3)  # several INSERT statements per page
+    conn = sqlite_compat.connect(str(tmp_path / 'scan.db'))
+    create_sqlite_schema(conn)
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO enterprises (id, name) VALUES (1, 'acme')")
+    cursor.executemany("INSERT INTO projects (id, name, enterprise_id) VALUES (%s, %s, 1)", [(1, 'a'), (2, 'b')])
+    cursor.execute("INSERT INTO risks (id, project_id, title) VALUES (40, 1, 'raised by hand')")
+    cursor.executemany(
+        "INSERT INTO tasks (id, project_id, title, priority, status, due_date, created_at, updated_at) "
+        "VALUES (%s, %s, %s, 'High', 'InProgress', '2026-01-01', '2026-01-01', '2026-01-01')",
+        [(n, 1 + n % 2, f'task {n}') for n in range(1, 9)])
+    conn.commit()
+
+    assert scan(conn, 1)['findings'] == 8
+    cursor.execute("""
+        SELECT f.source_id, r.id, r.title FROM risk_findings f JOIN risks r ON r.id = f.risk_id
+        WHERE f.rule_key = 'overdue_high_task' ORDER BY f.source_id
+    """)
+    found = cursor.fetchall()
+    assert [title for _, _, title in found] == [f'Overdue high-priority task: task {n}' for n in range(1, 9)]
+    assert len({risk_id for _, risk_id, _ in found}) == 8 and min(r for _, r, _ in found) > 40
+    conn.close()
+
+
+@pytest.mark.parametrize('body', [[1, 2], 'scan', {'budget': 'soon'}, {'budget': True}, {'budget': [30]}])
+def test_run_route_rejects_malformed_body(login, body):
+    response = login('Analyst').post('/analyst/api/risk-scanner/run', json=body)
+    assert response.status_code == 400
+    assert response.get_json()['error']
+
+
+def test_run_route_accepts_no_body_or_a_budget(login):
+    analyst = login('Analyst')
+    assert analyst.post('/analyst/api/risk-scanner/run').status_code == 200
+    assert analyst.post('/analyst/api/risk-scanner/run', json={'budget': 5, 'full': True}).status_code == 200
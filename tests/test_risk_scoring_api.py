@@ -0,0 +1,43 @@
+"""
+Calculator preview and rescore reject malformed bodies with 400 instead of failing in the scorer.
+"""
+import pytest
+
+PREVIEW = '/analyst/api/risk-score/preview'
+RESCORE = '/analyst/api/risk-score/rescore'
+
+
+def test_preview_scores_inputs(login):
+    response = login('Analyst').post(PREVIEW, json={
+        'risks': [{'probability': 0.8, 'impact_score': 5}, {'probability': '60', 'impact_score': None}],
+        'weights': {'w_exposure': 1},
+    })
+    assert response.status_code == 200
+    first, second = response.get_json()['results']
+    assert first == {'risk_score': 4.0, 'rag_status': 'Red', 'health_impact': 'Red'}
+    assert second['risk_score'] == 0.0
+
+
+@pytest.mark.parametrize('body', [
+    {'weights': {'w_exposure': 'heavy'}},
+    {'weights': {'w_exposure': float('inf')}},
+    {'weights': {'finance_cap': 0}},
+    {'weights': [0.5]},
+    {'risks': {'probability': 0.5}},
+    {'risks': [0.5]},
+    {'risks': [{'probability': 'likely'}]},
+    {'risks': [{'impact_score': [3]}]},
+    [1, 2],
+])
+def test_preview_rejects_malformed_body(login, body):
+    response = login('Analyst').post(PREVIEW, json=body)
+    assert response.status_code == 400
+    assert response.get_json()['error']
+
+
+def test_rescore_keeps_configured_weights_for_analysts(login, tenant):
+    # checks only the request gates: the write-back (UPDATE ... JOIN) needs MySQL
+    analyst = login('Analyst')
+    assert analyst.post(RESCORE, json={'project_id': tenant[2], 'weights': {'w_exposure': 5}}).status_code == 403
+    assert analyst.post(RESCORE, json={'project_id': 'x'}).status_code == 400
+    assert login('Admin').post(RESCORE, json={'project_id': tenant[2], 'weights': {'w_exposure': 'x'}}).status_code == 400
@@ -0,0 +1,87 @@
+"""
+ScheduleGraph.update() must land exactly where a full compute() over the same inputs does.
+"""
+import json
+import random
+from datetime import date
+
+from backend.schedule_graph import MILESTONE, NO_DATE, TASK, ScheduleGraph
+
+TODAY = date(2026, 5, 4).toordinal()
+
+
+def random_project(rnd, tasks=60, milestones=6, edges=120):
+    keys = [(TASK, i) for i in range(tasks)] + [(MILESTONE, i) for i in range(milestones)]
+    attrs = {key: random_attrs(rnd, key) for key in keys}
+    # mostly forward edges, plus a few that close cycles
+    links = set()
+    while len(links) < edges:
+        a, b = sorted(rnd.sample(range(len(keys)), 2))
+        if rnd.random() < 0.05:
+            a, b = b, a
+        links.add((keys[a], keys[b], rnd.choice((0, 0, 1, 3))))
+    return keys, attrs, sorted(links)
+
+
+def random_attrs(rnd, key):
+    if key[0] == MILESTONE:
+        return 0, TODAY + rnd.randint(-10, 90), None, False
+    done = TODAY - rnd.randint(1, 30) if rnd.random() < 0.2 else None
+    own = TODAY + rnd.randint(-20, 60) if rnd.random() < 0.8 else NO_DATE
+    return rnd.randint(1, 15), own, done, rnd.random() < 0.05
+
+
+def build(keys, attrs, links, today=TODAY):
+    graph = ScheduleGraph(1, today)
+    for key in keys:
+        graph.add_node(key, *attrs[key])
+    for predecessor, successor, lag in links:
+        graph.add_edge(predecessor, successor, lag)
+    return graph.compute()
+
+
+def assert_same(graph, reference):
+    assert graph.finish == reference.finish
+    assert graph.driver == reference.driver
+    assert graph.latest == reference.latest
+    assert graph.milestone_updates() == reference.milestone_updates()
+
+
+def test_update_matches_full_recompute():
+    rnd = random.Random(2026)
+    keys, attrs, links = random_project(rnd)
+    graph = build(keys, attrs, links)
+    graph.milestone_updates()  # as stored after the first run
+    for _ in range(40):
+        changes = {key: random_attrs(rnd, key) for key in rnd.sample(keys, rnd.randint(1, 4))}
+        attrs.update(changes)
+        visited = graph.update(changes)
+        assert visited is not None and len(visited) <= len(keys)
+        reference = build(keys, attrs, links)
+        reference.written = dict(graph.written)
+        assert_same(graph, reference)
+
+
+def test_new_day_and_unknown_nodes():
+    rnd = random.Random(7)
+    keys, attrs, links = random_project(rnd, tasks=30, milestones=3, edges=50)
+    graph = build(keys, attrs, links)
+    graph.update({}, today=TODAY + 5)
+    assert_same(graph, build(keys, attrs, links, today=TODAY + 5))
+    assert graph.update({(TASK, 999): (1, TODAY, None, False)}) is None
+
+
+def test_slip_is_traced_to_its_root_cause():
+    graph = ScheduleGraph(1, TODAY)
+    graph.add_node((TASK, 1), 5, TODAY + 2, None, False)
+    graph.add_node((TASK, 2), 3, TODAY + 4, None, False)
+    graph.add_node((MILESTONE, 1), 0, TODAY + 6, None, False)
+    graph.add_edge((TASK, 1), (TASK, 2), 1)
+    graph.add_edge((TASK, 2), (MILESTONE, 1))
+    graph.compute()
+    assert graph.projection(2)[1] == 0
+
+    graph.update({(TASK, 1): (5, TODAY + 6, None, False)})  # task 1's due date moves out by 4 days
+    projected, slip, path = graph.projection(2)
+    assert (projected.toordinal(), slip) == (TODAY + 10, 4)
+    assert [step[:2] for step in json.loads(path)] == [['task', 1], ['task', 2]]
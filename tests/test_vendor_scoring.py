@@ -0,0 +1,27 @@
+"""
+Vendor scoring settings are validated up front like the risk scoring ones.
+"""
+import pytest
+
+from backend.risk_scoring import ScoringInputError
+from backend.vendor_scoring import VendorScoringConfig
+
+
+@pytest.mark.parametrize('env, value', [
+    ('VENDOR_SCORE_VOLUME_CAP', '0'),
+    ('VENDOR_SCORE_LAG_CAP', '-5'),
+    ('VENDOR_SCORE_W_LAG', 'heavy'),
+    ('VENDOR_SCORE_W_EXPOSURE', 'nan'),
+])
+def test_from_env_rejects_bad_settings(monkeypatch, env, value):
+    monkeypatch.setenv(env, value)
+    with pytest.raises(ScoringInputError):
+        VendorScoringConfig.from_env()
+
+
+def test_from_env_reads_valid_settings(monkeypatch):
+    monkeypatch.setenv('VENDOR_SCORE_LAG_CAP', '30')
+    assert VendorScoringConfig.from_env(volume_cap='5').lag_cap == 30.0
+    assert VendorScoringConfig.from_env(volume_cap='5').volume_cap == 5.0
+    with pytest.raises(ScoringInputError):
+        VendorScoringConfig.from_env(volume_cap=0)